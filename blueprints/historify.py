@@ -13,6 +13,7 @@ import traceback
 from flask import Blueprint, Response, jsonify, request, send_file, session
 
 from utils.logging import get_logger
+from utils.response_format import RESPONSE_FORMATS, table_response
 from utils.session import check_session_validity
 
 logger = get_logger(__name__)
@@ -217,6 +218,12 @@ def get_chart_data():
         interval = request.args.get("interval", "D")
         start_date = request.args.get("start_date")
         end_date = request.args.get("end_date")
+        response_format = request.args.get("format", "json").lower()
+
+        if response_format not in RESPONSE_FORMATS:
+            return jsonify(
+                {"status": "error", "message": f"format must be one of: {', '.join(RESPONSE_FORMATS)}"}
+            ), 400
 
         success, response, status_code = service_get_chart_data(
             symbol=symbol,
@@ -224,8 +231,9 @@ def get_chart_data():
             interval=interval,
             start_date=start_date,
             end_date=end_date,
+            response_format=response_format,
         )
-        return jsonify(response), status_code
+        return table_response(response, status_code, response_format)
     except Exception as e:
         logger.error(f"Error getting chart data: {e}")
         traceback.print_exc()
@@ -411,6 +419,24 @@ def get_export_preview():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _emit_export_progress(current: int, total: int, symbol: str):
+    """Emit Socket.IO progress event for a running ZIP export."""
+    try:
+        from extensions import socketio
+
+        socketio.emit(
+            "historify_export_progress",
+            {
+                "current": current,
+                "total": total,
+                "symbol": symbol,
+                "percent": round((current / total) * 100, 1),
+            },
+        )
+    except Exception as e:
+        logger.debug(f"Could not emit export progress: {e}")
+
+
 @historify_bp.route("/api/export/bulk", methods=["POST"])
 @check_session_validity
 def bulk_export():
@@ -438,6 +464,7 @@ def bulk_export():
         end_date = data.get("end_date")
         split_by = data.get("split_by", "symbol")  # For ZIP: 'symbol' or 'none'
         compression = data.get("compression", "zstd")  # For Parquet
+        file_format = data.get("file_format", "csv")  # For ZIP: 'csv' or 'parquet' files
 
         # Validate intervals parameter using parse_interval for dynamic validation
         from database.historify_db import parse_interval
@@ -511,6 +538,8 @@ def bulk_export():
                 start_timestamp=start_timestamp,
                 end_timestamp=end_timestamp,
                 split_by=split_by,
+                file_format=file_format,
+                progress_callback=_emit_export_progress,
             )
             mime_type = "application/zip"
         elif format_type == "txt":
@@ -8,6 +8,7 @@ The key fixes are in the _handle_ticks method for proper topic generation.
 """
 import asyncio
 import json
+import logging
 import os
 import threading
 import time
@@ -40,6 +41,8 @@ class ZerodhaWebSocketAdapter(BaseBrokerWebSocketAdapter):
         self.lock = threading.Lock()
         self.subscribed_symbols = {}  # {symbol: {exchange, token, mode}}
         self.token_to_symbol = {}  # {token: (symbol, exchange)}
+        # {token: (subscription_exchange, frozenset(modes))}, rebuilt on (un)subscribe
+        self.token_subscriptions = {}
 
         # Authentication
         self.api_key = None
@@ -221,6 +224,7 @@ class ZerodhaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                     # Reset subscriptions tracking
                     self.subscribed_symbols.clear()
                     self.token_to_symbol.clear()
+                    self.token_subscriptions.clear()
 
                 # Always clean up ZMQ resources to ensure proper cleanup
                 self.cleanup_zmq()
@@ -325,6 +329,7 @@ class ZerodhaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                     "mapped_exchange": subscription_exchange,  # Mapped exchange for data matching
                 }
                 self.token_to_symbol[token] = (symbol, exchange)
+                self._index_token_subscription(token)
 
             self.logger.info(
                 f"✅ Subscribed to {exchange}:{symbol} (token: [REDACTED], mode: {zerodha_mode})"
@@ -365,6 +370,7 @@ class ZerodhaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 # Remove from tracking
                 del self.subscribed_symbols[key]
                 self.token_to_symbol.pop(token, None)
+                self._index_token_subscription(token)
 
             self.logger.info(f"✅ Unsubscribed from {exchange}:{symbol}")
             return {"status": "success", "message": f"Unsubscribed from {symbol}"}
@@ -412,91 +418,98 @@ class ZerodhaWebSocketAdapter(BaseBrokerWebSocketAdapter):
         else:
             return subscription_exchange  # Keep as-is for regular exchanges
 
+    def _index_token_subscription(self, token: int):
+        """
+        Refresh the token lookup used by _handle_ticks for one token.
+        Caller must hold self.lock.
+        """
+        subscription_exchange = None
+        subscribed_modes = set()
+        for sub_info in self.subscribed_symbols.values():
+            if sub_info["token"] == token:
+                subscription_exchange = sub_info["exchange"]
+                subscribed_modes.add(sub_info["mode"])
+
+        if subscription_exchange:
+            self.token_subscriptions[token] = (subscription_exchange, frozenset(subscribed_modes))
+        else:
+            self.token_subscriptions.pop(token, None)
+
     def _handle_ticks(self, ticks: list[dict]):
         """Handle incoming ticks from WebSocket"""
         if not ticks:
             return
 
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
         try:
             for tick in ticks:
                 transformed_tick = self._transform_tick(tick)
-                if transformed_tick:
-                    symbol = transformed_tick["symbol"]
-                    token = tick.get("instrument_token")
-                    original_tick_mode = transformed_tick.get(
-                        "mode", "ltp"
-                    )  # Original mode from the tick
-                    subscription_exchange = None
-                    subscribed_modes = set()  # Track which modes this symbol is subscribed to
-
-                    # Get subscription info to determine exchange and subscribed modes
-                    with self.lock:
-                        for key, sub_info in self.subscribed_symbols.items():
-                            if sub_info["token"] == token:
-                                # Found a subscription for this token
-                                subscription_exchange = sub_info["exchange"]
-                                mode_num = sub_info["mode"]
-                                subscribed_modes.add(mode_num)
-
-                    if not subscription_exchange:
-                        self.logger.warning(f"No subscription info found for token: {token}")
-                        continue
-
-                    # Set the data exchange field
-                    data_exchange = self._map_data_exchange(subscription_exchange)
-                    transformed_tick["exchange"] = data_exchange
-
-                    # If we have a 'full' mode tick, create and publish separate messages for each subscribed mode
-                    if original_tick_mode == "full":
-                        # Always publish the full depth data first
-                        depth_tick = transformed_tick.copy()
-                        depth_tick["mode"] = "full"
-                        depth_topic = self._generate_topic(symbol, subscription_exchange, "DEPTH")
+                if not transformed_tick:
+                    continue
+
+                symbol = transformed_tick["symbol"]
+                token = tick.get("instrument_token")
+                original_tick_mode = transformed_tick.get("mode", "ltp")  # Original mode from the tick
+
+                # Subscription exchange and subscribed modes for this token
+                subscription = self.token_subscriptions.get(token)
+                if subscription is None:
+                    self.logger.warning(f"No subscription info found for token: {token}")
+                    continue
+                subscription_exchange, subscribed_modes = subscription
+
+                # Set the data exchange field
+                data_exchange = self._map_data_exchange(subscription_exchange)
+                transformed_tick["exchange"] = data_exchange
+
+                # A 'full' tick serves every subscribed mode from one decoded record.
+                # publish_market_data serializes synchronously, so the record is
+                # narrowed in place between publishes instead of copied per topic.
+                if original_tick_mode == "full":
+                    # Always publish the full depth data first
+                    depth_topic = self._generate_topic(symbol, subscription_exchange, "DEPTH")
+                    if debug_enabled:
                         self.logger.debug(f"📊 Publishing DEPTH data to topic: {depth_topic}")
-                        self.publish_market_data(depth_topic, depth_tick)
-
-                        # If subscribed to Quote (mode 2), publish quote data
-                        if 2 in subscribed_modes:
-                            quote_tick = transformed_tick.copy()
-                            # Remove depth data for quote message
-                            if "depth" in quote_tick:
-                                del quote_tick["depth"]
-                            quote_tick["mode"] = "quote"
-                            quote_topic = self._generate_topic(
-                                symbol, subscription_exchange, "QUOTE"
-                            )
+                    self.publish_market_data(depth_topic, transformed_tick)
+
+                    # If subscribed to Quote (mode 2), publish quote data without depth
+                    if 2 in subscribed_modes:
+                        transformed_tick.pop("depth", None)
+                        transformed_tick["mode"] = "quote"
+                        quote_topic = self._generate_topic(symbol, subscription_exchange, "QUOTE")
+                        if debug_enabled:
                             self.logger.debug(f"📊 Publishing QUOTE data to topic: {quote_topic}")
-                            self.publish_market_data(quote_topic, quote_tick)
-
-                        # If subscribed to LTP (mode 1), publish LTP data
-                        if 1 in subscribed_modes:
-                            ltp_tick = {
-                                "symbol": symbol,
-                                "exchange": data_exchange,
-                                "mode": "ltp",
-                                "ltp": transformed_tick.get("ltp", 0),
-                                "timestamp": transformed_tick.get(
-                                    "timestamp", int(time.time() * 1000)
-                                ),
-                            }
-                            ltp_topic = self._generate_topic(symbol, subscription_exchange, "LTP")
+                        self.publish_market_data(quote_topic, transformed_tick)
+
+                    # If subscribed to LTP (mode 1), publish LTP data
+                    if 1 in subscribed_modes:
+                        ltp_tick = {
+                            "symbol": symbol,
+                            "exchange": data_exchange,
+                            "mode": "ltp",
+                            "ltp": transformed_tick.get("ltp", 0),
+                            "timestamp": transformed_tick.get(
+                                "timestamp", int(time.time() * 1000)
+                            ),
+                        }
+                        ltp_topic = self._generate_topic(symbol, subscription_exchange, "LTP")
+                        if debug_enabled:
                             self.logger.debug(f"📊 Publishing LTP data to topic: {ltp_topic}")
-                            self.publish_market_data(ltp_topic, ltp_tick)
-                            self.logger.debug(
-                                f"📊 LTP Data should be available for polling: {subscription_exchange}:{symbol}"
-                            )
-                    else:
-                        # For non-full modes, just publish as-is
-                        mode_str = {"ltp": "LTP", "quote": "QUOTE", "full": "DEPTH"}.get(
-                            original_tick_mode, "LTP"
-                        )
+                        self.publish_market_data(ltp_topic, ltp_tick)
+                else:
+                    # For non-full modes, just publish as-is
+                    mode_str = {"ltp": "LTP", "quote": "QUOTE", "full": "DEPTH"}.get(
+                        original_tick_mode, "LTP"
+                    )
 
-                        topic = self._generate_topic(symbol, subscription_exchange, mode_str)
+                    topic = self._generate_topic(symbol, subscription_exchange, mode_str)
+                    if debug_enabled:
                         self.logger.debug(f"📊 Publishing to topic: {topic}")
                         self.logger.debug(f"📊 Data structure: {transformed_tick}")
 
-                        # Publish to ZeroMQ
-                        self.publish_market_data(topic, transformed_tick)
+                    # Publish to ZeroMQ
+                    self.publish_market_data(topic, transformed_tick)
 
         except Exception as e:
             self.logger.error(f"Error handling ticks: {e}")
@@ -741,6 +754,7 @@ class ZerodhaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 # Clear subscription records
                 self.subscribed_symbols.clear()
                 self.token_to_symbol.clear()
+                self.token_subscriptions.clear()
 
             # Clean up ZMQ resources using base class method
             self.cleanup_zmq()
@@ -24,6 +24,18 @@ from typing import Any, Dict, List, Optional, Set
 import websockets.client
 import websockets.exceptions
 
+# Precompiled layouts of the binary packets (big-endian, prices in paise)
+_UINT16 = struct.Struct(">H")
+_LTP_PACKET = struct.Struct(">Ii")  # token, last price
+_QUOTE_PACKET = struct.Struct(">11i")  # token, ltp, ltq, atp, volume, tbq, tsq, ohlc
+_FULL_EXTENSION = struct.Struct(">5i")  # ltt, oi, oi high, oi low, exchange timestamp
+_DEPTH_ENTRY = struct.Struct(">iih2x")  # quantity, price, orders, padding
+
+QUOTE_PACKET_SIZE = 44
+FULL_EXTENSION_END = 64
+DEPTH_SIZE = 120
+FULL_PACKET_SIZE = FULL_EXTENSION_END + DEPTH_SIZE
+
 
 class ZerodhaWebSocket:
     """
@@ -736,31 +748,39 @@ class ZerodhaWebSocket:
             self.error_count += 1
 
     def _parse_binary_message(self, data: bytes) -> list[dict]:
-        """Parse binary message according to Zerodha specification"""
+        """
+        Parse binary message according to Zerodha specification.
+
+        The frame is read through a memoryview with precompiled structs, so no
+        packet or field is copied out of the original buffer.
+        """
         try:
-            if len(data) < 4:
+            view = memoryview(data)
+            size = len(view)
+            if size < 4:
                 return []
 
             # Parse header: first 2 bytes = number of packets
-            num_packets = struct.unpack(">H", data[0:2])[0]
+            num_packets = _UINT16.unpack_from(view, 0)[0]
+
+            # Shared by every packet of the frame
+            timestamp = int(time.time() * 1000)
 
             packets = []
             offset = 2
 
-            for packet_idx in range(num_packets):
-                if offset + 2 > len(data):
+            for _ in range(num_packets):
+                if offset + 2 > size:
                     break
 
                 # Next 2 bytes: packet length
-                packet_length = struct.unpack(">H", data[offset : offset + 2])[0]
+                packet_length = _UINT16.unpack_from(view, offset)[0]
                 offset += 2
 
-                if offset + packet_length > len(data):
+                if offset + packet_length > size:
                     break
 
-                # Extract and parse packet
-                packet_data = data[offset : offset + packet_length]
-                tick = self._parse_packet(packet_data)
+                tick = self._parse_packet(view, offset, packet_length, timestamp)
                 if tick:
                     packets.append(tick)
 
@@ -772,106 +792,101 @@ class ZerodhaWebSocket:
             self.logger.error(f"❌ Error parsing binary message: {e}")
             return []
 
-    def _parse_packet(self, packet: bytes) -> dict | None:
+    def _parse_packet(
+        self,
+        packet: bytes | memoryview,
+        offset: int = 0,
+        length: int | None = None,
+        timestamp: int | None = None,
+    ) -> dict | None:
         """
         Parse individual packet with improved error handling.
         ✅ ENHANCED: Adds exchange information to tick data.
+
+        Args:
+            packet: Buffer containing the packet (a whole frame is fine)
+            offset: Start of the packet within the buffer
+            length: Packet length (defaults to the rest of the buffer)
+            timestamp: Receive timestamp in ms (defaults to now)
         """
         try:
-            if len(packet) < 8:
+            if length is None:
+                length = len(packet) - offset
+            if length < 8:
                 return None
 
-            # Extract instrument token and last price
-            instrument_token = struct.unpack(">I", packet[0:4])[0]
-            last_price_paise = struct.unpack(">i", packet[4:8])[0]
-            last_price = last_price_paise / 100.0
+            if length >= QUOTE_PACKET_SIZE:
+                # Quote and full packets: 11 integers * 4 bytes = 44 bytes
+                fields = _QUOTE_PACKET.unpack_from(packet, offset)
+                instrument_token = fields[0]
+                last_price = fields[1] / 100.0
+            else:
+                instrument_token, last_price_paise = _LTP_PACKET.unpack_from(packet, offset)
+                last_price = last_price_paise / 100.0
+                fields = None
 
             # Determine mode based on packet length
-            if len(packet) == 8:
+            if length == 8:
                 mode = self.MODE_LTP
-            elif len(packet) == 44:
+            elif length == QUOTE_PACKET_SIZE:
                 mode = self.MODE_QUOTE
-            elif len(packet) >= 184:
+            elif length >= FULL_PACKET_SIZE:
                 mode = self.MODE_FULL
             else:
                 mode = self.mode_map.get(instrument_token, self.MODE_QUOTE)
 
-            # ✅ NEW: Get exchange information for this token
-            exchange = None
-            with self.lock:
-                exchange = self.token_exchange_map.get(instrument_token)
-
             # Basic tick structure
             tick = {
                 "instrument_token": instrument_token,
                 "last_traded_price": last_price,
                 "last_price": last_price,
                 "mode": mode,
-                "timestamp": int(time.time() * 1000),
+                "timestamp": timestamp if timestamp is not None else int(time.time() * 1000),
             }
 
             # ✅ NEW: Add exchange information if available
+            exchange = self.token_exchange_map.get(instrument_token)
             if exchange:
                 tick["source_exchange"] = exchange  # Add source exchange from mapping
 
-            # Parse additional fields for quote mode (44 bytes)
-            if len(packet) >= 44:
-                try:
-                    # Only unpack exactly 44 bytes for quote mode
-                    fields = struct.unpack(">11i", packet[0:44])  # 11 integers * 4 bytes = 44 bytes
-
-                    tick.update(
-                        {
-                            "instrument_token": fields[0],
-                            "last_traded_price": fields[1] / 100.0,
-                            "last_price": fields[1] / 100.0,
-                            "last_traded_quantity": fields[2],
-                            "average_traded_price": fields[3] / 100.0,
-                            "average_price": fields[3] / 100.0,
-                            "volume_traded": fields[4],
-                            "volume": fields[4],
-                            "total_buy_quantity": fields[5],
-                            "total_sell_quantity": fields[6],
-                            "open_price": fields[7] / 100.0,
-                            "high_price": fields[8] / 100.0,
-                            "low_price": fields[9] / 100.0,
-                            "close_price": fields[10] / 100.0,
-                            "ohlc": {
-                                "open": fields[7] / 100.0,
-                                "high": fields[8] / 100.0,
-                                "low": fields[9] / 100.0,
-                                "close": fields[10] / 100.0,
-                            },
-                        }
-                    )
-                except struct.error as e:
-                    self.logger.debug(f"⚠️ Quote parsing issue (packet length: {len(packet)}): {e}")
-                    # Fallback - just use LTP data
-                    pass
-
-            # Parse full mode fields if available (64+ bytes)
-            if len(packet) >= 64:
-                try:
-                    extended_fields = struct.unpack(">iiiii", packet[44:64])
-                    tick.update(
-                        {
-                            "last_traded_timestamp": extended_fields[0],
-                            "open_interest": extended_fields[1],
-                            "oi": extended_fields[1],
-                            "exchange_timestamp": extended_fields[4],
-                        }
-                    )
-                except struct.error:
-                    pass
-
-            # Parse market depth for full mode (184+ bytes)
-            if len(packet) >= 184:
-                try:
-                    depth = self._parse_market_depth(packet[64:184])
-                    if depth:
-                        tick["depth"] = depth
-                except Exception:
-                    pass
+            # Additional fields for quote mode (44 bytes)
+            if fields is not None:
+                open_price = fields[7] / 100.0
+                high_price = fields[8] / 100.0
+                low_price = fields[9] / 100.0
+                close_price = fields[10] / 100.0
+                average_price = fields[3] / 100.0
+                tick["last_traded_quantity"] = fields[2]
+                tick["average_traded_price"] = average_price
+                tick["average_price"] = average_price
+                tick["volume_traded"] = fields[4]
+                tick["volume"] = fields[4]
+                tick["total_buy_quantity"] = fields[5]
+                tick["total_sell_quantity"] = fields[6]
+                tick["open_price"] = open_price
+                tick["high_price"] = high_price
+                tick["low_price"] = low_price
+                tick["close_price"] = close_price
+                tick["ohlc"] = {
+                    "open": open_price,
+                    "high": high_price,
+                    "low": low_price,
+                    "close": close_price,
+                }
+
+            # Full mode fields if available (64+ bytes)
+            if length >= FULL_EXTENSION_END:
+                extended_fields = _FULL_EXTENSION.unpack_from(packet, offset + QUOTE_PACKET_SIZE)
+                tick["last_traded_timestamp"] = extended_fields[0]
+                tick["open_interest"] = extended_fields[1]
+                tick["oi"] = extended_fields[1]
+                tick["exchange_timestamp"] = extended_fields[4]
+
+            # Market depth for full mode (184+ bytes)
+            if length >= FULL_PACKET_SIZE:
+                depth = self._parse_market_depth(packet, offset + FULL_EXTENSION_END)
+                if depth:
+                    tick["depth"] = depth
 
             return tick
 
@@ -879,39 +894,27 @@ class ZerodhaWebSocket:
             self.logger.error(f"❌ Error parsing packet: {e}")
             return None
 
-    def _parse_market_depth(self, depth_data: bytes) -> dict | None:
-        """Parse market depth data"""
+    def _parse_market_depth(self, depth_data: bytes | memoryview, offset: int = 0) -> dict | None:
+        """
+        Parse market depth data (5 buy levels followed by 5 sell levels)
+
+        Args:
+            depth_data: Buffer containing the depth block
+            offset: Start of the 120 byte depth block within the buffer
+        """
         try:
-            if len(depth_data) < 120:
+            if len(depth_data) - offset < DEPTH_SIZE:
                 return None
 
-            depth = {"buy": [], "sell": []}
-
-            # Parse buy side (first 5 entries)
-            for i in range(5):
-                offset = i * 12
-                if offset + 10 <= len(depth_data):
-                    quantity, price, orders = struct.unpack(
-                        ">iih", depth_data[offset : offset + 10]
-                    )
-                    if price > 0:  # Only add valid prices
-                        depth["buy"].append(
-                            {"quantity": quantity, "price": price / 100.0, "orders": orders}
-                        )
-
-            # Parse sell side (next 5 entries)
-            for i in range(5):
-                offset = 60 + (i * 12)
-                if offset + 10 <= len(depth_data):
-                    quantity, price, orders = struct.unpack(
-                        ">iih", depth_data[offset : offset + 10]
-                    )
-                    if price > 0:  # Only add valid prices
-                        depth["sell"].append(
-                            {"quantity": quantity, "price": price / 100.0, "orders": orders}
-                        )
+            block = memoryview(depth_data)[offset : offset + DEPTH_SIZE]
+            buy = []
+            sell = []
+            for level, (quantity, price, orders) in enumerate(_DEPTH_ENTRY.iter_unpack(block)):
+                if price > 0:  # Only add valid prices
+                    side = buy if level < 5 else sell
+                    side.append({"quantity": quantity, "price": price / 100.0, "orders": orders})
 
-            return depth if (depth["buy"] or depth["sell"]) else None
+            return {"buy": buy, "sell": sell} if (buy or sell) else None
 
         except Exception as e:
             self.logger.error(f"❌ Error parsing market depth: {e}")
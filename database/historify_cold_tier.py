@@ -0,0 +1,242 @@
+# database/historify_cold_tier.py
+"""
+Historify Parquet Cold Tier
+
+Optional second storage tier for market_data. Closed months are compacted out
+of the DuckDB table into hive-partitioned Parquet files:
+
+    <root>/exchange=NSE/interval=1m/symbol=SBIN/year=2024/data_<id>.parquet
+
+The hot table keeps recent data and stays small, so inserts, VACUUM and the
+file lock are no longer affected by the full history.
+
+Both tiers are read through the market_data_all view. Filters on symbol,
+exchange, interval and timestamp are pushed down into the Parquet scan, so
+only the matching partitions and row groups are read. If a compacted month
+is downloaded again, the new rows land in the hot table and take precedence
+over the Parquet copy until the next compaction merges them.
+
+Each partition holds a single file, rewritten when more rows are compacted
+into it. Parquet files can be read directly by other tools (pandas, polars,
+backtesting engines) without going through DuckDB.
+
+Configuration:
+    HISTORIFY_COLD_TIER: Compact closed months into Parquet (default: false)
+    HISTORIFY_COLD_TIER_PATH: Root directory of the Parquet tier
+                              (default: historify_cold next to the database file)
+    HISTORIFY_COLD_TIER_COMPACT_INTERVAL: Seconds between compaction passes (default: 86400)
+"""
+
+import glob
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# View that reads both tiers; use it instead of market_data for reads
+MARKET_DATA_VIEW = "market_data_all"
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_COMPACT_INTERVAL = 86400
+
+OHLCV_COLUMNS = "timestamp, open, high, low, close, volume, oi"
+
+HIVE_TYPES = "{'exchange': VARCHAR, 'interval': VARCHAR, 'symbol': VARCHAR, 'year': INTEGER}"
+
+
+def is_cold_tier_enabled() -> bool:
+    """Check whether closed months should be compacted into the Parquet tier"""
+    return os.getenv("HISTORIFY_COLD_TIER", "false").strip().lower() in ("true", "1", "yes")
+
+
+def get_compact_interval() -> float:
+    """Get seconds between background compaction passes (0 disables)"""
+    return float(os.getenv("HISTORIFY_COLD_TIER_COMPACT_INTERVAL", DEFAULT_COMPACT_INTERVAL))
+
+
+def closed_month_cutoff(now: datetime | None = None) -> int:
+    """
+    Get the epoch of the start of the current month in IST.
+
+    Everything before it belongs to a closed month.
+    """
+    now = (now or datetime.now(IST)).astimezone(IST)
+    return int(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+
+def year_bounds(year: int) -> tuple[int, int]:
+    """Get the [start, end) epoch range of an IST calendar year"""
+    start = datetime(year, 1, 1, tzinfo=IST)
+    end = datetime(year + 1, 1, 1, tzinfo=IST)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _sql_string(value: str) -> str:
+    """Quote a value as a SQL string literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def partition_dir(root: str, exchange: str, interval: str, symbol: str, year: int | None = None) -> str:
+    """Get the hive partition directory of a series (or of one year of it)"""
+    path = os.path.join(root, f"exchange={exchange}", f"interval={interval}", f"symbol={symbol}")
+    if year is not None:
+        path = os.path.join(path, f"year={year}")
+    return path
+
+
+def _files_glob(root: str) -> str:
+    return os.path.join(root, "exchange=*", "interval=*", "symbol=*", "year=*", "*.parquet")
+
+
+def has_cold_data(root: str) -> bool:
+    """Check whether the Parquet tier contains any files"""
+    return next(glob.iglob(_files_glob(glob.escape(root))), None) is not None
+
+
+def _cold_scan_sql(root: str) -> str:
+    return (
+        f"read_parquet({_sql_string(_files_glob(root))}, "
+        f"hive_partitioning = true, hive_types = {HIVE_TYPES})"
+    )
+
+
+def market_data_view_sql(root: str) -> str:
+    """
+    Build the CREATE VIEW statement for market_data_all.
+
+    Without Parquet files the view is a plain projection of market_data.
+    Otherwise both tiers are combined and, for duplicate keys, the hot row wins.
+
+    Args:
+        root: Root directory of the Parquet tier
+    """
+    hot = f"SELECT symbol, exchange, interval, {OHLCV_COLUMNS} FROM market_data"
+    if not has_cold_data(root):
+        return f"CREATE OR REPLACE VIEW {MARKET_DATA_VIEW} AS {hot}"
+
+    return f"""
+        CREATE OR REPLACE VIEW {MARKET_DATA_VIEW} AS
+        SELECT symbol, exchange, interval, {OHLCV_COLUMNS}
+        FROM (
+            SELECT 0 AS tier, symbol, exchange, interval, {OHLCV_COLUMNS} FROM market_data
+            UNION ALL
+            SELECT 1 AS tier, symbol, exchange, interval, {OHLCV_COLUMNS} FROM {_cold_scan_sql(root)}
+        )
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY symbol, exchange, interval, timestamp ORDER BY tier
+        ) = 1
+    """
+
+
+def compact_partition(
+    conn, root: str, exchange: str, interval: str, symbol: str, year: int, cutoff: int
+) -> int:
+    """
+    Move one series' rows of one year, before cutoff, into its Parquet partition.
+
+    Hot rows are merged with the partition's existing file into a new file,
+    which replaces the old one before the hot rows are deleted. A failure at
+    any step therefore leaves the rows readable from at least one tier.
+
+    Args:
+        conn: Writer connection
+        root: Root directory of the Parquet tier
+        exchange: Exchange code
+        interval: Stored interval (1m or D)
+        symbol: Trading symbol
+        year: IST calendar year of the partition
+        cutoff: Only rows before this epoch are moved
+
+    Returns:
+        Number of rows removed from the hot table
+    """
+    year_start, year_end = year_bounds(year)
+    upper = min(year_end, cutoff)
+    hot_filter = "symbol = ? AND exchange = ? AND interval = ? AND timestamp >= ? AND timestamp < ?"
+    hot_params = [symbol, exchange, interval, year_start, upper]
+
+    directory = partition_dir(root, exchange, interval, symbol, year)
+    os.makedirs(directory, exist_ok=True)
+    existing = sorted(glob.glob(os.path.join(glob.escape(directory), "*.parquet")))
+
+    source = f"SELECT 0 AS tier, {OHLCV_COLUMNS} FROM market_data WHERE {hot_filter}"
+    if existing:
+        files = ", ".join(_sql_string(path) for path in existing)
+        source += f" UNION ALL SELECT 1 AS tier, {OHLCV_COLUMNS} FROM read_parquet([{files}])"
+
+    target = os.path.join(directory, f"data_{uuid.uuid4().hex}.parquet")
+    staging = target + ".tmp"
+    try:
+        conn.execute(
+            f"""
+            COPY (
+                SELECT {OHLCV_COLUMNS}
+                FROM ({source})
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY timestamp ORDER BY tier) = 1
+                ORDER BY timestamp
+            ) TO {_sql_string(staging)} (FORMAT PARQUET, COMPRESSION 'zstd')
+        """,
+            hot_params,
+        )
+        os.replace(staging, target)
+    finally:
+        if os.path.exists(staging):
+            os.remove(staging)
+
+    for path in existing:
+        os.remove(path)
+
+    return conn.execute(f"DELETE FROM market_data WHERE {hot_filter}", hot_params).fetchone()[0]
+
+
+def delete_cold_data(root: str, symbol: str, exchange: str, interval: str | None = None) -> bool:
+    """
+    Delete a symbol's Parquet partitions.
+
+    Args:
+        root: Root directory of the Parquet tier
+        symbol: Trading symbol
+        exchange: Exchange code
+        interval: Only this interval (if None, all intervals)
+
+    Returns:
+        True if any partition was removed
+    """
+    pattern = partition_dir(
+        glob.escape(root),
+        glob.escape(exchange),
+        glob.escape(interval) if interval else "*",
+        glob.escape(symbol),
+    )
+    directories = glob.glob(pattern)
+    for directory in directories:
+        shutil.rmtree(directory, ignore_errors=True)
+    return bool(directories)
+
+
+def get_cold_tier_stats(conn, root: str) -> dict[str, Any]:
+    """
+    Get file count, size and row count of the Parquet tier.
+
+    Row counts come from Parquet footers, so no data is scanned.
+    """
+    files = glob.glob(_files_glob(glob.escape(root)))
+    records = 0
+    if files:
+        records = conn.execute(
+            f"SELECT COALESCE(SUM(num_rows), 0) FROM parquet_file_metadata({_sql_string(_files_glob(root))})"
+        ).fetchone()[0]
+
+    return {
+        "enabled": is_cold_tier_enabled(),
+        "path": root,
+        "files": len(files),
+        "size_mb": round(sum(os.path.getsize(path) for path in files) / (1024 * 1024), 2),
+        "records": int(records),
+    }
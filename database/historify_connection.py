@@ -0,0 +1,333 @@
+# database/historify_connection.py
+"""
+Historify DuckDB Connection Manager
+
+Optionally keeps one DuckDB database instance open across calls instead of
+opening and closing the file on every call.
+
+- Readers get a cursor per thread, created from the shared database instance
+  and reused for every read on that thread. DuckDB's MVCC lets them run
+  concurrently with each other and with the writer.
+- Writes go through a single writer connection. Callers wait their turn in
+  a FIFO queue, so writes are serialized in arrival order and never fight
+  over the file lock.
+
+Wait time and queue depth for the writer are tracked for monitoring.
+
+DuckDB holds an exclusive lock on the file while it is open read-write, so no
+other process can open it meanwhile. The default is therefore a fresh
+connection per call. When the persistent connection is enabled it is released
+after HISTORIFY_IDLE_CLOSE_SECONDS without use, so other processes (such as
+historify_live_refresh.py, or an external reader) can get the file between
+bursts. Only enable it when the app is the sole process using the database.
+
+Configuration:
+    HISTORIFY_PERSISTENT_CONNECTION: Set to true to keep the database open across
+                                     calls (default: false)
+    HISTORIFY_IDLE_CLOSE_SECONDS: Close the persistent connection after this many
+                                  idle seconds, 0 to keep it open (default: 2)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+
+import duckdb
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def is_persistent_connection_enabled() -> bool:
+    """Check whether the long-lived connection manager is enabled"""
+    return os.getenv("HISTORIFY_PERSISTENT_CONNECTION", "false").strip().lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+
+def get_idle_close_seconds() -> float:
+    """Seconds without use after which the persistent connection is released"""
+    try:
+        return max(0.0, float(os.getenv("HISTORIFY_IDLE_CLOSE_SECONDS", "2")))
+    except ValueError:
+        return 2.0
+
+
+def connect_with_retry(db_path: str, max_retries: int = 3, retry_delay: float = 0.5):
+    """
+    Open a DuckDB connection, retrying on temporary file access conflicts.
+
+    DuckDB uses exclusive file locking on Windows, so another process may hold
+    the file briefly.
+
+    Args:
+        db_path: Path to the database file
+        max_retries: Maximum number of connection attempts
+        retry_delay: Base delay in seconds between attempts (grows linearly)
+    """
+    last_error = None
+    for attempt in range(max_retries):
+        try:
+            return duckdb.connect(db_path)
+        except Exception as e:
+            last_error = e
+            if attempt < max_retries - 1:
+                logger.debug(f"DuckDB connection attempt {attempt + 1} failed, retrying: {e}")
+                time.sleep(retry_delay * (attempt + 1))
+            else:
+                logger.exception(f"Failed to connect to DuckDB after {max_retries} attempts: {e}")
+                if "lock" in str(e).lower():
+                    logger.error(
+                        f"{db_path} is locked by another process. If the app runs with "
+                        "HISTORIFY_PERSISTENT_CONNECTION=true, disable it or lower "
+                        "HISTORIFY_IDLE_CLOSE_SECONDS when other processes use the database."
+                    )
+
+    raise last_error or Exception("Failed to connect to DuckDB")
+
+
+class HistorifyConnectionManager:
+    """
+    Long-lived DuckDB connections: one FIFO-serialized writer and a reader
+    cursor per thread, all on the same database instance.
+    """
+
+    def __init__(self, db_path_getter: Callable[[], str], idle_close_seconds: float | None = None):
+        """
+        Initialize the manager (the database is opened on first use)
+
+        Args:
+            db_path_getter: Returns the database file path
+            idle_close_seconds: Close the database after this many idle seconds
+                                (0 = never; default HISTORIFY_IDLE_CLOSE_SECONDS)
+        """
+        self._db_path_getter = db_path_getter
+        self._idle_close_seconds = (
+            get_idle_close_seconds() if idle_close_seconds is None else idle_close_seconds
+        )
+        self._open_lock = threading.Lock()
+        # Readers and writers (including queued ones) currently using the database
+        self._active = 0
+        self._last_used = time.monotonic()
+        self._idle_thread: threading.Thread | None = None
+        self._root: duckdb.DuckDBPyConnection | None = None
+        self._writer_conn: duckdb.DuckDBPyConnection | None = None
+        self._generation = 0
+        self._local = threading.local()
+
+        # Writer FIFO: one event per waiting thread, head of the deque owns the writer
+        self._queue_lock = threading.Lock()
+        self._waiters: deque[threading.Event] = deque()
+        self._writer_owner: int | None = None
+        self._writer_depth = 0
+
+        # Metrics
+        self.opens = 0
+        self.reader_cursors_created = 0
+        self.reads = 0
+        self.writes = 0
+        self.writer_wait_total = 0.0
+        self.writer_wait_max = 0.0
+        self.writer_queue_max = 0
+        self.writer_hold_total = 0.0
+        self.idle_closes = 0
+
+    def _ensure_open(self) -> duckdb.DuckDBPyConnection:
+        """Open the shared database instance if needed"""
+        root = self._root
+        if root is not None:
+            return root
+        with self._open_lock:
+            if self._root is None:
+                self._root = connect_with_retry(self._db_path_getter())
+                self._writer_conn = self._root.cursor()
+                self._generation += 1
+                self.opens += 1
+                logger.debug(f"Opened Historify database {self._db_path_getter()}")
+                if self._idle_close_seconds > 0 and self._idle_thread is None:
+                    self._idle_thread = threading.Thread(
+                        target=self._idle_close_loop, name="historify-idle-close", daemon=True
+                    )
+                    self._idle_thread.start()
+            return self._root
+
+    def _acquire(self) -> None:
+        """Mark the database in use so the idle closer leaves it open"""
+        with self._open_lock:
+            self._active += 1
+
+    def _release(self) -> None:
+        with self._open_lock:
+            self._active -= 1
+            self._last_used = time.monotonic()
+
+    def _idle_close_loop(self) -> None:
+        """Release the file lock once nobody has used the database for a while"""
+        while True:
+            time.sleep(min(self._idle_close_seconds, 1.0))
+            with self._open_lock:
+                if (
+                    self._root is None
+                    or self._active
+                    or time.monotonic() - self._last_used < self._idle_close_seconds
+                ):
+                    continue
+                root, writer_conn = self._root, self._writer_conn
+                self._root = None
+                self._writer_conn = None
+                self.idle_closes += 1
+            self._close_connections(writer_conn, root)
+            logger.debug("Closed idle Historify database")
+
+    def _thread_cursor(self) -> duckdb.DuckDBPyConnection:
+        """Get this thread's reader cursor, creating it on first use"""
+        root = self._ensure_open()
+        local = self._local
+        cursor = getattr(local, "cursor", None)
+        if cursor is None or getattr(local, "generation", None) != self._generation:
+            with self._open_lock:
+                cursor = root.cursor()
+            local.cursor = cursor
+            local.generation = self._generation
+            local.depth = 0
+            self.reader_cursors_created += 1
+        return cursor
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow this thread's reader cursor.
+
+        Nested reads on the same thread get a temporary cursor, so an outer
+        result that is still being fetched is not invalidated.
+        """
+        self._acquire()
+        try:
+            cursor = self._thread_cursor()
+            local = self._local
+            self.reads += 1
+
+            if local.depth > 0:
+                with self._open_lock:
+                    nested = self._root.cursor()
+                try:
+                    yield nested
+                finally:
+                    nested.close()
+                return
+
+            local.depth += 1
+            try:
+                yield cursor
+            finally:
+                local.depth -= 1
+        finally:
+            self._release()
+
+    @contextmanager
+    def writer(self):
+        """
+        Acquire the writer connection, waiting in FIFO order.
+
+        Re-entrant on the owning thread. If the body raises while a transaction
+        is open, it is rolled back so the shared connection stays usable.
+        """
+        thread_id = threading.get_ident()
+
+        if self._writer_owner == thread_id:
+            self._writer_depth += 1
+            try:
+                yield self._writer_conn
+            finally:
+                self._writer_depth -= 1
+            return
+
+        self._acquire()
+        try:
+            self._ensure_open()
+        except BaseException:
+            self._release()
+            raise
+
+        started = time.monotonic()
+        turn = threading.Event()
+        with self._queue_lock:
+            self._waiters.append(turn)
+            depth = len(self._waiters)
+            if depth > self.writer_queue_max:
+                self.writer_queue_max = depth
+            if depth == 1:
+                turn.set()
+        turn.wait()
+
+        acquired = time.monotonic()
+        wait = acquired - started
+        self.writer_wait_total += wait
+        if wait > self.writer_wait_max:
+            self.writer_wait_max = wait
+        self.writes += 1
+
+        self._writer_owner = thread_id
+        self._writer_depth = 1
+        conn = self._writer_conn
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                # No transaction was open
+                pass
+            raise
+        finally:
+            self._writer_owner = None
+            self._writer_depth = 0
+            self.writer_hold_total += time.monotonic() - acquired
+            with self._queue_lock:
+                self._waiters.popleft()
+                if self._waiters:
+                    self._waiters[0].set()
+            self._release()
+
+    def close(self) -> None:
+        """Close all connections; the next call reopens the database"""
+        with self._open_lock:
+            root = self._root
+            writer_conn = self._writer_conn
+            self._root = None
+            self._writer_conn = None
+        self._close_connections(writer_conn, root)
+
+    @staticmethod
+    def _close_connections(*connections) -> None:
+        for conn in connections:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.debug(f"Error closing Historify connection: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get connection, wait time and queue depth metrics"""
+        return {
+            "open": self._root is not None,
+            "opens": self.opens,
+            "idle_closes": self.idle_closes,
+            "reader_cursors_created": self.reader_cursors_created,
+            "reads": self.reads,
+            "writes": self.writes,
+            "writer_queue_depth": len(self._waiters),
+            "writer_queue_max": self.writer_queue_max,
+            "writer_wait_avg_ms": round(self.writer_wait_total / self.writes * 1000, 3)
+            if self.writes
+            else 0,
+            "writer_wait_max_ms": round(self.writer_wait_max * 1000, 3),
+            "writer_hold_total_s": round(self.writer_hold_total, 3),
+        }
@@ -7,15 +7,33 @@ Optimized for backtesting and analytical queries.
 """
 
 import os
+import threading
+import time
+from collections.abc import Callable
 from contextlib import contextmanager
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import duckdb
 import pandas as pd
 from dotenv import load_dotenv
 
+from database.historify_cold_tier import (
+    IST,
+    closed_month_cutoff,
+    compact_partition,
+    delete_cold_data,
+    get_cold_tier_stats,
+    get_compact_interval,
+    is_cold_tier_enabled,
+    market_data_view_sql,
+)
+from database.historify_connection import (
+    HistorifyConnectionManager,
+    connect_with_retry,
+    is_persistent_connection_enabled,
+)
+from database.historify_export import EXPORT_FORMATS, ExportEntry, ExportJob, write_zip_entries
 from utils.logging import get_logger
 
 # Initialize logger
@@ -37,6 +55,18 @@ def get_db_path() -> str:
     return os.path.join(base_dir, HISTORIFY_DB_PATH)
 
 
+def get_cold_tier_path() -> str:
+    """Get absolute path to the Parquet cold tier directory."""
+    path = os.getenv("HISTORIFY_COLD_TIER_PATH")
+    if not path:
+        return os.path.join(os.path.dirname(get_db_path()), "historify_cold")
+    if os.path.isabs(path):
+        return path
+    # Relative to the openalgo directory
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, path)
+
+
 def ensure_db_directory():
     """Ensure the database directory exists."""
     db_path = get_db_path()
@@ -46,50 +76,62 @@ def ensure_db_directory():
         logger.info(f"Created database directory: {db_dir}")
 
 
+def _open_db_path() -> str:
+    """Ensure the database directory exists and return the database path."""
+    ensure_db_directory()
+    return get_db_path()
+
+
+# Long-lived connections shared by all callers (see historify_connection)
+_connection_manager = HistorifyConnectionManager(_open_db_path)
+
+
 @contextmanager
-def get_connection(max_retries: int = 3, retry_delay: float = 0.5):
+def get_connection(max_retries: int = 3, retry_delay: float = 0.5, read_only: bool = False):
     """
     Get a DuckDB connection with proper resource management and retry logic.
 
-    DuckDB uses exclusive file locking on Windows. This function includes retry
-    logic to handle temporary file access conflicts in concurrent scenarios.
+    By default a fresh connection is opened and closed per call, so other
+    processes can open the file in between. With HISTORIFY_PERSISTENT_CONNECTION=true
+    connections come from a long-lived manager instead: reads use this thread's
+    cursor on the shared database instance, writes wait in FIFO order for the
+    single writer connection, and the file is released when idle.
+
+    DuckDB uses exclusive file locking on Windows. Opening the database includes
+    retry logic to handle temporary file access conflicts.
 
     Args:
         max_retries: Maximum number of connection attempts (default: 3)
         retry_delay: Delay in seconds between retries (default: 0.5)
+        read_only: The caller only reads, so it does not need to wait for the writer
 
     Usage:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute("SELECT * FROM market_data").fetchdf()
     """
-    import time
-
-    ensure_db_directory()
-    db_path = get_db_path()
-    conn = None
-    last_error = None
-
-    for attempt in range(max_retries):
-        try:
-            conn = duckdb.connect(db_path)
-            break
-        except Exception as e:
-            last_error = e
-            if attempt < max_retries - 1:
-                logger.debug(f"DuckDB connection attempt {attempt + 1} failed, retrying: {e}")
-                time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-            else:
-                logger.exception(f"Failed to connect to DuckDB after {max_retries} attempts: {e}")
-
-    if conn is None:
-        raise last_error or Exception("Failed to connect to DuckDB")
+    if is_persistent_connection_enabled():
+        manager_context = _connection_manager.reader() if read_only else _connection_manager.writer()
+        with manager_context as conn:
+            yield conn
+        return
 
+    conn = connect_with_retry(_open_db_path(), max_retries, retry_delay)
     try:
         yield conn
     finally:
         conn.close()
 
 
+def get_connection_stats() -> dict[str, Any]:
+    """Get connection manager metrics (writer wait time, queue depth, reads/writes)."""
+    return _connection_manager.get_stats()
+
+
+def close_connections():
+    """Close the long-lived connections (they reopen on next use)."""
+    _connection_manager.close()
+
+
 def init_database():
     """
     Initialize the Historify database schema.
@@ -116,6 +158,35 @@ def init_database():
             )
         """)
 
+        # Materialized rollups of the standard computed intervals (see ROLLUP_INTERVALS)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS market_data_rollup (
+                symbol VARCHAR NOT NULL,
+                exchange VARCHAR NOT NULL,
+                interval VARCHAR NOT NULL,
+                timestamp BIGINT NOT NULL,
+                open DOUBLE NOT NULL,
+                high DOUBLE NOT NULL,
+                low DOUBLE NOT NULL,
+                close DOUBLE NOT NULL,
+                volume BIGINT NOT NULL,
+                oi BIGINT DEFAULT 0,
+                PRIMARY KEY (symbol, exchange, interval, timestamp)
+            )
+        """)
+
+        # Days whose bars are known to be stored, per series (see get_history_coverage)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS history_coverage (
+                symbol VARCHAR NOT NULL,
+                exchange VARCHAR NOT NULL,
+                interval VARCHAR NOT NULL,
+                first_date DATE NOT NULL,
+                last_date DATE NOT NULL,
+                PRIMARY KEY (symbol, exchange, interval)
+            )
+        """)
+
         # Watchlist table
         conn.execute("""
             CREATE TABLE IF NOT EXISTS watchlist (
@@ -269,8 +340,20 @@ def init_database():
             ON historify_schedule_executions (schedule_id)
         """)
 
+        # Reads go through market_data_all, which includes the Parquet cold tier
+        refresh_market_data_view(conn)
+
         logger.debug("Historify database initialized successfully")
 
+    # Roll up data stored before rollups existed
+    start_rollup_backfill()
+
+    # Periodically correct the incrementally maintained data catalog
+    start_catalog_reconciler()
+
+    # Move closed months to the Parquet cold tier
+    start_cold_tier_compactor()
+
 
 # =============================================================================
 # Watchlist Operations
@@ -279,7 +362,7 @@ def init_database():
 
 def get_watchlist() -> list[dict[str, Any]]:
     """Get all symbols in the watchlist."""
-    with get_connection() as conn:
+    with get_connection(read_only=True) as conn:
         result = conn.execute("""
             SELECT id, symbol, exchange, display_name, added_at
             FROM watchlist
@@ -509,6 +592,151 @@ def clear_watchlist() -> tuple[bool, str]:
 # =============================================================================
 
 
+def _prepare_market_data_frame(
+    df: pd.DataFrame, symbol: str, exchange: str, interval: str
+) -> pd.DataFrame:
+    """
+    Normalize an OHLCV DataFrame to the market_data column layout.
+
+    Args:
+        df: DataFrame with columns: timestamp, open, high, low, close, volume, oi (optional)
+        symbol: Trading symbol
+        exchange: Exchange code
+        interval: Time interval
+
+    Returns:
+        DataFrame with market_data columns in table order
+    """
+    df = df.copy()
+    df["symbol"] = symbol.upper()
+    df["exchange"] = exchange.upper()
+    df["interval"] = interval
+
+    # Ensure required columns exist
+    if "oi" not in df.columns:
+        df["oi"] = 0
+
+    # Ensure timestamp is integer (epoch seconds)
+    if df["timestamp"].dtype != "int64":
+        df["timestamp"] = pd.to_datetime(df["timestamp"]).astype("int64") // 10**9
+
+    # Select only required columns in correct order
+    return df[
+        [
+            "symbol",
+            "exchange",
+            "interval",
+            "timestamp",
+            "open",
+            "high",
+            "low",
+            "close",
+            "volume",
+            "oi",
+        ]
+    ]
+
+
+def _upsert_prepared_frame(conn, frame: pd.DataFrame, symbol: str, exchange: str, interval: str):
+    """
+    Upsert a prepared frame and update its catalog entry and rollups incrementally.
+
+    The catalog is adjusted from the frame's own min/max timestamp and the
+    number of rows that did not exist yet, and only the rollup candles the
+    frame touches are recomputed, so the cost depends on the frame size rather
+    than the stored history. reconcile_data_catalog() corrects
+    any drift in the background.
+
+    Args:
+        conn: Writer connection (caller manages the transaction)
+        frame: Output of _prepare_market_data_frame
+        symbol: Trading symbol (upper case)
+        exchange: Exchange code (upper case)
+        interval: Time interval
+    """
+    frame_first = int(frame["timestamp"].min())
+    frame_last = int(frame["timestamp"].max())
+    key = [symbol, exchange, interval]
+
+    conn.register("upsert_frame", frame)
+    try:
+        # Rows that are new, looked up only within the frame's time range
+        new_rows = conn.execute(
+            """
+            SELECT COUNT(DISTINCT f.timestamp)
+            FROM upsert_frame f
+            WHERE NOT EXISTS (
+                SELECT 1 FROM market_data_all m
+                WHERE m.symbol = ? AND m.exchange = ? AND m.interval = ?
+                  AND m.timestamp BETWEEN ? AND ?
+                  AND m.timestamp = f.timestamp
+            )
+        """,
+            key + [frame_first, frame_last],
+        ).fetchone()[0]
+
+        # Use INSERT with ON CONFLICT for upsert (DuckDB requires explicit conflict target)
+        conn.execute("""
+            INSERT INTO market_data
+            (symbol, exchange, interval, timestamp, open, high, low, close, volume, oi)
+            SELECT symbol, exchange, interval, timestamp, open, high, low, close, volume, oi
+            FROM upsert_frame
+            ON CONFLICT (symbol, exchange, interval, timestamp) DO UPDATE SET
+                open = EXCLUDED.open,
+                high = EXCLUDED.high,
+                low = EXCLUDED.low,
+                close = EXCLUDED.close,
+                volume = EXCLUDED.volume,
+                oi = EXCLUDED.oi
+        """)
+    finally:
+        conn.unregister("upsert_frame")
+
+    if interval in STORAGE_INTERVALS:
+        _refresh_rollups(conn, symbol, exchange, interval, frame_first, frame_last)
+
+    # Update catalog - check if exists first due to multiple constraints
+    existing = conn.execute(
+        """
+        SELECT id FROM data_catalog
+        WHERE symbol = ? AND exchange = ? AND interval = ?
+    """,
+        key,
+    ).fetchone()
+
+    if existing:
+        conn.execute(
+            """
+            UPDATE data_catalog SET
+                first_timestamp = LEAST(COALESCE(first_timestamp, ?), ?),
+                last_timestamp = GREATEST(COALESCE(last_timestamp, ?), ?),
+                record_count = COALESCE(record_count, 0) + ?,
+                last_download_at = current_timestamp
+            WHERE id = ?
+        """,
+            [frame_first, frame_first, frame_last, frame_last, new_rows, existing[0]],
+        )
+    else:
+        # New catalog entry: compute exact values once, in case rows exist without one
+        next_id_result = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM data_catalog").fetchone()
+        next_id = next_id_result[0] if next_id_result else 1
+
+        conn.execute(
+            """
+            INSERT INTO data_catalog
+            (id, symbol, exchange, interval, first_timestamp, last_timestamp,
+             record_count, last_download_at)
+            SELECT
+                ?, ?, ?, ?,
+                MIN(timestamp), MAX(timestamp), COUNT(*),
+                current_timestamp
+            FROM market_data_all
+            WHERE symbol = ? AND exchange = ? AND interval = ?
+        """,
+            [next_id] + key + key,
+        )
+
+
 def upsert_market_data(df: pd.DataFrame, symbol: str, exchange: str, interval: str) -> int:
     """
     Insert or update OHLCV data from a pandas DataFrame.
@@ -526,126 +754,257 @@ def upsert_market_data(df: pd.DataFrame, symbol: str, exchange: str, interval: s
         return 0
 
     try:
-        # Prepare DataFrame
-        df = df.copy()
-        df["symbol"] = symbol.upper()
-        df["exchange"] = exchange.upper()
-        df["interval"] = interval
+        frame = _prepare_market_data_frame(df, symbol, exchange, interval)
 
-        # Ensure required columns exist
-        if "oi" not in df.columns:
-            df["oi"] = 0
+        with get_connection() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            _upsert_prepared_frame(conn, frame, symbol.upper(), exchange.upper(), interval)
+            conn.execute("COMMIT")
 
-        # Ensure timestamp is integer (epoch seconds)
-        if df["timestamp"].dtype != "int64":
-            df["timestamp"] = pd.to_datetime(df["timestamp"]).astype("int64") // 10**9
+        logger.info(f"Upserted {len(frame)} records for {symbol}:{exchange}:{interval}")
+        return len(frame)
 
-        # Select only required columns in correct order
-        df = df[
-            [
-                "symbol",
-                "exchange",
-                "interval",
-                "timestamp",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "oi",
-            ]
-        ]
+    except Exception as e:
+        logger.exception(f"Error upserting market data: {e}")
+        raise
+
+
+def bulk_upsert_market_data(frames: list[tuple[pd.DataFrame, str, str, str]]) -> int:
+    """
+    Upsert OHLCV frames for many symbols in a single transaction.
+
+    Either every frame is stored or none is, and the database commits once,
+    which is much cheaper than one commit per symbol for watchlist refreshes.
+
+    Args:
+        frames: List of (df, symbol, exchange, interval) tuples
+
+    Returns:
+        Total number of records inserted/updated
+    """
+    prepared = [
+        (_prepare_market_data_frame(df, symbol, exchange, interval), symbol, exchange, interval)
+        for df, symbol, exchange, interval in frames
+        if not df.empty
+    ]
+    if not prepared:
+        return 0
 
+    try:
         with get_connection() as conn:
-            # Use INSERT with ON CONFLICT for upsert (DuckDB requires explicit conflict target)
-            conn.execute("""
-                INSERT INTO market_data
-                (symbol, exchange, interval, timestamp, open, high, low, close, volume, oi)
-                SELECT symbol, exchange, interval, timestamp, open, high, low, close, volume, oi
-                FROM df
-                ON CONFLICT (symbol, exchange, interval, timestamp) DO UPDATE SET
-                    open = EXCLUDED.open,
-                    high = EXCLUDED.high,
-                    low = EXCLUDED.low,
-                    close = EXCLUDED.close,
-                    volume = EXCLUDED.volume,
-                    oi = EXCLUDED.oi
-            """)
-
-            # Update catalog - check if exists first due to multiple constraints
-            existing = conn.execute(
+            conn.execute("BEGIN TRANSACTION")
+            for frame, symbol, exchange, interval in prepared:
+                _upsert_prepared_frame(conn, frame, symbol.upper(), exchange.upper(), interval)
+            conn.execute("COMMIT")
+
+        total = sum(len(frame) for frame, _, _, _ in prepared)
+        logger.info(f"Bulk upserted {total} records for {len(prepared)} symbols")
+        return total
+
+    except Exception as e:
+        logger.exception(f"Error bulk upserting market data: {e}")
+        raise
+
+
+def reconcile_data_catalog() -> int:
+    """
+    Recompute data_catalog ranges and counts from market_data in one pass.
+
+    upsert_market_data maintains the catalog incrementally; this corrects
+    any drift (for example after manual edits) and adds missing entries.
+
+    Returns:
+        Number of catalog entries corrected or added
+    """
+    try:
+        with get_connection() as conn:
+            drift = conn.execute("""
+                WITH actual AS (
+                    SELECT symbol, exchange, interval,
+                           MIN(timestamp) AS first_ts, MAX(timestamp) AS last_ts, COUNT(*) AS cnt
+                    FROM market_data_all
+                    GROUP BY symbol, exchange, interval
+                )
+                SELECT c.id, a.symbol, a.exchange, a.interval, a.first_ts, a.last_ts, a.cnt
+                FROM actual a
+                LEFT JOIN data_catalog c
+                    ON c.symbol = a.symbol AND c.exchange = a.exchange AND c.interval = a.interval
+                WHERE c.id IS NULL
+                   OR c.first_timestamp IS DISTINCT FROM a.first_ts
+                   OR c.last_timestamp IS DISTINCT FROM a.last_ts
+                   OR c.record_count IS DISTINCT FROM a.cnt
+            """).fetchall()
+
+            if not drift:
+                return 0
+
+            next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM data_catalog").fetchone()[0]
+            conn.execute("BEGIN TRANSACTION")
+            for catalog_id, symbol, exchange, interval, first_ts, last_ts, count in drift:
+                if catalog_id is None:
+                    conn.execute(
+                        """
+                        INSERT INTO data_catalog
+                        (id, symbol, exchange, interval, first_timestamp, last_timestamp, record_count)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                        [next_id, symbol, exchange, interval, first_ts, last_ts, count],
+                    )
+                    next_id += 1
+                else:
+                    conn.execute(
+                        """
+                        UPDATE data_catalog
+                        SET first_timestamp = ?, last_timestamp = ?, record_count = ?
+                        WHERE id = ?
+                    """,
+                        [first_ts, last_ts, count, catalog_id],
+                    )
+            conn.execute("COMMIT")
+
+        logger.info(f"Reconciled {len(drift)} data catalog entries")
+        return len(drift)
+
+    except Exception as e:
+        logger.exception(f"Error reconciling data catalog: {e}")
+        return 0
+
+
+_catalog_reconciler: threading.Thread | None = None
+_catalog_reconciler_lock = threading.Lock()
+
+
+def get_catalog_reconcile_interval() -> float:
+    """Get seconds between background catalog reconciliation passes (0 disables)."""
+    return float(os.getenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "3600"))
+
+
+def start_catalog_reconciler() -> bool:
+    """
+    Start the background catalog reconciliation thread (once per process).
+
+    Returns:
+        True if the thread is running
+    """
+    global _catalog_reconciler
+
+    interval = get_catalog_reconcile_interval()
+    if interval <= 0:
+        return False
+
+    with _catalog_reconciler_lock:
+        if _catalog_reconciler is not None and _catalog_reconciler.is_alive():
+            return True
+
+        def _reconcile_loop():
+            while True:
+                time.sleep(interval)
+                reconcile_data_catalog()
+
+        _catalog_reconciler = threading.Thread(
+            target=_reconcile_loop, name="historify-catalog-reconciler", daemon=True
+        )
+        _catalog_reconciler.start()
+        return True
+
+
+# =============================================================================
+# Parquet Cold Tier (see historify_cold_tier)
+# =============================================================================
+
+
+def refresh_market_data_view(conn=None):
+    """
+    Recreate the market_data_all view for the current contents of the cold tier.
+
+    Args:
+        conn: Writer connection (optional, one is acquired if not given)
+    """
+    if conn is None:
+        with get_connection() as writer:
+            writer.execute(market_data_view_sql(get_cold_tier_path()))
+        return
+    conn.execute(market_data_view_sql(get_cold_tier_path()))
+
+
+def compact_closed_months(cutoff: int | None = None) -> dict[str, int]:
+    """
+    Move 1m and D rows of closed months from market_data to the Parquet cold tier.
+
+    Args:
+        cutoff: Move rows before this epoch (default: start of the current IST month)
+
+    Returns:
+        Dictionary with partitions written and rows moved
+    """
+    cutoff = cutoff or closed_month_cutoff()
+    root = get_cold_tier_path()
+    partitions = 0
+    rows_moved = 0
+
+    try:
+        with get_connection() as conn:
+            candidates = conn.execute(
                 """
-                SELECT id FROM data_catalog
-                WHERE symbol = ? AND exchange = ? AND interval = ?
+                SELECT exchange, interval, symbol,
+                       YEAR(to_timestamp(timestamp + ?)) AS year
+                FROM market_data
+                WHERE timestamp < ? AND interval IN ('1m', 'D')
+                GROUP BY ALL
+                ORDER BY ALL
             """,
-                [symbol.upper(), exchange.upper(), interval],
-            ).fetchone()
+                [IST_OFFSET_SECONDS, cutoff],
+            ).fetchall()
 
-            if existing:
-                # Update existing record
-                conn.execute(
-                    """
-                    UPDATE data_catalog SET
-                        first_timestamp = (SELECT MIN(timestamp) FROM market_data
-                                          WHERE symbol = ? AND exchange = ? AND interval = ?),
-                        last_timestamp = (SELECT MAX(timestamp) FROM market_data
-                                         WHERE symbol = ? AND exchange = ? AND interval = ?),
-                        record_count = (SELECT COUNT(*) FROM market_data
-                                       WHERE symbol = ? AND exchange = ? AND interval = ?),
-                        last_download_at = current_timestamp
-                    WHERE symbol = ? AND exchange = ? AND interval = ?
-                """,
-                    [
-                        symbol.upper(),
-                        exchange.upper(),
-                        interval,
-                        symbol.upper(),
-                        exchange.upper(),
-                        interval,
-                        symbol.upper(),
-                        exchange.upper(),
-                        interval,
-                        symbol.upper(),
-                        exchange.upper(),
-                        interval,
-                    ],
-                )
-            else:
-                # Insert new record
-                next_id_result = conn.execute(
-                    "SELECT COALESCE(MAX(id), 0) + 1 FROM data_catalog"
-                ).fetchone()
-                next_id = next_id_result[0] if next_id_result else 1
+            for exchange, interval, symbol, year in candidates:
+                conn.execute("BEGIN TRANSACTION")
+                rows_moved += compact_partition(conn, root, exchange, interval, symbol, year, cutoff)
+                conn.execute("COMMIT")
+                partitions += 1
 
-                conn.execute(
-                    """
-                    INSERT INTO data_catalog
-                    (id, symbol, exchange, interval, first_timestamp, last_timestamp,
-                     record_count, last_download_at)
-                    SELECT
-                        ?, ?, ?, ?,
-                        MIN(timestamp), MAX(timestamp), COUNT(*),
-                        current_timestamp
-                    FROM market_data
-                    WHERE symbol = ? AND exchange = ? AND interval = ?
-                """,
-                    [
-                        next_id,
-                        symbol.upper(),
-                        exchange.upper(),
-                        interval,
-                        symbol.upper(),
-                        exchange.upper(),
-                        interval,
-                    ],
-                )
+            if partitions:
+                refresh_market_data_view(conn)
 
-        logger.info(f"Upserted {len(df)} records for {symbol}:{exchange}:{interval}")
-        return len(df)
+        if partitions:
+            logger.info(f"Compacted {rows_moved} rows in {partitions} partitions to the cold tier")
+        return {"partitions": partitions, "rows_moved": rows_moved}
 
     except Exception as e:
-        logger.exception(f"Error upserting market data: {e}")
-        raise
+        logger.exception(f"Error compacting closed months to the cold tier: {e}")
+        return {"partitions": partitions, "rows_moved": rows_moved}
+
+
+_cold_tier_compactor: threading.Thread | None = None
+_cold_tier_compactor_lock = threading.Lock()
+
+
+def start_cold_tier_compactor() -> bool:
+    """
+    Start the background cold tier compaction thread (once per process).
+
+    Returns:
+        True if the thread is running
+    """
+    global _cold_tier_compactor
+
+    interval = get_compact_interval()
+    if not is_cold_tier_enabled() or interval <= 0:
+        return False
+
+    with _cold_tier_compactor_lock:
+        if _cold_tier_compactor is not None and _cold_tier_compactor.is_alive():
+            return True
+
+        def _compact_loop():
+            while True:
+                compact_closed_months()
+                time.sleep(interval)
+
+        _cold_tier_compactor = threading.Thread(
+            target=_compact_loop, name="historify-cold-tier-compactor", daemon=True
+        )
+        _cold_tier_compactor.start()
+        return True
 
 
 # Storage intervals - only these are physically stored
@@ -800,7 +1159,8 @@ def get_ohlcv(
 ) -> pd.DataFrame:
     """
     Retrieve OHLCV data for a symbol.
-    For computed intervals, aggregates from base data on-the-fly.
+    Standard computed intervals (5m, 15m, 30m, 1h, W, M) are read from the
+    materialized rollups; other computed intervals aggregate base data on-the-fly.
 
     Supports:
     - Storage intervals: 1m, D (retrieved directly)
@@ -818,6 +1178,12 @@ def get_ohlcv(
         DataFrame with columns: timestamp, open, high, low, close, volume, oi
     """
     try:
+        # Standard computed intervals come from the materialized rollups when available
+        if interval in ROLLUP_INTERVALS:
+            result = _get_rollup_ohlcv(symbol, exchange, interval, start_timestamp, end_timestamp)
+            if result is not None:
+                return result
+
         # Check if this is a daily-aggregated interval (W, MO, Q, Y)
         if is_daily_aggregated_interval(interval):
             return _get_daily_aggregated_ohlcv(
@@ -841,7 +1207,7 @@ def get_ohlcv(
         # Standard query for stored intervals (1m, D)
         query = """
             SELECT timestamp, open, high, low, close, volume, oi
-            FROM market_data
+            FROM market_data_all
             WHERE symbol = ? AND exchange = ? AND interval = ?
         """
         params = [symbol.upper(), exchange.upper(), interval]
@@ -856,7 +1222,7 @@ def get_ohlcv(
 
         query += " ORDER BY timestamp ASC"
 
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(query, params).fetchdf()
 
         return result
@@ -910,6 +1276,96 @@ def _get_market_open_seconds(exchange: str) -> int:
     return EXCHANGE_MARKET_OPEN_SECONDS.get(exchange.upper(), 33300)
 
 
+# IST timezone offset from UTC (5 hours 30 minutes = 19800 seconds)
+IST_OFFSET_SECONDS = 19800
+
+
+def _intraday_bucket_sql(interval_seconds: int, market_open_seconds: int) -> str:
+    """
+    SQL expression for the market-open aligned candle start of `timestamp`.
+
+    Use FLOOR() to ensure proper integer division for candle alignment.
+    Without FLOOR(), floating-point division can cause incorrect bucketing.
+
+    Args:
+        interval_seconds: Candle length in seconds
+        market_open_seconds: Market open in seconds from midnight IST
+
+    Returns:
+        SQL expression evaluating to the candle start (UTC epoch seconds)
+    """
+    ist_offset = IST_OFFSET_SECONDS
+    return (
+        f"(FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) + "
+        f"{market_open_seconds} + "
+        f"FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) "
+        f"* {interval_seconds}"
+    )
+
+
+def _daily_group_sql(parsed: dict[str, Any]) -> str | None:
+    """
+    SQL expression grouping daily `timestamp` rows into W/M/Q/Y periods.
+
+    Args:
+        parsed: Output of parse_interval for a weekly, monthly, quarterly or yearly interval
+
+    Returns:
+        SQL timestamp expression for the period start (IST date), or None if unsupported
+    """
+    interval_type = parsed["type"]
+    interval_value = parsed.get("value", 1)
+    ist_offset = IST_OFFSET_SECONDS
+
+    # Build the GROUP BY expression based on interval type
+    if interval_type == "weekly":
+        # Group by ISO week number, adjusting for multi-week intervals
+        # ISO week starts on Monday
+        if interval_value == 1:
+            group_expr = f"DATE_TRUNC('week', to_timestamp(timestamp + {ist_offset}))"
+        else:
+            # For multi-week intervals, group weeks together
+            group_expr = f"""
+                DATE_TRUNC('week', to_timestamp(timestamp + {ist_offset})) -
+                INTERVAL ((EXTRACT(WEEK FROM to_timestamp(timestamp + {ist_offset})) - 1) % {interval_value}) WEEK
+            """
+    elif interval_type == "monthly":
+        # Group by calendar month
+        if interval_value == 1:
+            group_expr = f"DATE_TRUNC('month', to_timestamp(timestamp + {ist_offset}))"
+        else:
+            # For multi-month intervals, group months together
+            group_expr = f"""
+                DATE_TRUNC('month', to_timestamp(timestamp + {ist_offset})) -
+                INTERVAL ((EXTRACT(MONTH FROM to_timestamp(timestamp + {ist_offset})) - 1) % {interval_value}) MONTH
+            """
+    elif interval_type == "quarterly":
+        # Group by calendar quarter (3 months)
+        months = parsed.get("months", 3)
+        if months == 3:
+            group_expr = f"DATE_TRUNC('quarter', to_timestamp(timestamp + {ist_offset}))"
+        else:
+            # For multi-quarter intervals
+            group_expr = f"""
+                DATE_TRUNC('quarter', to_timestamp(timestamp + {ist_offset})) -
+                INTERVAL ((EXTRACT(QUARTER FROM to_timestamp(timestamp + {ist_offset})) - 1) % {interval_value}) QUARTER
+            """
+    elif interval_type == "yearly":
+        # Group by calendar year
+        if interval_value == 1:
+            group_expr = f"DATE_TRUNC('year', to_timestamp(timestamp + {ist_offset}))"
+        else:
+            # For multi-year intervals
+            group_expr = f"""
+                DATE_TRUNC('year', to_timestamp(timestamp + {ist_offset})) -
+                INTERVAL ((EXTRACT(YEAR FROM to_timestamp(timestamp + {ist_offset})) % {interval_value})) YEAR
+            """
+    else:
+        return None
+
+    return group_expr
+
+
 def _get_aggregated_ohlcv(
     symbol: str,
     exchange: str,
@@ -952,11 +1408,7 @@ def _get_aggregated_ohlcv(
         # Get market open time for this exchange (in seconds from midnight)
         market_open_seconds = _get_market_open_seconds(exchange)
 
-        # IST timezone offset from UTC (5 hours 30 minutes = 19800 seconds)
-        # We need this because timestamps are in UTC epoch
-        ist_offset = 19800
-
-        # Candle alignment algorithm:
+        # Candle alignment algorithm (see _intraday_bucket_sql):
         # 1. Convert UTC timestamp to IST by adding ist_offset
         # 2. Get seconds from midnight: (timestamp + ist_offset) % 86400
         # 3. Get trading seconds: seconds_from_midnight - market_open_seconds
@@ -969,22 +1421,18 @@ def _get_aggregated_ohlcv(
         # trading_seconds = seconds_from_midnight_ist - market_open_seconds
         # bucket_offset = (trading_seconds / interval_seconds) * interval_seconds
         # candle_timestamp = day_start_utc + market_open_seconds + bucket_offset
+        bucket_expr = _intraday_bucket_sql(interval_seconds, market_open_seconds)
 
-        # Use FLOOR() to ensure proper integer division for candle alignment
-        # Without FLOOR(), floating-point division can cause incorrect bucketing
         query = f"""
             SELECT
-                (FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
-                {market_open_seconds} +
-                FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}
-                as timestamp,
+                {bucket_expr} as timestamp,
                 FIRST(open ORDER BY timestamp) as open,
                 MAX(high) as high,
                 MIN(low) as low,
                 LAST(close ORDER BY timestamp) as close,
                 SUM(volume) as volume,
                 LAST(oi ORDER BY timestamp) as oi
-            FROM market_data
+            FROM market_data_all
             WHERE symbol = ? AND exchange = ? AND interval = '1m'
         """
         params = [symbol.upper(), exchange.upper()]
@@ -998,13 +1446,11 @@ def _get_aggregated_ohlcv(
             params.append(end_timestamp)
 
         query += f"""
-            GROUP BY (FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
-                     {market_open_seconds} +
-                     FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}
+            GROUP BY {bucket_expr}
             ORDER BY timestamp ASC
         """
 
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(query, params).fetchdf()
 
         return result
@@ -1014,6 +1460,68 @@ def _get_aggregated_ohlcv(
         return pd.DataFrame()
 
 
+def _daily_aggregate_query(
+    symbol: str,
+    exchange: str,
+    target_interval: str,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+) -> tuple[str, list] | None:
+    """
+    Build the query aggregating Daily (D) data to a W, M, Q or Y interval.
+
+    Args:
+        symbol: Trading symbol
+        exchange: Exchange code
+        target_interval: Target interval (W, M, Q, Y, or multiples like 2W, 3M)
+        start_timestamp: Start epoch timestamp (optional)
+        end_timestamp: End epoch timestamp (optional)
+
+    Returns:
+        Tuple of (query, params), or None if the interval cannot be aggregated
+    """
+    parsed = parse_interval(target_interval)
+    if not parsed:
+        logger.error(f"Cannot parse interval: {target_interval}")
+        return None
+
+    group_expr = _daily_group_sql(parsed)
+    if group_expr is None:
+        logger.error(f"Unsupported interval type for daily aggregation: {parsed['type']}")
+        return None
+
+    # Build the query - aggregate from D (daily) data
+    # Return timestamp as UTC epoch representing the IST date
+    # (frontend will interpret as UTC which visually shows the IST date)
+    query = f"""
+        SELECT
+            EPOCH({group_expr}) as timestamp,
+            FIRST(open ORDER BY timestamp) as open,
+            MAX(high) as high,
+            MIN(low) as low,
+            LAST(close ORDER BY timestamp) as close,
+            SUM(volume) as volume,
+            LAST(oi ORDER BY timestamp) as oi
+        FROM market_data_all
+        WHERE symbol = ? AND exchange = ? AND interval = 'D'
+    """
+    params = [symbol.upper(), exchange.upper()]
+
+    if start_timestamp:
+        query += " AND timestamp >= ?"
+        params.append(start_timestamp)
+
+    if end_timestamp:
+        query += " AND timestamp <= ?"
+        params.append(end_timestamp)
+
+    query += f"""
+        GROUP BY {group_expr}
+        ORDER BY timestamp ASC
+    """
+    return query, params
+
+
 def _get_daily_aggregated_ohlcv(
     symbol: str,
     exchange: str,
@@ -1041,102 +1549,368 @@ def _get_daily_aggregated_ohlcv(
         DataFrame with aggregated OHLCV data
     """
     try:
-        parsed = parse_interval(target_interval)
-        if not parsed:
-            logger.error(f"Cannot parse interval: {target_interval}")
+        built = _daily_aggregate_query(symbol, exchange, target_interval, start_timestamp, end_timestamp)
+        if built is None:
             return pd.DataFrame()
+        query, params = built
 
-        interval_type = parsed["type"]
-        interval_value = parsed.get("value", 1)
+        with get_connection(read_only=True) as conn:
+            result = conn.execute(query, params).fetchdf()
 
-        # IST timezone offset from UTC (5 hours 30 minutes = 19800 seconds)
-        ist_offset = 19800
+        return result
 
-        # Build the GROUP BY expression based on interval type
-        if interval_type == "weekly":
-            # Group by ISO week number, adjusting for multi-week intervals
-            # ISO week starts on Monday
-            if interval_value == 1:
-                group_expr = f"DATE_TRUNC('week', to_timestamp(timestamp + {ist_offset}))"
-            else:
-                # For multi-week intervals, group weeks together
-                group_expr = f"""
-                    DATE_TRUNC('week', to_timestamp(timestamp + {ist_offset})) -
-                    INTERVAL ((EXTRACT(WEEK FROM to_timestamp(timestamp + {ist_offset})) - 1) % {interval_value}) WEEK
-                """
-        elif interval_type == "monthly":
-            # Group by calendar month
-            if interval_value == 1:
-                group_expr = f"DATE_TRUNC('month', to_timestamp(timestamp + {ist_offset}))"
-            else:
-                # For multi-month intervals, group months together
-                group_expr = f"""
-                    DATE_TRUNC('month', to_timestamp(timestamp + {ist_offset})) -
-                    INTERVAL ((EXTRACT(MONTH FROM to_timestamp(timestamp + {ist_offset})) - 1) % {interval_value}) MONTH
-                """
-        elif interval_type == "quarterly":
-            # Group by calendar quarter (3 months)
-            months = parsed.get("months", 3)
-            if months == 3:
-                group_expr = f"DATE_TRUNC('quarter', to_timestamp(timestamp + {ist_offset}))"
-            else:
-                # For multi-quarter intervals
-                group_expr = f"""
-                    DATE_TRUNC('quarter', to_timestamp(timestamp + {ist_offset})) -
-                    INTERVAL ((EXTRACT(QUARTER FROM to_timestamp(timestamp + {ist_offset})) - 1) % {interval_value}) QUARTER
-                """
-        elif interval_type == "yearly":
-            # Group by calendar year
-            if interval_value == 1:
-                group_expr = f"DATE_TRUNC('year', to_timestamp(timestamp + {ist_offset}))"
-            else:
-                # For multi-year intervals
-                group_expr = f"""
-                    DATE_TRUNC('year', to_timestamp(timestamp + {ist_offset})) -
-                    INTERVAL ((EXTRACT(YEAR FROM to_timestamp(timestamp + {ist_offset})) % {interval_value})) YEAR
-                """
-        else:
-            logger.error(f"Unsupported interval type for daily aggregation: {interval_type}")
-            return pd.DataFrame()
+    except Exception as e:
+        logger.exception(f"Error aggregating daily OHLCV data to {target_interval}: {e}")
+        return pd.DataFrame()
 
-        # Build the query - aggregate from D (daily) data
-        # Return timestamp as UTC epoch representing the IST date
-        # (frontend will interpret as UTC which visually shows the IST date)
-        query = f"""
-            SELECT
-                EPOCH({group_expr}) as timestamp,
-                FIRST(open ORDER BY timestamp) as open,
-                MAX(high) as high,
-                MIN(low) as low,
-                LAST(close ORDER BY timestamp) as close,
-                SUM(volume) as volume,
-                LAST(oi ORDER BY timestamp) as oi
-            FROM market_data
-            WHERE symbol = ? AND exchange = ? AND interval = 'D'
-        """
-        params = [symbol.upper(), exchange.upper()]
 
-        if start_timestamp:
-            query += " AND timestamp >= ?"
-            params.append(start_timestamp)
+# =============================================================================
+# Materialized Rollups
+# =============================================================================
 
-        if end_timestamp:
-            query += " AND timestamp <= ?"
-            params.append(end_timestamp)
+# Standard intervals kept materialized in market_data_rollup, mapped to the
+# stored interval they are built from. Other computed intervals (25m, 2h, Q,
+# 2W, ...) are still aggregated on-the-fly.
+ROLLUP_INTERVALS = {
+    "5m": "1m",
+    "15m": "1m",
+    "30m": "1m",
+    "1h": "1m",
+    "W": "D",
+    "M": "D",
+}
 
-        query += f"""
-            GROUP BY {group_expr}
-            ORDER BY timestamp ASC
-        """
+# Upper bound (seconds) on the base data covered by one rollup candle
+ROLLUP_BUCKET_SPAN = {
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "W": 8 * 86400,
+    "M": 32 * 86400,
+}
+
+# Set once existing base data has been rolled up; until then get_ohlcv
+# aggregates on-the-fly
+_rollups_ready = False
+_rollup_backfill: threading.Thread | None = None
+
+
+def _rollup_bucket_sql(interval: str, exchange: str) -> str:
+    """
+    SQL expression for the rollup candle start of a base `timestamp`.
+
+    Uses the same bucketing as the on-the-fly aggregation, so intraday candles
+    stay aligned to the exchange market open.
+
+    Args:
+        interval: Rollup interval (key of ROLLUP_INTERVALS)
+        exchange: Exchange code
+
+    Returns:
+        SQL expression evaluating to the candle start as BIGINT epoch seconds
+    """
+    if ROLLUP_INTERVALS[interval] == "1m":
+        expr = _intraday_bucket_sql(INTERVAL_MINUTES[interval] * 60, _get_market_open_seconds(exchange))
+    else:
+        expr = f"EPOCH({_daily_group_sql(parse_interval(interval))})"
+    return f"CAST({expr} AS BIGINT)"
+
+
+# Aggregates base rows grouped by `bucket` into one rollup candle
+_ROLLUP_AGGREGATE_SQL = """
+    bucket,
+    FIRST(open ORDER BY timestamp),
+    MAX(high),
+    MIN(low),
+    LAST(close ORDER BY timestamp),
+    SUM(volume),
+    LAST(oi ORDER BY timestamp)
+"""
+
+_ROLLUP_CONFLICT_SQL = """
+    ON CONFLICT (symbol, exchange, interval, timestamp) DO UPDATE SET
+        open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume,
+        oi = EXCLUDED.oi
+"""
+
+
+def _refresh_rollups(conn, symbol: str, exchange: str, base_interval: str, first_ts: int, last_ts: int):
+    """
+    Recompute the rollup candles touched by a base-data upsert.
 
+    Only candles overlapping [first_ts, last_ts] are rebuilt, from the base rows
+    they cover, so the cost depends on the upserted range rather than the
+    stored history.
+
+    Args:
+        conn: Writer connection (caller manages the transaction)
+        symbol: Trading symbol (upper case)
+        exchange: Exchange code (upper case)
+        base_interval: Stored interval that was upserted (1m or D)
+        first_ts: First upserted timestamp
+        last_ts: Last upserted timestamp
+    """
+    for interval, base in ROLLUP_INTERVALS.items():
+        if base != base_interval:
+            continue
+
+        bucket_expr = _rollup_bucket_sql(interval, exchange)
+        span = ROLLUP_BUCKET_SPAN[interval]
+        first_bucket, last_bucket = conn.execute(
+            f"""
+            SELECT MIN({bucket_expr}), MAX({bucket_expr})
+            FROM (VALUES (?::BIGINT), (?::BIGINT)) AS bounds(timestamp)
+        """,
+            [first_ts, last_ts],
+        ).fetchone()
+
+        conn.execute(
+            f"""
+            INSERT INTO market_data_rollup
+            (symbol, exchange, interval, timestamp, open, high, low, close, volume, oi)
+            SELECT ?, ?, ?, {_ROLLUP_AGGREGATE_SQL}
+            FROM (
+                SELECT {bucket_expr} AS bucket, timestamp, open, high, low, close, volume, oi
+                FROM market_data_all
+                WHERE symbol = ? AND exchange = ? AND interval = ?
+                  AND timestamp BETWEEN ? AND ?
+            )
+            WHERE bucket BETWEEN ? AND ?
+            GROUP BY bucket
+            {_ROLLUP_CONFLICT_SQL}
+        """,
+            [
+                symbol,
+                exchange,
+                interval,
+                symbol,
+                exchange,
+                base_interval,
+                first_ts - span,
+                last_ts + span,
+                first_bucket,
+                last_bucket,
+            ],
+        )
+
+
+def rebuild_rollups(symbol: str | None = None, exchange: str | None = None) -> int:
+    """
+    Rebuild materialized rollups from the stored base data.
+
+    upsert_market_data keeps rollups current; this is for backfilling an
+    existing database and for recovering after the market open time of an
+    exchange was changed.
+
+    Args:
+        symbol: Only rebuild this symbol (optional)
+        exchange: Only rebuild this exchange (optional)
+
+    Returns:
+        Number of rollup candles written
+    """
+    symbol_filter = " AND symbol = ?" if symbol else ""
+    symbol_params = [symbol.upper()] if symbol else []
+    filters = symbol_filter + (" AND exchange = ?" if exchange else "")
+    params = symbol_params + ([exchange.upper()] if exchange else [])
+
+    try:
         with get_connection() as conn:
+            exchanges = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT DISTINCT exchange FROM market_data_all WHERE interval IN ('1m', 'D'){filters}",
+                    params,
+                ).fetchall()
+            ]
+
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute(f"DELETE FROM market_data_rollup WHERE 1 = 1{filters}", params)
+            for exch in exchanges:
+                for interval, base in ROLLUP_INTERVALS.items():
+                    bucket_expr = _rollup_bucket_sql(interval, exch)
+                    conn.execute(
+                        f"""
+                        INSERT INTO market_data_rollup
+                        (symbol, exchange, interval, timestamp, open, high, low, close, volume, oi)
+                        SELECT symbol, exchange, ?, {_ROLLUP_AGGREGATE_SQL}
+                        FROM (
+                            SELECT symbol, exchange, {bucket_expr} AS bucket,
+                                   timestamp, open, high, low, close, volume, oi
+                            FROM market_data_all
+                            WHERE exchange = ? AND interval = ?{symbol_filter}
+                        )
+                        GROUP BY symbol, exchange, bucket
+                    """,
+                        [interval, exch, base] + symbol_params,
+                    )
+            written = conn.execute(
+                f"SELECT COUNT(*) FROM market_data_rollup WHERE 1 = 1{filters}", params
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+
+        logger.info(f"Rebuilt {written} rollup candles")
+        return written
+
+    except Exception as e:
+        logger.exception(f"Error rebuilding rollups: {e}")
+        raise
+
+
+def start_rollup_backfill() -> bool:
+    """
+    Make rollups usable, backfilling them in the background if needed.
+
+    A database that has base data (hot or cold tier) but no rollups yet
+    (created before rollups existed) is rolled up once on a background thread;
+    get_ohlcv keeps aggregating on-the-fly until that finishes.
+
+    Returns:
+        True if rollups are ready immediately
+    """
+    global _rollups_ready, _rollup_backfill
+
+    with get_connection(read_only=True) as conn:
+        needs_backfill = conn.execute("""
+            SELECT EXISTS (SELECT 1 FROM market_data_all WHERE interval IN ('1m', 'D'))
+               AND NOT EXISTS (SELECT 1 FROM market_data_rollup)
+        """).fetchone()[0]
+
+    if not needs_backfill:
+        _rollups_ready = True
+        return True
+
+    _rollups_ready = False
+    if _rollup_backfill is not None and _rollup_backfill.is_alive():
+        return False
+
+    def _backfill():
+        global _rollups_ready
+        try:
+            rebuild_rollups()
+            _rollups_ready = True
+        except Exception:
+            # Already logged; reads keep using on-the-fly aggregation
+            pass
+
+    _rollup_backfill = threading.Thread(target=_backfill, name="historify-rollup-backfill", daemon=True)
+    _rollup_backfill.start()
+    return False
+
+
+def _get_rollup_ohlcv(
+    symbol: str,
+    exchange: str,
+    interval: str,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+) -> pd.DataFrame | None:
+    """
+    Read a standard computed interval from the materialized rollups.
+
+    Candles at the edges of the requested range that also contain base rows
+    outside it are recomputed on-the-fly, so the result matches
+    _get_aggregated_ohlcv / _get_daily_aggregated_ohlcv exactly.
+
+    Args:
+        symbol: Trading symbol
+        exchange: Exchange code
+        interval: Rollup interval (key of ROLLUP_INTERVALS)
+        start_timestamp: Start epoch timestamp (optional)
+        end_timestamp: End epoch timestamp (optional)
+
+    Returns:
+        DataFrame with OHLCV data, or None if rollups cannot serve the request
+    """
+    if not _rollups_ready or interval not in ROLLUP_INTERVALS:
+        return None
+
+    symbol = symbol.upper()
+    exchange = exchange.upper()
+    daily_based = ROLLUP_INTERVALS[interval] == "D"
+    aggregate = _get_daily_aggregated_ohlcv if daily_based else _get_aggregated_ohlcv
+    # Daily candles are keyed by IST date, so their base rows start up to
+    # IST_OFFSET_SECONDS before the candle timestamp
+    base_offset = IST_OFFSET_SECONDS if daily_based else 0
+
+    def on_the_fly(start: int | None, end: int | None) -> pd.DataFrame:
+        part = aggregate(symbol, exchange, interval, start, end)
+        if not part.empty:
+            part["timestamp"] = part["timestamp"].astype("int64")
+        return part
+
+    try:
+        query = """
+            SELECT timestamp, open, high, low, close, volume, oi
+            FROM market_data_rollup
+            WHERE symbol = ? AND exchange = ? AND interval = ?
+        """
+        params = [symbol, exchange, interval]
+
+        with get_connection(read_only=True) as conn:
+            if start_timestamp:
+                bucket_expr = _rollup_bucket_sql(interval, exchange)
+                first_bucket = conn.execute(
+                    f"SELECT {bucket_expr} FROM (SELECT ?::BIGINT AS timestamp)", [start_timestamp]
+                ).fetchone()[0]
+                query += " AND timestamp >= ?"
+                params.append(first_bucket)
+
+            if end_timestamp:
+                query += " AND timestamp <= ?"
+                params.append(end_timestamp + base_offset)
+
+            query += " ORDER BY timestamp ASC"
             result = conn.execute(query, params).fetchdf()
 
-        return result
+            if result.empty:
+                # No rollup rows for base data that exists (the backfill skipped the
+                # series or a rollup write failed): let the caller aggregate on-the-fly
+                base_query = """
+                    SELECT EXISTS (
+                        SELECT 1 FROM market_data_all
+                        WHERE symbol = ? AND exchange = ? AND interval = ?
+                """
+                base_params = [symbol, exchange, ROLLUP_INTERVALS[interval]]
+                if start_timestamp:
+                    base_query += " AND timestamp >= ?"
+                    base_params.append(start_timestamp)
+                if end_timestamp:
+                    base_query += " AND timestamp <= ?"
+                    base_params.append(end_timestamp)
+                if conn.execute(base_query + ")", base_params).fetchone()[0]:
+                    logger.debug(f"No {interval} rollup for {exchange}:{symbol}, aggregating on-the-fly")
+                    return None
+                return result
 
     except Exception as e:
-        logger.exception(f"Error aggregating daily OHLCV data to {target_interval}: {e}")
-        return pd.DataFrame()
+        logger.exception(f"Error reading {interval} rollup, aggregating on-the-fly: {e}")
+        return None
+
+    timestamps = result["timestamp"]
+    head_partial = bool(start_timestamp) and int(timestamps.iloc[0]) - base_offset < start_timestamp
+    if not head_partial and not end_timestamp:
+        return result
+    if len(result) == 1:
+        return on_the_fly(start_timestamp, end_timestamp)
+
+    parts = []
+    body_start, body_end = 0, len(result)
+    if head_partial:
+        parts.append(on_the_fly(start_timestamp, int(timestamps.iloc[1]) - base_offset - 1))
+        body_start = 1
+    if end_timestamp:
+        body_end -= 1
+    parts.append(result.iloc[body_start:body_end])
+    if end_timestamp:
+        parts.append(on_the_fly(int(timestamps.iloc[-1]) - base_offset, end_timestamp))
+
+    return pd.concat([part for part in parts if not part.empty], ignore_index=True)
 
 
 def get_data_catalog() -> list[dict[str, Any]]:
@@ -1147,7 +1921,7 @@ def get_data_catalog() -> list[dict[str, Any]]:
         List of dictionaries with symbol, exchange, interval, and data range info
     """
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute("""
                 SELECT
                     symbol, exchange, interval,
@@ -1175,7 +1949,7 @@ def get_available_symbols() -> list[dict[str, str]]:
         List of dictionaries with symbol and exchange
     """
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute("""
                 SELECT DISTINCT symbol, exchange
                 FROM data_catalog
@@ -1197,33 +1971,124 @@ def get_data_range(symbol: str, exchange: str, interval: str) -> dict[str, Any]
     Get the date range of available data for a symbol.
 
     Returns:
-        Dictionary with first_timestamp, last_timestamp, record_count
-        or None if no data exists
+        Dictionary with first_timestamp, last_timestamp, record_count
+        or None if no data exists
+    """
+    try:
+        with get_connection(read_only=True) as conn:
+            result = conn.execute(
+                """
+                SELECT first_timestamp, last_timestamp, record_count
+                FROM data_catalog
+                WHERE symbol = ? AND exchange = ? AND interval = ?
+            """,
+                [symbol.upper(), exchange.upper(), interval],
+            ).fetchone()
+
+        if result:
+            return {
+                "first_timestamp": result[0],
+                "last_timestamp": result[1],
+                "record_count": result[2],
+            }
+        return None
+
+    except Exception as e:
+        logger.exception(f"Error fetching data range: {e}")
+        return None
+
+
+def get_history_coverage(symbol: str, exchange: str, interval: str) -> tuple[date, date] | None:
+    """
+    Get the span of IST trading days whose bars are fully stored.
+
+    Days are covered once they were fetched from the broker after they ended,
+    including days without bars (weekends, holidays). Series without a
+    coverage record yet (e.g. downloaded through Historify jobs) are seeded
+    from the data catalog; their last stored day only counts if it was
+    written after that day ended, since it may hold a partial session.
+
+    Args:
+        symbol: Trading symbol
+        exchange: Exchange code
+        interval: Stored interval (1m or D)
+
+    Returns:
+        Tuple of (first_date, last_date), or None if nothing is covered
     """
+    key = [symbol.upper(), exchange.upper(), interval]
     try:
-        with get_connection() as conn:
-            result = conn.execute(
+        with get_connection(read_only=True) as conn:
+            row = conn.execute(
                 """
-                SELECT first_timestamp, last_timestamp, record_count
+                SELECT first_date, last_date FROM history_coverage
+                WHERE symbol = ? AND exchange = ? AND interval = ?
+            """,
+                key,
+            ).fetchone()
+            if row:
+                return row[0], row[1]
+
+            # last_download_at holds the session-local wall time of the write
+            row = conn.execute(
+                f"""
+                SELECT
+                    first_timestamp,
+                    last_timestamp,
+                    last_download_at >= CAST(to_timestamp(
+                        CAST(FLOOR((last_timestamp + {IST_OFFSET_SECONDS}) / 86400) AS BIGINT) * 86400
+                        + 86400 - {IST_OFFSET_SECONDS}
+                    ) AS TIMESTAMP)
                 FROM data_catalog
                 WHERE symbol = ? AND exchange = ? AND interval = ?
+                  AND first_timestamp IS NOT NULL
             """,
-                [symbol.upper(), exchange.upper(), interval],
+                key,
             ).fetchone()
 
-        if result:
-            return {
-                "first_timestamp": result[0],
-                "last_timestamp": result[1],
-                "record_count": result[2],
-            }
-        return None
+        if not row:
+            return None
+        first_date = datetime.fromtimestamp(row[0], IST).date()
+        last_date = datetime.fromtimestamp(row[1], IST).date()
+        if not row[2]:
+            last_date -= timedelta(days=1)
+        if last_date < first_date:
+            return None
+        return first_date, last_date
 
     except Exception as e:
-        logger.exception(f"Error fetching data range: {e}")
+        logger.exception(f"Error fetching history coverage: {e}")
         return None
 
 
+def extend_history_coverage(
+    symbol: str, exchange: str, interval: str, first_date: date, last_date: date
+) -> None:
+    """
+    Record that all bars from first_date to last_date (IST days) are stored.
+
+    The span must overlap or touch the existing coverage; they are merged.
+
+    Args:
+        symbol: Trading symbol
+        exchange: Exchange code
+        interval: Stored interval (1m or D)
+        first_date: First covered day
+        last_date: Last covered day (must have ended)
+    """
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO history_coverage (symbol, exchange, interval, first_date, last_date)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, exchange, interval) DO UPDATE SET
+                first_date = LEAST(history_coverage.first_date, EXCLUDED.first_date),
+                last_date = GREATEST(history_coverage.last_date, EXCLUDED.last_date)
+        """,
+            [symbol.upper(), exchange.upper(), interval, first_date, last_date],
+        )
+
+
 def delete_market_data(symbol: str, exchange: str, interval: str | None = None) -> tuple[bool, str]:
     """
     Delete market data for a symbol.
@@ -1253,6 +2118,22 @@ def delete_market_data(symbol: str, exchange: str, interval: str | None = None)
                 """,
                     [symbol.upper(), exchange.upper(), interval],
                 )
+                conn.execute(
+                    """
+                    DELETE FROM history_coverage
+                    WHERE symbol = ? AND exchange = ? AND interval = ?
+                """,
+                    [symbol.upper(), exchange.upper(), interval],
+                )
+                rollup_intervals = [name for name, base in ROLLUP_INTERVALS.items() if base == interval]
+                if rollup_intervals:
+                    conn.execute(
+                        """
+                        DELETE FROM market_data_rollup
+                        WHERE symbol = ? AND exchange = ? AND list_contains(?, interval)
+                    """,
+                        [symbol.upper(), exchange.upper(), rollup_intervals],
+                    )
                 msg = f"Deleted {symbol}:{exchange}:{interval} data"
             else:
                 conn.execute(
@@ -1269,8 +2150,25 @@ def delete_market_data(symbol: str, exchange: str, interval: str | None = None)
                 """,
                     [symbol.upper(), exchange.upper()],
                 )
+                conn.execute(
+                    """
+                    DELETE FROM market_data_rollup
+                    WHERE symbol = ? AND exchange = ?
+                """,
+                    [symbol.upper(), exchange.upper()],
+                )
+                conn.execute(
+                    """
+                    DELETE FROM history_coverage
+                    WHERE symbol = ? AND exchange = ?
+                """,
+                    [symbol.upper(), exchange.upper()],
+                )
                 msg = f"Deleted all {symbol}:{exchange} data"
 
+            if delete_cold_data(get_cold_tier_path(), symbol.upper(), exchange.upper(), interval):
+                refresh_market_data_view(conn)
+
         logger.info(msg)
         return True, msg
 
@@ -1294,6 +2192,7 @@ def bulk_delete_market_data(
     deleted = 0
     skipped = 0
     failed = []
+    cold_deleted = False
 
     try:
         with get_connection() as conn:
@@ -1320,6 +2219,11 @@ def bulk_delete_market_data(
                     )
                     rows_deleted = result.rowcount if hasattr(result, 'rowcount') else 0
 
+                    # Delete Parquet cold tier partitions
+                    if delete_cold_data(get_cold_tier_path(), symbol, exchange):
+                        cold_deleted = True
+                        rows_deleted = max(rows_deleted, 1)
+
                     # Delete from data_catalog
                     conn.execute(
                         """
@@ -1329,6 +2233,24 @@ def bulk_delete_market_data(
                         [symbol, exchange],
                     )
 
+                    # Delete materialized rollups
+                    conn.execute(
+                        """
+                        DELETE FROM market_data_rollup
+                        WHERE symbol = ? AND exchange = ?
+                        """,
+                        [symbol, exchange],
+                    )
+
+                    # Delete read-through coverage
+                    conn.execute(
+                        """
+                        DELETE FROM history_coverage
+                        WHERE symbol = ? AND exchange = ?
+                        """,
+                        [symbol, exchange],
+                    )
+
                     if rows_deleted > 0:
                         deleted += 1
                         logger.info(f"Bulk delete: Deleted {symbol}:{exchange}")
@@ -1344,6 +2266,9 @@ def bulk_delete_market_data(
                     })
                     logger.error(f"Bulk delete: Failed to delete {symbol}:{exchange}: {e}")
 
+            if cold_deleted:
+                refresh_market_data_view(conn)
+
         logger.info(f"Bulk delete completed: {deleted} deleted, {skipped} skipped, {len(failed)} failed")
         return deleted, skipped, failed
 
@@ -1408,7 +2333,7 @@ def export_to_csv(
                 strftime(to_timestamp(timestamp), '%Y-%m-%d') as date,
                 strftime(to_timestamp(timestamp), '%H:%M:%S') as time,
                 open, high, low, close, volume, oi
-            FROM market_data
+            FROM market_data_all
             WHERE {where_clause}
             ORDER BY symbol, exchange, interval, timestamp
         """
@@ -1421,7 +2346,7 @@ def export_to_csv(
         if not abs_output.startswith(os.path.abspath(temp_dir)):
             return False, "Invalid output path: must be within temp directory"
 
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             # Always use parameterized query and pandas to_csv for safety
             df = conn.execute(query, params).fetchdf()
             df.to_csv(output_path, index=False)
@@ -1476,12 +2401,16 @@ def get_database_stats() -> dict[str, Any]:
         db_path = get_db_path()
         db_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
 
-        with get_connection() as conn:
-            total_records = conn.execute("SELECT COUNT(*) FROM market_data").fetchone()[0]
+        with get_connection(read_only=True) as conn:
+            cold_tier = get_cold_tier_stats(conn, get_cold_tier_path())
+            total_records = (
+                conn.execute("SELECT COUNT(*) FROM market_data").fetchone()[0] + cold_tier["records"]
+            )
             total_symbols = conn.execute(
-                "SELECT COUNT(DISTINCT symbol || exchange) FROM market_data"
+                "SELECT COUNT(DISTINCT symbol || exchange) FROM data_catalog"
             ).fetchone()[0]
             watchlist_count = conn.execute("SELECT COUNT(*) FROM watchlist").fetchone()[0]
+            rollup_candles = conn.execute("SELECT COUNT(*) FROM market_data_rollup").fetchone()[0]
 
         return {
             "database_path": db_path,
@@ -1489,6 +2418,9 @@ def get_database_stats() -> dict[str, Any]:
             "total_records": total_records,
             "total_symbols": total_symbols,
             "watchlist_count": watchlist_count,
+            "rollups": {"ready": _rollups_ready, "candles": rollup_candles},
+            "cold_tier": cold_tier,
+            "connections": get_connection_stats(),
         }
 
     except Exception as e:
@@ -1861,7 +2793,7 @@ def _safe_timestamp(val) -> str | None:
 def get_download_job(job_id: str) -> dict[str, Any] | None:
     """Get a download job by ID."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(
                 """
                 SELECT id, job_type, status, total_symbols, completed_symbols,
@@ -1900,7 +2832,7 @@ def get_download_job(job_id: str) -> dict[str, Any] | None:
 def get_all_download_jobs(status: str = None, limit: int = 50) -> list[dict[str, Any]]:
     """Get all download jobs, optionally filtered by status."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             if status:
                 result = conn.execute(
                     """
@@ -1947,7 +2879,7 @@ def get_all_download_jobs(status: str = None, limit: int = 50) -> list[dict[str,
 def get_job_items(job_id: str, status: str = None) -> list[dict[str, Any]]:
     """Get all items for a job, optionally filtered by status."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             if status:
                 result = conn.execute(
                     """
@@ -2184,7 +3116,7 @@ def upsert_symbol_metadata(symbols: list[dict[str, Any]]) -> int:
 def get_symbol_metadata(symbol: str, exchange: str) -> dict[str, Any] | None:
     """Get metadata for a specific symbol."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(
                 """
                 SELECT symbol, exchange, name, expiry, strike, lotsize,
@@ -2222,7 +3154,7 @@ def get_catalog_with_metadata() -> list[dict[str, Any]]:
         List of catalog entries with metadata joined
     """
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute("""
                 SELECT
                     c.symbol, c.exchange, c.interval,
@@ -2284,6 +3216,11 @@ def get_catalog_grouped(group_by: str = "underlying") -> dict[str, list[dict[str
 # =============================================================================
 
 
+def _copy_target_sql(path: str) -> str:
+    """Quote an output path for a COPY ... TO statement."""
+    return "'" + path.replace("'", "''") + "'"
+
+
 def export_to_parquet(
     output_path: str,
     symbols: list[dict[str, str]] | None = None,
@@ -2341,58 +3278,27 @@ def export_to_parquet(
         if not abs_output.startswith(os.path.abspath(temp_dir)):
             return False, "Invalid output path: must be within temp directory", 0
 
-        # Get record count first
-        count_query = f"SELECT COUNT(*) FROM market_data WHERE {where_clause}"
+        # Export using DuckDB's native COPY TO PARQUET, which streams rows
+        # to the file and reports the number of rows written
+        export_query = f"""
+            COPY (
+                SELECT
+                    symbol, exchange, interval, timestamp,
+                    open, high, low, close, volume, oi,
+                    to_timestamp(timestamp) as datetime
+                FROM market_data_all
+                WHERE {where_clause}
+                ORDER BY symbol, exchange, interval, timestamp
+            ) TO {_copy_target_sql(abs_output)}
+            (FORMAT PARQUET, COMPRESSION '{compression}')
+        """
 
-        with get_connection() as conn:
-            record_count = conn.execute(count_query, params).fetchone()[0]
-
-            if record_count == 0:
-                return False, "No data matching the criteria", 0
-
-            # Export using DuckDB's native COPY TO PARQUET
-            # Build the query string for COPY - need to embed values for COPY command
-            export_query = f"""
-                COPY (
-                    SELECT
-                        symbol, exchange, interval, timestamp,
-                        open, high, low, close, volume, oi,
-                        to_timestamp(timestamp) as datetime
-                    FROM market_data
-                    WHERE {where_clause}
-                    ORDER BY symbol, exchange, interval, timestamp
-                ) TO '{abs_output}'
-                (FORMAT PARQUET, COMPRESSION '{compression}')
-            """
+        with get_connection(read_only=True) as conn:
+            record_count = conn.execute(export_query, params).fetchone()[0]
 
-            # For COPY command, we need to execute without parameters
-            # Build the full query with values embedded safely
-            if params:
-                # Re-execute with DataFrame approach for safety
-                select_query = f"""
-                    SELECT
-                        symbol, exchange, interval, timestamp,
-                        open, high, low, close, volume, oi
-                    FROM market_data
-                    WHERE {where_clause}
-                    ORDER BY symbol, exchange, interval, timestamp
-                """
-                df = conn.execute(select_query, params).fetchdf()
-                df["datetime"] = pd.to_datetime(df["timestamp"], unit="s")
-                df.to_parquet(abs_output, compression=compression, index=False)
-            else:
-                # No params - can use COPY directly
-                conn.execute(f"""
-                    COPY (
-                        SELECT
-                            symbol, exchange, interval, timestamp,
-                            open, high, low, close, volume, oi,
-                            to_timestamp(timestamp) as datetime
-                        FROM market_data
-                        ORDER BY symbol, exchange, interval, timestamp
-                    ) TO '{abs_output}'
-                    (FORMAT PARQUET, COMPRESSION '{compression}')
-                """)
+        if record_count == 0:
+            os.remove(abs_output)
+            return False, "No data matching the criteria", 0
 
         file_size = os.path.getsize(abs_output) / (1024 * 1024)  # MB
         logger.info(f"Exported {record_count} records to Parquet ({file_size:.2f} MB)")
@@ -2403,24 +3309,29 @@ def export_to_parquet(
         return False, str(e), 0
 
 
-def export_to_txt(
+def _export_delimited(
     output_path: str,
-    symbols: list[dict[str, str]] | None = None,
-    interval: str | None = None,
-    start_timestamp: int | None = None,
-    end_timestamp: int | None = None,
-    delimiter: str = "\t",
+    symbols: list[dict[str, str]] | None,
+    interval: str | None,
+    start_timestamp: int | None,
+    end_timestamp: int | None,
+    delimiter: str,
+    file_label: str,
 ) -> tuple[bool, str, int]:
     """
-    Export market data to TXT format (tab or pipe delimited).
+    Export market data to a single delimited file.
+
+    The file is written by DuckDB's COPY, which streams rows to disk instead
+    of building the whole result in memory.
 
     Args:
-        output_path: Path to save the TXT file
+        output_path: Path to save the file
         symbols: List of dicts with 'symbol' and 'exchange' keys (optional)
         interval: Filter by interval (optional)
         start_timestamp: Start epoch timestamp (optional)
         end_timestamp: End epoch timestamp (optional)
-        delimiter: Column delimiter (default: tab)
+        delimiter: Column delimiter
+        file_label: File type used in log messages (CSV, TXT)
 
     Returns:
         Tuple of (success, message, record_count)
@@ -2458,33 +3369,61 @@ def export_to_txt(
             return False, "Invalid output path: must be within temp directory", 0
 
         query = f"""
-            SELECT
-                symbol, exchange, interval,
-                strftime(to_timestamp(timestamp), '%Y-%m-%d') as date,
-                strftime(to_timestamp(timestamp), '%H:%M:%S') as time,
-                open, high, low, close, volume, oi
-            FROM market_data
-            WHERE {where_clause}
-            ORDER BY symbol, exchange, interval, timestamp
+            COPY (
+                SELECT
+                    symbol, exchange, interval,
+                    strftime(to_timestamp(timestamp), '%Y-%m-%d') as date,
+                    strftime(to_timestamp(timestamp), '%H:%M:%S') as time,
+                    open, high, low, close, volume, oi
+                FROM market_data_all
+                WHERE {where_clause}
+                ORDER BY symbol, exchange, interval, timestamp
+            ) TO {_copy_target_sql(abs_output)}
+            (FORMAT CSV, HEADER, DELIMITER {_copy_target_sql(delimiter)})
         """
 
-        with get_connection() as conn:
-            df = conn.execute(query, params).fetchdf()
-
-            if df.empty:
-                return False, "No data matching the criteria", 0
+        with get_connection(read_only=True) as conn:
+            record_count = conn.execute(query, params).fetchone()[0]
 
-            df.to_csv(output_path, index=False, sep=delimiter)
-            record_count = len(df)
+        if record_count == 0:
+            os.remove(abs_output)
+            return False, "No data matching the criteria", 0
 
-        logger.info(f"Exported {record_count} records to TXT")
+        logger.info(f"Exported {record_count} records to {file_label}")
         return True, f"Exported {record_count} records", record_count
 
     except Exception as e:
-        logger.exception(f"Error exporting to TXT: {e}")
+        logger.exception(f"Error exporting to {file_label}: {e}")
         return False, str(e), 0
 
 
+def export_to_txt(
+    output_path: str,
+    symbols: list[dict[str, str]] | None = None,
+    interval: str | None = None,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+    delimiter: str = "\t",
+) -> tuple[bool, str, int]:
+    """
+    Export market data to TXT format (tab or pipe delimited).
+
+    Args:
+        output_path: Path to save the TXT file
+        symbols: List of dicts with 'symbol' and 'exchange' keys (optional)
+        interval: Filter by interval (optional)
+        start_timestamp: Start epoch timestamp (optional)
+        end_timestamp: End epoch timestamp (optional)
+        delimiter: Column delimiter (default: tab)
+
+    Returns:
+        Tuple of (success, message, record_count)
+    """
+    return _export_delimited(
+        output_path, symbols, interval, start_timestamp, end_timestamp, delimiter, "TXT"
+    )
+
+
 def _sanitize_filename(name: str) -> str:
     """Remove path traversal and special characters from filename."""
     import re
@@ -2496,6 +3435,115 @@ def _sanitize_filename(name: str) -> str:
     return name
 
 
+def _zip_entry_query(
+    symbol: str,
+    exchange: str,
+    interval: str,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+) -> tuple[str, list] | None:
+    """
+    Build the query producing one ZIP export file (date, time, OHLCV columns).
+
+    Computed intervals are aggregated on-the-fly:
+    - Intraday (from 1m): 5m, 15m, 30m, 1h, 25m, 2h, etc.
+    - Daily-based (from D): W, M, Q, Y
+
+    Args:
+        symbol: Trading symbol
+        exchange: Exchange code
+        interval: Interval to export
+        start_timestamp: Start epoch timestamp (optional)
+        end_timestamp: End epoch timestamp (optional)
+
+    Returns:
+        Tuple of (query, params), or None if the interval cannot be exported
+    """
+    ist_offset = IST_OFFSET_SECONDS
+
+    # Aggregated timestamps are UTC epochs; shift them by the IST offset and
+    # format them as naive timestamps so the file shows IST wall-clock time
+    def with_date_time(aggregate_query: str, ts_column: str) -> str:
+        shifted = f"make_timestamp(CAST({ts_column} + {ist_offset} AS BIGINT) * 1000000)"
+        return f"""
+            SELECT
+                strftime({shifted}, '%Y-%m-%d') as date,
+                strftime({shifted}, '%H:%M:%S') as time,
+                open, high, low, close, CAST(volume AS BIGINT) as volume, oi
+            FROM ({aggregate_query}) aggregated
+            ORDER BY {ts_column}
+        """
+
+    if is_daily_aggregated_interval(interval):
+        built = _daily_aggregate_query(symbol, exchange, interval, start_timestamp, end_timestamp)
+        if built is None:
+            return None
+        query, params = built
+        return with_date_time(query, "timestamp"), params
+
+    if interval in COMPUTED_INTERVALS or is_custom_interval(interval):
+        # Support both standard and custom intervals
+        minutes = INTERVAL_MINUTES.get(interval)
+        if minutes is None:
+            parsed = parse_interval(interval)
+            if not parsed or parsed["type"] != "intraday":
+                logger.warning(f"Cannot parse interval {interval}, skipping")
+                return None
+            minutes = parsed["minutes"]
+
+        market_open_seconds = _get_market_open_seconds(exchange)
+        bucket_expr = _intraday_bucket_sql(minutes * 60, market_open_seconds)
+
+        # Filter to only include data after market open to avoid negative timestamp issues
+        query = f"""
+            SELECT
+                {bucket_expr} as ts,
+                FIRST(open ORDER BY timestamp) as open,
+                MAX(high) as high,
+                MIN(low) as low,
+                LAST(close ORDER BY timestamp) as close,
+                SUM(volume) as volume,
+                LAST(oi ORDER BY timestamp) as oi
+            FROM market_data_all
+            WHERE symbol = ? AND exchange = ? AND interval = '1m'
+            AND ((timestamp + {ist_offset}) % 86400) >= {market_open_seconds}
+        """
+        params = [symbol, exchange]
+
+        if start_timestamp:
+            query += " AND timestamp >= ?"
+            params.append(start_timestamp)
+
+        if end_timestamp:
+            query += " AND timestamp <= ?"
+            params.append(end_timestamp)
+
+        query += f" GROUP BY {bucket_expr}"
+        return with_date_time(query, "ts"), params
+
+    # Direct query for stored intervals (1m, D)
+    query = """
+        SELECT
+            strftime(to_timestamp(timestamp), '%Y-%m-%d') as date,
+            strftime(to_timestamp(timestamp), '%H:%M:%S') as time,
+            open, high, low, close, volume, oi
+        FROM market_data_all
+        WHERE symbol = ? AND exchange = ? AND interval = ?
+    """
+    params = [symbol, exchange, interval]
+
+    if start_timestamp:
+        query += " AND timestamp >= ?"
+        params.append(start_timestamp)
+
+    if end_timestamp:
+        query += " AND timestamp <= ?"
+        params.append(end_timestamp)
+
+    query += " ORDER BY timestamp"
+    return query, params
+
+
 def export_to_zip(
     output_path: str,
     symbols: list[dict[str, str]] | None = None,
@@ -2503,14 +3551,20 @@ def export_to_zip(
     start_timestamp: int | None = None,
     end_timestamp: int | None = None,
     split_by: str = "symbol",
+    file_format: str = "csv",
+    progress_callback: Callable[[int, int, str], None] | None = None,
 ) -> tuple[bool, str, int]:
     """
-    Export market data to ZIP archive containing CSVs.
+    Export market data to ZIP archive containing CSVs (or Parquet files).
 
     Supports multi-timeframe export where intervals are aggregated on-the-fly:
     - Intraday (from 1m): 5m, 15m, 30m, 1h, 25m, 2h, etc.
     - Daily-based (from D): W, M, Q, Y
 
+    Symbols are exported in parallel and every file is streamed into the
+    archive in record batches (see database/historify_export.py), so memory
+    use does not grow with the size of the export.
+
     Args:
         output_path: Path to save the ZIP file
         symbols: List of dicts with 'symbol' and 'exchange' keys (optional)
@@ -2518,6 +3572,8 @@ def export_to_zip(
         start_timestamp: Start epoch timestamp (optional)
         end_timestamp: End epoch timestamp (optional)
         split_by: 'symbol' to create one CSV per symbol/interval, 'none' for combined
+        file_format: Format of the files in the archive, 'csv' or 'parquet'
+        progress_callback: Called as (completed_symbols, total_symbols, "SYMBOL:EXCHANGE")
 
     Returns:
         Tuple of (success, message, record_count)
@@ -2532,214 +3588,57 @@ def export_to_zip(
         if not abs_output.startswith(os.path.abspath(temp_dir)):
             return False, "Invalid output path: must be within temp directory", 0
 
-        total_records = 0
-        skipped_intervals = []  # Track computed intervals with missing 1m data
+        if file_format not in EXPORT_FORMATS:
+            return False, f"Unsupported export format: {file_format}", 0
 
-        # IST timezone offset from UTC (5 hours 30 minutes = 19800 seconds)
-        ist_offset = 19800
+        # Get symbols to export
+        if symbols and len(symbols) > 0:
+            symbols_list = [(s["symbol"].upper(), s["exchange"].upper()) for s in symbols]
+        else:
+            # Get all symbols from catalog
+            with get_connection(read_only=True) as conn:
+                symbols_list = conn.execute("""
+                    SELECT DISTINCT symbol, exchange FROM data_catalog
+                    ORDER BY symbol, exchange
+                """).fetchall()
+
+        if not symbols_list:
+            return False, "No symbols found to export", 0
+
+        # Determine intervals to export
+        intervals_to_export = intervals if intervals else ["D"]
+
+        skipped_intervals = []  # Track computed intervals with missing base data
+        computed_entries = {}
+        jobs = []
+        for sym, exch in symbols_list:
+            entries = []
+            for interval in intervals_to_export:
+                built = _zip_entry_query(sym, exch, interval, start_timestamp, end_timestamp)
+                if built is None:
+                    skipped_intervals.append(f"{sym}:{exch}:{interval}")
+                    continue
+                # Sanitize filename to prevent path traversal
+                name = f"{_sanitize_filename(sym)}_{_sanitize_filename(exch)}_{_sanitize_filename(interval)}"
+                entries.append(ExportEntry(name, *built))
+                if interval not in STORAGE_INTERVALS:
+                    computed_entries[name] = f"{sym}:{exch}:{interval}"
+            jobs.append(ExportJob(f"{sym}:{exch}", entries))
 
         with zipfile.ZipFile(abs_output, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
-            with get_connection() as conn:
-                # Get symbols to export
-                if symbols and len(symbols) > 0:
-                    symbols_list = [(s["symbol"].upper(), s["exchange"].upper()) for s in symbols]
-                else:
-                    # Get all symbols from catalog
-                    symbols_df = conn.execute("""
-                        SELECT DISTINCT symbol, exchange FROM data_catalog
-                        ORDER BY symbol, exchange
-                    """).fetchdf()
-                    symbols_list = [
-                        (row["symbol"], row["exchange"]) for _, row in symbols_df.iterrows()
-                    ]
-
-                if not symbols_list:
-                    return False, "No symbols found to export", 0
-
-                # Determine intervals to export
-                intervals_to_export = intervals if intervals else ["D"]
-
-                for sym, exch in symbols_list:
-                    market_open_seconds = _get_market_open_seconds(exch)
-
-                    for interval in intervals_to_export:
-                        # Determine if this is a daily-aggregated interval (W, MO, Q, Y)
-                        is_daily_agg = is_daily_aggregated_interval(interval)
-
-                        # Determine if this is an intraday computed interval (standard or custom)
-                        is_intraday_computed = interval in COMPUTED_INTERVALS or is_custom_interval(
-                            interval
-                        )
+            records = write_zip_entries(
+                zf,
+                jobs,
+                lambda: get_connection(read_only=True),
+                file_format=file_format,
+                progress_callback=progress_callback,
+            )
 
-                        if is_daily_agg:
-                            # Check if D data exists before attempting aggregation
-                            check_query = """
-                                SELECT COUNT(*) FROM market_data
-                                WHERE symbol = ? AND exchange = ? AND interval = 'D'
-                            """
-                            check_params = [sym, exch]
-                            if start_timestamp:
-                                check_query += " AND timestamp >= ?"
-                                check_params.append(start_timestamp)
-                            if end_timestamp:
-                                check_query += " AND timestamp <= ?"
-                                check_params.append(end_timestamp)
-
-                            count = conn.execute(check_query, check_params).fetchone()[0]
-                            if count == 0:
-                                logger.warning(
-                                    f"No D data for {sym}:{exch}, skipping daily-aggregated interval {interval}"
-                                )
-                                skipped_intervals.append(f"{sym}:{exch}:{interval}")
-                                continue
-
-                            # Use get_ohlcv which handles daily aggregation
-                            df = _get_daily_aggregated_ohlcv(
-                                symbol=sym,
-                                exchange=exch,
-                                target_interval=interval,
-                                start_timestamp=start_timestamp,
-                                end_timestamp=end_timestamp,
-                            )
-
-                            if not df.empty:
-                                # Format timestamp as date and time columns
-                                df["date"] = pd.to_datetime(
-                                    df["timestamp"] + ist_offset, unit="s"
-                                ).dt.strftime("%Y-%m-%d")
-                                df["time"] = pd.to_datetime(
-                                    df["timestamp"] + ist_offset, unit="s"
-                                ).dt.strftime("%H:%M:%S")
-                                df = df[
-                                    ["date", "time", "open", "high", "low", "close", "volume", "oi"]
-                                ]
-
-                                # Create CSV content
-                                csv_buffer = df.to_csv(index=False)
-
-                                # Sanitize filename
-                                safe_sym = _sanitize_filename(sym)
-                                safe_exch = _sanitize_filename(exch)
-                                safe_int = _sanitize_filename(interval)
-                                filename = f"{safe_sym}_{safe_exch}_{safe_int}.csv"
-
-                                zf.writestr(filename, csv_buffer)
-                                total_records += len(df)
-
-                        elif is_intraday_computed:
-                            # Check if 1m data exists before attempting aggregation
-                            check_query = """
-                                SELECT COUNT(*) FROM market_data
-                                WHERE symbol = ? AND exchange = ? AND interval = '1m'
-                            """
-                            check_params = [sym, exch]
-                            if start_timestamp:
-                                check_query += " AND timestamp >= ?"
-                                check_params.append(start_timestamp)
-                            if end_timestamp:
-                                check_query += " AND timestamp <= ?"
-                                check_params.append(end_timestamp)
-
-                            count = conn.execute(check_query, check_params).fetchone()[0]
-                            if count == 0:
-                                logger.warning(
-                                    f"No 1m data for {sym}:{exch}, skipping computed interval {interval}"
-                                )
-                                skipped_intervals.append(f"{sym}:{exch}:{interval}")
-                                continue
-
-                            # Aggregate from 1m data using the same logic as _get_aggregated_ohlcv
-                            # Filter to only include data after market open to avoid negative timestamp issues
-                            # Support both standard and custom intervals
-                            minutes = INTERVAL_MINUTES.get(interval)
-                            if minutes is None:
-                                parsed = parse_interval(interval)
-                                if parsed and parsed["type"] == "intraday":
-                                    minutes = parsed["minutes"]
-                                else:
-                                    logger.warning(f"Cannot parse interval {interval}, skipping")
-                                    skipped_intervals.append(f"{sym}:{exch}:{interval}")
-                                    continue
-                            interval_seconds = minutes * 60
-
-                            query = f"""
-                                SELECT
-                                    (FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
-                                    {market_open_seconds} +
-                                    FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}
-                                    as ts,
-                                    FIRST(open ORDER BY timestamp) as open,
-                                    MAX(high) as high,
-                                    MIN(low) as low,
-                                    LAST(close ORDER BY timestamp) as close,
-                                    SUM(volume) as volume,
-                                    LAST(oi ORDER BY timestamp) as oi
-                                FROM market_data
-                                WHERE symbol = ? AND exchange = ? AND interval = '1m'
-                                AND ((timestamp + {ist_offset}) % 86400) >= {market_open_seconds}
-                            """
-                            params = [sym, exch]
-
-                            if start_timestamp:
-                                query += " AND timestamp >= ?"
-                                params.append(start_timestamp)
-
-                            if end_timestamp:
-                                query += " AND timestamp <= ?"
-                                params.append(end_timestamp)
-
-                            query += f"""
-                                GROUP BY (FLOOR((timestamp + {ist_offset}) / 86400) * 86400 - {ist_offset}) +
-                                         {market_open_seconds} +
-                                         FLOOR((((timestamp + {ist_offset}) % 86400) - {market_open_seconds}) / {interval_seconds}) * {interval_seconds}
-                                ORDER BY ts ASC
-                            """
-
-                            df = conn.execute(query, params).fetchdf()
-
-                            if not df.empty:
-                                # Format timestamp as date and time columns
-                                # Add IST offset (19800 seconds) for display since aggregated timestamps are UTC
-                                df["date"] = pd.to_datetime(
-                                    df["ts"] + ist_offset, unit="s"
-                                ).dt.strftime("%Y-%m-%d")
-                                df["time"] = pd.to_datetime(
-                                    df["ts"] + ist_offset, unit="s"
-                                ).dt.strftime("%H:%M:%S")
-                                df = df[
-                                    ["date", "time", "open", "high", "low", "close", "volume", "oi"]
-                                ]
-
-                        else:
-                            # Direct query for stored intervals (1m, D)
-                            query = """
-                                SELECT
-                                    strftime(to_timestamp(timestamp), '%Y-%m-%d') as date,
-                                    strftime(to_timestamp(timestamp), '%H:%M:%S') as time,
-                                    open, high, low, close, volume, oi
-                                FROM market_data
-                                WHERE symbol = ? AND exchange = ? AND interval = ?
-                            """
-                            params = [sym, exch, interval]
-
-                            if start_timestamp:
-                                query += " AND timestamp >= ?"
-                                params.append(start_timestamp)
-
-                            if end_timestamp:
-                                query += " AND timestamp <= ?"
-                                params.append(end_timestamp)
-
-                            query += " ORDER BY timestamp"
-
-                            df = conn.execute(query, params).fetchdf()
-
-                        if not df.empty:
-                            csv_content = df.to_csv(index=False)
-                            # Sanitize filename to prevent path traversal
-                            filename = f"{_sanitize_filename(sym)}_{_sanitize_filename(exch)}_{_sanitize_filename(interval)}.csv"
-                            zf.writestr(filename, csv_content)
-                            total_records += len(df)
+        total_records = sum(records.values())
+        for name, label in computed_entries.items():
+            if records.get(name) == 0:
+                logger.warning(f"No base data for {label}, skipped computed interval")
+                skipped_intervals.append(label)
 
         if total_records == 0:
             if os.path.exists(abs_output):
@@ -2790,66 +3689,7 @@ def export_bulk_csv(
     Returns:
         Tuple of (success, message, record_count)
     """
-    import tempfile
-
-    try:
-        # Build symbol filter
-        conditions = []
-        params = []
-
-        if symbols and len(symbols) > 0:
-            # Export specific symbols
-            symbol_conditions = []
-            for sym in symbols:
-                symbol_conditions.append("(symbol = ? AND exchange = ?)")
-                params.extend([sym["symbol"].upper(), sym["exchange"].upper()])
-            conditions.append(f"({' OR '.join(symbol_conditions)})")
-        # If no symbols specified, export all (no symbol filter needed)
-
-        if interval:
-            conditions.append("interval = ?")
-            params.append(interval)
-        if start_timestamp:
-            conditions.append("timestamp >= ?")
-            params.append(start_timestamp)
-        if end_timestamp:
-            conditions.append("timestamp <= ?")
-            params.append(end_timestamp)
-
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-        # Validate output path
-        temp_dir = tempfile.gettempdir()
-        abs_output = os.path.abspath(output_path)
-        if not abs_output.startswith(os.path.abspath(temp_dir)):
-            return False, "Invalid output path: must be within temp directory", 0
-
-        query = f"""
-            SELECT
-                symbol, exchange, interval,
-                strftime(to_timestamp(timestamp), '%Y-%m-%d') as date,
-                strftime(to_timestamp(timestamp), '%H:%M:%S') as time,
-                open, high, low, close, volume, oi
-            FROM market_data
-            WHERE {where_clause}
-            ORDER BY symbol, exchange, interval, timestamp
-        """
-
-        with get_connection() as conn:
-            df = conn.execute(query, params).fetchdf()
-
-            if df.empty:
-                return False, "No data matching the criteria", 0
-
-            df.to_csv(output_path, index=False)
-            record_count = len(df)
-
-        logger.info(f"Exported {record_count} records to CSV")
-        return True, f"Exported {record_count} records", record_count
-
-    except Exception as e:
-        logger.exception(f"Error exporting bulk CSV: {e}")
-        return False, str(e), 0
+    return _export_delimited(output_path, symbols, interval, start_timestamp, end_timestamp, ",", "CSV")
 
 
 def get_export_preview(
@@ -2901,11 +3741,11 @@ def get_export_preview(
                 COUNT(DISTINCT interval) as interval_count,
                 MIN(timestamp) as first_timestamp,
                 MAX(timestamp) as last_timestamp
-            FROM market_data
+            FROM market_data_all
             WHERE {where_clause}
         """
 
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(query, params).fetchone()
 
             if result[0] == 0:
@@ -3054,7 +3894,7 @@ def _clean_schedule_record(record: dict[str, Any]) -> dict[str, Any]:
 def get_schedule(schedule_id: str) -> dict[str, Any] | None:
     """Get a schedule by ID."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(
                 """
                 SELECT id, name, description, schedule_type, interval_value,
@@ -3082,7 +3922,7 @@ def get_schedule(schedule_id: str) -> dict[str, Any] | None:
 def get_all_schedules() -> list[dict[str, Any]]:
     """Get all schedules."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute("""
                 SELECT id, name, description, schedule_type, interval_value,
                        interval_unit, time_of_day, download_source, data_interval,
@@ -3348,7 +4188,7 @@ def update_schedule_execution(
 def get_schedule_executions(schedule_id: str, limit: int = 20) -> list[dict[str, Any]]:
     """Get execution history for a schedule."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute(
                 """
                 SELECT id, schedule_id, download_job_id, status,
@@ -3377,7 +4217,7 @@ def get_schedule_executions(schedule_id: str, limit: int = 20) -> list[dict[str,
 def get_active_schedules() -> list[dict[str, Any]]:
     """Get all enabled and non-paused schedules."""
     try:
-        with get_connection() as conn:
+        with get_connection(read_only=True) as conn:
             result = conn.execute("""
                 SELECT id, name, description, schedule_type, interval_value,
                        interval_unit, time_of_day, download_source, data_interval,
@@ -0,0 +1,245 @@
+# database/historify_export.py
+"""
+Historify Streaming Export
+
+Writes query results into export archives without materializing them.
+
+Rows are pulled from DuckDB as Arrow record batches and encoded batch by
+batch (CSV or Parquet), so memory stays bounded by the batch size instead of
+growing with the size of the series. Symbols are exported in parallel: each
+worker reads on its own cursor and encodes its entries into a spooled
+temporary file, and the calling thread appends finished entries to the ZIP
+archive one at a time (zipfile allows a single open entry per archive).
+A bounded hand-off queue keeps workers from running ahead of the writer.
+
+Configuration:
+    HISTORIFY_EXPORT_WORKERS: Symbols exported in parallel (default: 4)
+    HISTORIFY_EXPORT_BATCH_ROWS: Rows per record batch (default: 100000)
+    HISTORIFY_EXPORT_SPOOL_MB: Entry size kept in memory before spilling to disk (default: 16)
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_EXPORT_WORKERS = 4
+DEFAULT_BATCH_ROWS = 100_000
+DEFAULT_SPOOL_MB = 16
+
+EXPORT_FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def get_export_workers() -> int:
+    """Get the number of symbols exported in parallel"""
+    return max(1, int(os.getenv("HISTORIFY_EXPORT_WORKERS", DEFAULT_EXPORT_WORKERS)))
+
+
+def get_batch_rows() -> int:
+    """Get the number of rows fetched per record batch"""
+    return max(1, int(os.getenv("HISTORIFY_EXPORT_BATCH_ROWS", DEFAULT_BATCH_ROWS)))
+
+
+def get_spool_bytes() -> int:
+    """Get the entry size kept in memory before a spool file spills to disk"""
+    return int(float(os.getenv("HISTORIFY_EXPORT_SPOOL_MB", DEFAULT_SPOOL_MB)) * 1024 * 1024)
+
+
+def iter_record_batches(conn, query: str, params: list | None = None) -> Iterator[pa.RecordBatch]:
+    """
+    Execute a query and yield its result as Arrow record batches.
+
+    Args:
+        conn: DuckDB connection or cursor
+        query: SQL query
+        params: Query parameters
+
+    Yields:
+        Record batches of at most HISTORIFY_EXPORT_BATCH_ROWS rows
+    """
+    reader = conn.execute(query, params or []).fetch_record_batch(get_batch_rows())
+    yield from reader
+
+
+def write_batches(
+    batches: Iterator[pa.RecordBatch], fileobj, file_format: str = "csv", delimiter: str = ","
+) -> int:
+    """
+    Encode record batches into a binary file object.
+
+    Nothing is written when there are no rows. CSV output has an unquoted
+    header line and unquoted values, like DataFrame.to_csv for OHLCV data.
+
+    Args:
+        batches: Record batches sharing one schema
+        fileobj: Writable binary file object (left open)
+        file_format: 'csv' or 'parquet'
+        delimiter: CSV column delimiter
+
+    Returns:
+        Number of rows written
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            if writer is None:
+                if file_format == "parquet":
+                    writer = pq.ParquetWriter(fileobj, batch.schema, compression="zstd")
+                else:
+                    fileobj.write((delimiter.join(batch.schema.names) + "\n").encode())
+                    writer = pa_csv.CSVWriter(
+                        fileobj,
+                        batch.schema,
+                        write_options=pa_csv.WriteOptions(
+                            include_header=False, delimiter=delimiter, quoting_style="none"
+                        ),
+                    )
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _discard_pending(finished: queue.Queue):
+    while True:
+        try:
+            kind, _, payload, _ = finished.get_nowait()
+        except queue.Empty:
+            return
+        if kind == "entry":
+            payload.close()
+
+
+@dataclass
+class ExportEntry:
+    """One file of an export archive and the query producing its rows"""
+
+    name: str
+    query: str
+    params: list = field(default_factory=list)
+
+
+@dataclass
+class ExportJob:
+    """The entries of one symbol; a job is the unit of parallelism and progress"""
+
+    label: str
+    entries: list[ExportEntry]
+
+
+def write_zip_entries(
+    zf,
+    jobs: list[ExportJob],
+    connect: Callable[[], Any],
+    file_format: str = "csv",
+    workers: int | None = None,
+    progress_callback: Callable[[int, int, str], None] | None = None,
+) -> dict[str, int]:
+    """
+    Stream the entries of export jobs into an open ZIP archive.
+
+    Args:
+        zf: zipfile.ZipFile opened for writing
+        jobs: Export jobs, run in parallel
+        connect: Context manager factory yielding a read connection for the
+                 calling thread, e.g. lambda: get_connection(read_only=True)
+        file_format: Entry format, 'csv' or 'parquet' (sets the file extension)
+        workers: Parallel jobs (default: HISTORIFY_EXPORT_WORKERS)
+        progress_callback: Called as (completed_jobs, total_jobs, label) after each job
+
+    Returns:
+        Records written per entry name (0 for entries without rows, which are
+        not added to the archive)
+    """
+    extension = EXPORT_FORMATS.get(file_format)
+    if extension is None:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+    workers = min(workers or get_export_workers(), max(1, len(jobs)))
+    spool_bytes = get_spool_bytes()
+    finished: queue.Queue = queue.Queue(maxsize=workers * 2)
+    cancelled = threading.Event()
+    records: dict[str, int] = {}
+
+    def hand_off(item) -> bool:
+        while not cancelled.is_set():
+            try:
+                finished.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(job: ExportJob):
+        try:
+            with connect() as conn:
+                for entry in job.entries:
+                    if cancelled.is_set():
+                        return
+                    spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+                    try:
+                        rows = write_batches(
+                            iter_record_batches(conn, entry.query, entry.params), spool, file_format
+                        )
+                    except BaseException:
+                        spool.close()
+                        raise
+                    if not hand_off(("entry", entry.name, spool, rows)):
+                        spool.close()
+                        return
+            hand_off(("done", job.label, None, 0))
+        except Exception as e:
+            logger.error(f"Export of {job.label} failed: {e}")
+            hand_off(("error", job.label, e, 0))
+
+    completed = 0
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="historify-export")
+    try:
+        for job in jobs:
+            executor.submit(run, job)
+
+        while completed < len(jobs):
+            kind, name, payload, rows = finished.get()
+            if kind == "error":
+                raise payload
+            if kind == "done":
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, len(jobs), name)
+                continue
+
+            with payload as spool:
+                records[name] = rows
+                if rows:
+                    spool.seek(0)
+                    with zf.open(name + extension, "w", force_zip64=True) as target:
+                        shutil.copyfileobj(spool, target, 1024 * 1024)
+    finally:
+        cancelled.set()
+        # Release spools of entries that were not written (error or early exit)
+        _discard_pending(finished)
+        executor.shutdown(wait=True)
+        _discard_pending(finished)
+
+    return records
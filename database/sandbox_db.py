@@ -17,6 +17,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
     create_engine,
+    event,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
@@ -35,12 +36,31 @@ load_dotenv()
 # Get from environment variable or use default path in /db directory
 SANDBOX_DATABASE_URL = os.getenv("SANDBOX_DATABASE_URL", "sqlite:///db/sandbox.db")
 
+# SQLite durability for sandbox commits. In WAL mode, NORMAL appends each commit to the
+# write-ahead log without an fsync; the log is synced in groups at checkpoints. A crash
+# never corrupts the database, and at worst loses the last few paper fills on power loss.
+# Use FULL to fsync every commit.
+SANDBOX_DB_SYNCHRONOUS = os.getenv("SANDBOX_DB_SYNCHRONOUS", "NORMAL").upper()
+if SANDBOX_DB_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    SANDBOX_DB_SYNCHRONOUS = "NORMAL"
+
 # Conditionally create engine based on DB type
 if SANDBOX_DATABASE_URL and "sqlite" in SANDBOX_DATABASE_URL:
     # SQLite: Use NullPool to prevent connection pool exhaustion
     engine = create_engine(
         SANDBOX_DATABASE_URL, poolclass=NullPool, connect_args={"check_same_thread": False}
     )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Journal sandbox writes through WAL so fills and MTM commits don't fsync"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SANDBOX_DB_SYNCHRONOUS}")
+        # Wait for the engine thread's write to finish instead of failing with 'database is locked'
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
 else:
     # For other databases like PostgreSQL, use connection pooling
     engine = create_engine(SANDBOX_DATABASE_URL, pool_size=20, max_overflow=40, pool_timeout=10)
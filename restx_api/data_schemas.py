@@ -2,6 +2,8 @@ import re
 
 from marshmallow import Schema, ValidationError, fields, validate
 
+from utils.response_format import RESPONSE_FORMATS
+
 
 # Custom validator for date or timestamp string
 def validate_date_or_timestamp(data):
@@ -51,6 +53,8 @@ class MultiQuotesSchema(Schema):
     symbols = fields.List(
         fields.Nested(SymbolExchangePair), required=True, validate=validate.Length(min=1)
     )
+    # Optional: Response format - 'json' (default), 'columnar', 'arrow' or 'parquet'
+    format = fields.Str(required=False, load_default="json", validate=validate.OneOf(RESPONSE_FORMATS))
 
 
 class HistorySchema(Schema):
@@ -95,6 +99,8 @@ class HistorySchema(Schema):
     end_date = fields.Date(required=True, format="%Y-%m-%d")  # YYYY-MM-DD
     # Optional: Data source - 'api' (broker, default) or 'db' (DuckDB/Historify)
     source = fields.Str(required=False, load_default="api", validate=validate.OneOf(["api", "db"]))
+    # Optional: Response format - 'json' (default), 'columnar', 'arrow' or 'parquet'
+    format = fields.Str(required=False, load_default="json", validate=validate.OneOf(RESPONSE_FORMATS))
     # OI is now always included by default for F&O exchanges
 
 
@@ -8,6 +8,7 @@ from marshmallow import ValidationError
 from limiter import limiter
 from services.history_service import get_history
 from utils.logging import get_logger
+from utils.response_format import table_response
 
 from .data_schemas import HistorySchema
 
@@ -37,6 +38,7 @@ class History(Resource):
             start_date = history_data["start_date"]
             end_date = history_data["end_date"]
             source = history_data.get("source", "api")  # Optional, defaults to 'api'
+            response_format = history_data.get("format", "json")  # Optional, defaults to 'json'
 
             # Call the service function to get historical data with API key
             success, response_data, status_code = get_history(
@@ -47,9 +49,10 @@ class History(Resource):
                 end_date=end_date,
                 api_key=api_key,
                 source=source,
+                response_format=response_format,
             )
 
-            return make_response(jsonify(response_data), status_code)
+            return table_response(response_data, status_code, response_format)
 
         except ValidationError as err:
             return make_response(jsonify({"status": "error", "message": err.messages}), 400)
@@ -7,6 +7,7 @@ from marshmallow import ValidationError
 from limiter import limiter
 from services.quotes_service import get_multiquotes
 from utils.logging import get_logger
+from utils.response_format import table_response
 
 from .data_schemas import MultiQuotesSchema
 
@@ -31,11 +32,14 @@ class MultiQuotes(Resource):
 
             api_key = multiquotes_data["apikey"]
             symbols = multiquotes_data["symbols"]
+            response_format = multiquotes_data.get("format", "json")
 
             # Call the service function to get multiquotes data with API key
-            success, response_data, status_code = get_multiquotes(symbols=symbols, api_key=api_key)
+            success, response_data, status_code = get_multiquotes(
+                symbols=symbols, api_key=api_key, response_format=response_format
+            )
 
-            return make_response(jsonify(response_data), status_code)
+            return table_response(response_data, status_code, response_format, table_key="results")
 
         except ValidationError as err:
             return make_response(jsonify({"status": "error", "message": err.messages}), 400)
@@ -8,15 +8,21 @@ Features:
 - Order execution based on price type (MARKET, LIMIT, SL, SL-M)
 - Trade creation and position updates
 - Rate limit compliance (10 orders/second, 50 API calls/second)
-- Batch processing for efficiency
+- Incremental checks: orders sit in per-symbol trigger books, and a cycle only
+  evaluates orders on symbols whose LTP moved (plus new, modified or deferred
+  orders) and whose limit/trigger price the LTP crosses
+- One multiquotes call per cycle for the symbols of all users' open orders
+- Order rate cap as a non-blocking token bucket (orders over the cap wait for
+  the next cycle instead of sleeping the whole loop)
 """
 
 import os
 import sys
+import threading
 import time
 import uuid
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 import pytz
 
@@ -26,11 +32,86 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.auth_db import get_auth_token_broker
 from database.sandbox_db import SandboxOrders, SandboxPositions, SandboxTrades, db_session
 from sandbox.fund_manager import FundManager, reconcile_margin, validate_margin_consistency
+from sandbox.trigger_book import TriggerBook
 from services.quotes_service import get_multiquotes, get_quotes
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# The API key used for sandbox quote fetches is looked up and decrypted at most this often
+QUOTE_API_KEY_TTL = 300  # seconds
+
+_quote_api_key: str | None = None
+_quote_api_key_expires = 0.0
+_quote_api_key_lock = threading.Lock()
+
+
+def quote_price(quote, field):
+    """
+    Read a price field of a quote as a Decimal.
+
+    A missing or null value counts as 0 (no price). Raises InvalidOperation
+    for values that are not finite numbers.
+    """
+    price = Decimal(str(quote.get(field) or 0))
+    if not price.is_finite():
+        raise InvalidOperation(f"{field} is {price}")
+    return price
+
+
+def get_quote_api_key():
+    """
+    Get an API key for fetching sandbox quotes (any user's key will do).
+
+    Cached for QUOTE_API_KEY_TTL seconds so quote fetches don't query and
+    decrypt ApiKeys every time. A missing key is not cached.
+
+    Returns:
+        str: Decrypted API key, or None if no user has generated one
+    """
+    global _quote_api_key, _quote_api_key_expires
+
+    with _quote_api_key_lock:
+        now = time.monotonic()
+        if _quote_api_key and now < _quote_api_key_expires:
+            return _quote_api_key
+
+        from database.auth_db import ApiKeys, decrypt_token
+
+        api_key_obj = ApiKeys.query.first()
+        if not api_key_obj:
+            return None
+
+        _quote_api_key = decrypt_token(api_key_obj.api_key_encrypted)
+        _quote_api_key_expires = now + QUOTE_API_KEY_TTL
+        return _quote_api_key
+
+
+class OrderRateLimiter:
+    """
+    Non-blocking token bucket for the sandbox order rate cap.
+
+    Holds up to one second of tokens and refills continuously, so at most
+    `rate` orders are processed in any one-second window.
+    """
+
+    def __init__(self, rate: int):
+        self.rate = max(1, rate)
+        self._tokens = float(self.rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available. Never waits."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
 
 class ExecutionEngine:
     """Executes pending orders based on market data"""
@@ -39,38 +120,50 @@ class ExecutionEngine:
         # Read rate limits from .env (same as API protection)
         self.order_rate_limit = int(os.getenv("ORDER_RATE_LIMIT", "10 per second").split()[0])
         self.api_rate_limit = int(os.getenv("API_RATE_LIMIT", "50 per second").split()[0])
-        self.batch_delay = 1.0  # 1 second between batches
+        self.order_limiter = OrderRateLimiter(self.order_rate_limit)
+
+        # Incremental state, kept across check_and_execute_pending_orders() cycles
+        # (symbol, exchange) -> TriggerBook of open orders
+        self._books: dict[tuple[str, str], TriggerBook] = {}
+        # orderid -> ((symbol, exchange), price signature) as indexed in the books
+        self._indexed: dict[str, tuple] = {}
+        # (symbol, exchange) -> LTP at the last evaluation
+        self._last_ltp: dict[tuple[str, str], Decimal] = {}
+        # Crossed orders that were over the rate cap; retried next cycle
+        self._deferred: set[str] = set()
 
     def check_and_execute_pending_orders(self):
         """
-        Main execution loop - checks all pending orders and executes if conditions met
-        Respects rate limits through batch processing
+        Main execution loop - checks pending orders and executes if conditions met
+
+        Only orders whose limit/trigger price is crossed by an LTP that moved since
+        the last cycle (or that are new, modified or deferred) reach _process_order.
+        Respects the order rate limit without blocking: orders over the cap are
+        deferred to the next cycle.
         """
         try:
+            # This engine's session lives across cycles; reload orders so price
+            # modifications made by other threads are seen
+            db_session.expire_all()
+
             # Get all pending orders
             pending_orders = SandboxOrders.query.filter_by(order_status="open").all()
 
             if not pending_orders:
                 logger.debug("No pending orders to process")
+                self._books.clear()
+                self._indexed.clear()
+                self._last_ltp.clear()
+                self._deferred.clear()
                 return
 
-            logger.info(f"Processing {len(pending_orders)} pending orders")
+            orders_by_id = {order.orderid: order for order in pending_orders}
+            fresh = self._sync_books(orders_by_id)
 
-            # Group orders by user and symbol for efficient quote fetching
-            orders_by_symbol = {}
-            for order in pending_orders:
-                key = (order.symbol, order.exchange)
-                if key not in orders_by_symbol:
-                    orders_by_symbol[key] = []
-                orders_by_symbol[key].append(order)
-
-            # Fetch quotes using multiquotes (more efficient - single API call)
-            # Falls back to individual quotes if multiquotes fails
-            quote_cache = {}
-            symbols_list = list(orders_by_symbol.keys())
-
-            # Fetch quotes using multiquotes only (no individual quote fallback to avoid rate limiting)
+            # Fetch quotes for every symbol with open orders, across all users, in a
+            # single multiquotes call (no individual quote fallback to avoid rate limiting)
             # WebSocket is the primary data source; multiquotes is the fallback
+            symbols_list = list(self._books)
             quote_cache = self._fetch_quotes_batch(symbols_list)
 
             # Log symbols that couldn't be fetched (don't retry individually to avoid rate limits)
@@ -82,26 +175,92 @@ class ExecutionEngine:
                     f"{len(failed_symbols)} symbols not available via multiquotes, waiting for WebSocket data"
                 )
 
-            # Process orders in batches (respecting order rate limit of 10/second)
             orders_processed = 0
-            for i in range(0, len(pending_orders), self.order_rate_limit):
-                batch = pending_orders[i : i + self.order_rate_limit]
-
-                for order in batch:
-                    quote = quote_cache.get((order.symbol, order.exchange))
-                    if quote:
-                        self._process_order(order, quote)
-                        orders_processed += 1
-
-                # Wait 1 second before next batch if more orders remain
-                if i + self.order_rate_limit < len(pending_orders):
-                    time.sleep(self.batch_delay)
-
-            logger.info(f"Processed {orders_processed} orders")
+            for key, book in list(self._books.items()):
+                quote = quote_cache.get(key)
+                if not quote:
+                    continue
+
+                try:
+                    ltp = quote_price(quote, "ltp")
+                except InvalidOperation:
+                    # A bad quote only skips its own symbol, not the whole cycle
+                    logger.warning(f"Skipping {key[1]}:{key[0]}: invalid LTP {quote.get('ltp')!r}")
+                    continue
+                moved = self._last_ltp.get(key) != ltp
+                self._last_ltp[key] = ltp
+
+                # A non-positive LTP bypasses the price conditions in _process_order
+                candidates = book.crossed(ltp) if ltp > 0 else book.order_ids()
+                if not moved:
+                    # Same LTP as last cycle: only orders not yet evaluated at it
+                    candidates = [o for o in candidates if o in fresh or o in self._deferred]
+
+                for order_id in candidates:
+                    if not self.order_limiter.try_acquire():
+                        self._deferred.add(order_id)
+                        continue
+
+                    self._deferred.discard(order_id)
+                    order = orders_by_id[order_id]
+                    self._process_order(order, quote)
+                    orders_processed += 1
+
+                    if order.order_status != "open":
+                        self._unindex(order_id)
+
+            if orders_processed or self._deferred:
+                logger.info(
+                    f"Processed {orders_processed} of {len(pending_orders)} pending orders"
+                    + (f", {len(self._deferred)} deferred by rate limit" if self._deferred else "")
+                )
 
         except Exception as e:
             logger.exception(f"Error in execution engine: {e}")
 
+    def _sync_books(self, orders_by_id):
+        """
+        Bring the trigger books in line with the current open orders.
+
+        Returns:
+            set: IDs of orders that are new or whose price changed since the last cycle
+        """
+        for order_id in list(self._indexed):
+            if order_id not in orders_by_id:
+                self._unindex(order_id)
+
+        fresh = set()
+        for order_id, order in orders_by_id.items():
+            key = (order.symbol, order.exchange)
+            signature = (order.action, order.price_type, order.price, order.trigger_price)
+            if self._indexed.get(order_id) == (key, signature):
+                continue
+
+            self._unindex(order_id)
+            book = self._books.get(key)
+            if book is None:
+                book = self._books[key] = TriggerBook()
+            book.add(order_id, order.action, order.price_type, order.price, order.trigger_price)
+            self._indexed[order_id] = (key, signature)
+            fresh.add(order_id)
+
+        return fresh
+
+    def _unindex(self, order_id):
+        """Drop an order from the incremental state"""
+        indexed = self._indexed.pop(order_id, None)
+        self._deferred.discard(order_id)
+        if indexed is None:
+            return
+
+        key = indexed[0]
+        book = self._books.get(key)
+        if book is not None:
+            book.remove(order_id)
+            if not book:
+                del self._books[key]
+                self._last_ltp.pop(key, None)
+
     def _fetch_quote(self, symbol, exchange):
         """
         Fetch real-time quote for a symbol using API key
@@ -110,17 +269,12 @@ class ExecutionEngine:
         """
         try:
             # Get any user's API key for fetching quotes
-            from database.auth_db import ApiKeys, decrypt_token
+            api_key = get_quote_api_key()
 
-            api_key_obj = ApiKeys.query.first()
-
-            if not api_key_obj:
+            if not api_key:
                 logger.debug("No API keys found for fetching quotes")
                 return None
 
-            # Decrypt the API key
-            api_key = decrypt_token(api_key_obj.api_key_encrypted)
-
             # Use quotes service with API key authentication
             success, response, status_code = get_quotes(
                 symbol=symbol, exchange=exchange, api_key=api_key
@@ -155,17 +309,12 @@ class ExecutionEngine:
 
         try:
             # Get any user's API key for fetching quotes
-            from database.auth_db import ApiKeys, decrypt_token
-
-            api_key_obj = ApiKeys.query.first()
+            api_key = get_quote_api_key()
 
-            if not api_key_obj:
+            if not api_key:
                 logger.debug("No API keys found for fetching multiquotes")
                 return quote_cache
 
-            # Decrypt the API key
-            api_key = decrypt_token(api_key_obj.api_key_encrypted)
-
             # Prepare symbols list for multiquotes API
             symbols_payload = [
                 {"symbol": symbol, "exchange": exchange} for symbol, exchange in symbols_list
@@ -231,9 +380,9 @@ class ExecutionEngine:
                     )
                 return
 
-            ltp = Decimal(str(quote.get("ltp", 0)))
-            bid = Decimal(str(quote.get("bid", 0)))
-            ask = Decimal(str(quote.get("ask", 0)))
+            ltp = quote_price(quote, "ltp")
+            bid = quote_price(quote, "bid")
+            ask = quote_price(quote, "ask")
 
             if ltp <= 0:
                 if (
@@ -346,7 +495,11 @@ class ExecutionEngine:
             order.pending_quantity = 0
             order.update_timestamp = datetime.now(pytz.timezone("Asia/Kolkata"))
 
-            db_session.commit()
+            # Flush only: the trade, order, position and fund rows of a fill are
+            # committed together by _update_position (one transaction per fill).
+            # If any of them fails, the whole fill is rolled back and the order
+            # is rejected below, so it can't be filled twice.
+            db_session.flush()
 
             # Update position
             self._update_position(order, execution_price)
@@ -456,9 +609,15 @@ class ExecutionEngine:
                     )
 
                     if margin_to_release > 0:
-                        fund_manager.release_margin(
-                            margin_to_release, realized_pnl, f"Position closed: {order.symbol}"
+                        # Part of this fill's transaction, committed below
+                        released, message = fund_manager.release_margin(
+                            margin_to_release,
+                            realized_pnl,
+                            f"Position closed: {order.symbol}",
+                            commit=False,
                         )
+                        if not released:
+                            raise RuntimeError(message)
                         logger.info(
                             f"Released exact margin ₹{margin_to_release} for closed position (from position.margin_blocked)"
                         )
@@ -551,9 +710,15 @@ class ExecutionEngine:
                         margin_to_release = Decimal("0.00")
 
                     if margin_to_release > 0:
-                        fund_manager.release_margin(
-                            margin_to_release, realized_pnl, f"Position reduced: {order.symbol}"
+                        # Part of this fill's transaction, committed below
+                        released, message = fund_manager.release_margin(
+                            margin_to_release,
+                            realized_pnl,
+                            f"Position reduced: {order.symbol}",
+                            commit=False,
                         )
+                        if not released:
+                            raise RuntimeError(message)
                         logger.info(
                             f"Released proportional margin ₹{margin_to_release} for reduced position ({reduction_proportion * 100:.1f}% of ₹{current_margin})"
                         )
@@ -648,10 +813,24 @@ class ExecutionEngine:
         return f"TRADE-{timestamp}-{unique_id}"
 
 
+# Global instance so the trigger books and LTP snapshot carry over between cycles
+_execution_engine: ExecutionEngine | None = None
+_execution_engine_lock = threading.Lock()
+
+
+def get_execution_engine() -> ExecutionEngine:
+    """Get or create the singleton polling execution engine instance"""
+    global _execution_engine
+
+    with _execution_engine_lock:
+        if _execution_engine is None:
+            _execution_engine = ExecutionEngine()
+        return _execution_engine
+
+
 def run_execution_engine_once():
     """Run one cycle of the execution engine"""
-    engine = ExecutionEngine()
-    engine.check_and_execute_pending_orders()
+    get_execution_engine().check_and_execute_pending_orders()
 
 
 if __name__ == "__main__":
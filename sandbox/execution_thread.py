@@ -40,10 +40,10 @@ class ExecutionEngineThread(threading.Thread):
 
     def run(self):
         """Main thread loop"""
-        from sandbox.execution_engine import ExecutionEngine
+        from sandbox.execution_engine import get_execution_engine
 
         logger.debug("Sandbox Execution Engine thread started")
-        engine = ExecutionEngine()
+        engine = get_execution_engine()
 
         while not self.stop_event.is_set():
             try:
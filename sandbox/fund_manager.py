@@ -224,8 +224,13 @@ class FundManager:
             logger.exception(f"Error checking margin for user {self.user_id}: {e}")
             return False, f"Error checking margin: {str(e)}"
 
-    def block_margin(self, amount, description=""):
-        """Block margin for a trade"""
+    def block_margin(self, amount, description="", commit=True):
+        """
+        Block margin for a trade
+
+        With commit=False the change is left in the caller's transaction (the
+        caller commits or rolls back), and errors don't roll the session back.
+        """
         with self._lock:
             try:
                 funds = SandboxFunds.query.filter_by(user_id=self.user_id).first()
@@ -245,18 +250,25 @@ class FundManager:
                 funds.available_balance -= amount
                 funds.used_margin += amount
 
-                db_session.commit()
+                if commit:
+                    db_session.commit()
 
                 logger.info(f"Blocked ₹{amount} margin for user {self.user_id}. {description}")
                 return True, f"Margin blocked: ₹{amount}"
 
             except Exception as e:
-                db_session.rollback()
+                if commit:
+                    db_session.rollback()
                 logger.exception(f"Error blocking margin for user {self.user_id}: {e}")
                 return False, f"Error blocking margin: {str(e)}"
 
-    def release_margin(self, amount, realized_pnl=0, description=""):
-        """Release blocked margin and update P&L"""
+    def release_margin(self, amount, realized_pnl=0, description="", commit=True):
+        """
+        Release blocked margin and update P&L
+
+        With commit=False the change is left in the caller's transaction (the
+        caller commits or rolls back), and errors don't roll the session back.
+        """
         with self._lock:
             try:
                 funds = SandboxFunds.query.filter_by(user_id=self.user_id).first()
@@ -280,7 +292,8 @@ class FundManager:
                 ) + realized_pnl
                 funds.total_pnl = funds.realized_pnl + funds.unrealized_pnl
 
-                db_session.commit()
+                if commit:
+                    db_session.commit()
 
                 logger.info(
                     f"Released ₹{amount} margin for user {self.user_id}. Realized P&L: ₹{realized_pnl}. {description}"
@@ -288,7 +301,8 @@ class FundManager:
                 return True, f"Margin released: ₹{amount}, P&L: ₹{realized_pnl}"
 
             except Exception as e:
-                db_session.rollback()
+                if commit:
+                    db_session.rollback()
                 logger.exception(f"Error releasing margin for user {self.user_id}: {e}")
                 return False, f"Error releasing margin: {str(e)}"
 
@@ -363,6 +377,10 @@ class FundManager:
 
                 unrealized_pnl = Decimal(str(unrealized_pnl))
 
+                # Skip the write when MTM hasn't moved (e.g. no open positions)
+                if funds.unrealized_pnl == unrealized_pnl.quantize(Decimal("0.01")):
+                    return True, "Unrealized P&L unchanged"
+
                 funds.unrealized_pnl = unrealized_pnl
                 funds.total_pnl = funds.realized_pnl + funds.unrealized_pnl
 
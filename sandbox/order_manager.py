@@ -629,6 +629,19 @@ class OrderManager:
 
             logger.info(f"Order modified: {orderid}")
 
+            # Re-sort the order in the WebSocket execution engine's trigger book
+            try:
+                from sandbox.websocket_execution_engine import (
+                    get_websocket_execution_engine,
+                    is_websocket_execution_engine_running,
+                )
+
+                if is_websocket_execution_engine_running():
+                    engine = get_websocket_execution_engine()
+                    engine.notify_order_modified(order)
+            except Exception as e:
+                logger.debug(f"WebSocket execution engine notification skipped: {e}")
+
             return (
                 True,
                 {
@@ -769,6 +782,21 @@ class OrderManager:
 
             logger.info(f"Order cancelled: {orderid}")
 
+            # Drop the order from the WebSocket execution engine's trigger book
+            try:
+                from sandbox.websocket_execution_engine import (
+                    get_websocket_execution_engine,
+                    is_websocket_execution_engine_running,
+                )
+
+                if is_websocket_execution_engine_running():
+                    engine = get_websocket_execution_engine()
+                    engine.notify_order_completed(
+                        orderid, f"{order.exchange}:{order.symbol}", order.user_id
+                    )
+            except Exception as e:
+                logger.debug(f"WebSocket execution engine notification skipped: {e}")
+
             return (
                 True,
                 {
@@ -8,15 +8,23 @@ Features:
 - Position netting (same symbol/exchange/product)
 - Open position retrieval with live P&L
 - Background MTM updates (configurable interval)
+- Write-behind MTM: live P&L is served from memory and persisted at most
+  once per mtm_update_interval per user
+- Batched MTM: all of a user's positions are marked in one numpy pass using
+  integer prices (paise, or 0.0001 rupee on the currency exchanges where the
+  tick is 0.0025), and only rows whose values changed are written
 """
 
 import os
 import sys
+import threading
 import time
 from datetime import datetime
 from decimal import Decimal
 
+import numpy as np
 import pytz
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -33,6 +41,63 @@ logger = get_logger(__name__)
 # Maximum age (seconds) for WebSocket data to be considered fresh
 WEBSOCKET_DATA_MAX_AGE = 5
 
+# pnl_percent is stored with 4 decimals: units of 0.0001%
+PNL_PERCENT_SCALE = 10_000
+
+# Prices are marked in paise, except on exchanges that tick below a paise
+# (currency derivatives: 0.0025), which are marked in 0.0001 rupee
+PRICE_SCALE = 100
+FINE_PRICE_SCALE = 10_000
+FINE_TICK_EXCHANGES = ("CDS", "BCD")
+
+
+def price_scale(exchange) -> int:
+    """Integer price units per rupee used to mark positions on an exchange"""
+    return FINE_PRICE_SCALE if exchange in FINE_TICK_EXCHANGES else PRICE_SCALE
+
+
+def to_price_units(values, scale=PRICE_SCALE) -> np.ndarray:
+    """
+    Convert rupee amounts (Decimal, float or None) to int64 price units.
+
+    Args:
+        values: Rupee amounts
+        scale: Units per rupee, a scalar or one per value (100 = paise)
+
+    Returns:
+        int64 array; None becomes -1
+    """
+    values = list(values)
+    missing = np.array([v is None for v in values], dtype=bool)
+    rupees = np.array([0.0 if v is None else float(v) for v in values], dtype=np.float64)
+    return np.where(missing, -1, np.rint(rupees * scale)).astype(np.int64)
+
+
+def calculate_mtm(quantity, average, ltp):
+    """
+    Unrealized P&L of many positions in integer arithmetic.
+
+    Longs gain when LTP rises above the average price and shorts when it
+    falls below, so P&L is (ltp - avg) * quantity for both. The percentage is
+    relative to the average price and rounded half away from zero.
+
+    Args:
+        quantity: int64 array of net quantities (negative for short)
+        average: int64 array of average prices in price units
+        ltp: int64 array of LTPs in the same units
+
+    Returns:
+        tuple: (pnl in price units, pnl_percent in units of 0.0001%) as int64 arrays
+    """
+    move = ltp - average
+    pnl = move * quantity
+
+    numerator = move * np.sign(quantity) * (100 * PNL_PERCENT_SCALE)
+    has_average = average > 0
+    denominator = np.where(has_average, average, 1)
+    percent = np.sign(numerator) * ((2 * np.abs(numerator) + denominator) // (2 * denominator))
+    return pnl, np.where(has_average, percent, 0)
+
 
 def parse_expiry_from_symbol(symbol, exchange):
     """
@@ -169,6 +234,10 @@ def get_contract_expiry(symbol, exchange):
 class PositionManager:
     """Manages positions and MTM calculations"""
 
+    # Last time each user's MTM was written to the database (monotonic seconds)
+    _mtm_persisted_at: dict[str, float] = {}
+    _mtm_lock = threading.Lock()
+
     def __init__(self, user_id):
         self.user_id = user_id
         self.fund_manager = FundManager(user_id)
@@ -444,8 +513,7 @@ class PositionManager:
             # This handles NRML positions where the contract has expired
             positions = self._check_and_close_expired_positions(positions)
 
-            if update_mtm:
-                self._update_positions_mtm(positions)
+            mtm_persisted = self._update_positions_mtm(positions) if update_mtm else False
 
             positions_list = []
             total_unrealized_pnl = Decimal("0.00")  # Only from open positions
@@ -503,7 +571,8 @@ class PositionManager:
 
             # Update fund unrealized P&L (only from open positions)
             # Closed position P&L is already in realized_pnl, so don't include it here
-            if update_mtm:
+            # Written on the same write-behind schedule as the position MTM
+            if mtm_persisted:
                 self.fund_manager.update_unrealized_pnl(total_unrealized_pnl)
 
             return (
@@ -562,14 +631,114 @@ class PositionManager:
             logger.exception(f"Error getting position for {symbol}: {e}")
             return None
 
+    def _claim_mtm_write(self):
+        """
+        Decide whether this MTM refresh should be written to the database.
+
+        MTM is recomputed from live quotes on every read, so intermediate values
+        only need to live in memory. They are persisted at most once per
+        mtm_update_interval seconds per user (0 = write every refresh).
+        """
+        try:
+            interval = float(get_config("mtm_update_interval", "5"))
+        except (TypeError, ValueError):
+            interval = 5.0
+
+        now = time.monotonic()
+        with self._mtm_lock:
+            last = self._mtm_persisted_at.get(self.user_id)
+            if interval > 0 and last is not None and now - last < interval:
+                return False
+            self._mtm_persisted_at[self.user_id] = now
+            return True
+
+    def _apply_mtm(self, position, values, persist):
+        """
+        Set ltp, pnl and pnl_percent on a position.
+
+        When not persisting, the values are set as already-committed so the
+        position isn't marked dirty (a later unrelated commit would otherwise
+        write them and bump updated_at). When persisting, the attributes are
+        flagged modified so an unchanged in-memory value is still written.
+        """
+        for key, value in values.items():
+            if persist:
+                setattr(position, key, value)
+                flag_modified(position, key)
+            else:
+                set_committed_value(position, key, value)
+
+    def _mark_to_market(self, positions, ltps, persist):
+        """
+        Mark open positions to market in one vectorized pass.
+
+        Args:
+            positions: Open SandboxPositions (quantity != 0)
+            ltps: LTP per position (float, NaN or <= 0 where unavailable)
+            persist: Whether this refresh is written to the database
+
+        Returns:
+            int: Number of positions written
+        """
+        scale = np.array([price_scale(p.exchange) for p in positions], dtype=np.int64)
+        ltp_units = np.rint(np.nan_to_num(np.asarray(ltps, dtype=np.float64), nan=0.0) * scale).astype(np.int64)
+        priced = np.flatnonzero(ltp_units > 0)
+        if not len(priced):
+            return 0
+
+        positions = [positions[i] for i in priced]
+        scale = scale[priced]
+        ltp_units = ltp_units[priced]
+        quantity = np.array([p.quantity for p in positions], dtype=np.int64)
+        average_units = to_price_units((p.average_price for p in positions), scale)
+        # pnl = unrealized only (broker standard - Zerodha Kite style)
+        pnl, pnl_percent = calculate_mtm(quantity, average_units, ltp_units)
+
+        changed = np.zeros(len(positions), dtype=bool)
+        if persist:
+            # Compare against what is in the table, not the in-memory values,
+            # which may hold unpersisted MTM from earlier refreshes
+            stored = dict(
+                (row[0], row[1:])
+                for row in db_session.query(
+                    SandboxPositions.id,
+                    SandboxPositions.ltp,
+                    SandboxPositions.pnl,
+                    SandboxPositions.pnl_percent,
+                ).filter(SandboxPositions.id.in_([p.id for p in positions]))
+            )
+            rows = [stored.get(p.id, (None, None, None)) for p in positions]
+            stored_percent = np.array(
+                [-1 if r[2] is None else round(float(r[2]) * PNL_PERCENT_SCALE) for r in rows], dtype=np.int64
+            )
+            # ltp and pnl are stored (and read back) in paise
+            changed = (
+                (to_price_units(r[0] for r in rows) != np.rint(ltp_units * PRICE_SCALE / scale))
+                | (to_price_units(r[1] for r in rows) != np.rint(pnl * PRICE_SCALE / scale))
+                | (stored_percent != pnl_percent)
+            )
+
+        digits = np.rint(np.log10(scale)).astype(int)
+        for i, position in enumerate(positions):
+            values = {
+                "ltp": Decimal(int(ltp_units[i])).scaleb(-int(digits[i])),
+                "pnl": Decimal(int(pnl[i])).scaleb(-int(digits[i])),
+                "pnl_percent": Decimal(int(pnl_percent[i])).scaleb(-4),
+            }
+            self._apply_mtm(position, values, bool(changed[i]))
+        return int(changed.sum())
+
     def _update_positions_mtm(self, positions):
         """
         Update MTM for all positions with live quotes.
         Uses WebSocket data first, falls back to multiquotes API if WebSocket data is stale.
+
+        Returns:
+            bool: True if the refreshed MTM was written to the database
         """
         try:
             if not positions:
-                return
+                return self._claim_mtm_write()
 
             # Get unique symbols
             symbols_to_fetch = set()
@@ -578,7 +747,7 @@ class PositionManager:
                     symbols_to_fetch.add((position.symbol, position.exchange))
 
             if not symbols_to_fetch:
-                return
+                return self._claim_mtm_write()
 
             symbols_list = list(symbols_to_fetch)
 
@@ -608,37 +777,27 @@ class PositionManager:
             else:
                 logger.debug(f"Positions MTM: All {ws_count} symbols from WebSocket (no API calls)")
 
-            # Update MTM for each position
-            for position in positions:
-                # Skip MTM update for closed positions (quantity = 0)
-                # They already have today's realized P&L stored in position.pnl
-                if position.quantity == 0:
-                    continue
+            persist = self._claim_mtm_write()
 
+            # Skip MTM update for closed positions (quantity = 0)
+            # They already have today's realized P&L stored in position.pnl
+            open_positions = [p for p in positions if p.quantity != 0]
+            ltps = []
+            for position in open_positions:
                 quote = quote_cache.get((position.symbol, position.exchange))
-                if quote:
-                    ltp = Decimal(str(quote.get("ltp", 0)))
-                    if ltp > 0:
-                        position.ltp = ltp
-
-                        # Calculate current unrealized P&L for open position
-                        current_unrealized_pnl = self._calculate_position_pnl(
-                            position.quantity, position.average_price, ltp
-                        )
+                ltps.append(float(quote.get("ltp") or 0) if quote else 0.0)
 
-                        # pnl = unrealized only (broker standard - Zerodha Kite style)
-                        # This is the primary P&L field for open positions
-                        position.pnl = current_unrealized_pnl
+            written = self._mark_to_market(open_positions, ltps, persist)
 
-                        position.pnl_percent = self._calculate_pnl_percent(
-                            position.average_price, ltp, position.quantity
-                        )
-
-            db_session.commit()
+            if persist:
+                logger.debug(f"Positions MTM: wrote {written} of {len(open_positions)} open positions")
+                db_session.commit()
+            return persist
 
         except Exception as e:
             db_session.rollback()
             logger.exception(f"Error updating positions MTM: {e}")
+            return False
 
     def _update_single_position_mtm(self, position):
         """
@@ -659,70 +818,16 @@ class PositionManager:
             if not quote:
                 quote = self._fetch_quote(position.symbol, position.exchange)
 
-            if quote:
-                ltp = Decimal(str(quote.get("ltp", 0)))
-                if ltp > 0:
-                    position.ltp = ltp
-
-                    # Calculate current unrealized P&L for open position
-                    current_unrealized_pnl = self._calculate_position_pnl(
-                        position.quantity, position.average_price, ltp
-                    )
-
-                    # pnl = unrealized only (broker standard - Zerodha Kite style)
-                    position.pnl = current_unrealized_pnl
-
-                    position.pnl_percent = self._calculate_pnl_percent(
-                        position.average_price, ltp, position.quantity
-                    )
-                    db_session.commit()
+            if quote and (quote.get("ltp") or 0) > 0:
+                # Served from memory only: persisting is left to the full MTM pass,
+                # which also writes the fund's unrealized P&L, so a single-symbol
+                # read must not take its write-behind slot
+                self._mark_to_market([position], [float(quote["ltp"])], persist=False)
 
         except Exception as e:
             db_session.rollback()
             logger.exception(f"Error updating position MTM for {position.symbol}: {e}")
 
-    def _calculate_position_pnl(self, quantity, avg_price, ltp):
-        """Calculate P&L for a position"""
-        try:
-            quantity = Decimal(str(quantity))
-            avg_price = Decimal(str(avg_price))
-            ltp = Decimal(str(ltp))
-
-            if quantity > 0:
-                # Long position
-                pnl = (ltp - avg_price) * quantity
-            else:
-                # Short position
-                pnl = (avg_price - ltp) * abs(quantity)
-
-            return pnl
-
-        except Exception as e:
-            logger.exception(f"Error calculating position P&L: {e}")
-            return Decimal("0.00")
-
-    def _calculate_pnl_percent(self, avg_price, ltp, quantity):
-        """Calculate P&L percentage"""
-        try:
-            avg_price = Decimal(str(avg_price))
-            ltp = Decimal(str(ltp))
-
-            if avg_price <= 0:
-                return Decimal("0.00")
-
-            if quantity > 0:
-                # Long position
-                pnl_percent = ((ltp - avg_price) / avg_price) * Decimal("100")
-            else:
-                # Short position
-                pnl_percent = ((avg_price - ltp) / avg_price) * Decimal("100")
-
-            return pnl_percent
-
-        except Exception as e:
-            logger.exception(f"Error calculating P&L percent: {e}")
-            return Decimal("0.00")
-
     def _fetch_quotes_from_websocket(self, symbols_list):
         """
         Fetch LTP from WebSocket (MarketDataService) for multiple symbols.
@@ -735,27 +840,15 @@ class PositionManager:
             return quote_cache
 
         try:
-            market_data_service = get_market_data_service()
-            current_time = time.time()
-
-            for symbol, exchange in symbols_list:
-                # Get all cached data from MarketDataService
-                data = market_data_service.get_all_data(symbol, exchange)
-
-                if data:
-                    # Check if data is fresh using last_update timestamp
-                    last_update = data.get("last_update", 0)
-                    age = current_time - last_update
-
-                    if age <= WEBSOCKET_DATA_MAX_AGE:
-                        # Get LTP from the ltp sub-dict
-                        ltp_data = data.get("ltp", {})
-                        ltp = ltp_data.get("value") if isinstance(ltp_data, dict) else None
+            # One gather from the MarketDataService snapshot; stale rows come back as NaN
+            ltps = get_market_data_service().get_multiple_ltp_values(
+                [{"symbol": symbol, "exchange": exchange} for symbol, exchange in symbols_list],
+                max_age=WEBSOCKET_DATA_MAX_AGE,
+            )
 
-                        if ltp and ltp > 0:
-                            quote_cache[(symbol, exchange)] = {"ltp": ltp}
-                    else:
-                        logger.debug(f"WebSocket data stale for {symbol} (age: {age:.1f}s)")
+            for key, ltp in zip(symbols_list, ltps.tolist()):
+                if ltp > 0:
+                    quote_cache[key] = {"ltp": ltp}
 
             return quote_cache
 
@@ -0,0 +1,140 @@
+# sandbox/trigger_book.py
+"""
+Trigger Price Book - In-memory index of resting sandbox orders for one symbol
+
+Orders are kept in two lists sorted by the price at which they become
+executable, so a tick only has to look at the orders it actually crosses:
+
+- Orders that fire when LTP falls to their level (LIMIT BUY at price,
+  SL/SL-M SELL at trigger) - crossed orders form the tail of the list
+- Orders that fire when LTP rises to their level (LIMIT SELL at price,
+  SL/SL-M BUY at trigger) - crossed orders form the head of the list
+
+MARKET orders, and orders without a usable level, are returned on every tick.
+The crossing rules mirror ExecutionEngine._process_order, which remains the
+authority on whether (and at what price) an order fills.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+from itertools import count
+
+# Sorts after any sequence number, so bisect_right includes every entry at a level
+_LAST = float("inf")
+
+
+def _to_decimal(value) -> Decimal | None:
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class TriggerBook:
+    """
+    Resting orders for a single symbol, sorted by limit/trigger price per side.
+
+    Not thread-safe: the owning engine serializes access with its own lock.
+    """
+
+    def __init__(self):
+        # Entries are (level, seq, order_id); seq keeps ties in placement order
+        self._falling: list[tuple[Decimal, int, str]] = []
+        self._rising: list[tuple[Decimal, int, str]] = []
+        self._always: dict[str, None] = {}
+        # order_id -> (side list or None, entry, SL limit band)
+        self._orders: dict[str, tuple] = {}
+        self._seq = count()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._orders
+
+    def add(self, order_id: str, action: str, price_type: str, price=None, trigger_price=None):
+        """
+        Add (or re-price) a resting order.
+
+        Args:
+            order_id: Sandbox order ID
+            action: BUY or SELL
+            price_type: MARKET, LIMIT, SL or SL-M
+            price: Limit price (LIMIT and SL orders)
+            trigger_price: Trigger price (SL and SL-M orders)
+        """
+        self.remove(order_id)
+
+        price = _to_decimal(price)
+        trigger_price = _to_decimal(trigger_price)
+        buy = action == "BUY"
+
+        level = None
+        band = None
+        if price_type == "LIMIT":
+            level = price
+        elif price_type in ("SL", "SL-M"):
+            level = trigger_price
+            if price_type == "SL":
+                if price is None:
+                    level = None
+                else:
+                    # SL BUY fills only while LTP <= price, SL SELL only while LTP >= price
+                    band = (buy, price)
+
+        if level is None:
+            self._always[order_id] = None
+            self._orders[order_id] = (None, None, None)
+            return
+
+        # LIMIT BUY and SL SELL fire on the way down; LIMIT SELL and SL BUY on the way up
+        falling = buy if price_type == "LIMIT" else not buy
+        side = self._falling if falling else self._rising
+        entry = (level, next(self._seq), order_id)
+        insort(side, entry)
+        self._orders[order_id] = (side, entry, band)
+
+    def remove(self, order_id: str) -> bool:
+        """Remove an order. Returns True if it was in the book."""
+        indexed = self._orders.pop(order_id, None)
+        if indexed is None:
+            return False
+
+        side, entry, _ = indexed
+        if side is None:
+            self._always.pop(order_id, None)
+        else:
+            index = bisect_left(side, entry)
+            if index < len(side) and side[index] == entry:
+                del side[index]
+        return True
+
+    def crossed(self, ltp) -> list[str]:
+        """
+        Order IDs whose price conditions are met at this LTP.
+
+        Args:
+            ltp: Last traded price
+
+        Returns:
+            list: Order IDs to hand to the execution engine
+        """
+        ltp = _to_decimal(ltp)
+        candidates = list(self._always)
+        candidates.extend(entry[2] for entry in self._falling[bisect_left(self._falling, (ltp,)) :])
+        candidates.extend(entry[2] for entry in self._rising[: bisect_right(self._rising, (ltp, _LAST))])
+
+        order_ids = []
+        for order_id in candidates:
+            band = self._orders[order_id][2]
+            if band is not None:
+                buy, limit = band
+                if (buy and ltp > limit) or (not buy and ltp < limit):
+                    continue
+            order_ids.append(order_id)
+        return order_ids
+
+    def order_ids(self) -> list[str]:
+        """All order IDs in the book."""
+        return list(self._orders)
@@ -6,7 +6,9 @@ Features:
 - Real-time order execution using WebSocket market data
 - Subscribes to MarketDataService for LTP updates
 - Immediate execution when price conditions are met (sub-second latency)
+- Per-symbol trigger price books, so a tick only loads the orders it crosses
 - Automatic fallback to polling engine if WebSocket data is stale
+  (incremental checks every SANDBOX_FALLBACK_INTERVAL seconds, default 1)
 - Thread-safe order index management
 """
 
@@ -21,6 +23,7 @@ from typing import Dict, List, Optional, Set
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.sandbox_db import SandboxOrders, db_session
+from sandbox.trigger_book import TriggerBook
 from services.market_data_service import get_market_data_service
 from services.websocket_service import subscribe_to_symbols, unsubscribe_from_symbols
 from utils.logging import get_logger
@@ -40,9 +43,9 @@ class WebSocketExecutionEngine:
         self._running = False
         self._lock = threading.Lock()
 
-        # Index of pending orders by symbol key (exchange:symbol)
-        # Maps symbol_key -> list of order IDs
-        self._pending_orders_index: dict[str, list[str]] = {}
+        # Resting orders by symbol key (exchange:symbol), sorted by limit/trigger price
+        # Maps symbol_key -> TriggerBook
+        self._order_books: dict[str, TriggerBook] = {}
 
         # Track symbols we're monitoring
         self._monitored_symbols: set[str] = set()
@@ -54,13 +57,17 @@ class WebSocketExecutionEngine:
         # Fallback settings
         self.fallback_enabled = os.getenv("SANDBOX_ENGINE_FALLBACK", "true").lower() == "true"
         self.stale_data_threshold = 30  # seconds
+        # Fallback cycles are incremental, so they can poll far more often than
+        # order_check_interval; each cycle costs one multiquotes call
+        self.fallback_interval = float(os.getenv("SANDBOX_FALLBACK_INTERVAL", "1"))
         self._fallback_thread: threading.Thread | None = None
         self._fallback_running = False
 
-        # Import execution engine for order processing and fallback
-        from sandbox.execution_engine import ExecutionEngine
+        # Order processing and fallback go through the process-wide polling engine,
+        # so they share its order rate limit
+        from sandbox.execution_engine import get_execution_engine
 
-        self._execution_engine = ExecutionEngine()
+        self._execution_engine = get_execution_engine()
 
     def start(self):
         """Start the WebSocket execution engine"""
@@ -119,7 +126,7 @@ class WebSocketExecutionEngine:
         subscriptions_to_add: dict[str, list[tuple[str, str]]] = {}
 
         with self._lock:
-            self._pending_orders_index.clear()
+            self._order_books.clear()
             self._monitored_symbols.clear()
             self._user_symbol_refcounts.clear()
 
@@ -128,10 +135,7 @@ class WebSocketExecutionEngine:
 
                 for order in pending_orders:
                     symbol_key = f"{order.exchange}:{order.symbol}"
-                    if symbol_key not in self._pending_orders_index:
-                        self._pending_orders_index[symbol_key] = []
-                    self._pending_orders_index[symbol_key].append(order.orderid)
-                    self._monitored_symbols.add(symbol_key)
+                    self._add_to_book(symbol_key, order)
                     self._increment_user_symbol_refcount(order.user_id, symbol_key)
 
                 logger.debug(
@@ -162,13 +166,13 @@ class WebSocketExecutionEngine:
         subscribe_symbol = None
 
         with self._lock:
-            if symbol_key not in self._pending_orders_index:
-                self._pending_orders_index[symbol_key] = []
+            book = self._order_books.get(symbol_key)
+            if book is not None and order.orderid in book:
+                # Already indexed (e.g. by a rebuild racing with placement)
+                return
 
-            if order.orderid not in self._pending_orders_index[symbol_key]:
-                self._pending_orders_index[symbol_key].append(order.orderid)
-                self._monitored_symbols.add(symbol_key)
-                logger.debug(f"Added order {order.orderid} to index for {symbol_key}")
+            self._add_to_book(symbol_key, order)
+            logger.debug(f"Added order {order.orderid} to index for {symbol_key}")
 
             # Increment refcount and decide if we need to subscribe
             if self._increment_user_symbol_refcount(order.user_id, symbol_key):
@@ -179,27 +183,41 @@ class WebSocketExecutionEngine:
             exchange, symbol = subscribe_symbol.split(":", 1)
             self._subscribe_ws_symbols(subscribe_user, [(symbol, exchange)])
 
+    def notify_order_modified(self, order):
+        """Called when an open order's price or trigger price changes to re-sort it"""
+        symbol_key = f"{order.exchange}:{order.symbol}"
+
+        with self._lock:
+            book = self._order_books.get(symbol_key)
+            if book is None or order.orderid not in book:
+                return
+
+            book.add(order.orderid, order.action, order.price_type, order.price, order.trigger_price)
+            logger.debug(f"Re-indexed modified order {order.orderid} for {symbol_key}")
+
     def notify_order_completed(self, order_id: str, symbol_key: str, user_id: str | None = None):
         """Called when an order is completed/cancelled to update the index"""
         unsubscribe_user = None
         unsubscribe_symbol = None
 
         with self._lock:
-            if symbol_key and symbol_key in self._pending_orders_index:
-                if order_id in self._pending_orders_index[symbol_key]:
-                    self._pending_orders_index[symbol_key].remove(order_id)
+            book = self._order_books.get(symbol_key) if symbol_key else None
+            if book is not None:
+                removed = book.remove(order_id)
+                if removed:
                     logger.debug(f"Removed order {order_id} from index for {symbol_key}")
 
                 # Clean up empty symbol entries
-                if not self._pending_orders_index[symbol_key]:
-                    del self._pending_orders_index[symbol_key]
+                if not book:
+                    del self._order_books[symbol_key]
                     self._monitored_symbols.discard(symbol_key)
             else:
-                # Fallback: remove order_id from any symbol list
-                self._remove_order_from_index(order_id)
+                # Fallback: remove order_id from any symbol book
+                removed = self._remove_order_from_index(order_id)
 
-            # Decrement refcount and decide if we should unsubscribe
-            if user_id and symbol_key:
+            # Decrement refcount and decide if we should unsubscribe. Only orders that
+            # were still indexed hold a ref, so repeated notifications are harmless.
+            if removed and user_id and symbol_key:
                 if self._decrement_user_symbol_refcount(user_id, symbol_key):
                     unsubscribe_user = user_id
                     unsubscribe_symbol = symbol_key
@@ -227,14 +245,15 @@ class WebSocketExecutionEngine:
 
             symbol_key = f"{exchange}:{symbol}"
 
-            # Check if we have pending orders for this symbol
+            # Only orders whose limit/trigger price this LTP crosses need a DB round-trip
             with self._lock:
-                order_ids = self._pending_orders_index.get(symbol_key, []).copy()
+                book = self._order_books.get(symbol_key)
+                order_ids = book.crossed(Decimal(str(ltp))) if book is not None else []
 
             if not order_ids:
                 return
 
-            # Process each pending order for this symbol
+            # Process each crossed order for this symbol
             for order_id in order_ids:
                 try:
                     self._check_and_execute_order(order_id, Decimal(str(ltp)))
@@ -319,23 +338,24 @@ class WebSocketExecutionEngine:
         self._fallback_running = True
 
         def fallback_loop():
-            from database.sandbox_db import get_config
-            from sandbox.execution_engine import run_execution_engine_once
-
-            check_interval = int(get_config("order_check_interval", "5"))
-            logger.debug(f"Fallback polling started with {check_interval}s interval")
+            logger.debug(f"Fallback polling started with {self.fallback_interval}s interval")
 
+            # Reuse one engine so its trigger books and last-seen LTPs carry over
+            # between cycles and only moved symbols are re-checked
             while self._fallback_running and self._running:
+                started = time.monotonic()
                 try:
-                    run_execution_engine_once()
+                    self._execution_engine.check_and_execute_pending_orders()
                 except Exception as e:
                     logger.exception(f"Error in fallback polling: {e}")
 
                 # Sleep in small increments for quick shutdown
-                for _ in range(check_interval):
-                    if not self._fallback_running or not self._running:
+                deadline = started + self.fallback_interval
+                while self._fallback_running and self._running:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
                         break
-                    time.sleep(1)
+                    time.sleep(min(remaining, 0.25))
 
             logger.debug("Fallback polling stopped")
 
@@ -380,18 +400,29 @@ class WebSocketExecutionEngine:
         self._user_symbol_refcounts[user_id][symbol_key] = current - 1
         return False
 
-    def _remove_order_from_index(self, order_id: str):
-        """Remove order_id from all symbol buckets (fallback cleanup)."""
+    def _add_to_book(self, symbol_key: str, order):
+        """Index an open order in its symbol's trigger book. Caller holds the lock."""
+        book = self._order_books.get(symbol_key)
+        if book is None:
+            book = self._order_books[symbol_key] = TriggerBook()
+
+        book.add(order.orderid, order.action, order.price_type, order.price, order.trigger_price)
+        self._monitored_symbols.add(symbol_key)
+
+    def _remove_order_from_index(self, order_id: str) -> bool:
+        """Remove order_id from all symbol books (fallback cleanup). Returns True if found."""
+        removed = False
         to_cleanup = []
-        for symbol_key, order_ids in self._pending_orders_index.items():
-            if order_id in order_ids:
-                order_ids.remove(order_id)
+        for symbol_key, book in self._order_books.items():
+            if book.remove(order_id):
+                removed = True
                 logger.debug(f"Removed order {order_id} from index for {symbol_key} (fallback)")
-                if not order_ids:
+                if not book:
                     to_cleanup.append(symbol_key)
         for symbol_key in to_cleanup:
-            del self._pending_orders_index[symbol_key]
+            del self._order_books[symbol_key]
             self._monitored_symbols.discard(symbol_key)
+        return removed
 
     def _subscribe_ws_symbols(self, user_id: str, symbols: list[tuple[str, str]]):
         """Subscribe to LTP via WebSocket for the given user and symbols."""
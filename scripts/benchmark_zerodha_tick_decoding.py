@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Zerodha Tick Decoder Benchmark
+
+Measures ticks/second for the current Zerodha binary tick decoder
+(broker/zerodha/streaming/zerodha_websocket.py) and for the reference copy of
+the previous slice-and-unpack decoder kept in test/test_zerodha_tick_decoding.py.
+
+Usage:
+    python scripts/benchmark_zerodha_tick_decoding.py [capture_file] [--repeat N]
+
+Without a capture file the frames are synthetic. A capture file holds raw
+websocket binary messages, each prefixed with its length as a 4 byte
+big-endian integer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import struct
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "test"))
+
+from test_zerodha_tick_decoding import (  # noqa: E402
+    legacy_parse_binary_message,
+    make_client,
+    synthetic_frames,
+)
+
+logger = logging.getLogger("benchmark_zerodha_tick_decoding")
+
+
+def load_capture(path: str) -> list[bytes]:
+    """Read length-prefixed binary messages from a capture file"""
+    frames = []
+    with open(path, "rb") as capture:
+        while header := capture.read(4):
+            frames.append(capture.read(struct.unpack(">I", header)[0]))
+    return frames
+
+
+def benchmark(frames: list[bytes], repeat: int = 5) -> dict[str, float]:
+    """
+    Decode all frames with the legacy and the current decoder.
+
+    Args:
+        frames: Binary websocket messages
+        repeat: Runs per decoder; the fastest one is reported
+
+    Returns:
+        dict: Ticks/second per decoder
+    """
+    client = make_client()
+    total_ticks = sum(len(client._parse_binary_message(frame)) for frame in frames)
+
+    results = {}
+    for label, decode in (
+        ("legacy", lambda frame: legacy_parse_binary_message(client, frame)),
+        ("current", client._parse_binary_message),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for frame in frames:
+                decode(frame)
+            best = min(best, time.perf_counter() - started)
+        results[label] = total_ticks / best
+        logger.info(f"{label:>8}: {total_ticks / best:,.0f} ticks/sec ({total_ticks} ticks in {best * 1000:.1f} ms)")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Zerodha binary tick decoder")
+    parser.add_argument("capture", nargs="?", help="Capture file of length-prefixed binary messages")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per decoder (fastest is reported)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    benchmark(load_capture(args.capture) if args.capture else synthetic_frames(), repeat=args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
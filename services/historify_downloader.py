@@ -0,0 +1,443 @@
+# services/historify_downloader.py
+"""
+Concurrent, Rate-Aware Historify Downloader
+
+Download jobs used to fetch one symbol at a time with a random 1-3 second
+sleep between symbols, regardless of what the broker allows. This module
+schedules the broker requests instead:
+
+- A token bucket per broker caps the request rate. It is shared by all jobs
+  in the process, so concurrent jobs cannot exceed the broker limit together.
+- Each download is split into date-range chunks, fetched in parallel by a
+  pool of workers and merged back into one frame per symbol.
+- A rate limit response (HTTP 429 or a "too many requests" error) halves the
+  bucket rate and retries the chunk after a backoff; the rate recovers
+  gradually on success.
+
+Pause and cancellation are checked before every request, so they take effect
+without waiting for in-flight symbols to finish.
+
+Configuration:
+    HISTORIFY_RATE_LIMIT: Broker history requests per second (default: 3)
+    HISTORIFY_RATE_LIMIT_<BROKER>: Per-broker override, e.g. HISTORIFY_RATE_LIMIT_ZERODHA
+    HISTORIFY_DOWNLOAD_WORKERS: Concurrent fetch workers per job (default: 4)
+    HISTORIFY_CHUNK_DAYS_1M: Days per request for 1m data (default: 30)
+    HISTORIFY_CHUNK_DAYS_D: Days per request for daily data (default: 3650)
+    HISTORIFY_MAX_RETRIES: Retries per chunk after rate limiting (default: 5)
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+import pandas as pd
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_RATE_LIMIT = 3.0
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_CHUNK_DAYS = {"1m": 30, "D": 3650}
+DEFAULT_MAX_RETRIES = 5
+
+# Adaptive slowdown: rate is multiplied by this on a 429 and never drops below
+# MIN_RATE_FRACTION of the configured rate; each success adds back RECOVERY_STEP
+THROTTLE_FACTOR = 0.5
+MIN_RATE_FRACTION = 0.1
+RECOVERY_STEP = 0.05
+BACKOFF_SECONDS = 2.0
+
+RATE_LIMIT_PATTERN = re.compile(r"\b429\b|too many requests|rate limit", re.IGNORECASE)
+
+
+def _get_positive_rate(name: str, default: float) -> float:
+    """Read a requests-per-second setting, falling back to default unless it is a positive number"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = 0.0
+    if not math.isfinite(rate) or rate <= 0:
+        logger.warning(f"Ignoring {name}={value!r}: must be a positive number of requests per second")
+        return default
+    return rate
+
+
+def get_rate_limit(broker: str | None = None) -> float:
+    """Get requests per second for a broker from config"""
+    rate = _get_positive_rate("HISTORIFY_RATE_LIMIT", DEFAULT_RATE_LIMIT)
+    if broker:
+        return _get_positive_rate(f"HISTORIFY_RATE_LIMIT_{broker.upper()}", rate)
+    return rate
+
+
+def get_download_workers() -> int:
+    """Get number of concurrent fetch workers per job from config"""
+    return max(1, int(os.getenv("HISTORIFY_DOWNLOAD_WORKERS", DEFAULT_DOWNLOAD_WORKERS)))
+
+
+def get_chunk_days(interval: str) -> int:
+    """Get days per request for an interval from config"""
+    default = DEFAULT_CHUNK_DAYS.get(interval, DEFAULT_CHUNK_DAYS["D"])
+    return max(1, int(os.getenv(f"HISTORIFY_CHUNK_DAYS_{interval.upper()}", default)))
+
+
+def get_max_retries() -> int:
+    """Get retries per chunk after rate limiting from config"""
+    return int(os.getenv("HISTORIFY_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+
+def split_date_range(start_date: str, end_date: str, chunk_days: int) -> list[tuple[str, str]]:
+    """
+    Split an inclusive YYYY-MM-DD range into consecutive non-overlapping chunks.
+
+    Args:
+        start_date: First day
+        end_date: Last day
+        chunk_days: Maximum days per chunk
+
+    Returns:
+        List of (start_date, end_date) tuples in chronological order
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, start + timedelta(days=chunk_days - 1))
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def is_rate_limited(response: dict[str, Any], status_code: int) -> bool:
+    """Check whether a failed history response was caused by broker rate limiting"""
+    return status_code == 429 or bool(RATE_LIMIT_PATTERN.search(str(response.get("message", ""))))
+
+
+def history_response_to_frame(response: dict[str, Any]) -> pd.DataFrame | None:
+    """
+    Convert a history service response to a DataFrame with a timestamp column.
+
+    Returns:
+        DataFrame (empty if there is no data), or None if the data has no timestamp
+    """
+    data = response.get("data", [])
+    if not data:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(data)
+    if "time" in df.columns:
+        df["timestamp"] = df["time"]
+    elif "timestamp" not in df.columns:
+        return None
+    return df
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with adaptive rate.
+
+    throttle() cuts the rate and blocks new requests for a backoff period;
+    record_success() restores the rate step by step up to the configured one.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        """
+        Initialize the bucket (starts full)
+
+        Args:
+            rate: Tokens per second
+            burst: Bucket capacity (defaults to one second of tokens, at least 1)
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """
+        Take one token, waiting for it if necessary
+
+        Args:
+            timeout: Give up after this many seconds (None waits indefinitely)
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.acquired += 1
+                    self.wait_seconds += now - started
+                    return True
+                delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def throttle(self, backoff: float = BACKOFF_SECONDS) -> None:
+        """Slow down after a rate limit response"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate * THROTTLE_FACTOR)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + backoff)
+            self.throttled += 1
+        logger.warning(f"Broker rate limit hit, history request rate reduced to {self.rate:.2f}/s")
+
+    def record_success(self) -> None:
+        """Recover rate gradually after successful requests"""
+        if self.rate >= self.base_rate:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get rate and throttling metrics"""
+        return {
+            "rate": round(self.rate, 3),
+            "base_rate": self.base_rate,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+# One bucket per broker, shared by all jobs in the process
+_rate_limiters: dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(broker: str | None) -> TokenBucket:
+    """Get the shared token bucket for a broker"""
+    key = (broker or "default").lower()
+    with _rate_limiters_lock:
+        bucket = _rate_limiters.get(key)
+        if bucket is None:
+            bucket = TokenBucket(get_rate_limit(broker))
+            _rate_limiters[key] = bucket
+        return bucket
+
+
+def get_rate_limiter_stats() -> dict[str, dict[str, Any]]:
+    """Get token bucket metrics for every broker seen so far"""
+    with _rate_limiters_lock:
+        return {broker: bucket.get_stats() for broker, bucket in _rate_limiters.items()}
+
+
+class DownloadCancelled(Exception):
+    """Raised inside a worker when the job was cancelled"""
+
+
+@dataclass
+class SymbolDownload:
+    """Chunks of one job item and their merged result"""
+
+    key: Any
+    symbol: str
+    exchange: str
+    interval: str
+    remaining: int = 0
+    frames: list[pd.DataFrame] = field(default_factory=list)
+    error: str | None = None
+    cancelled: bool = False
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Merged data of all chunks, sorted and de-duplicated by timestamp"""
+        frames = [frame for frame in self.frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        merged = pd.concat(frames, ignore_index=True)
+        return (
+            merged.drop_duplicates(subset="timestamp", keep="last")
+            .sort_values("timestamp")
+            .reset_index(drop=True)
+        )
+
+
+class ChunkedDownloader:
+    """
+    Fetches symbols as parallel date-range chunks through a shared token bucket.
+
+    submit() queues all chunks of one symbol; completed() returns symbols whose
+    chunks have all finished. Results are handed back to the calling thread,
+    so database writes and progress events stay on the job thread.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str, str, str, str], tuple[bool, dict[str, Any], int]],
+        limiter: TokenBucket,
+        workers: int | None = None,
+        wait_if_paused: Callable[[], bool] | None = None,
+        max_retries: int | None = None,
+        name: str = "historify-download",
+    ):
+        """
+        Initialize the downloader
+
+        Args:
+            fetch: fetch(symbol, exchange, interval, start_date, end_date) returning
+                   (success, response, status_code) like history_service.get_history
+            limiter: Token bucket gating every request
+            workers: Concurrent fetch workers (defaults to HISTORIFY_DOWNLOAD_WORKERS)
+            wait_if_paused: Blocks while the job is paused; returns False if it was cancelled
+            max_retries: Retries per chunk after rate limiting (defaults to HISTORIFY_MAX_RETRIES)
+            name: Worker thread name prefix
+        """
+        self.fetch = fetch
+        self.limiter = limiter
+        self.workers = workers or get_download_workers()
+        self.wait_if_paused = wait_if_paused or (lambda: True)
+        self.max_retries = get_max_retries() if max_retries is None else max_retries
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._futures: dict[Future, SymbolDownload] = {}
+        self._ready: list[SymbolDownload] = []
+
+        # Metrics (incremented by the worker threads)
+        self.requests = 0
+        self.retries = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted symbols not yet returned by completed()"""
+        return len({id(download) for download in self._futures.values()}) + len(self._ready)
+
+    def submit(
+        self, key: Any, symbol: str, exchange: str, interval: str, ranges: list[tuple[str, str]]
+    ) -> SymbolDownload:
+        """
+        Queue a symbol for download
+
+        Args:
+            key: Caller identifier returned with the result (e.g. the job item)
+            symbol: Trading symbol
+            exchange: Exchange code
+            interval: Storage interval (1m or D)
+            ranges: Inclusive (start_date, end_date) ranges to fetch
+
+        Returns:
+            SymbolDownload that completed() will return once all chunks finish
+        """
+        download = SymbolDownload(key, symbol, exchange, interval)
+        chunk_days = get_chunk_days(interval)
+        chunks = [
+            chunk for start, end in ranges for chunk in split_date_range(start, end, chunk_days)
+        ]
+        download.remaining = len(chunks)
+        if not chunks:
+            self._ready.append(download)
+        for start, end in chunks:
+            future = self._executor.submit(self._fetch_chunk, download, start, end)
+            self._futures[future] = download
+        return download
+
+    def _fetch_chunk(self, download: SymbolDownload, start: str, end: str) -> pd.DataFrame:
+        """Fetch one chunk, retrying with backoff while the broker rate limits"""
+        for attempt in range(self.max_retries + 1):
+            if download.error is not None or not self.wait_if_paused():
+                raise DownloadCancelled()
+            self.limiter.acquire()
+            with self._stats_lock:
+                self.requests += 1
+
+            success, response, status_code = self.fetch(
+                download.symbol, download.exchange, download.interval, start, end
+            )
+            if success:
+                self.limiter.record_success()
+                frame = history_response_to_frame(response)
+                if frame is None:
+                    raise ValueError("No timestamp column in data")
+                return frame
+
+            if not is_rate_limited(response, status_code) or attempt == self.max_retries:
+                raise RuntimeError(response.get("message", "Unknown error"))
+
+            with self._stats_lock:
+                self.retries += 1
+            self.limiter.throttle(BACKOFF_SECONDS * (attempt + 1))
+            logger.debug(
+                f"Rate limited on {download.symbol} {start}..{end}, retry {attempt + 1}/{self.max_retries}"
+            )
+
+    def completed(self, timeout: float | None = None) -> list[SymbolDownload]:
+        """
+        Wait for chunks to finish and return symbols that are now complete
+
+        Args:
+            timeout: Maximum seconds to wait for at least one chunk
+
+        Returns:
+            Finished SymbolDownloads; check .error and .frame
+        """
+        finished, self._ready = self._ready, []
+        if not self._futures or finished:
+            timeout = 0
+
+        done, _ = wait(list(self._futures), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            download = self._futures.pop(future)
+            try:
+                download.frames.append(future.result())
+            except DownloadCancelled:
+                download.cancelled = True
+            except Exception as e:
+                # First error wins; the symbol's other chunks stop early
+                if download.error is None:
+                    download.error = str(e)
+            download.remaining -= 1
+            if download.remaining == 0:
+                finished.append(download)
+        return finished
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping chunks that have not started"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._futures.clear()
+        self._ready.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get request and retry counters"""
+        with self._stats_lock:
+            requests, retries = self.requests, self.retries
+        return {
+            "workers": self.workers,
+            "requests": requests,
+            "retries": retries,
+            "in_flight": self.in_flight,
+        }
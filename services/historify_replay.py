@@ -0,0 +1,451 @@
+# services/historify_replay.py
+"""
+Historify Market Replay
+
+Replays a past session from the Historify DuckDB store onto the ZeroMQ market
+data bus, the same way a live broker adapter publishes. The WebSocket proxy,
+MarketDataService and everything behind them (sandbox execution engine,
+position MTM, strategies) treat the replayed feed as live ticks. This gives
+end-to-end load tests outside market hours and accelerated sandbox runs
+against past sessions.
+
+- Reads the 1m bars of one trading day for a set of symbols. Historify stores
+  1m and daily bars, not ticks, so each bar is published either once at its
+  close ("bars") or as four synthetic ticks ("ticks"): open, then low and high
+  (high and low for a falling bar), then close.
+- Topics use the adapters' EXCHANGE_SYMBOL_MODE format and go through
+  SharedZmqPublisher, so ZMQ_WIRE_FORMAT applies as usual.
+- Tick timestamps are derived from the bar timestamps, never from the wall
+  clock, so two replays of a session publish identical messages.
+- speed=1 replays in real time, speed=N N times faster and speed=0 as fast as
+  possible. At full speed the publisher's high-water mark drops whatever the
+  proxy cannot keep up with, so compare the counters here with the proxy's.
+- Counters: messages, errors (messages the publisher did not send), throughput,
+  publish latency and schedule lag (how late each tick went out against its
+  paced send time).
+
+Usage:
+    python -m services.historify_replay 2025-01-15 NSE:RELIANCE NFO:NIFTY30JAN25FUT --speed 10
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from database.historify_db import get_ohlcv
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+BAR_SECONDS = 60
+
+# Seconds into a 1m bar at which the synthetic ticks are stamped:
+# open, first extreme, second extreme, close
+TICK_OFFSETS = (0, 15, 30, 59)
+
+REPLAY_MODES = ("ticks", "bars")
+PUBLISH_MODES = ("LTP", "QUOTE")
+
+
+def session_bounds(day: date) -> tuple[int, int]:
+    """Epoch seconds of the first and last second of a trading day (IST)"""
+    start = int(datetime.combine(day, dt_time.min, tzinfo=IST).timestamp())
+    return start, start + 86400 - 1
+
+
+def build_events(
+    bars: dict[tuple[str, str], pd.DataFrame], replay_mode: str = "ticks"
+) -> dict[str, np.ndarray]:
+    """
+    Turn per-symbol 1m bars into one time-ordered event stream.
+
+    Events are ordered by timestamp, then by the order of `bars`, so the
+    stream is identical for identical input.
+
+    Args:
+        bars: {(symbol, exchange): DataFrame with timestamp, open, high, low, close, volume}
+        replay_mode: "ticks" for four ticks per bar, "bars" for one tick at the bar close
+
+    Returns:
+        dict: Arrays timestamp (ms), instrument (index into bars), price, volume (per event)
+    """
+    if replay_mode not in REPLAY_MODES:
+        raise ValueError(f"replay_mode must be one of {REPLAY_MODES}")
+
+    parts = []
+    for instrument, df in enumerate(bars.values()):
+        if df is None or df.empty:
+            continue
+
+        ts = df["timestamp"].to_numpy(dtype=np.int64)
+        o = df["open"].to_numpy(dtype=np.float64)
+        h = df["high"].to_numpy(dtype=np.float64)
+        lo = df["low"].to_numpy(dtype=np.float64)
+        c = df["close"].to_numpy(dtype=np.float64)
+        v = df["volume"].to_numpy(dtype=np.int64)
+
+        if replay_mode == "bars":
+            offsets = np.array(TICK_OFFSETS[-1:], dtype=np.int64)
+            prices = c[:, None]
+            volumes = v[:, None]
+        else:
+            offsets = np.array(TICK_OFFSETS, dtype=np.int64)
+            rising = c >= o
+            first = np.where(rising, lo, h)
+            second = np.where(rising, h, lo)
+            prices = np.column_stack((o, first, second, c))
+            quarter = v // 4
+            volumes = np.column_stack((quarter, quarter, quarter, v - 3 * quarter))
+
+        stamps = (ts[:, None] + offsets[None, :]) * 1000
+        parts.append(
+            (
+                stamps.ravel(),
+                np.full(stamps.size, instrument, dtype=np.int64),
+                prices.ravel(),
+                volumes.ravel(),
+            )
+        )
+
+    if not parts:
+        empty = np.array([], dtype=np.int64)
+        return {"timestamp": empty, "instrument": empty, "price": np.array([]), "volume": empty}
+
+    timestamp, instrument, price, volume = (np.concatenate(arrays) for arrays in zip(*parts))
+    order = np.lexsort((instrument, timestamp))
+    return {
+        "timestamp": timestamp[order],
+        "instrument": instrument[order],
+        "price": price[order],
+        "volume": volume[order],
+    }
+
+
+def _percentiles(samples: list[float], scale: float) -> dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    values = np.asarray(samples) * scale
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"p50": round(float(p50), 3), "p99": round(float(p99), 3), "max": round(float(values.max()), 3)}
+
+
+@dataclass
+class ReplayStats:
+    """Throughput and latency counters of one replay run"""
+
+    events: int = 0
+    messages: int = 0
+    errors: int = 0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    replayed_seconds: float = 0.0
+    publish_seconds: list[float] = field(default_factory=list)
+    lag_seconds: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        """Counters as a JSON-friendly dict"""
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at if self.started_at else 0.0
+        return {
+            "events": self.events,
+            "messages": self.messages,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(self.messages / elapsed, 1) if elapsed > 0 else 0.0,
+            "replayed_seconds": self.replayed_seconds,
+            "effective_speed": round(self.replayed_seconds / elapsed, 2) if elapsed > 0 else 0.0,
+            "publish_latency_us": _percentiles(self.publish_seconds, 1e6),
+            "schedule_lag_ms": _percentiles(self.lag_seconds, 1e3),
+        }
+
+
+class HistorifyReplay:
+    """
+    Publishes a past session from Historify to the market data bus.
+
+    Usage:
+        replay = HistorifyReplay([("RELIANCE", "NSE")], date(2025, 1, 15), speed=10)
+        replay.load()
+        stats = replay.run()
+    """
+
+    def __init__(
+        self,
+        symbols: list[tuple[str, str]],
+        day: date,
+        speed: float = 1.0,
+        replay_mode: str = "ticks",
+        publish_modes: tuple[str, ...] = ("LTP",),
+        publisher=None,
+    ):
+        """
+        Args:
+            symbols: (symbol, exchange) pairs to replay
+            day: Trading day to replay
+            speed: 1 for real time, N for N times faster, 0 for as fast as possible
+            replay_mode: "ticks" (four ticks per 1m bar) or "bars" (one tick per bar)
+            publish_modes: Topics to publish per tick, any of LTP and QUOTE
+            publisher: Object with publish(topic, data) returning False when the message
+                was not sent; defaults to the SharedZmqPublisher, bound to ZMQ_PORT
+        """
+        if replay_mode not in REPLAY_MODES:
+            raise ValueError(f"replay_mode must be one of {REPLAY_MODES}")
+        unknown = set(publish_modes) - set(PUBLISH_MODES)
+        if unknown or not publish_modes:
+            raise ValueError(f"publish_modes must be a non-empty subset of {PUBLISH_MODES}")
+        if speed < 0:
+            raise ValueError("speed must be >= 0")
+
+        self.symbols = [(symbol.upper(), exchange.upper()) for symbol, exchange in symbols]
+        self.day = day
+        self.speed = speed
+        self.replay_mode = replay_mode
+        self.publish_modes = tuple(publish_modes)
+        self.publisher = publisher
+        self.events: dict[str, np.ndarray] | None = None
+        self.stats = ReplayStats()
+        self._stop_event = threading.Event()
+        self._clock_origin: tuple[float, int] | None = None
+
+    def load(self) -> int:
+        """
+        Read the day's 1m bars for every symbol and build the event stream.
+
+        Returns:
+            int: Number of events to replay
+        """
+        start, end = session_bounds(self.day)
+        bars = {}
+        for symbol, exchange in self.symbols:
+            df = get_ohlcv(symbol, exchange, "1m", start, end)
+            if df is None or df.empty:
+                logger.warning(f"Replay: no 1m data for {exchange}:{symbol} on {self.day}")
+            bars[(symbol, exchange)] = df
+
+        self.events = build_events(bars, self.replay_mode)
+        logger.info(
+            f"Replay: loaded {len(self.events['timestamp'])} events for {len(self.symbols)} symbols on {self.day}"
+        )
+        return len(self.events["timestamp"])
+
+    def expected_wall_time(self, timestamp_ms: int) -> float | None:
+        """
+        Wall-clock time (epoch seconds) at which a tick is due to be published.
+
+        Subscribers can subtract this from their receive time to measure
+        end-to-end latency of a paced run. None before the run starts or when
+        replaying as fast as possible.
+        """
+        if self._clock_origin is None or not self.speed:
+            return None
+        wall_start, first_ts = self._clock_origin
+        return wall_start + (timestamp_ms - first_ts) / 1000 / self.speed
+
+    def stop(self):
+        """Stop a running replay after the current tick"""
+        self._stop_event.set()
+
+    def run(self) -> dict[str, Any]:
+        """
+        Publish the loaded session, pacing by speed. Blocks until done or stopped.
+
+        Returns:
+            dict: ReplayStats summary
+
+        Raises:
+            RuntimeError: If the default publisher can't bind to ZMQ_PORT
+        """
+        if self.events is None:
+            self.load()
+        if self.publisher is None:
+            from websocket_proxy.connection_manager import SharedZmqPublisher
+
+            publisher = SharedZmqPublisher()
+            bind_publisher(publisher)
+            self.publisher = publisher
+
+        timestamps = self.events["timestamp"]
+        instruments = self.events["instrument"]
+        prices = self.events["price"]
+        volumes = self.events["volume"]
+
+        topics = [
+            {mode: f"{exchange}_{symbol}_{mode}" for mode in self.publish_modes}
+            for symbol, exchange in self.symbols
+        ]
+        quote_mode = "QUOTE" in self.publish_modes
+        ltp_mode = "LTP" in self.publish_modes
+        # Running session open/high/low/volume per instrument for QUOTE ticks
+        session = [None] * len(self.symbols)
+
+        stats = self.stats = ReplayStats()
+        self._stop_event.clear()
+        publish = self.publisher.publish
+        paced = self.speed > 0
+        perf_counter = time.perf_counter
+
+        if len(timestamps):
+            first_ts = int(timestamps[0])
+            stats.replayed_seconds = (int(timestamps[-1]) - first_ts) / 1000
+        else:
+            first_ts = 0
+        stats.started_at = perf_counter()
+        self._clock_origin = (time.time(), first_ts)
+
+        for i in range(len(timestamps)):
+            if self._stop_event.is_set():
+                break
+
+            ts = int(timestamps[i])
+            if paced:
+                due = stats.started_at + (ts - first_ts) / 1000 / self.speed
+                delay = due - perf_counter()
+                if delay > 0:
+                    if self._stop_event.wait(delay):
+                        break
+                else:
+                    stats.lag_seconds.append(-delay)
+
+            index = int(instruments[i])
+            symbol, exchange = self.symbols[index]
+            ltp = float(prices[i])
+            stats.events += 1
+
+            messages = []
+            if ltp_mode:
+                messages.append(
+                    (
+                        topics[index]["LTP"],
+                        {"symbol": symbol, "exchange": exchange, "mode": "ltp", "ltp": ltp, "timestamp": ts},
+                    )
+                )
+            if quote_mode:
+                state = session[index]
+                if state is None:
+                    state = session[index] = [ltp, ltp, ltp, 0]
+                state[1] = max(state[1], ltp)
+                state[2] = min(state[2], ltp)
+                state[3] += int(volumes[i])
+                messages.append(
+                    (
+                        topics[index]["QUOTE"],
+                        {
+                            "symbol": symbol,
+                            "exchange": exchange,
+                            "mode": "quote",
+                            "ltp": ltp,
+                            "open": state[0],
+                            "high": state[1],
+                            "low": state[2],
+                            "volume": state[3],
+                            "ltt": ts,
+                            "timestamp": ts,
+                        },
+                    )
+                )
+
+            for topic, data in messages:
+                sent = perf_counter()
+                try:
+                    if publish(topic, data) is False:
+                        stats.errors += 1
+                    else:
+                        stats.messages += 1
+                except Exception as e:
+                    stats.errors += 1
+                    logger.debug(f"Replay publish failed for {topic}: {e}")
+                stats.publish_seconds.append(perf_counter() - sent)
+
+        stats.finished_at = perf_counter()
+        summary = stats.summary()
+        logger.info(
+            f"Replay finished: {summary['messages']} messages in {summary['elapsed_seconds']}s "
+            f"({summary['messages_per_second']}/s, {summary['effective_speed']}x)"
+        )
+        return summary
+
+
+def bind_publisher(publisher) -> int:
+    """
+    Bind a SharedZmqPublisher to ZMQ_PORT, where the WebSocket proxy listens.
+
+    SharedZmqPublisher falls back to another port when ZMQ_PORT is busy. A
+    replay published there would never reach the proxy, so that is an error.
+
+    Returns:
+        int: The bound port
+
+    Raises:
+        RuntimeError: If the publisher ended up on a different port
+    """
+    requested_port = int(os.getenv("ZMQ_PORT", "5555"))
+    port = publisher.bind(requested_port)
+    if port != requested_port:
+        raise RuntimeError(
+            f"ZMQ port {requested_port} is busy and the publisher is bound to {port}, "
+            "which the WebSocket proxy doesn't listen on"
+        )
+    return port
+
+
+def _parse_symbols(values: list[str]) -> list[tuple[str, str]]:
+    symbols = []
+    for value in values:
+        exchange, _, symbol = value.partition(":")
+        if not symbol:
+            raise ValueError(f"Expected EXCHANGE:SYMBOL, got {value!r}")
+        symbols.append((symbol, exchange))
+    return symbols
+
+
+def main() -> int:
+    """Replay a Historify session onto the ZMQ bus the WebSocket proxy listens on"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Replay a Historify session onto the market data bus")
+    parser.add_argument("date", type=date.fromisoformat, help="Trading day, YYYY-MM-DD")
+    parser.add_argument("symbols", nargs="+", help="EXCHANGE:SYMBOL pairs")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N x, 0 = max")
+    parser.add_argument("--replay-mode", choices=REPLAY_MODES, default="ticks")
+    parser.add_argument("--publish-modes", default="LTP", help="Comma-separated: LTP,QUOTE")
+    args = parser.parse_args()
+
+    from websocket_proxy.connection_manager import SharedZmqPublisher
+
+    publisher = SharedZmqPublisher()
+    try:
+        bind_publisher(publisher)
+    except RuntimeError as e:
+        logger.error(f"Replay not started: {e}")
+        publisher.cleanup()
+        return 1
+    # Give subscribers time to (re)connect before the first tick
+    time.sleep(1)
+
+    replay = HistorifyReplay(
+        _parse_symbols(args.symbols),
+        args.date,
+        speed=args.speed,
+        replay_mode=args.replay_mode,
+        publish_modes=tuple(mode.strip().upper() for mode in args.publish_modes.split(",")),
+        publisher=publisher,
+    )
+    try:
+        logger.info(f"Replay summary: {json.dumps(replay.run(), indent=2)}")
+    except KeyboardInterrupt:
+        replay.stop()
+    finally:
+        publisher.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
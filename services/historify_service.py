@@ -20,6 +20,7 @@ from database.historify_db import (
     COMPUTED_INTERVALS,
     STORAGE_INTERVALS,
     SUPPORTED_EXCHANGES,
+    bulk_upsert_market_data,
     delete_market_data,
     export_to_dataframe,
     get_data_range,
@@ -39,9 +40,15 @@ from database.historify_db import remove_from_watchlist as db_remove_from_watchl
 from database.historify_db import bulk_remove_from_watchlist as db_bulk_remove_from_watchlist
 from database.historify_db import bulk_delete_market_data as db_bulk_delete_market_data
 from database.token_db_enhanced import get_symbol_info
-from services.history_service import get_history
+from services.historify_downloader import (
+    ChunkedDownloader,
+    get_rate_limiter,
+    history_response_to_frame,
+)
+from services.history_service import get_history, get_history_with_auth
 from services.intervals_service import get_intervals
 from utils.logging import get_logger
+from utils.response_format import format_table
 
 logger = get_logger(__name__)
 
@@ -283,7 +290,13 @@ def bulk_add_to_watchlist(symbols: list[dict[str, str]]) -> tuple[bool, dict[str
 
 
 def download_data(
-    symbol: str, exchange: str, interval: str, start_date: str, end_date: str, api_key: str
+    symbol: str,
+    exchange: str,
+    interval: str,
+    start_date: str,
+    end_date: str,
+    api_key: str,
+    pending: list | None = None,
 ) -> tuple[bool, dict[str, Any], int]:
     """
     Download historical data for a symbol and store in DuckDB.
@@ -298,6 +311,8 @@ def download_data(
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
         api_key: OpenAlgo API key
+        pending: If given, the downloaded frame is appended as (df, symbol, exchange,
+                 interval) for a later bulk_upsert_market_data instead of stored now
 
     Returns:
         Tuple of (success, response_data, status_code)
@@ -317,7 +332,7 @@ def download_data(
 
         logger.info(f"Downloading {symbol}:{exchange}:{interval} from {start_date} to {end_date}")
 
-        # Fetch data from broker via history_service
+        # Fetch data from broker via history_service (bypassing the Historify cache)
         success, response, status_code = get_history(
             symbol=symbol,
             exchange=exchange,
@@ -325,13 +340,17 @@ def download_data(
             start_date=start_date,
             end_date=end_date,
             api_key=api_key,
+            read_through=False,
         )
 
         if not success:
             return False, response, status_code
 
-        data = response.get("data", [])
-        if not data:
+        # Convert to DataFrame with a normalized timestamp column
+        df = history_response_to_frame(response)
+        if df is None:
+            return False, {"status": "error", "message": "No timestamp column in data"}, 500
+        if df.empty:
             return (
                 True,
                 {
@@ -342,17 +361,12 @@ def download_data(
                 200,
             )
 
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-
-        # Normalize timestamp column
-        if "time" in df.columns:
-            df["timestamp"] = df["time"]
-        elif "timestamp" not in df.columns:
-            return False, {"status": "error", "message": "No timestamp column in data"}, 500
-
-        # Store in DuckDB
-        records = upsert_market_data(df, symbol, exchange, interval)
+        # Store in DuckDB, or leave it to the caller's single bulk transaction
+        if pending is not None:
+            pending.append((df, symbol, exchange, interval))
+            records = len(df)
+        else:
+            records = upsert_market_data(df, symbol, exchange, interval)
 
         logger.info(f"Downloaded and stored {records} records for {symbol}:{exchange}:{interval}")
 
@@ -397,6 +411,8 @@ def download_watchlist_data(
             return False, {"status": "error", "message": "Watchlist is empty"}, 400
 
         results = []
+        # Frames are committed together in one transaction after all downloads
+        pending = []
         for item in watchlist:
             symbol = item["symbol"]
             exchange = item["exchange"]
@@ -408,6 +424,7 @@ def download_watchlist_data(
                 start_date=start_date,
                 end_date=end_date,
                 api_key=api_key,
+                pending=pending,
             )
 
             results.append(
@@ -420,6 +437,14 @@ def download_watchlist_data(
                 }
             )
 
+        try:
+            bulk_upsert_market_data(pending)
+        except Exception as e:
+            # Nothing was stored: report every downloaded symbol as failed
+            for result in results:
+                if result["success"] and result["records"]:
+                    result.update({"success": False, "records": 0, "error": str(e)})
+
         total_records = sum(r["records"] for r in results if r["success"])
         successful = sum(1 for r in results if r["success"])
 
@@ -449,7 +474,12 @@ def download_watchlist_data(
 
 
 def get_chart_data(
-    symbol: str, exchange: str, interval: str, start_date: str = None, end_date: str = None
+    symbol: str,
+    exchange: str,
+    interval: str,
+    start_date: str = None,
+    end_date: str = None,
+    response_format: str = "json",
 ) -> tuple[bool, dict[str, Any], int]:
     """
     Get OHLCV data for charting.
@@ -460,6 +490,7 @@ def get_chart_data(
         interval: Time interval
         start_date: Start date in YYYY-MM-DD format (optional)
         end_date: End date in YYYY-MM-DD format (optional)
+        response_format: Format of the data (see utils.response_format)
 
     Returns:
         Tuple of (success, response_data, status_code)
@@ -491,9 +522,6 @@ def get_chart_data(
                 200,
             )
 
-        # Convert to list of dicts for JSON response
-        data = df.to_dict("records")
-
         return (
             True,
             {
@@ -501,8 +529,8 @@ def get_chart_data(
                 "symbol": symbol.upper(),
                 "exchange": exchange.upper(),
                 "interval": interval,
-                "data": data,
-                "count": len(data),
+                "data": format_table(df, response_format),
+                "count": len(df),
             },
             200,
         )
@@ -1293,10 +1321,9 @@ def get_option_chain_symbols(
 # Download Job Operations
 # =============================================================================
 
-import random
 import threading
-import time
 import uuid
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
 # Job executor pool - shared across all job operations
@@ -1429,9 +1456,12 @@ def _process_download_job(job_id: str, api_key: str):
     """
     Background job processor with Socket.IO progress updates.
 
-    This runs in a separate thread and downloads data for each symbol.
+    This runs in a separate thread and schedules the downloads through a
+    ChunkedDownloader (see historify_downloader), while database updates and
+    progress events stay on this thread.
     Features:
-    - Random delay (1-3 seconds) between downloads to avoid rate limits
+    - Concurrent downloads split into date-range chunks, paced by a per-broker
+      token bucket that slows down on rate limit errors
     - Pause/resume support via threading.Event
     - Checkpoint support - resumes from pending items
     - Incremental download - only fetches data after last available timestamp
@@ -1479,10 +1509,19 @@ def _process_download_job(job_id: str, api_key: str):
                 config = {}
 
         incremental = config.get("incremental", False)
+        interval = job["interval"]
 
-        # Get delay settings from environment (min and max seconds)
-        delay_min = float(os.getenv("HISTORIFY_DELAY_MIN", "1"))
-        delay_max = float(os.getenv("HISTORIFY_DELAY_MAX", "3"))
+        # Resolve broker credentials once; requests are paced by the broker's token bucket
+        auth_token, feed_token, broker = get_auth_token_broker(api_key, include_feed_token=True)
+        if auth_token is None:
+            update_job_status(job_id, "failed", "Invalid openalgo apikey")
+            _cleanup_job(job_id)
+            return
+
+        def fetch(symbol, exchange, interval, start_date, end_date):
+            return get_history_with_auth(
+                auth_token, feed_token, broker, symbol, exchange, interval, start_date, end_date
+            )
 
         # Count already completed items
         already_completed = sum(1 for item in items if item["status"] == "success")
@@ -1493,186 +1532,214 @@ def _process_download_job(job_id: str, api_key: str):
         total_items = len(items)
         processed_count = already_completed + already_failed
 
-        for item in pending_items:
-            # Check for cancellation with thread-safe access
-            with _job_state_lock:
-                is_cancelled = not _running_jobs.get(job_id, False)
-                pause_event = _paused_jobs.get(job_id)
+        # Scheduled refreshes buffer downloaded frames and commit them in bulk
+        # transactions instead of one commit per symbol
+        pending_frames = [] if job.get("job_type") == "scheduled" else None
+        deferred_items = []  # (item_id, records) waiting for the bulk commit
+        bulk_size = int(os.getenv("HISTORIFY_BULK_UPSERT_SIZE", "50"))
 
-            if is_cancelled:
-                logger.info(f"Job {job_id} cancelled")
-                update_job_status(job_id, "cancelled")
-                _cleanup_job(job_id)
+        def flush_pending():
+            """Commit buffered frames and settle the items waiting on them"""
+            nonlocal completed, failed
+            if pending_frames is None or not (pending_frames or deferred_items):
                 return
-
-            # Check for pause - wait if paused
-            if pause_event:
-                while not pause_event.is_set():
-                    # Emit paused status
-                    _emit_job_paused(job_id, processed_count, total_items)
-                    # Wait for resume signal (check every 1 second)
-                    pause_event.wait(timeout=1.0)
-                    # Check for cancellation while paused (with lock)
-                    with _job_state_lock:
-                        is_cancelled = not _running_jobs.get(job_id, False)
-                    if is_cancelled:
-                        logger.info(f"Job {job_id} cancelled while paused")
-                        update_job_status(job_id, "cancelled")
-                        _cleanup_job(job_id)
-                        return
-
-            # Update item status
-            update_job_item_status(item["id"], "downloading")
-
-            processed_count += 1
-            # Emit progress via Socket.IO
-            _emit_progress(job_id, processed_count, total_items, item["symbol"])
-
             try:
-                # Determine date ranges - use incremental if enabled
-                requested_start = job["start_date"]
-                requested_end = job["end_date"]
-                total_records = 0
-                download_error = None
-
-                if incremental:
-                    # Check existing data range for this symbol
-                    data_range = get_data_range(item["symbol"], item["exchange"], job["interval"])
-
-                    if (
-                        data_range
-                        and data_range.get("first_timestamp")
-                        and data_range.get("last_timestamp")
-                    ):
-                        first_ts = data_range["first_timestamp"]
-                        last_ts = data_range["last_timestamp"]
-                        first_datetime = datetime.fromtimestamp(first_ts)
-                        last_datetime = datetime.fromtimestamp(last_ts)
-
-                        requested_start_dt = datetime.strptime(requested_start, "%Y-%m-%d")
-                        requested_end_dt = datetime.strptime(requested_end, "%Y-%m-%d")
-
-                        # Determine what needs to be downloaded:
-                        # 1. Data BEFORE existing data (if requested_start < first_timestamp)
-                        # 2. Data AFTER existing data (if requested_end > last_timestamp)
-
-                        need_before = requested_start_dt.date() < first_datetime.date()
-                        need_after = requested_end_dt.date() > last_datetime.date()
-
-                        # For 1m data, be more precise about timing
-                        if job["interval"] == "1m":
-                            need_after = requested_end_dt.date() >= last_datetime.date()
-
-                        if not need_before and not need_after:
-                            # Data already covers the requested range
-                            update_job_item_status(
-                                item["id"], "skipped", 0, "Data already covers requested range"
-                            )
-                            logger.info(
-                                f"Skipping {item['symbol']} - data already covers requested range"
-                            )
-                            continue
-
-                        # Download data BEFORE existing range if needed
-                        if need_before:
-                            # End date for "before" download is the day before first existing data
-                            if job["interval"] == "1m":
-                                before_end = first_datetime.strftime("%Y-%m-%d")
-                            else:
-                                before_end = (first_datetime - timedelta(days=1)).strftime(
-                                    "%Y-%m-%d"
-                                )
-
-                            if requested_start <= before_end:
-                                logger.debug(
-                                    f"Incremental (before): {item['symbol']} from {requested_start} to {before_end}"
-                                )
-                                success_before, response_before, _ = download_data(
-                                    symbol=item["symbol"],
-                                    exchange=item["exchange"],
-                                    interval=job["interval"],
-                                    start_date=requested_start,
-                                    end_date=before_end,
-                                    api_key=api_key,
-                                )
-                                if success_before:
-                                    total_records += response_before.get("records", 0)
-                                else:
-                                    download_error = response_before.get(
-                                        "message", "Error downloading earlier data"
-                                    )
-
-                        # Download data AFTER existing range if needed
-                        if need_after and download_error is None:
-                            # Start date for "after" download
-                            if job["interval"] == "1m":
-                                after_start = last_datetime.strftime("%Y-%m-%d")
-                            else:
-                                after_start = (last_datetime + timedelta(days=1)).strftime(
-                                    "%Y-%m-%d"
-                                )
-
-                            if after_start <= requested_end:
-                                logger.debug(
-                                    f"Incremental (after): {item['symbol']} from {after_start} to {requested_end}"
-                                )
-                                success_after, response_after, _ = download_data(
-                                    symbol=item["symbol"],
-                                    exchange=item["exchange"],
-                                    interval=job["interval"],
-                                    start_date=after_start,
-                                    end_date=requested_end,
-                                    api_key=api_key,
-                                )
-                                if success_after:
-                                    total_records += response_after.get("records", 0)
-                                else:
-                                    download_error = response_after.get(
-                                        "message", "Error downloading later data"
-                                    )
-
-                        # Update status based on results
-                        if download_error:
-                            update_job_item_status(
-                                item["id"], "error", total_records, download_error
-                            )
-                            failed += 1
-                        else:
-                            update_job_item_status(item["id"], "success", total_records)
-                            completed += 1
-                        continue
+                bulk_upsert_market_data(pending_frames)
+                for item_id, records in deferred_items:
+                    update_job_item_status(item_id, "success", records)
+                completed += len(deferred_items)
+            except Exception as e:
+                for item_id, _ in deferred_items:
+                    update_job_item_status(item_id, "error", 0, str(e))
+                failed += len(deferred_items)
+            pending_frames.clear()
+            deferred_items.clear()
+            update_job_progress(job_id, completed, failed)
 
-                # Non-incremental or no existing data: download full range
-                success, response, _ = download_data(
-                    symbol=item["symbol"],
-                    exchange=item["exchange"],
-                    interval=job["interval"],
-                    start_date=requested_start,
-                    end_date=requested_end,
-                    api_key=api_key,
-                )
+        def mark_success(item_id, records):
+            """Mark an item done, or defer it until its frames are committed"""
+            nonlocal completed
+            if pending_frames is None:
+                update_job_item_status(item_id, "success", records)
+                completed += 1
+                return
+            deferred_items.append((item_id, records))
+            if len(deferred_items) >= bulk_size:
+                flush_pending()
 
-                if success:
-                    records = response.get("records", 0)
-                    update_job_item_status(item["id"], "success", records)
-                    completed += 1
+        def job_state():
+            """Get (is_cancelled, pause_event) with thread-safe access"""
+            with _job_state_lock:
+                return not _running_jobs.get(job_id, False), _paused_jobs.get(job_id)
+
+        def wait_if_paused() -> bool:
+            """Block a fetch worker while the job is paused; False once cancelled"""
+            is_cancelled, pause_event = job_state()
+            while not is_cancelled and pause_event and not pause_event.is_set():
+                pause_event.wait(timeout=1.0)
+                is_cancelled, pause_event = job_state()
+            return not is_cancelled
+
+        def plan_ranges(item) -> list[tuple[str, str]] | None:
+            """Date ranges to download for an item, or None if it is already covered"""
+            requested_start = job["start_date"]
+            requested_end = job["end_date"]
+            if not incremental:
+                return [(requested_start, requested_end)]
+
+            # Check existing data range for this symbol
+            data_range = get_data_range(item["symbol"], item["exchange"], interval)
+            if not (
+                data_range
+                and data_range.get("first_timestamp")
+                and data_range.get("last_timestamp")
+            ):
+                # No existing data: download full range
+                return [(requested_start, requested_end)]
+
+            first_datetime = datetime.fromtimestamp(data_range["first_timestamp"])
+            last_datetime = datetime.fromtimestamp(data_range["last_timestamp"])
+            requested_start_dt = datetime.strptime(requested_start, "%Y-%m-%d")
+            requested_end_dt = datetime.strptime(requested_end, "%Y-%m-%d")
+
+            # Determine what needs to be downloaded:
+            # 1. Data BEFORE existing data (if requested_start < first_timestamp)
+            # 2. Data AFTER existing data (if requested_end > last_timestamp)
+            need_before = requested_start_dt.date() < first_datetime.date()
+            need_after = requested_end_dt.date() > last_datetime.date()
+
+            # For 1m data, be more precise about timing
+            if interval == "1m":
+                need_after = requested_end_dt.date() >= last_datetime.date()
+
+            if not need_before and not need_after:
+                return None
+
+            ranges = []
+            if need_before:
+                # End date for "before" download is the day before first existing data
+                if interval == "1m":
+                    before_end = first_datetime.strftime("%Y-%m-%d")
                 else:
-                    error_msg = response.get("message", "Unknown error")
-                    update_job_item_status(item["id"], "error", 0, error_msg)
-                    failed += 1
+                    before_end = (first_datetime - timedelta(days=1)).strftime("%Y-%m-%d")
+                if requested_start <= before_end:
+                    logger.debug(
+                        f"Incremental (before): {item['symbol']} from {requested_start} to {before_end}"
+                    )
+                    ranges.append((requested_start, before_end))
+
+            if need_after:
+                # Start date for "after" download
+                if interval == "1m":
+                    after_start = last_datetime.strftime("%Y-%m-%d")
+                else:
+                    after_start = (last_datetime + timedelta(days=1)).strftime("%Y-%m-%d")
+                if after_start <= requested_end:
+                    logger.debug(
+                        f"Incremental (after): {item['symbol']} from {after_start} to {requested_end}"
+                    )
+                    ranges.append((after_start, requested_end))
+
+            return ranges
+
+        def finish(download):
+            """Store a downloaded symbol and settle its job item"""
+            nonlocal failed
+            item = download.key
+            if download.cancelled and download.error is None:
+                # Job cancelled mid-download; the item stays resumable
+                return
+
+            try:
+                if download.error is not None:
+                    raise RuntimeError(download.error)
 
+                frame = download.frame
+                if frame.empty or pending_frames is None:
+                    records = upsert_market_data(frame, item["symbol"], item["exchange"], interval)
+                else:
+                    pending_frames.append((frame, item["symbol"], item["exchange"], interval))
+                    records = len(frame)
+                logger.info(
+                    f"Downloaded and stored {records} records for {item['symbol']}:{item['exchange']}:{interval}"
+                )
+                mark_success(item["id"], records)
             except Exception as e:
-                logger.exception(f"Error downloading {item['symbol']}: {e}")
+                logger.error(f"Error downloading {item['symbol']}: {e}")
                 update_job_item_status(item["id"], "error", 0, str(e))
                 failed += 1
 
             # Update progress counters in database
             update_job_progress(job_id, completed, failed)
 
-            # Random delay between 1-3 seconds (configurable)
-            delay = random.uniform(delay_min, delay_max)
-            logger.debug(f"Waiting {delay:.1f}s before next download...")
-            time.sleep(delay)
+        downloader = ChunkedDownloader(
+            fetch,
+            get_rate_limiter(broker),
+            wait_if_paused=wait_if_paused,
+            name=f"historify-{job_id}",
+        )
+        # Bound the symbols held in memory while their chunks download
+        max_in_flight = downloader.workers * 2
+        queue = deque(pending_items)
+
+        try:
+            while queue or downloader.in_flight:
+                is_cancelled, pause_event = job_state()
+
+                if is_cancelled:
+                    logger.info(f"Job {job_id} cancelled")
+                    downloader.shutdown()
+                    flush_pending()
+                    update_job_status(job_id, "cancelled")
+                    _cleanup_job(job_id)
+                    return
+
+                # Check for pause - workers hold their next request until resumed
+                if pause_event and not pause_event.is_set():
+                    # Emit paused status
+                    _emit_job_paused(job_id, processed_count, total_items)
+                    # Wait for resume signal (check every 1 second)
+                    pause_event.wait(timeout=1.0)
+                    for download in downloader.completed(timeout=0):
+                        finish(download)
+                    continue
+
+                while queue and downloader.in_flight < max_in_flight:
+                    item = queue.popleft()
+
+                    # Update item status
+                    update_job_item_status(item["id"], "downloading")
+
+                    processed_count += 1
+                    # Emit progress via Socket.IO
+                    _emit_progress(job_id, processed_count, total_items, item["symbol"])
+
+                    try:
+                        ranges = plan_ranges(item)
+                    except Exception as e:
+                        logger.exception(f"Error planning download for {item['symbol']}: {e}")
+                        update_job_item_status(item["id"], "error", 0, str(e))
+                        failed += 1
+                        update_job_progress(job_id, completed, failed)
+                        continue
+
+                    if ranges is None:
+                        # Data already covers the requested range
+                        update_job_item_status(
+                            item["id"], "skipped", 0, "Data already covers requested range"
+                        )
+                        logger.info(f"Skipping {item['symbol']} - data already covers requested range")
+                        continue
+
+                    downloader.submit(item, item["symbol"], item["exchange"], interval, ranges)
+
+                for download in downloader.completed(timeout=0.5):
+                    finish(download)
+        finally:
+            downloader.shutdown()
+
+        # Commit whatever is still buffered
+        flush_pending()
 
         # Job completed
         final_status = "completed" if failed == 0 else "completed_with_errors"
@@ -1681,7 +1748,10 @@ def _process_download_job(job_id: str, api_key: str):
         # Emit completion event
         _emit_job_complete(job_id, completed, failed, total_items)
 
-        logger.info(f"Job {job_id} completed: {completed} success, {failed} failed")
+        logger.info(
+            f"Job {job_id} completed: {completed} success, {failed} failed "
+            f"({downloader.get_stats()['requests']} requests, {downloader.get_stats()['retries']} retries)"
+        )
 
         # Cleanup
         _cleanup_job(job_id)
@@ -1,6 +1,8 @@
 import importlib
+import os
 import time
 import traceback
+from datetime import date, datetime, time as dt_time, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
@@ -9,6 +11,7 @@ from database.auth_db import get_auth_token_broker
 from database.token_db import get_token
 from utils.constants import VALID_EXCHANGES
 from utils.logging import get_logger
+from utils.response_format import format_table
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -29,6 +32,23 @@ def _enforce_rate_limit():
     _last_history_call = time.monotonic()
 
 
+# Read-through cache: 1m and D history is served from Historify and only the
+# days it does not cover are fetched from the broker and written back
+# (HISTORIFY_READ_THROUGH=true to enable for source='api')
+READ_THROUGH_INTERVALS = {"1m", "D"}
+IST = timezone(timedelta(hours=5, minutes=30))
+HISTORY_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "oi"]
+
+# Days without bars tolerated at the edges of a fetched chunk (weekend plus
+# holidays) before the response is treated as truncated
+COVERAGE_EDGE_GAP_DAYS = 4
+
+
+def is_read_through_enabled() -> bool:
+    """Check whether broker history requests go through the Historify cache."""
+    return os.getenv("HISTORIFY_READ_THROUGH", "false").strip().lower() in ("true", "1", "yes")
+
+
 def validate_symbol_exchange(symbol: str, exchange: str) -> tuple[bool, str | None]:
     """
     Validate that a symbol exists for the given exchange.
@@ -84,6 +104,7 @@ def get_history_with_auth(
     interval: str,
     start_date: str,
     end_date: str,
+    response_format: str = "json",
 ) -> tuple[bool, dict[str, Any], int]:
     """
     Get historical data for a symbol using provided auth tokens.
@@ -97,6 +118,7 @@ def get_history_with_auth(
         interval: Time interval (e.g., 1m, 5m, 15m, 1h, 1d)
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
+        response_format: Format of the data (see utils.response_format)
 
     Returns:
         Tuple containing:
@@ -136,7 +158,7 @@ def get_history_with_auth(
         if "oi" not in df.columns:
             df["oi"] = 0
 
-        return True, {"status": "success", "data": df.to_dict(orient="records")}, 200
+        return True, {"status": "success", "data": format_table(df, response_format)}, 200
     except Exception as e:
         logger.error(f"Error in broker_module.get_history: {e}")
         traceback.print_exc()
@@ -144,7 +166,12 @@ def get_history_with_auth(
 
 
 def get_history_from_db(
-    symbol: str, exchange: str, interval: str, start_date: str, end_date: str
+    symbol: str,
+    exchange: str,
+    interval: str,
+    start_date: str,
+    end_date: str,
+    response_format: str = "json",
 ) -> tuple[bool, dict[str, Any], int]:
     """
     Get historical data from DuckDB/Historify database.
@@ -155,6 +182,7 @@ def get_history_from_db(
         interval: Time interval (e.g., 1m, 5m, 15m, 1h, D, W, M, Q, Y)
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
+        response_format: Format of the data (see utils.response_format)
 
     Returns:
         Tuple containing:
@@ -163,7 +191,6 @@ def get_history_from_db(
         - HTTP status code (int)
     """
     try:
-        from datetime import date, datetime
 
         from database.historify_db import get_ohlcv
 
@@ -211,7 +238,7 @@ def get_history_from_db(
         columns = ["timestamp", "open", "high", "low", "close", "volume", "oi"]
         df = df[columns]
 
-        return True, {"status": "success", "data": df.to_dict(orient="records")}, 200
+        return True, {"status": "success", "data": format_table(df, response_format)}, 200
 
     except Exception as e:
         logger.error(f"Error fetching history from DB: {e}")
@@ -219,6 +246,262 @@ def get_history_from_db(
         return False, {"status": "error", "message": str(e)}, 500
 
 
+def _to_date(value: str | date) -> date:
+    """Convert a YYYY-MM-DD string or date/datetime to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _ist_epoch(day: date) -> int:
+    """Epoch of IST midnight at the start of the given day."""
+    return int(datetime.combine(day, dt_time(), IST).timestamp())
+
+
+def _missing_ranges(
+    start: date, end: date, coverage: tuple[date, date] | None
+) -> list[tuple[date, date, bool]]:
+    """
+    Split a requested day range into the parts Historify does not cover.
+
+    Args:
+        start: First requested day
+        end: Last requested day
+        coverage: Covered (first_date, last_date) span, or None
+
+    Returns:
+        List of (first_day, last_day, adjacent) ranges to fetch, where adjacent
+        means the range touches the covered span and can extend it
+    """
+    if coverage is None:
+        return [(start, end, True)] if start <= end else []
+
+    first, last = coverage
+    one_day = timedelta(days=1)
+    ranges = []
+    if start < first:
+        ranges.append((start, min(end, first - one_day), end >= first - one_day))
+    if end > last:
+        ranges.append((max(start, last + one_day), end, start <= last + one_day))
+
+    # A range spanning the whole coverage is fetched in one request
+    if len(ranges) == 2 and ranges[0][1] + one_day >= ranges[1][0]:
+        ranges = [(ranges[0][0], ranges[1][1], True)]
+    return ranges
+
+
+def _received_span(first: date, last: date, frame: pd.DataFrame) -> tuple[date, date] | None:
+    """
+    Days of a fetched chunk that the broker response actually covers.
+
+    Brokers cap history per request and silently truncate, so the requested
+    span only counts as covered up to the bars received, apart from a few
+    non-trading days at either edge.
+
+    Args:
+        first: First requested day
+        last: Last requested day
+        frame: Bars returned for the request
+
+    Returns:
+        (first_day, last_day) covered, or None if nothing can be trusted
+    """
+    if frame.empty:
+        return (first, last) if (last - first).days < COVERAGE_EDGE_GAP_DAYS else None
+
+    bar_first = datetime.fromtimestamp(int(frame["timestamp"].min()), IST).date()
+    bar_last = datetime.fromtimestamp(int(frame["timestamp"].max()), IST).date()
+    return (
+        first if (bar_first - first).days <= COVERAGE_EDGE_GAP_DAYS else bar_first,
+        last if (last - bar_last).days <= COVERAGE_EDGE_GAP_DAYS else bar_last,
+    )
+
+
+def _merge_coverage(
+    coverage: tuple[date, date] | None, spans: list[tuple[date, date]]
+) -> tuple[date, date] | None:
+    """
+    Grow the covered span by the fetched spans that touch it, so it stays contiguous.
+
+    Without existing coverage the most recent fetched span is the starting point.
+    """
+    spans = sorted(spans)
+    if coverage is None:
+        if not spans:
+            return None
+        coverage = spans.pop()
+
+    one_day = timedelta(days=1)
+    first, last = coverage
+    grown = True
+    while grown:
+        grown = False
+        for span_first, span_last in spans:
+            if span_first <= last + one_day and span_last >= first - one_day:
+                if span_first < first or span_last > last:
+                    first, last = min(first, span_first), max(last, span_last)
+                    grown = True
+    return first, last
+
+
+def _history_frame(response: dict[str, Any]) -> pd.DataFrame | None:
+    """Convert a broker history response to a frame with epoch-second timestamps."""
+    from services.historify_downloader import history_response_to_frame
+
+    df = history_response_to_frame(response)
+    if df is None or df.empty:
+        return df
+    if df["timestamp"].dtype != "int64":
+        df["timestamp"] = pd.to_datetime(df["timestamp"]).astype("int64") // 10**9
+    if "oi" not in df.columns:
+        df["oi"] = 0
+    return df[HISTORY_COLUMNS]
+
+
+def get_history_read_through(
+    auth_token: str,
+    feed_token: str | None,
+    broker: str,
+    symbol: str,
+    exchange: str,
+    interval: str,
+    start_date: str | date,
+    end_date: str | date,
+    response_format: str = "json",
+) -> tuple[bool, dict[str, Any], int]:
+    """
+    Get 1m or D history from Historify, fetching only uncovered days from the broker.
+
+    Missing days are fetched in broker-sized chunks (HISTORIFY_CHUNK_DAYS_*).
+    Fetched days that have ended are written back with upsert_market_data and
+    recorded as covered, but only as far as the bars each chunk returned reach,
+    so a truncated broker response is fetched again next time. Today's bars are
+    always fetched from the broker and returned but never stored, because the
+    current session is still partial. A fetched range that does not touch the
+    covered span is stored but not recorded as covered, so the covered span
+    stays contiguous.
+
+    Args:
+        auth_token: Authentication token for the broker API
+        feed_token: Feed token for market data (if required by broker)
+        broker: Name of the broker
+        symbol: Trading symbol
+        exchange: Exchange (e.g., NSE, BSE)
+        interval: 1m or D
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        response_format: Format of the data (see utils.response_format)
+
+    Returns:
+        Tuple containing:
+        - Success status (bool)
+        - Response data (dict)
+        - HTTP status code (int)
+    """
+    from database.historify_db import (
+        extend_history_coverage,
+        get_history_coverage,
+        get_ohlcv,
+        upsert_market_data,
+    )
+    from services.historify_downloader import get_chunk_days, split_date_range
+
+    try:
+        start, end = _to_date(start_date), _to_date(end_date)
+        today = datetime.now(IST).date()
+        coverage = get_history_coverage(symbol, exchange, interval)
+        missing = _missing_ranges(start, end, coverage)
+    except Exception as e:
+        logger.error(f"Error reading history coverage for {symbol}:{exchange}: {e}")
+        _enforce_rate_limit()
+        return get_history_with_auth(
+            auth_token,
+            feed_token,
+            broker,
+            symbol,
+            exchange,
+            interval,
+            start_date,
+            end_date,
+            response_format,
+        )
+
+    chunks = [
+        chunk
+        for first, last, _ in missing
+        for chunk in split_date_range(first.isoformat(), last.isoformat(), get_chunk_days(interval))
+    ]
+    fetched = []
+    received = []
+    for chunk_first, chunk_last in chunks:
+        _enforce_rate_limit()
+        success, response, status_code = get_history_with_auth(
+            auth_token,
+            feed_token,
+            broker,
+            symbol,
+            exchange,
+            interval,
+            chunk_first,
+            chunk_last,
+        )
+        if not success:
+            return success, response, status_code
+        frame = _history_frame(response)
+        if frame is None:
+            return False, {"status": "error", "message": "No timestamp column in data"}, 500
+        fetched.append(frame)
+        span = _received_span(_to_date(chunk_first), _to_date(chunk_last), frame)
+        if span is not None:
+            received.append(span)
+
+    fetched = [frame for frame in fetched if not frame.empty]
+    fetched_df = pd.concat(fetched, ignore_index=True) if fetched else pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    # Write back completed days only and extend the covered span
+    try:
+        closed = fetched_df[fetched_df["timestamp"] < _ist_epoch(today)]
+        if not closed.empty:
+            upsert_market_data(closed, symbol, exchange, interval)
+
+        yesterday = today - timedelta(days=1)
+        completed = [(first, min(last, yesterday)) for first, last in received if first <= yesterday]
+        merged = _merge_coverage(coverage, completed)
+        if merged is not None and merged != coverage:
+            extend_history_coverage(symbol, exchange, interval, *merged)
+    except Exception as e:
+        logger.error(f"Error caching history for {symbol}:{exchange}:{interval}: {e}")
+
+    stored = get_ohlcv(
+        symbol=symbol,
+        exchange=exchange,
+        interval=interval,
+        start_timestamp=_ist_epoch(start),
+        end_timestamp=_ist_epoch(end + timedelta(days=1)) - 1,
+    )
+    if "oi" not in stored.columns:
+        stored["oi"] = 0
+
+    # Broker bars take precedence over stored ones (e.g. if the write failed)
+    frames = [frame[HISTORY_COLUMNS] for frame in (stored, fetched_df) if not frame.empty]
+    if frames:
+        df = (
+            pd.concat(frames, ignore_index=True)
+            .drop_duplicates(subset="timestamp", keep="last")
+            .sort_values("timestamp")
+        )
+    else:
+        df = pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    logger.debug(
+        f"History read-through {symbol}:{exchange}:{interval}: "
+        f"{len(chunks)} broker request(s), {len(stored)} stored bars"
+    )
+    return True, {"status": "success", "data": format_table(df, response_format)}, 200
+
+
 def get_history(
     symbol: str,
     exchange: str,
@@ -230,6 +513,8 @@ def get_history(
     feed_token: str | None = None,
     broker: str | None = None,
     source: str = "api",
+    read_through: bool | None = None,
+    response_format: str = "json",
 ) -> tuple[bool, dict[str, Any], int]:
     """
     Get historical data for a symbol.
@@ -246,6 +531,10 @@ def get_history(
         feed_token: Direct broker feed token (for internal calls)
         broker: Direct broker name (for internal calls)
         source: Data source - 'api' (broker, default) or 'db' (DuckDB/Historify)
+        read_through: For source 'api', serve 1m/D history from Historify and fetch
+                      only missing days from the broker (default: HISTORIFY_READ_THROUGH)
+        response_format: Format of the data - 'json' (row objects, default),
+                         'columnar', 'arrow' or 'parquet' (see utils.response_format)
 
     Returns:
         Tuple containing:
@@ -261,31 +550,19 @@ def get_history(
             interval=interval,
             start_date=start_date,
             end_date=end_date,
+            response_format=response_format,
         )
 
     # Source: 'api' (default) - Fetch from broker API
-    # Enforce 3 requests/second rate limit for broker history calls
-    _enforce_rate_limit()
-
     # Case 1: API-based authentication
     if api_key and not (auth_token and broker):
-        AUTH_TOKEN, FEED_TOKEN, broker_name = get_auth_token_broker(
-            api_key, include_feed_token=True
-        )
-        if AUTH_TOKEN is None:
+        auth_token, feed_token, broker = get_auth_token_broker(api_key, include_feed_token=True)
+        if auth_token is None:
             return False, {"status": "error", "message": "Invalid openalgo apikey"}, 403
-        return get_history_with_auth(
-            AUTH_TOKEN, FEED_TOKEN, broker_name, symbol, exchange, interval, start_date, end_date
-        )
-
-    # Case 2: Direct internal call with auth_token and broker
-    elif auth_token and broker:
-        return get_history_with_auth(
-            auth_token, feed_token, broker, symbol, exchange, interval, start_date, end_date
-        )
 
+    # Case 2 is a direct internal call with auth_token and broker
     # Case 3: Invalid parameters
-    else:
+    elif not (auth_token and broker):
         return (
             False,
             {
@@ -294,3 +571,32 @@ def get_history(
             },
             400,
         )
+
+    if read_through is None:
+        read_through = is_read_through_enabled()
+    if read_through and interval in READ_THROUGH_INTERVALS:
+        return get_history_read_through(
+            auth_token,
+            feed_token,
+            broker,
+            symbol,
+            exchange,
+            interval,
+            start_date,
+            end_date,
+            response_format,
+        )
+
+    # Enforce 3 requests/second rate limit for broker history calls
+    _enforce_rate_limit()
+    return get_history_with_auth(
+        auth_token,
+        feed_token,
+        broker,
+        symbol,
+        exchange,
+        interval,
+        start_date,
+        end_date,
+        response_format,
+    )
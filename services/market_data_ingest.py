@@ -0,0 +1,302 @@
+"""
+Ingestion stage for MarketDataService
+
+The WebSocket proxy receives every tick on its asyncio event loop. Running
+validation, the last-value store update and every subscriber callback inline
+there means one slow callback (the sandbox execution engine queries the
+database) delays websocket delivery for all clients.
+
+RingWorker decouples the two: the producer only appends to a bounded
+single-producer/single-consumer ring buffer and returns, and a dedicated
+thread drains the ring in batches. When the ring is full new items are dropped
+and counted, so the producer never blocks. MarketDataService uses one
+RingWorker for ingestion and, for subscribers registered with isolated=True,
+one per subscriber so a slow callback only delays itself.
+
+Configuration:
+    MDS_INGEST_MODE: thread | inline (default: thread)
+    MDS_INGEST_QUEUE_SIZE: Ingestion ring capacity, rounded up to a power of two (default: 65536)
+    MDS_INGEST_BATCH_SIZE: Maximum ticks handed to the service per batch (default: 512)
+    MDS_ISOLATED_QUEUE_SIZE: Ring capacity of each isolated callback (default: 4096)
+"""
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_INGEST_MODE = "thread"
+INGEST_MODES = ("thread", "inline")
+DEFAULT_INGEST_QUEUE_SIZE = 65536
+DEFAULT_INGEST_BATCH_SIZE = 512
+DEFAULT_ISOLATED_QUEUE_SIZE = 4096
+
+# Worker re-checks the ring at least this often even without a wakeup
+IDLE_WAIT_SECONDS = 0.1
+
+
+def get_ingest_mode() -> str:
+    """Get MarketDataService ingestion mode from config"""
+    mode = os.getenv("MDS_INGEST_MODE", DEFAULT_INGEST_MODE).strip().lower()
+    if mode not in INGEST_MODES:
+        logger.warning(f"Invalid MDS_INGEST_MODE '{mode}', using {DEFAULT_INGEST_MODE}")
+        return DEFAULT_INGEST_MODE
+    return mode
+
+
+def get_ingest_queue_size() -> int:
+    """Get ingestion ring capacity from config"""
+    return int(os.getenv("MDS_INGEST_QUEUE_SIZE", DEFAULT_INGEST_QUEUE_SIZE))
+
+
+def get_ingest_batch_size() -> int:
+    """Get maximum ingestion batch size from config"""
+    return max(1, int(os.getenv("MDS_INGEST_BATCH_SIZE", DEFAULT_INGEST_BATCH_SIZE)))
+
+
+def get_isolated_queue_size() -> int:
+    """Get ring capacity for isolated subscriber callbacks from config"""
+    return int(os.getenv("MDS_ISOLATED_QUEUE_SIZE", DEFAULT_ISOLATED_QUEUE_SIZE))
+
+
+class RingBuffer:
+    """
+    Bounded single-producer/single-consumer ring buffer.
+
+    Head is only written by the producer and tail only by the consumer, and the
+    slot is filled before head is published, so no lock is needed as long as
+    there is exactly one thread on each side.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the ring
+
+        Args:
+            capacity: Minimum number of slots; rounded up to a power of two
+        """
+        size = 1
+        while size < max(2, capacity):
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+        self._slots: list[Any] = [None] * size
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def put(self, item: Any) -> bool:
+        """Append an item; returns False if the ring is full"""
+        head = self._head
+        if head - self._tail >= self.capacity:
+            return False
+        self._slots[head & self._mask] = item
+        self._head = head + 1
+        return True
+
+    def drain(self, max_items: int) -> list:
+        """Remove and return up to max_items items in FIFO order"""
+        tail = self._tail
+        count = min(self._head - tail, max_items)
+        if count <= 0:
+            return []
+        slots = self._slots
+        mask = self._mask
+        items = []
+        for position in range(tail, tail + count):
+            index = position & mask
+            items.append(slots[index])
+            slots[index] = None
+        self._tail = tail + count
+        return items
+
+
+class RingWorker:
+    """
+    Worker thread that drains a RingBuffer in batches and passes each batch to
+    a handler. submit() never blocks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[list], Any],
+        capacity: int,
+        batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
+    ):
+        """
+        Initialize the worker (the thread starts on first submit)
+
+        Args:
+            name: Thread name, also used in logs
+            handler: Called from the worker thread with a list of items
+            capacity: Ring buffer capacity
+            batch_size: Maximum items per handler call
+        """
+        self.name = name
+        self.handler = handler
+        self.batch_size = batch_size
+        self.ring = RingBuffer(capacity)
+
+        self._wakeup = threading.Event()
+        self._waiting = False
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+        # Metrics
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.high_watermark = 0
+        self.handler_errors = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.busy_seconds = 0.0
+
+    def start(self) -> None:
+        """Start the worker thread"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop the worker thread; items still in the ring are discarded"""
+        self._running = False
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def submit(self, item: Any) -> bool:
+        """
+        Queue an item for the worker
+
+        Args:
+            item: Item passed to the handler
+
+        Returns:
+            bool: False if the ring was full and the item was dropped
+        """
+        if self._thread is None:
+            self.start()
+
+        self.submitted += 1
+        if not self.ring.put((time.monotonic(), item)):
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 10000 == 0:
+                logger.warning(f"{self.name} queue full, dropped {self.dropped} items so far")
+            return False
+
+        depth = len(self.ring)
+        if depth > self.high_watermark:
+            self.high_watermark = depth
+        if self._waiting:
+            self._wakeup.set()
+        return True
+
+    def _run(self) -> None:
+        """Drain the ring until stopped"""
+        ring = self.ring
+        while self._running:
+            entries = ring.drain(self.batch_size)
+            if not entries:
+                self._waiting = True
+                # Re-check after announcing we are waiting, so a concurrent
+                # submit either sees the flag or its item is seen here
+                if not len(ring):
+                    self._wakeup.wait(IDLE_WAIT_SECONDS)
+                self._wakeup.clear()
+                self._waiting = False
+                continue
+
+            started = time.monotonic()
+            latency_ms = (started - entries[0][0]) * 1000
+            self.last_latency_ms = latency_ms
+            if latency_ms > self.max_latency_ms:
+                self.max_latency_ms = latency_ms
+
+            try:
+                self.handler([item for _, item in entries])
+            except Exception as e:
+                self.handler_errors += 1
+                logger.exception(f"Error in {self.name} handler: {e}")
+
+            self.busy_seconds += time.monotonic() - started
+            self.batches += 1
+            self.processed += len(entries)
+            if len(entries) > self.max_batch:
+                self.max_batch = len(entries)
+
+    def get_stats(self) -> dict:
+        """Get queue depth and backpressure counters for health monitoring"""
+        return {
+            "running": self._thread is not None,
+            "depth": len(self.ring),
+            "capacity": self.ring.capacity,
+            "high_watermark": self.high_watermark,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "batches": self.batches,
+            "avg_batch": round(self.processed / self.batches, 2) if self.batches else 0,
+            "max_batch": self.max_batch,
+            "handler_errors": self.handler_errors,
+            "last_latency_ms": round(self.last_latency_ms, 3),
+            "max_latency_ms": round(self.max_latency_ms, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class IsolatedCallback:
+    """
+    Subscriber callback wrapper that runs the callback on its own RingWorker,
+    so a slow subscriber cannot delay dispatch to the others.
+    """
+
+    def __init__(self, callback: Callable, name: str, capacity: int | None = None):
+        """
+        Initialize the wrapper
+
+        Args:
+            callback: Original subscriber callback
+            name: Subscriber name, used for the thread name
+            capacity: Pending updates before new ones are dropped
+                      (defaults to MDS_ISOLATED_QUEUE_SIZE)
+        """
+        self.callback = callback
+        self.worker = RingWorker(
+            f"mds-callback-{name}",
+            self._deliver,
+            capacity or get_isolated_queue_size(),
+            batch_size=DEFAULT_INGEST_BATCH_SIZE,
+        )
+
+    def __call__(self, data: dict[str, Any]) -> None:
+        self.worker.submit(data)
+
+    def _deliver(self, batch: list) -> None:
+        """Invoke the callback for each update; one failure does not skip the rest"""
+        for data in batch:
+            try:
+                self.callback(data)
+            except Exception as e:
+                self.worker.handler_errors += 1
+                logger.exception(f"Error in isolated subscriber callback ({self.worker.name}): {e}")
+
+    def stop(self) -> None:
+        """Stop the callback worker"""
+        self.worker.stop()
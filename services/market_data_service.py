@@ -13,6 +13,9 @@ Features:
 - Priority subscriber system (critical vs display)
 - Auto-reconnection awareness
 - Health status API
+- Columnar last-value store (see market_data_store) with lock-free reads
+- Symbol-indexed subscriber dispatch (see DispatchIndex)
+- Ingestion off the caller's thread with batch dispatch (see market_data_ingest)
 """
 
 import threading
@@ -24,6 +27,14 @@ from datetime import datetime
 from enum import IntEnum
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from services.market_data_ingest import (
+    IsolatedCallback,
+    RingWorker,
+    get_ingest_batch_size,
+    get_ingest_mode,
+    get_ingest_queue_size,
+)
+from services.market_data_store import CacheView, LastValueStore
 from utils.logging import get_logger
 
 # Initialize logger
@@ -278,6 +289,67 @@ class ConnectionHealthMonitor:
         self._running = False
 
 
+EVENT_TYPES = ("ltp", "quote", "depth", "all")
+MODE_TO_EVENT = {1: "ltp", 2: "quote", 3: "depth"}
+
+
+class DispatchIndex:
+    """
+    Immutable inverted index from (symbol_key, event_type) to the subscribers
+    that should receive the update, already in dispatch order.
+
+    Rebuilt copy-on-write whenever subscribers change, so dispatch is a single
+    dict lookup and never takes a lock.
+    """
+
+    __slots__ = ("by_symbol", "default", "size")
+
+    def __init__(self, entries: list[tuple[tuple, dict]] | None = None):
+        """
+        Build the index
+
+        Args:
+            entries: (sort_key, subscriber) pairs; subscribers need "event_type"
+                     and "filter" keys. Lower sort keys are dispatched first.
+        """
+        entries = sorted(entries or [], key=lambda entry: entry[0])
+        self.size = len(entries)
+
+        def matches(subscriber, event_type):
+            sub_event_type = subscriber.get("event_type", "all")
+            return sub_event_type == "all" or sub_event_type == event_type
+
+        # Unfiltered subscribers receive every symbol
+        wildcard = [subscriber for _, subscriber in entries if not subscriber["filter"]]
+        self.default: dict[str, tuple] = {
+            event_type: tuple(sub for sub in wildcard if matches(sub, event_type))
+            for event_type in EVENT_TYPES
+        }
+
+        # Symbols named in any filter get their own merged, ordered list
+        filtered_symbols = set()
+        for _, subscriber in entries:
+            if subscriber["filter"]:
+                filtered_symbols.update(subscriber["filter"])
+
+        self.by_symbol: dict[tuple[str, str], tuple] = {}
+        for symbol_key in filtered_symbols:
+            for event_type in EVENT_TYPES:
+                self.by_symbol[(symbol_key, event_type)] = tuple(
+                    subscriber
+                    for _, subscriber in entries
+                    if matches(subscriber, event_type)
+                    and (not subscriber["filter"] or symbol_key in subscriber["filter"])
+                )
+
+    def lookup(self, symbol_key: str, event_type: str) -> tuple:
+        """Get subscribers for an update, in dispatch order"""
+        subscribers = self.by_symbol.get((symbol_key, event_type))
+        if subscribers is None:
+            return self.default.get(event_type, ())
+        return subscribers
+
+
 class MarketDataService:
     """
     Enhanced singleton service for managing market data across the application.
@@ -307,8 +379,10 @@ class MarketDataService:
         self._initialized = True
         self.data_lock = threading.Lock()
 
-        # Market data cache structure
-        self.market_data_cache: dict[str, dict[str, Any]] = {}
+        # Market data cache: numpy columns indexed by interned instrument id.
+        # market_data_cache keeps the legacy {"EXCHANGE:SYMBOL": entry} shape as a read-only view.
+        self.store = LastValueStore()
+        self.market_data_cache = CacheView(self.store)
 
         # Enhanced subscriber system with priorities
         # {priority: {subscriber_id: {callback, filter, name}}}
@@ -318,6 +392,10 @@ class MarketDataService:
         # Legacy subscribers (for backward compatibility)
         self.subscribers = defaultdict(dict)
 
+        # Inverted indexes used for dispatch, rebuilt on subscribe/unsubscribe
+        self._priority_index = DispatchIndex()
+        self._legacy_index = DispatchIndex()
+
         # User-specific data tracking
         self.user_access_tracking = defaultdict(dict)
 
@@ -345,18 +423,70 @@ class MarketDataService:
         self._trade_management_paused = False
         self._pause_reason = ""
 
+        # Ingestion stage: submit_market_data() queues ticks for a worker thread
+        # so producers (the WebSocket proxy event loop) never run callbacks inline
+        self.ingest_mode = get_ingest_mode()
+        self.ingestor = (
+            RingWorker(
+                "mds-ingest",
+                self.process_market_data_batch,
+                get_ingest_queue_size(),
+                get_ingest_batch_size(),
+            )
+            if self.ingest_mode == "thread"
+            else None
+        )
+
         # Start cleanup thread
         self.cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
         self.cleanup_thread.start()
 
         logger.debug("Enhanced MarketDataService initialized")
 
-    def process_market_data(self, data: dict[str, Any]) -> bool:
+    def submit_market_data(self, data: dict[str, Any]) -> bool:
+        """
+        Queue incoming market data for the ingestion worker without blocking.
+        Falls back to processing inline when MDS_INGEST_MODE is "inline".
+
+        Args:
+            data: Market data dictionary from WebSocket
+
+        Returns:
+            bool: False if the data was dropped (ingestion queue full) or invalid
+        """
+        if self.ingestor is None:
+            return self.process_market_data(data)
+        return self.ingestor.submit(data)
+
+    def process_market_data_batch(self, batch: list[dict[str, Any]]) -> int:
+        """
+        Process a batch of market data updates in arrival order
+
+        Args:
+            batch: Market data dictionaries from WebSocket
+
+        Returns:
+            int: Number of updates processed successfully
+        """
+        if not batch:
+            return 0
+
+        # One health heartbeat per batch instead of per tick
+        self.health_monitor.record_data_received()
+
+        processed = 0
+        for data in batch:
+            if self.process_market_data(data, record_health=False):
+                processed += 1
+        return processed
+
+    def process_market_data(self, data: dict[str, Any], record_health: bool = True) -> bool:
         """
         Process incoming market data from WebSocket
 
         Args:
             data: Market data dictionary from WebSocket
+            record_health: Record the update with the health monitor
 
         Returns:
             bool: True if data was processed successfully
@@ -375,7 +505,8 @@ class MarketDataService:
                     logger.debug(f"Data warning: {warning}")
 
             # Record data received for health monitoring
-            self.health_monitor.record_data_received()
+            if record_health:
+                self.health_monitor.record_data_received()
 
             # Extract data
             symbol = data.get("symbol")
@@ -387,54 +518,10 @@ class MarketDataService:
                 return False
 
             symbol_key = f"{exchange}:{symbol}"
-            timestamp = int(time.time())
-
-            with self.data_lock:
-                # Initialize cache entry if needed
-                if symbol_key not in self.market_data_cache:
-                    self.market_data_cache[symbol_key] = {
-                        "symbol": symbol,
-                        "exchange": exchange,
-                        "last_update": timestamp,
-                    }
-
-                cache_entry = self.market_data_cache[symbol_key]
-
-                # Update based on mode
-                if mode == 1:  # LTP
-                    cache_entry["ltp"] = {
-                        "value": market_data.get("ltp", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                        "volume": market_data.get("volume", 0),
-                    }
-                elif mode == 2:  # Quote
-                    cache_entry["quote"] = {
-                        "open": market_data.get("open", 0),
-                        "high": market_data.get("high", 0),
-                        "low": market_data.get("low", 0),
-                        "close": market_data.get("close", 0),
-                        "ltp": market_data.get("ltp", 0),
-                        "volume": market_data.get("volume", 0),
-                        "change": market_data.get("change", 0),
-                        "change_percent": market_data.get("change_percent", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                    }
-                    # Also update LTP from quote
-                    cache_entry["ltp"] = {
-                        "value": market_data.get("ltp", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                        "volume": market_data.get("volume", 0),
-                    }
-                elif mode == 3:  # Depth
-                    cache_entry["depth"] = {
-                        "buy": market_data.get("depth", {}).get("buy", []),
-                        "sell": market_data.get("depth", {}).get("sell", []),
-                        "ltp": market_data.get("ltp", 0),
-                        "timestamp": market_data.get("timestamp", timestamp),
-                    }
-
-                cache_entry["last_update"] = timestamp
-                self.metrics["total_updates"] += 1
+
+            # Columnar store has its own writer lock; readers never block on it
+            self.store.update(exchange, symbol, mode, market_data, time.time())
+            self.metrics["total_updates"] += 1
 
             # Broadcast to subscribers by priority (critical first)
             self._broadcast_update_priority(symbol_key, mode, data)
@@ -455,6 +542,7 @@ class MarketDataService:
         callback: Callable,
         filter_symbols: set[str] | None = None,
         name: str = "",
+        isolated: bool = False,
     ) -> int:
         """
         Subscribe to market data updates with priority
@@ -465,6 +553,8 @@ class MarketDataService:
             callback: Function to call with updates
             filter_symbols: Optional set of symbol keys to filter updates
             name: Optional name for the subscriber (for debugging)
+            isolated: Run the callback on its own worker thread so that a slow
+                      callback does not delay other subscribers
 
         Returns:
             Subscriber ID for unsubscribing
@@ -473,13 +563,18 @@ class MarketDataService:
             self.subscriber_id_counter += 1
             subscriber_id = self.subscriber_id_counter
 
+            name = name or f"subscriber_{subscriber_id}"
+            isolated_callback = IsolatedCallback(callback, name) if isolated else None
+
             self.priority_subscribers[priority][subscriber_id] = {
-                "callback": callback,
-                "filter": filter_symbols,
+                "callback": isolated_callback or callback,
+                "filter": frozenset(filter_symbols) if filter_symbols else None,
                 "event_type": event_type,
-                "name": name or f"subscriber_{subscriber_id}",
+                "name": name,
                 "created_at": time.time(),
+                "isolated": isolated_callback,
             }
+            self._rebuild_priority_index()
 
         logger.debug(
             f"Added priority subscriber {subscriber_id} ({name}) - priority={priority.name}, type={event_type}"
@@ -487,7 +582,11 @@ class MarketDataService:
         return subscriber_id
 
     def subscribe_critical(
-        self, callback: Callable, filter_symbols: set[str] | None = None, name: str = ""
+        self,
+        callback: Callable,
+        filter_symbols: set[str] | None = None,
+        name: str = "",
+        isolated: bool = False,
     ) -> int:
         """
         Subscribe with CRITICAL priority for trade management
@@ -497,12 +596,18 @@ class MarketDataService:
             callback: Function to call with LTP updates
             filter_symbols: Symbols to monitor
             name: Subscriber name
+            isolated: Run the callback on its own worker thread
 
         Returns:
             Subscriber ID
         """
         return self.subscribe_with_priority(
-            SubscriberPriority.CRITICAL, "ltp", callback, filter_symbols, name or "trade_management"
+            SubscriberPriority.CRITICAL,
+            "ltp",
+            callback,
+            filter_symbols,
+            name or "trade_management",
+            isolated,
         )
 
     def unsubscribe_priority(self, subscriber_id: int) -> bool:
@@ -518,8 +623,11 @@ class MarketDataService:
         with self.data_lock:
             for priority in self.priority_subscribers:
                 if subscriber_id in self.priority_subscribers[priority]:
-                    name = self.priority_subscribers[priority][subscriber_id].get("name", "")
-                    del self.priority_subscribers[priority][subscriber_id]
+                    subscriber = self.priority_subscribers[priority].pop(subscriber_id)
+                    name = subscriber.get("name", "")
+                    self._rebuild_priority_index()
+                    if subscriber.get("isolated") is not None:
+                        subscriber["isolated"].stop()
                     logger.info(f"Removed priority subscriber {subscriber_id} ({name})")
                     return True
 
@@ -546,8 +654,10 @@ class MarketDataService:
 
             self.subscribers[event_type][subscriber_id] = {
                 "callback": callback,
-                "filter": filter_symbols,
+                "filter": frozenset(filter_symbols) if filter_symbols else None,
+                "event_type": event_type,
             }
+            self._rebuild_legacy_index()
 
         logger.info(f"Added subscriber {subscriber_id} for {event_type} updates")
         return subscriber_id
@@ -571,6 +681,7 @@ class MarketDataService:
             for event_type in self.subscribers:
                 if subscriber_id in self.subscribers[event_type]:
                     del self.subscribers[event_type][subscriber_id]
+                    self._rebuild_legacy_index()
                     logger.info(f"Removed subscriber {subscriber_id}")
                     return True
 
@@ -587,12 +698,10 @@ class MarketDataService:
         Returns:
             LTP data dictionary or None
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                self.metrics["cache_hits"] += 1
-                return self.market_data_cache[symbol_key].get("ltp")
+        instrument_id = self.store.get_id(exchange, symbol)
+        if instrument_id is not None and self.store.has(instrument_id):
+            self.metrics["cache_hits"] += 1
+            return self.store.ltp_view(instrument_id)
 
         self.metrics["cache_misses"] += 1
         return None
@@ -608,9 +717,12 @@ class MarketDataService:
         Returns:
             LTP value or None
         """
-        ltp_data = self.get_ltp(symbol, exchange)
-        if ltp_data:
-            return ltp_data.get("value")
+        instrument_id = self.store.get_id(exchange, symbol)
+        if instrument_id is not None and self.store.has(instrument_id):
+            self.metrics["cache_hits"] += 1
+            return self.store.ltp_value(instrument_id)
+
+        self.metrics["cache_misses"] += 1
         return None
 
     def get_quote(self, symbol: str, exchange: str) -> dict[str, Any] | None:
@@ -624,12 +736,10 @@ class MarketDataService:
         Returns:
             Quote data dictionary or None
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                self.metrics["cache_hits"] += 1
-                return self.market_data_cache[symbol_key].get("quote")
+        instrument_id = self.store.get_id(exchange, symbol)
+        if instrument_id is not None and self.store.has(instrument_id):
+            self.metrics["cache_hits"] += 1
+            return self.store.quote_view(instrument_id)
 
         self.metrics["cache_misses"] += 1
         return None
@@ -645,12 +755,10 @@ class MarketDataService:
         Returns:
             Market depth data dictionary or None
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                self.metrics["cache_hits"] += 1
-                return self.market_data_cache[symbol_key].get("depth")
+        instrument_id = self.store.get_id(exchange, symbol)
+        if instrument_id is not None and self.store.has(instrument_id):
+            self.metrics["cache_hits"] += 1
+            return self.store.depth_view(instrument_id)
 
         self.metrics["cache_misses"] += 1
         return None
@@ -666,11 +774,11 @@ class MarketDataService:
         Returns:
             All market data for the symbol
         """
-        symbol_key = f"{exchange}:{symbol}"
-
-        with self.data_lock:
-            if symbol_key in self.market_data_cache:
-                return dict(self.market_data_cache[symbol_key])
+        instrument_id = self.store.get_id(exchange, symbol)
+        if instrument_id is not None:
+            entry = self.store.entry_view(instrument_id)
+            if entry is not None:
+                return entry
 
         return {}
 
@@ -686,19 +794,32 @@ class MarketDataService:
         """
         result = {}
 
-        with self.data_lock:
-            for symbol_info in symbols:
-                symbol = symbol_info.get("symbol")
-                exchange = symbol_info.get("exchange")
-                if symbol and exchange:
-                    symbol_key = f"{exchange}:{symbol}"
-                    if symbol_key in self.market_data_cache:
-                        ltp_data = self.market_data_cache[symbol_key].get("ltp")
-                        if ltp_data:
-                            result[symbol_key] = ltp_data
+        for symbol_info in symbols:
+            symbol = symbol_info.get("symbol")
+            exchange = symbol_info.get("exchange")
+            if symbol and exchange:
+                instrument_id = self.store.get_id(exchange, symbol)
+                if instrument_id is not None:
+                    ltp_data = self.store.ltp_view(instrument_id)
+                    if ltp_data:
+                        result[f"{exchange}:{symbol}"] = ltp_data
 
         return result
 
+    def get_multiple_ltp_values(self, symbols: list[dict[str, str]], out=None, max_age: float | None = None):
+        """
+        Get LTPs for multiple symbols as a numpy array, without per-symbol dicts
+
+        Args:
+            symbols: List of symbol dictionaries with 'symbol' and 'exchange' keys
+            out: Optional float64 array of len(symbols) to fill in place
+            max_age: Optional freshness limit in seconds; older data yields NaN
+
+        Returns:
+            np.ndarray: LTP per input symbol, NaN where no (fresh) LTP is cached
+        """
+        return self.store.ltp_values(self.store.get_ids(symbols), out=out, max_age=max_age)
+
     def is_data_fresh(
         self, symbol: str = None, exchange: str = None, max_age_seconds: float = 30
     ) -> bool:
@@ -719,12 +840,11 @@ class MarketDataService:
 
         # If specific symbol requested, check its freshness
         if symbol and exchange:
-            symbol_key = f"{exchange}:{symbol}"
-            with self.data_lock:
-                if symbol_key in self.market_data_cache:
-                    last_update = self.market_data_cache[symbol_key].get("last_update", 0)
-                    return (time.time() - last_update) < max_age_seconds
+            instrument_id = self.store.get_id(exchange, symbol)
+            last_update = self.store.last_update(instrument_id) if instrument_id is not None else None
+            if last_update is None:
                 return False
+            return (time.time() - last_update) < max_age_seconds
 
         return True
 
@@ -774,7 +894,7 @@ class MarketDataService:
             last_data_timestamp=self.health_monitor.last_data_timestamp,
             last_data_age_seconds=health["last_data_age_seconds"] or 0,
             data_flow_healthy=health["data_flow_active"],
-            cache_size=len(self.market_data_cache),
+            cache_size=len(self.store),
             total_subscribers=total_subscribers,
             critical_subscribers=critical_subscribers,
             total_updates_processed=self.metrics["total_updates"],
@@ -794,7 +914,7 @@ class MarketDataService:
             )
 
             return {
-                "total_symbols": len(self.market_data_cache),
+                "total_symbols": len(self.store),
                 "total_updates": self.metrics["total_updates"],
                 "cache_hits": self.metrics["cache_hits"],
                 "cache_misses": self.metrics["cache_misses"],
@@ -806,6 +926,14 @@ class MarketDataService:
                 "critical_subscribers": len(
                     self.priority_subscribers.get(SubscriberPriority.CRITICAL, {})
                 ),
+                "ingest_mode": self.ingest_mode,
+                "ingest": self.ingestor.get_stats() if self.ingestor is not None else None,
+                "isolated_callbacks": {
+                    subscriber["name"]: subscriber["isolated"].worker.get_stats()
+                    for subscribers in self.priority_subscribers.values()
+                    for subscriber in subscribers.values()
+                    if subscriber.get("isolated") is not None
+                },
             }
 
     def register_user_callback(self, username: str) -> bool:
@@ -846,17 +974,36 @@ class MarketDataService:
             symbol: Specific symbol to clear (optional)
             exchange: Exchange for the symbol (optional)
         """
-        with self.data_lock:
-            if symbol and exchange:
-                symbol_key = f"{exchange}:{symbol}"
-                if symbol_key in self.market_data_cache:
-                    del self.market_data_cache[symbol_key]
-                    self.validator.clear_price_history(symbol_key)
-                    logger.info(f"Cleared cache for {symbol_key}")
-            else:
-                self.market_data_cache.clear()
-                self.validator.clear_price_history()
-                logger.info("Cleared entire market data cache")
+        if symbol and exchange:
+            symbol_key = f"{exchange}:{symbol}"
+            if self.store.clear(exchange, symbol):
+                self.validator.clear_price_history(symbol_key)
+                logger.info(f"Cleared cache for {symbol_key}")
+        else:
+            self.store.clear_all()
+            self.validator.clear_price_history()
+            logger.info("Cleared entire market data cache")
+
+    def _rebuild_priority_index(self) -> None:
+        """Rebuild the priority dispatch index (caller holds data_lock)"""
+        self._priority_index = DispatchIndex(
+            [
+                ((priority, subscriber_id), subscriber)
+                for priority, subscribers in self.priority_subscribers.items()
+                for subscriber_id, subscriber in subscribers.items()
+            ]
+        )
+
+    def _rebuild_legacy_index(self) -> None:
+        """Rebuild the legacy dispatch index (caller holds data_lock)"""
+        # Event-specific subscribers are called before "all" subscribers
+        self._legacy_index = DispatchIndex(
+            [
+                ((1 if event_type == "all" else 0, subscriber_id), subscriber)
+                for event_type, subscribers in self.subscribers.items()
+                for subscriber_id, subscriber in subscribers.items()
+            ]
+        )
 
     def _broadcast_update_priority(self, symbol_key: str, mode: int, data: dict[str, Any]) -> None:
         """
@@ -867,32 +1014,16 @@ class MarketDataService:
             mode: Update mode (1=LTP, 2=Quote, 3=Depth)
             data: Full data to broadcast
         """
-        mode_to_event = {1: "ltp", 2: "quote", 3: "depth"}
-        event_type = mode_to_event.get(mode, "all")
-
-        # Process subscribers by priority (CRITICAL first)
-        for priority in sorted(self.priority_subscribers.keys()):
-            with self.data_lock:
-                subscribers = list(self.priority_subscribers[priority].values())
-
-            for subscriber in subscribers:
-                try:
-                    # Check event type filter
-                    sub_event_type = subscriber.get("event_type", "all")
-                    if sub_event_type != "all" and sub_event_type != event_type:
-                        continue
+        event_type = MODE_TO_EVENT.get(mode, "all")
 
-                    # Check symbol filter
-                    if subscriber["filter"] and symbol_key not in subscriber["filter"]:
-                        continue
-
-                    # Call the callback
-                    subscriber["callback"](data)
-
-                except Exception as e:
-                    logger.exception(
-                        f"Error in priority subscriber callback ({subscriber.get('name', 'unknown')}): {e}"
-                    )
+        # Index lookup returns only interested subscribers, already in priority order
+        for subscriber in self._priority_index.lookup(symbol_key, event_type):
+            try:
+                subscriber["callback"](data)
+            except Exception as e:
+                logger.exception(
+                    f"Error in priority subscriber callback ({subscriber.get('name', 'unknown')}): {e}"
+                )
 
     def _broadcast_update(self, symbol_key: str, mode: int, data: dict[str, Any]) -> None:
         """
@@ -903,21 +1034,10 @@ class MarketDataService:
             mode: Update mode (1=LTP, 2=Quote, 3=Depth)
             data: Full data to broadcast
         """
-        mode_to_event = {1: "ltp", 2: "quote", 3: "depth"}
-        event_type = mode_to_event.get(mode, "all")
+        event_type = MODE_TO_EVENT.get(mode, "all")
 
-        # Broadcast to specific event subscribers
-        with self.data_lock:
-            subscribers = list(self.subscribers[event_type].values())
-            all_subscribers = list(self.subscribers["all"].values())
-
-        for subscriber in subscribers + all_subscribers:
+        for subscriber in self._legacy_index.lookup(symbol_key, event_type):
             try:
-                # Check filter
-                if subscriber["filter"] and symbol_key not in subscriber["filter"]:
-                    continue
-
-                # Call the callback
                 subscriber["callback"](data)
             except Exception as e:
                 logger.exception(f"Error in subscriber callback: {e}")
@@ -951,17 +1071,12 @@ class MarketDataService:
                 current_time = time.time()
                 stale_threshold = 3600  # 1 hour
 
-                with self.data_lock:
-                    # Clean up stale market data
-                    stale_symbols = []
-                    for symbol_key, data in self.market_data_cache.items():
-                        if current_time - data.get("last_update", 0) > stale_threshold:
-                            stale_symbols.append(symbol_key)
-
-                    for symbol_key in stale_symbols:
-                        del self.market_data_cache[symbol_key]
-                        self.validator.clear_price_history(symbol_key)
+                # Clean up stale market data (vectorized over the last_update column)
+                stale_symbols = self.store.clear_stale(current_time - stale_threshold)
+                for exchange, symbol in stale_symbols:
+                    self.validator.clear_price_history(f"{exchange}:{symbol}")
 
+                with self.data_lock:
                     # Clean up old user access tracking
                     for user_id in list(self.user_access_tracking.keys()):
                         user_data = self.user_access_tracking[user_id]
@@ -1023,10 +1138,13 @@ def subscribe_to_market_updates(
 
 
 def subscribe_critical(
-    callback: Callable, filter_symbols: set[str] | None = None, name: str = ""
+    callback: Callable,
+    filter_symbols: set[str] | None = None,
+    name: str = "",
+    isolated: bool = False,
 ) -> int:
     """Subscribe with CRITICAL priority for trade management"""
-    return _market_data_service.subscribe_critical(callback, filter_symbols, name)
+    return _market_data_service.subscribe_critical(callback, filter_symbols, name, isolated)
 
 
 def unsubscribe_from_market_updates(subscriber_id: int) -> bool:
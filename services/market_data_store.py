@@ -0,0 +1,422 @@
+"""
+Columnar last-value store for MarketDataService
+
+Keeps the latest LTP/Quote values of every instrument in preallocated numpy
+columns indexed by an interned instrument id, instead of one nested dict per
+symbol that is rebuilt on every tick.
+
+Concurrency:
+- A single writer lock serializes ticks (ingestion is effectively single-threaded)
+- Readers never take a lock. Each row has a sequence counter (seqlock): the
+  writer makes it odd while updating the row and even when done, and a reader
+  retries if the counter changed or was odd while it read the row.
+
+The dict shapes previously stored in MarketDataService.market_data_cache are
+still available through row views (ltp_view, quote_view, entry_view) and the
+read-only CacheView mapping.
+"""
+
+import math
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import numpy as np
+
+# Row flags
+HAS_LTP = 0x01
+HAS_QUOTE = 0x02
+HAS_DEPTH = 0x04
+ACTIVE = 0x80
+
+# Quote columns, in the order of the 2-D quote array
+QUOTE_FIELDS = ("open", "high", "low", "close", "ltp", "volume", "change", "change_percent")
+_QUOTE_VOLUME = QUOTE_FIELDS.index("volume")
+
+DEFAULT_CAPACITY = 1024
+
+
+def _to_float(value) -> float:
+    """Convert a tick field to float, NaN if it is not numeric"""
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_python(value: float):
+    """Convert a stored float back to int when it has no fractional part"""
+    value = float(value)
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+class _Columns:
+    """Set of preallocated columns; replaced as a whole when the store grows"""
+
+    __slots__ = (
+        "capacity",
+        "seq",
+        "flags",
+        "last_update",
+        "ltp",
+        "ltp_volume",
+        "ltp_timestamp",
+        "quote",
+        "quote_timestamp",
+        "depth",
+    )
+
+    def __init__(self, capacity: int, previous: "_Columns | None" = None):
+        self.capacity = capacity
+        self.seq = np.zeros(capacity, dtype=np.int64)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.last_update = np.zeros(capacity, dtype=np.float64)
+        self.ltp = np.zeros(capacity, dtype=np.float64)
+        self.ltp_volume = np.zeros(capacity, dtype=np.float64)
+        self.quote = np.zeros((capacity, len(QUOTE_FIELDS)), dtype=np.float64)
+        # Broker timestamps keep their original type (epoch int, float or string)
+        self.ltp_timestamp = np.empty(capacity, dtype=object)
+        self.quote_timestamp = np.empty(capacity, dtype=object)
+        self.depth = np.empty(capacity, dtype=object)
+
+        if previous is not None:
+            n = previous.capacity
+            for name in self.__slots__[1:]:
+                getattr(self, name)[:n] = getattr(previous, name)
+
+
+class LastValueStore:
+    """
+    Array-backed last-value cache indexed by interned instrument id.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._write_lock = threading.Lock()
+        self._ids: dict[tuple[str, str], int] = {}
+        self._keys: list[tuple[str, str]] = []
+        self._cols = _Columns(capacity)
+        self._active_count = 0
+
+    # ------------------------------------------------------------------
+    # Interning
+    # ------------------------------------------------------------------
+
+    def get_id(self, exchange: str, symbol: str) -> int | None:
+        """Get the instrument id for exchange/symbol, or None if never seen"""
+        return self._ids.get((exchange, symbol))
+
+    def get_ids(self, symbols: list[dict[str, str]]) -> np.ndarray:
+        """
+        Resolve a symbol list to instrument ids once so callers can reuse them.
+
+        Args:
+            symbols: List of dicts with 'symbol' and 'exchange' keys
+
+        Returns:
+            np.ndarray: int64 ids, -1 for unknown symbols
+        """
+        ids = self._ids
+        return np.fromiter(
+            (ids.get((s.get("exchange"), s.get("symbol")), -1) for s in symbols),
+            dtype=np.int64,
+            count=len(symbols),
+        )
+
+    def key_for(self, instrument_id: int) -> tuple[str, str]:
+        """Get (exchange, symbol) for an instrument id"""
+        return self._keys[instrument_id]
+
+    def _intern(self, exchange: str, symbol: str) -> int:
+        """Assign an id (caller holds the write lock)"""
+        key = (exchange, symbol)
+        instrument_id = self._ids.get(key)
+        if instrument_id is None:
+            instrument_id = len(self._keys)
+            if instrument_id >= self._cols.capacity:
+                self._cols = _Columns(self._cols.capacity * 2, self._cols)
+            self._keys.append(key)
+            self._ids[key] = instrument_id
+        return instrument_id
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def update(self, exchange: str, symbol: str, mode: int, market_data: dict, now: float) -> int:
+        """
+        Store a tick.
+
+        Args:
+            exchange: Exchange code
+            symbol: Trading symbol
+            mode: 1=LTP, 2=Quote, 3=Depth
+            market_data: Tick payload
+            now: Receive time (epoch seconds), used for last_update and as
+                 fallback timestamp
+
+        Returns:
+            int: Instrument id
+        """
+        timestamp = market_data.get("timestamp", int(now))
+        ltp = _to_float(market_data.get("ltp", 0))
+
+        with self._write_lock:
+            instrument_id = self._intern(exchange, symbol)
+            cols = self._cols
+            cols.seq[instrument_id] += 1  # odd: row is being written
+
+            flags = int(cols.flags[instrument_id])
+            if not flags & ACTIVE:
+                self._active_count += 1
+                flags = ACTIVE
+
+            if mode == 1 or mode == 2:
+                cols.ltp[instrument_id] = ltp
+                cols.ltp_volume[instrument_id] = _to_float(market_data.get("volume", 0))
+                cols.ltp_timestamp[instrument_id] = timestamp
+                flags |= HAS_LTP
+                if mode == 2:
+                    row = cols.quote[instrument_id]
+                    for index, name in enumerate(QUOTE_FIELDS):
+                        row[index] = _to_float(market_data.get(name, 0))
+                    cols.quote_timestamp[instrument_id] = timestamp
+                    flags |= HAS_QUOTE
+            elif mode == 3:
+                depth = market_data.get("depth", {})
+                cols.depth[instrument_id] = {
+                    "buy": depth.get("buy", []),
+                    "sell": depth.get("sell", []),
+                    "ltp": market_data.get("ltp", 0),
+                    "timestamp": timestamp,
+                }
+                flags |= HAS_DEPTH
+
+            cols.flags[instrument_id] = flags
+            cols.last_update[instrument_id] = int(now)
+            cols.seq[instrument_id] += 1  # even: row is consistent again
+
+        return instrument_id
+
+    def clear(self, exchange: str, symbol: str) -> bool:
+        """Remove cached values for one instrument (the id stays interned)"""
+        instrument_id = self._ids.get((exchange, symbol))
+        if instrument_id is None:
+            return False
+        with self._write_lock:
+            return self._deactivate(instrument_id)
+
+    def clear_all(self):
+        """Remove cached values for all instruments"""
+        with self._write_lock:
+            cols = self._cols
+            n = len(self._keys)
+            cols.seq[:n] += 2
+            cols.flags[:n] = 0
+            cols.depth[:n] = None
+            self._active_count = 0
+
+    def clear_stale(self, cutoff: float) -> list[tuple[str, str]]:
+        """
+        Remove instruments not updated since cutoff.
+
+        Returns:
+            list: (exchange, symbol) keys that were removed
+        """
+        with self._write_lock:
+            cols = self._cols
+            n = len(self._keys)
+            stale = np.nonzero(
+                (cols.flags[:n] & ACTIVE).astype(bool) & (cols.last_update[:n] < cutoff)
+            )[0]
+            for instrument_id in stale:
+                self._deactivate(int(instrument_id))
+            return [self._keys[int(instrument_id)] for instrument_id in stale]
+
+    def _deactivate(self, instrument_id: int) -> bool:
+        """Clear a row (caller holds the write lock)"""
+        cols = self._cols
+        if not cols.flags[instrument_id] & ACTIVE:
+            return False
+        cols.seq[instrument_id] += 1
+        cols.flags[instrument_id] = 0
+        cols.depth[instrument_id] = None
+        cols.seq[instrument_id] += 1
+        self._active_count -= 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Lock-free reads
+    # ------------------------------------------------------------------
+
+    def _read(self, instrument_id: int, reader):
+        """Run reader(cols, id) until it observes a consistent row"""
+        while True:
+            cols = self._cols
+            before = cols.seq[instrument_id]
+            if before & 1:
+                time.sleep(0)  # writer is mid-update, let it finish
+                continue
+            result = reader(cols, instrument_id)
+            if cols.seq[instrument_id] == before:
+                return result
+
+    def has(self, instrument_id: int, flag: int = ACTIVE) -> bool:
+        """Check whether a row is active and carries the given data"""
+        return bool(self._cols.flags[instrument_id] & flag)
+
+    def ltp_value(self, instrument_id: int) -> float | None:
+        """Get the LTP of an instrument without building a dict"""
+        return self._read(instrument_id, _read_ltp_value)
+
+    def ltp_values(
+        self, ids: np.ndarray, out: np.ndarray | None = None, max_age: float | None = None
+    ) -> np.ndarray:
+        """
+        Gather LTPs for many instruments into a float64 array.
+
+        Unknown ids (-1) and instruments without an LTP yield NaN. The gather is
+        a single numpy operation and does not allocate if out is given.
+
+        Args:
+            ids: Instrument ids from get_ids()
+            out: Optional float64 array of the same length to fill
+            max_age: Optional age limit in seconds; older rows yield NaN
+
+        Returns:
+            np.ndarray: LTP values
+        """
+        cols = self._cols
+        if out is None:
+            out = np.empty(len(ids), dtype=np.float64)
+        valid = ids >= 0
+        safe_ids = np.where(valid, ids, 0)
+        np.take(cols.ltp, safe_ids, out=out)
+        has_ltp = (cols.flags[safe_ids] & (ACTIVE | HAS_LTP)) == (ACTIVE | HAS_LTP)
+        if max_age is not None:
+            has_ltp &= cols.last_update[safe_ids] >= time.time() - max_age
+        out[~(valid & has_ltp)] = np.nan
+        return out
+
+    def ltp_view(self, instrument_id: int) -> dict[str, Any] | None:
+        """Get the LTP dict ({value, timestamp, volume}) for an instrument"""
+        return self._read(instrument_id, _read_ltp_view)
+
+    def quote_view(self, instrument_id: int) -> dict[str, Any] | None:
+        """Get the quote dict for an instrument"""
+        return self._read(instrument_id, _read_quote_view)
+
+    def depth_view(self, instrument_id: int) -> dict[str, Any] | None:
+        """Get the depth dict for an instrument"""
+        return self._read(instrument_id, _read_depth_view)
+
+    def last_update(self, instrument_id: int) -> float | None:
+        """Get the receive time of the last tick, None if not cached"""
+        return self._read(instrument_id, _read_last_update)
+
+    def entry_view(self, instrument_id: int) -> dict[str, Any] | None:
+        """Get the full cache entry in the legacy market_data_cache shape"""
+        return self._read(instrument_id, self._read_entry)
+
+    def _read_entry(self, cols: _Columns, instrument_id: int) -> dict[str, Any] | None:
+        flags = cols.flags[instrument_id]
+        if not flags & ACTIVE:
+            return None
+        exchange, symbol = self._keys[instrument_id]
+        entry = {
+            "symbol": symbol,
+            "exchange": exchange,
+            "last_update": int(cols.last_update[instrument_id]),
+        }
+        if flags & HAS_LTP:
+            entry["ltp"] = _read_ltp_view(cols, instrument_id)
+        if flags & HAS_QUOTE:
+            entry["quote"] = _read_quote_view(cols, instrument_id)
+        if flags & HAS_DEPTH:
+            entry["depth"] = _read_depth_view(cols, instrument_id)
+        return entry
+
+    def active_ids(self) -> np.ndarray:
+        """Get ids of all instruments currently cached"""
+        n = len(self._keys)
+        return np.nonzero(self._cols.flags[:n] & ACTIVE)[0]
+
+    def __len__(self) -> int:
+        return self._active_count
+
+
+def _read_ltp_value(cols: _Columns, instrument_id: int) -> float | None:
+    if (cols.flags[instrument_id] & (ACTIVE | HAS_LTP)) != (ACTIVE | HAS_LTP):
+        return None
+    return float(cols.ltp[instrument_id])
+
+
+def _read_ltp_view(cols: _Columns, instrument_id: int) -> dict[str, Any] | None:
+    if (cols.flags[instrument_id] & (ACTIVE | HAS_LTP)) != (ACTIVE | HAS_LTP):
+        return None
+    return {
+        "value": float(cols.ltp[instrument_id]),
+        "timestamp": cols.ltp_timestamp[instrument_id],
+        "volume": _to_python(cols.ltp_volume[instrument_id]),
+    }
+
+
+def _read_quote_view(cols: _Columns, instrument_id: int) -> dict[str, Any] | None:
+    if (cols.flags[instrument_id] & (ACTIVE | HAS_QUOTE)) != (ACTIVE | HAS_QUOTE):
+        return None
+    values = cols.quote[instrument_id].tolist()
+    quote = dict(zip(QUOTE_FIELDS, values))
+    quote["volume"] = _to_python(values[_QUOTE_VOLUME])
+    quote["timestamp"] = cols.quote_timestamp[instrument_id]
+    return quote
+
+
+def _read_depth_view(cols: _Columns, instrument_id: int) -> dict[str, Any] | None:
+    if (cols.flags[instrument_id] & (ACTIVE | HAS_DEPTH)) != (ACTIVE | HAS_DEPTH):
+        return None
+    return cols.depth[instrument_id]
+
+
+def _read_last_update(cols: _Columns, instrument_id: int) -> float | None:
+    if not cols.flags[instrument_id] & ACTIVE:
+        return None
+    return float(cols.last_update[instrument_id])
+
+
+class CacheView(Mapping):
+    """
+    Read-only mapping of "EXCHANGE:SYMBOL" -> legacy cache entry dict,
+    backed by a LastValueStore. Entries are built on access.
+    """
+
+    def __init__(self, store: LastValueStore):
+        self._store = store
+
+    def _id(self, symbol_key: str) -> int | None:
+        exchange, _, symbol = symbol_key.partition(":")
+        instrument_id = self._store.get_id(exchange, symbol)
+        if instrument_id is None or not self._store.has(instrument_id):
+            return None
+        return instrument_id
+
+    def __getitem__(self, symbol_key: str) -> dict[str, Any]:
+        instrument_id = self._id(symbol_key)
+        entry = self._store.entry_view(instrument_id) if instrument_id is not None else None
+        if entry is None:
+            raise KeyError(symbol_key)
+        return entry
+
+    def __contains__(self, symbol_key) -> bool:
+        return isinstance(symbol_key, str) and self._id(symbol_key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for instrument_id in self._store.active_ids():
+            exchange, symbol = self._store.key_for(int(instrument_id))
+            yield f"{exchange}:{symbol}"
+
+    def __len__(self) -> int:
+        return len(self._store)
@@ -2,10 +2,13 @@ import importlib
 import traceback
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import pandas as pd
+
 from database.auth_db import get_auth_token_broker
 from database.token_db import get_token
 from utils.constants import VALID_EXCHANGES
 from utils.logging import get_logger
+from utils.response_format import format_table
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -327,12 +330,53 @@ def get_multiquotes_with_auth(
         return False, {"status": "error", "message": str(e)}, 500
 
 
+def multiquotes_to_frame(results: list[dict[str, Any]]) -> pd.DataFrame:
+    """
+    Flatten multiquote results into one row per symbol.
+
+    Args:
+        results: List of {'symbol', 'exchange', 'data' or 'error'} dicts
+
+    Returns:
+        DataFrame with symbol, exchange, the quote fields and an error column.
+        Integer fields stay integers (nullable Int64) when some symbols failed.
+    """
+    rows = [
+        {
+            "symbol": item.get("symbol"),
+            "exchange": item.get("exchange"),
+            **(item.get("data") or {}),
+            "error": item.get("error"),
+        }
+        for item in results
+    ]
+    frame = pd.DataFrame(rows, columns=None if rows else ["symbol", "exchange", "error"])
+    for column in frame.columns:
+        values = [row[column] for row in rows if row.get(column) is not None]
+        if values and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            frame[column] = frame[column].astype("Int64")
+    return frame
+
+
+def _format_multiquotes(
+    result: tuple[bool, dict[str, Any], int], response_format: str
+) -> tuple[bool, dict[str, Any], int]:
+    """Convert the results of a successful multiquotes response to the requested format."""
+    success, response, status_code = result
+    if success and response_format != "json":
+        response["results"] = format_table(
+            multiquotes_to_frame(response.get("results", [])), response_format
+        )
+    return success, response, status_code
+
+
 def get_multiquotes(
     symbols: list,
     api_key: str | None = None,
     auth_token: str | None = None,
     feed_token: str | None = None,
     broker: str | None = None,
+    response_format: str = "json",
 ) -> tuple[bool, dict[str, Any], int]:
     """
     Get real-time quotes for multiple symbols.
@@ -344,6 +388,8 @@ def get_multiquotes(
         auth_token: Direct broker authentication token (for internal calls)
         feed_token: Direct broker feed token (for internal calls)
         broker: Direct broker name (for internal calls)
+        response_format: Format of the results - 'json' (one object per symbol,
+                         default), 'columnar', 'arrow' or 'parquet' (see utils.response_format)
 
     Returns:
         Tuple containing:
@@ -358,11 +404,15 @@ def get_multiquotes(
         )
         if AUTH_TOKEN is None:
             return False, {"status": "error", "message": "Invalid openalgo apikey"}, 403
-        return get_multiquotes_with_auth(AUTH_TOKEN, FEED_TOKEN, broker_name, symbols)
+        return _format_multiquotes(
+            get_multiquotes_with_auth(AUTH_TOKEN, FEED_TOKEN, broker_name, symbols), response_format
+        )
 
     # Case 2: Direct internal call with auth_token and broker
     elif auth_token and broker:
-        return get_multiquotes_with_auth(auth_token, feed_token, broker, symbols)
+        return _format_multiquotes(
+            get_multiquotes_with_auth(auth_token, feed_token, broker, symbols), response_format
+        )
 
     # Case 3: Invalid parameters
     else:
@@ -8,9 +8,13 @@ import os
 import sys
 import logging
 
+import numpy as np
+import pandas as pd
+
 # Add repo root to path to allow imports (if running as script)
 try:
     from base_strategy import BaseStrategy
+    from trading_utils import calculate_adx, calculate_atr, calculate_rsi
 except ImportError:
     # Try setting path to find utils
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,6 +23,25 @@ except ImportError:
     if utils_dir not in sys.path:
         sys.path.insert(0, utils_dir)
     from base_strategy import BaseStrategy
+    from trading_utils import calculate_adx, calculate_atr, calculate_rsi
+
+# Parameters used by the backtest wrappers below
+BACKTEST_PARAMS = {
+    'period_adx': 14,
+    'period_rsi': 14,
+    'period_atr': 14,
+    'adx_threshold': 25,
+    'min_atr': 10,
+    'risk_per_trade': 0.02,
+}
+
+def momentum_action(adx, rsi, close, prev_close, params):
+    """Backtest entry rule: trend strength (ADX) with RSI and close direction."""
+    if adx > params['adx_threshold'] and rsi > 50 and close > prev_close:
+        return 'BUY'
+    if adx > params['adx_threshold'] and rsi < 50 and close < prev_close:
+        return 'SELL'
+    return 'HOLD'
 
 class MCXMomentumStrategy(BaseStrategy):
     def __init__(self, **kwargs):
@@ -161,29 +184,14 @@ class MCXMomentumStrategy(BaseStrategy):
         if not seasonality_ok:
             return 'HOLD', 0.0, {'reason': 'Seasonality Weak'}
 
-        action = 'HOLD'
-        if (current['adx'] > self.params['adx_threshold'] and
-            current['rsi'] > 50 and
-            current['close'] > prev['close']):
-            action = 'BUY'
-        elif (current['adx'] > self.params['adx_threshold'] and
-              current['rsi'] < 50 and
-              current['close'] < prev['close']):
-            action = 'SELL'
+        action = momentum_action(current['adx'], current['rsi'], current['close'], prev['close'], self.params)
 
         return action, 1.0, {'atr': current.get('atr', 0)}
 
 # Module level wrapper for SimpleBacktestEngine
 def generate_signal(df, client=None, symbol=None, params=None):
     # Default params
-    strat_params = {
-        'period_adx': 14,
-        'period_rsi': 14,
-        'period_atr': 14,
-        'adx_threshold': 25,
-        'min_atr': 10,
-        'risk_per_trade': 0.02,
-    }
+    strat_params = dict(BACKTEST_PARAMS)
     if params:
         strat_params.update(params)
 
@@ -200,5 +208,39 @@ def generate_signal(df, client=None, symbol=None, params=None):
 
     return strat.generate_signal(df)
 
+# Incremental hooks for SimpleBacktestEngine: indicators are computed once
+# over the whole frame and each bar reads its own row (same signals as above)
+def precompute(df, params=None):
+    strat_params = {**BACKTEST_PARAMS, **(params or {})}
+    df = df.copy()
+    df['rsi'] = calculate_rsi(df['close'], period=strat_params['period_rsi'])
+    df['atr'] = calculate_atr(df, period=strat_params['period_atr'])
+    df['adx'] = calculate_adx(df, period=strat_params['period_adx'])
+    return df
+
+def generate_signal_at(df, i, client=None, symbol=None, params=None):
+    strat_params = {**BACKTEST_PARAMS, **(params or {})}
+    if strat_params.get('seasonality_score', 50) <= 40:
+        return 'HOLD', 0.0, {'reason': 'Seasonality Weak'}
+
+    close = df['close'].iat[i]
+    prev_close = df['close'].iat[i - 1] if i > 0 else close
+    action = momentum_action(df['adx'].iat[i], df['rsi'].iat[i], close, prev_close, strat_params)
+    return action, 1.0, {'atr': df['atr'].iat[i]}
+
+# Vectorized hook for SimpleBacktestEngine.run_vectorized_backtest: the entry
+# rule above evaluated for every bar at once
+def generate_signals(df, params=None):
+    strat_params = {**BACKTEST_PARAMS, **(params or {})}
+    df = precompute(df, strat_params)
+    if strat_params.get('seasonality_score', 50) <= 40:
+        return pd.DataFrame({'signal': 0, 'atr': df['atr']}, index=df.index)
+
+    prev_close = df['close'].shift(1).fillna(df['close'])
+    trending = df['adx'] > strat_params['adx_threshold']
+    buy = trending & (df['rsi'] > 50) & (df['close'] > prev_close)
+    sell = trending & (df['rsi'] < 50) & (df['close'] < prev_close)
+    return pd.DataFrame({'signal': np.select([buy, sell], [1, -1], 0), 'atr': df['atr']}, index=df.index)
+
 if __name__ == "__main__":
     MCXMomentumStrategy.cli()
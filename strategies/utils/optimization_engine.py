@@ -2,18 +2,28 @@
 Optimization Engine for Strategy Parameters
 -------------------------------------------
 Implements grid search and Bayesian optimization for finding optimal strategy parameters.
+
+The price history is loaded once per optimizer and reused by every backtest.
+With workers > 1 parameter sets are evaluated in a process pool: the bars are
+written once to an Arrow IPC file that each worker memory-maps, and results
+stream back as they complete (progress callback, optional early stopping).
 """
 import itertools
 import json
 import logging
 import os
+import shutil
 import sys
+import tempfile
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 # Add utils to path
 utils_path = Path(__file__).parent
@@ -75,12 +85,200 @@ def calculate_composite_score(metrics: dict[str, Any]) -> float:
 
     return composite
 
-class GridSearchOptimizer:
-    """Grid search optimizer for strategy parameters"""
+def evaluate_parameters(
+    strategy_name: str,
+    parameters: dict[str, Any],
+    data: pd.DataFrame,
+    symbol: str,
+    exchange: str,
+    start_date: str,
+    end_date: str,
+    initial_capital: float = 1000000.0,
+    interval: str = "15m",
+    api_key: str = None,
+    host: str = "http://127.0.0.1:5001"
+) -> dict[str, Any]:
+    """
+    Backtest one parameter set on preloaded bars and score it.
+
+    Strategies with a generate_signals() hook use the vectorized backtest,
+    others the bar loop (incremental when the strategy supports it).
+
+    Returns:
+        Result dict with parameters, metrics and composite_score, or error
+    """
+    try:
+        # Create strategy module with injected parameters
+        strategy_module = create_strategy_with_params(strategy_name, parameters)
+
+        # Initialize backtest engine
+        engine = SimpleBacktestEngine(
+            initial_capital=initial_capital,
+            api_key=api_key,
+            host=host
+        )
+
+        if hasattr(strategy_module, 'generate_signals'):
+            results = engine.run_vectorized_backtest(
+                strategy_module, symbol, exchange, start_date, end_date,
+                interval=interval, data=data, full_results=False
+            )
+        else:
+            results = engine.run_backtest(
+                strategy_module, symbol, exchange, start_date, end_date,
+                interval=interval, data=data
+            )
+
+        if 'error' in results:
+            return {
+                'parameters': parameters,
+                'error': results['error'],
+                'composite_score': 0.0
+            }
+
+        # Calculate composite score
+        metrics = results.get('metrics', {})
+        composite_score = calculate_composite_score(metrics)
+
+        return {
+            'parameters': parameters,
+            'metrics': metrics,
+            'composite_score': composite_score,
+            'total_trades': results.get('total_trades', 0),
+            'final_capital': results.get('final_capital', initial_capital)
+        }
+
+    except Exception as e:
+        logger.error(f"Error running backtest with params {parameters}: {e}")
+        return {
+            'parameters': parameters,
+            'error': str(e),
+            'composite_score': 0.0
+        }
+
+def share_frame(df: pd.DataFrame, directory: str) -> str:
+    """Write bars to an Arrow IPC file that worker processes memory-map"""
+    path = os.path.join(directory, "bars.arrow")
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+def load_shared_frame(path: str) -> pd.DataFrame:
+    """Read bars written by share_frame() through a memory map"""
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+# Per-process state of sweep workers, set by _init_worker
+_worker_data: pd.DataFrame | None = None
+_worker_config: dict[str, Any] = {}
+
+def _init_worker(data_path: str, config: dict[str, Any]):
+    global _worker_data, _worker_config
+    # One banner per backtest from every worker drowns the parent's progress log
+    logging.getLogger("BacktestEngine").setLevel(logging.WARNING)
+    _worker_data = load_shared_frame(data_path)
+    _worker_config = config
+
+def _evaluate_in_worker(parameters: dict[str, Any]) -> dict[str, Any]:
+    return evaluate_parameters(parameters=parameters, data=_worker_data, **_worker_config)
+
+def run_parameter_sweep(
+    param_sets: list[dict[str, Any]],
+    config: dict[str, Any],
+    data: pd.DataFrame,
+    workers: int = 1,
+    progress_callback: Callable[[int, int, dict[str, Any]], None] | None = None,
+    patience: int | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Evaluate parameter sets, yielding each result as soon as it is available.
+
+    Args:
+        param_sets: Parameter dicts to backtest
+        config: evaluate_parameters() arguments other than parameters and data
+        data: Preloaded bars shared by every backtest
+        workers: Worker processes (1 = evaluate in this process)
+        progress_callback: Called as (completed, total, result) after each result
+        patience: Stop once this many results in a row did not improve the
+                  best composite score; pending evaluations are cancelled
+
+    Yields:
+        Result dicts in completion order
+    """
+    total = len(param_sets)
+    best_score = -float('inf')
+    since_best = 0
+
+    def record(completed: int, result: dict[str, Any]) -> bool:
+        # Report a result; True when the sweep should stop early
+        nonlocal best_score, since_best
+        if progress_callback:
+            progress_callback(completed, total, result)
+        elif completed % 10 == 0:
+            logger.info(f"Progress: {completed}/{total} combinations tested")
+
+        if 'error' not in result and result['composite_score'] > best_score:
+            best_score = result['composite_score']
+            since_best = 0
+        else:
+            since_best += 1
+        if patience and since_best >= patience and completed < total:
+            logger.info(f"Early stopping after {completed}/{total}: no improvement in {patience} results "
+                        f"(best score {best_score:.2f})")
+            return True
+        return False
+
+    if workers <= 1 or total <= 1:
+        for completed, params in enumerate(param_sets, 1):
+            result = evaluate_parameters(parameters=params, data=data, **config)
+            yield result
+            if record(completed, result):
+                return
+        return
+
+    workers = min(workers, total)
+    shared_dir = tempfile.mkdtemp(prefix="openalgo_optimizer_")
+    executor = None
+    try:
+        data_path = share_frame(data, shared_dir)
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(data_path, config)
+        )
+        pending = {executor.submit(_evaluate_in_worker, params): params for params in param_sets}
+        completed = 0
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                params = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Worker failed for params {params}: {e}")
+                    result = {'parameters': params, 'error': str(e), 'composite_score': 0.0}
+                completed += 1
+                yield result
+                if record(completed, result):
+                    return
+    finally:
+        # Also runs when the caller stops consuming: drop evaluations not started yet
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+class BaseOptimizer:
+    """Settings and the shared price history of an optimization run"""
 
     def __init__(self, strategy_name: str, symbol: str, exchange: str,
                  start_date: str, end_date: str, initial_capital: float = 1000000.0,
-                 api_key: str = None, host: str = "http://127.0.0.1:5001"):
+                 api_key: str = None, host: str = "http://127.0.0.1:5001",
+                 interval: str = "15m", data: pd.DataFrame | None = None):
+        """
+        Args:
+            interval: Bar interval of the backtests
+            data: Preloaded bars for start_date..end_date (default: fetched
+                  once on first use)
+        """
         self.strategy_name = strategy_name
         self.symbol = symbol
         self.exchange = exchange
@@ -89,6 +287,41 @@ class GridSearchOptimizer:
         self.initial_capital = initial_capital
         self.api_key = api_key or os.getenv('OPENALGO_APIKEY', 'demo_key')
         self.host = host
+        self.interval = interval
+        self.data = data
+
+    def load_data(self) -> pd.DataFrame:
+        """Fetch the price history once; every backtest of the run reuses it"""
+        if self.data is None:
+            engine = SimpleBacktestEngine(
+                initial_capital=self.initial_capital,
+                api_key=self.api_key,
+                host=self.host
+            )
+            self.data, _ = engine.load_backtest_data(
+                self.symbol, self.exchange, self.start_date, self.end_date, self.interval
+            )
+        return self.data
+
+    def sweep_config(self) -> dict[str, Any]:
+        """evaluate_parameters() arguments shared by all parameter sets"""
+        return {
+            'strategy_name': self.strategy_name,
+            'symbol': self.symbol,
+            'exchange': self.exchange,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'initial_capital': self.initial_capital,
+            'interval': self.interval,
+            'api_key': self.api_key,
+            'host': self.host
+        }
+
+class GridSearchOptimizer(BaseOptimizer):
+    """Grid search optimizer for strategy parameters"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
         self.results: list[dict[str, Any]] = []
 
@@ -105,60 +338,19 @@ class GridSearchOptimizer:
 
     def run_backtest_with_params(self, parameters: dict[str, Any]) -> dict[str, Any]:
         """Run backtest with given parameters"""
-        try:
-            # Create strategy module with injected parameters
-            strategy_module = create_strategy_with_params(self.strategy_name, parameters)
-
-            # Initialize backtest engine
-            engine = SimpleBacktestEngine(
-                initial_capital=self.initial_capital,
-                api_key=self.api_key,
-                host=self.host
-            )
-
-            # Run backtest
-            results = engine.run_backtest(
-                strategy_module=strategy_module,
-                symbol=self.symbol,
-                exchange=self.exchange,
-                start_date=self.start_date,
-                end_date=self.end_date,
-                interval="15m"
-            )
-
-            if 'error' in results:
-                return {
-                    'parameters': parameters,
-                    'error': results['error'],
-                    'composite_score': 0.0
-                }
-
-            # Calculate composite score
-            metrics = results.get('metrics', {})
-            composite_score = calculate_composite_score(metrics)
-
-            return {
-                'parameters': parameters,
-                'metrics': metrics,
-                'composite_score': composite_score,
-                'total_trades': results.get('total_trades', 0),
-                'final_capital': results.get('final_capital', self.initial_capital)
-            }
-
-        except Exception as e:
-            logger.error(f"Error running backtest with params {parameters}: {e}")
-            return {
-                'parameters': parameters,
-                'error': str(e),
-                'composite_score': 0.0
-            }
+        return evaluate_parameters(parameters=parameters, data=self.load_data(), **self.sweep_config())
 
-    def optimize(self, max_combinations: int | None = None) -> list[dict[str, Any]]:
+    def optimize(self, max_combinations: int | None = None, workers: int = 1,
+                 progress_callback: Callable[[int, int, dict[str, Any]], None] | None = None,
+                 patience: int | None = None) -> list[dict[str, Any]]:
         """
         Run grid search optimization.
         
         Args:
             max_combinations: Maximum number of combinations to test (None = all)
+            workers: Worker processes evaluating combinations in parallel
+            progress_callback: Called as (completed, total, result) per result
+            patience: Stop after this many results in a row without a new best score
         
         Returns:
             List of results sorted by composite score (best first)
@@ -181,17 +373,18 @@ class GridSearchOptimizer:
             import random
             combinations = random.sample(combinations, max_combinations)
 
-        logger.info(f"Testing {len(combinations)} parameter combinations...")
+        data = self.load_data()
+        if data.empty:
+            logger.error(f"No data available to optimize {self.strategy_name}")
+            return []
+
+        logger.info(f"Testing {len(combinations)} parameter combinations on {max(1, workers)} worker(s)...")
 
         # Run backtests
-        for i, params in enumerate(combinations, 1):
-            logger.info(f"Testing combination {i}/{len(combinations)}: {params}")
-            result = self.run_backtest_with_params(params)
+        for result in run_parameter_sweep(combinations, self.sweep_config(), data,
+                                          workers, progress_callback, patience):
             self.results.append(result)
 
-            if i % 10 == 0:
-                logger.info(f"Progress: {i}/{len(combinations)} combinations tested")
-
         # Sort by composite score (best first)
         self.results.sort(key=lambda x: x.get('composite_score', 0), reverse=True)
 
@@ -204,21 +397,17 @@ class GridSearchOptimizer:
         valid_results = [r for r in self.results if 'error' not in r]
         return valid_results[:top_n]
 
-class BayesianOptimizer:
+class BayesianOptimizer(BaseOptimizer):
     """Bayesian optimization for strategy parameters"""
 
     def __init__(self, strategy_name: str, symbol: str, exchange: str,
                  start_date: str, end_date: str, initial_capital: float = 1000000.0,
                  api_key: str = None, host: str = "http://127.0.0.1:5001",
-                 initial_params: dict[str, Any] | None = None):
-        self.strategy_name = strategy_name
-        self.symbol = symbol
-        self.exchange = exchange
-        self.start_date = start_date
-        self.end_date = end_date
-        self.initial_capital = initial_capital
-        self.api_key = api_key or os.getenv('OPENALGO_APIKEY', 'demo_key')
-        self.host = host
+                 initial_params: dict[str, Any] | None = None,
+                 interval: str = "15m", data: pd.DataFrame | None = None):
+        super().__init__(strategy_name, symbol, exchange, start_date, end_date,
+                         initial_capital=initial_capital, api_key=api_key, host=host,
+                         interval=interval, data=data)
         self.initial_params = initial_params or {}
 
         self.history: list[dict[str, Any]] = []
@@ -271,28 +460,13 @@ class BayesianOptimizer:
 
         try:
             # Run backtest
-            strategy_module = create_strategy_with_params(self.strategy_name, params)
-
-            engine = SimpleBacktestEngine(
-                initial_capital=self.initial_capital,
-                api_key=self.api_key,
-                host=self.host
-            )
-
-            results = engine.run_backtest(
-                strategy_module=strategy_module,
-                symbol=self.symbol,
-                exchange=self.exchange,
-                start_date=self.start_date,
-                end_date=self.end_date,
-                interval="15m"
-            )
+            results = evaluate_parameters(parameters=params, data=self.load_data(), **self.sweep_config())
 
             if 'error' in results:
                 return 1000.0  # Large penalty for errors
 
-            metrics = results.get('metrics', {})
-            composite_score = calculate_composite_score(metrics)
+            metrics = results['metrics']
+            composite_score = results['composite_score']
 
             # Track history
             self.history.append({
@@ -314,20 +488,29 @@ class BayesianOptimizer:
             logger.error(f"Error in objective function: {e}")
             return 1000.0
 
-    def optimize(self, n_iterations: int = 50, n_initial_points: int = 10) -> dict[str, Any]:
+    def optimize(self, n_iterations: int = 50, n_initial_points: int = 10, workers: int = 1,
+                 progress_callback: Callable[[int, int, dict[str, Any]], None] | None = None,
+                 patience: int | None = None) -> dict[str, Any]:
         """
         Run Bayesian optimization.
         
         Args:
             n_iterations: Number of optimization iterations
             n_initial_points: Number of random initial points
+            workers: Worker processes for the random search fallback (each
+                     Bayesian step depends on the previous ones and runs in
+                     this process)
+            progress_callback: Random search fallback: called as
+                               (completed, total, result) per result
+            patience: Random search fallback: stop after this many results
+                      in a row without a new best score
         
         Returns:
             Best parameters and score
         """
         if not SKOPT_AVAILABLE:
             logger.warning("scikit-optimize not available, using random search fallback")
-            return self._random_search(n_iterations)
+            return self._random_search(n_iterations, workers, progress_callback, patience)
 
         logger.info(f"Starting Bayesian optimization for {self.strategy_name}")
 
@@ -390,60 +573,52 @@ class BayesianOptimizer:
             logger.error(f"Bayesian optimization error: {e}")
             return {'error': str(e)}
 
-    def _random_search(self, n_iterations: int) -> dict[str, Any]:
+    def _random_search(self, n_iterations: int, workers: int = 1,
+                       progress_callback: Callable[[int, int, dict[str, Any]], None] | None = None,
+                       patience: int | None = None) -> dict[str, Any]:
         """Fallback random search if scikit-optimize not available"""
         logger.info(f"Running random search (fallback) for {n_iterations} iterations")
 
         param_ranges = get_continuous_ranges(self.strategy_name)
 
-        for i in range(n_iterations):
-            # Generate random parameters
+        # Generate random parameters
+        param_sets = []
+        for _ in range(n_iterations):
             params = {}
             for param_name, (low, high) in param_ranges.items():
                 if 'PERIOD' in param_name or param_name in ['MACD_FAST', 'MACD_SLOW', 'MACD_SIGNAL']:
                     params[param_name] = int(np.random.uniform(low, high))
                 else:
                     params[param_name] = np.random.uniform(low, high)
+            param_sets.append(params)
 
-            # Run backtest
-            try:
-                strategy_module = create_strategy_with_params(self.strategy_name, params)
-                engine = SimpleBacktestEngine(
-                    initial_capital=self.initial_capital,
-                    api_key=self.api_key,
-                    host=self.host
-                )
-
-                results = engine.run_backtest(
-                    strategy_module=strategy_module,
-                    symbol=self.symbol,
-                    exchange=self.exchange,
-                    start_date=self.start_date,
-                    end_date=self.end_date,
-                    interval="15m"
-                )
-
-                if 'error' not in results:
-                    metrics = results.get('metrics', {})
-                    composite_score = calculate_composite_score(metrics)
-
-                    self.history.append({
-                        'parameters': params.copy(),
-                        'composite_score': composite_score,
-                        'metrics': metrics,
-                        'iteration': i + 1
-                    })
-
-                    if composite_score > self.best_score:
-                        self.best_score = composite_score
-                        self.best_params = params.copy()
-
-            except Exception as e:
-                logger.debug(f"Random search iteration {i+1} failed: {e}")
+        data = self.load_data()
+        if data.empty:
+            logger.error(f"No data available to optimize {self.strategy_name}")
+            return {'error': 'No data available'}
+
+        completed = 0
+        for result in run_parameter_sweep(param_sets, self.sweep_config(), data,
+                                          workers, progress_callback, patience):
+            completed += 1
+            if 'error' in result:
+                logger.debug(f"Random search iteration {completed} failed: {result['error']}")
+                continue
+
+            self.history.append({
+                'parameters': result['parameters'].copy(),
+                'composite_score': result['composite_score'],
+                'metrics': result['metrics'],
+                'iteration': completed
+            })
+
+            if result['composite_score'] > self.best_score:
+                self.best_score = result['composite_score']
+                self.best_params = result['parameters'].copy()
 
         return {
             'best_parameters': self.best_params,
             'best_score': self.best_score,
-            'n_iterations': n_iterations,
+            'n_iterations': completed,
             'history': self.history
         }
@@ -45,6 +45,27 @@ SLIPPAGE_BPS = 5  # 5 basis points slippage
 TRANSACTION_COST_BPS = 3  # 3 basis points transaction cost
 TOTAL_COST_BPS = SLIPPAGE_BPS + TRANSACTION_COST_BPS
 
+# Bar prices read by the engine itself (SL/TP checks, MTM)
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+def get_bar_duration(interval: str) -> timedelta:
+    """Convert an interval string (e.g. '15m', '1h') to the duration of one bar"""
+    try:
+        # Convert interval string (e.g. '15m') to timedelta
+        # pandas usually handles '15m' as 15 minutes in to_timedelta if we strictly parse,
+        # but standard aliases might vary. '15min' is safe.
+        # Simplistic mapping for common intervals
+        if interval.endswith('m') and not interval.endswith('min'):
+            # Treat 'm' as minutes for backtest context
+            delta_str = interval.replace('m', 'min')
+        else:
+            delta_str = interval
+
+        return pd.to_timedelta(delta_str)
+    except:
+        # Fallback to 15m default
+        return timedelta(minutes=15)
+
 @dataclass
 class Trade:
     """Represents a single trade"""
@@ -211,6 +232,52 @@ class SimpleBacktestEngine:
             logger.error(f"Error loading historical data: {e}")
             return pd.DataFrame()
 
+    def load_backtest_data(
+        self,
+        symbol: str,
+        exchange: str,
+        start_date: str,
+        end_date: str,
+        interval: str = "15m",
+        data: pd.DataFrame | None = None
+    ) -> tuple[pd.DataFrame, str | None]:
+        """
+        Load historical data and check it is usable for a backtest.
+
+        Args:
+            data: Bars loaded by the caller (e.g. shared by an optimizer);
+                  skips the API request and the data quality report
+
+        Returns:
+            (DataFrame, None) on success, or (empty DataFrame, error message)
+        """
+        df = self.load_historical_data(symbol, exchange, start_date, end_date, interval) if data is None else data
+
+        if df.empty:
+            logger.error("No data available for backtest")
+            return pd.DataFrame(), 'No data available'
+
+        # Ensure required columns exist
+        required_cols = ['open', 'high', 'low', 'close', 'volume']
+        missing_cols = [col for col in required_cols if col not in df.columns]
+        if missing_cols:
+            logger.error(f"Missing required columns: {missing_cols}")
+            return pd.DataFrame(), f'Missing columns: {missing_cols}'
+
+        # Validate Data
+        if DataValidator and data is None:
+            val_res = DataValidator.validate_ohlcv(df, symbol=symbol)
+            if not val_res['is_valid']:
+                logger.warning(f"Data Validation Failed: {val_res['issues']}")
+                # We log warning but proceed, or return error?
+                # For now, just warn loudly
+            elif val_res['issues']:
+                logger.warning(f"Data Quality Issues: {val_res['issues']}")
+            else:
+                logger.info("Data Validation Passed ✅")
+
+        return df, None
+
     def apply_costs(self, price: float, quantity: int, side: str) -> float:
         """
         Apply slippage and transaction costs to a trade.
@@ -232,17 +299,30 @@ class SimpleBacktestEngine:
             # Receive less when selling
             return price * (1 - cost_factor)
 
-    def check_exits(self, current_bar: pd.Series, position: Position, current_time: datetime, strategy_module=None, interval="15m", historical_df=None) -> tuple[bool, str | None, float | None]:
+    def check_exits(self, current_bar: pd.Series, position: Position, current_time: datetime, strategy_module=None, interval="15m", historical_df=None, data=None, bar_index=None) -> tuple[bool, str | None, float | None]:
         """
         Check if position should be exited based on SL/TP, Time Stop, Breakeven, or Custom Strategy Exit.
+
+        In incremental mode the full (precomputed) frame and the bar position are
+        passed as data/bar_index; a strategy check_exit_at(data, i, position) hook
+        is preferred there, and check_exit() gets a view of the bars up to i.
         """
         current_price = current_bar['close']
         high = current_bar['high']
         low = current_bar['low']
 
         # 0. Custom Strategy Exit
-        if strategy_module and hasattr(strategy_module, 'check_exit'):
+        if strategy_module and data is not None and hasattr(strategy_module, 'check_exit_at'):
+            try:
+                should_exit, reason, price = strategy_module.check_exit_at(data, bar_index, position)
+                if should_exit:
+                    return True, reason, (price if price else current_price)
+            except Exception as e:
+                logger.error(f"Error in strategy check_exit_at: {e}")
+        elif strategy_module and hasattr(strategy_module, 'check_exit'):
             try:
+                if historical_df is None and data is not None:
+                    historical_df = data.iloc[:bar_index + 1]
                 should_exit, reason, price = strategy_module.check_exit(historical_df, position)
                 if should_exit:
                     return True, reason, (price if price else current_price)
@@ -252,21 +332,7 @@ class SimpleBacktestEngine:
         # 1. Time Stop
         if strategy_module and hasattr(strategy_module, 'TIME_STOP_BARS'):
             # Calculate duration limit based on interval
-            try:
-                # Convert interval string (e.g. '15m') to timedelta
-                # pandas usually handles '15m' as 15 minutes in to_timedelta if we strictly parse,
-                # but standard aliases might vary. '15min' is safe.
-                # Simplistic mapping for common intervals
-                if interval.endswith('m') and not interval.endswith('min'):
-                    # Treat 'm' as minutes for backtest context
-                    delta_str = interval.replace('m', 'min')
-                else:
-                    delta_str = interval
-
-                bar_duration = pd.to_timedelta(delta_str)
-            except:
-                # Fallback to 15m default
-                bar_duration = timedelta(minutes=15)
+            bar_duration = get_bar_duration(interval)
 
             time_diff = current_time - position.entry_time
             # Check if duration exceeds allowed bars
@@ -320,11 +386,29 @@ class SimpleBacktestEngine:
         exchange: str,
         start_date: str,
         end_date: str,
-        interval: str = "15m"
+        interval: str = "15m",
+        incremental: bool | None = None,
+        lookback: int | None = None,
+        data: pd.DataFrame | None = None
     ) -> dict[str, Any]:
         """
         Run backtest on a strategy.
-        
+
+        The default mode hands generate_signal() a copy of every bar so far,
+        so each bar costs as much as the history before it. Incremental mode
+        makes the loop O(n):
+
+        - precompute(df) -> df, if the strategy defines it, is called once with
+          the full frame and may add indicator columns. Values at row i must
+          only depend on rows <= i (rolling/ewm/cumulative indicators), and
+          the returned frame must keep the bars and their order.
+        - generate_signal_at(df, i, client=..., symbol=...) and
+          check_exit_at(df, i, position), if defined, read row i of that frame
+          instead of receiving a history slice.
+        - Strategies with only generate_signal(df, ...) still work: they get a
+          view of the bars up to i (the last `lookback` bars if set) instead of
+          a copy, so they must not modify it in place.
+
         Args:
             strategy_module: Strategy module with generate_signal() function
             symbol: Trading symbol
@@ -332,7 +416,12 @@ class SimpleBacktestEngine:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             interval: Data interval
-        
+            incremental: Use incremental mode (default: when the strategy
+                         defines generate_signal_at)
+            lookback: Bars in the incremental generate_signal() view
+                      (default: all bars so far)
+            data: Preloaded bars to use instead of fetching start_date..end_date
+
         Returns:
             Dictionary with backtest results
         """
@@ -352,47 +441,50 @@ class SimpleBacktestEngine:
         self.equity_curve = []
 
         # Load historical data
-        df = self.load_historical_data(symbol, exchange, start_date, end_date, interval)
-
-        if df.empty:
-            logger.error("No data available for backtest")
-            return {'error': 'No data available'}
-
-        # Ensure required columns exist
-        required_cols = ['open', 'high', 'low', 'close', 'volume']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            logger.error(f"Missing required columns: {missing_cols}")
-            return {'error': f'Missing columns: {missing_cols}'}
-
-        # Validate Data
-        if DataValidator:
-            val_res = DataValidator.validate_ohlcv(df, symbol=symbol)
-            if not val_res['is_valid']:
-                logger.warning(f"Data Validation Failed: {val_res['issues']}")
-                # We log warning but proceed, or return error?
-                # For now, just warn loudly
-            elif val_res['issues']:
-                logger.warning(f"Data Quality Issues: {val_res['issues']}")
-            else:
-                logger.info("Data Validation Passed ✅")
+        df, error = self.load_backtest_data(symbol, exchange, start_date, end_date, interval, data=data)
+        if error:
+            return {'error': error}
 
         # Run backtest
         logger.info(f"Processing {len(df)} bars...")
 
+        if incremental is None:
+            incremental = hasattr(strategy_module, 'generate_signal_at')
+        signal_at = incremental and hasattr(strategy_module, 'generate_signal_at')
+
+        if incremental:
+            if hasattr(strategy_module, 'precompute'):
+                bars = len(df)
+                df = strategy_module.precompute(df)
+                if len(df) != bars:
+                    logger.error(f"precompute() returned {len(df)} bars, expected {bars}")
+                    return {'error': 'precompute() must keep every bar'}
+            prices = df[list(PRICE_COLUMNS)].to_numpy(dtype=float)
+            logger.info("Incremental mode" + (" (precomputed signals)" if signal_at else ""))
+
         # Use a rolling window for signal generation
         window_size = 50  # Minimum bars needed for indicators
 
         for i in range(window_size, len(df)):
-            current_bar = df.iloc[i]
             current_time = df.index[i]
 
-            # Get historical data up to current bar
-            historical_df = df.iloc[:i+1].copy()
+            if incremental:
+                current_bar = dict(zip(PRICE_COLUMNS, prices[i]))
+                # Zero-copy view, only needed by the generate_signal() path
+                start = 0 if lookback is None else max(0, i + 1 - lookback)
+                historical_df = None if signal_at else df.iloc[start:i + 1]
+            else:
+                current_bar = df.iloc[i]
+                # Get historical data up to current bar
+                historical_df = df.iloc[:i+1].copy()
 
             # Check for exits first
             for pos in self.positions[:]:  # Copy list to avoid modification during iteration
-                should_exit, exit_reason, exit_price = self.check_exits(current_bar, pos, current_time, strategy_module, interval=interval, historical_df=historical_df)
+                should_exit, exit_reason, exit_price = self.check_exits(
+                    current_bar, pos, current_time, strategy_module, interval=interval,
+                    historical_df=historical_df,
+                    data=df if incremental else None, bar_index=i
+                )
 
                 if should_exit:
                     # Close position
@@ -402,7 +494,7 @@ class SimpleBacktestEngine:
                     if pos.side == 'BUY':
                         pnl = (exit_price_with_costs - entry_price_with_costs) * pos.quantity
                     else:
-                        pnl = (entry_price_with_costs - exit_price_with_costs) * pos.quantity
+                        pnl = (entry_price_with_costs - exit_price_with_costs) * abs(pos.quantity)
 
                     pnl_pct = (pnl / (entry_price_with_costs * abs(pos.quantity))) * 100
 
@@ -431,12 +523,19 @@ class SimpleBacktestEngine:
             # Generate signal if no position
             if len(self.positions) == 0:
                 try:
-                    # Call strategy's generate_signal function
-                    action, score, details = strategy_module.generate_signal(
-                        historical_df,
-                        client=self.client,
-                        symbol=symbol
-                    )
+                    if signal_at:
+                        action, score, details = strategy_module.generate_signal_at(
+                            df, i,
+                            client=self.client,
+                            symbol=symbol
+                        )
+                    else:
+                        # Call strategy's generate_signal function
+                        action, score, details = strategy_module.generate_signal(
+                            historical_df,
+                            client=self.client,
+                            symbol=symbol
+                        )
 
                     if action in ['BUY', 'SELL']:
                         # Calculate position size
@@ -580,6 +679,50 @@ class SimpleBacktestEngine:
             'metrics': self.metrics
         }
 
+    def run_vectorized_backtest(
+        self,
+        strategy_module,
+        symbol: str,
+        exchange: str,
+        start_date: str,
+        end_date: str,
+        interval: str = "15m",
+        data: pd.DataFrame | None = None,
+        full_results: bool = True
+    ) -> dict[str, Any]:
+        """
+        Run a backtest from signal arrays instead of the bar-by-bar loop.
+
+        The strategy module must define generate_signals(df) returning a
+        DataFrame (or dict of arrays) aligned with df with a 'signal' column
+        (>0 buy, <0 sell, 0 hold) and optionally 'atr', 'stop_loss',
+        'take_profit', 'exit' and 'quantity'. Fills, costs and metrics follow
+        run_backtest(), see vectorized_backtest.py.
+
+        Args:
+            data: Preloaded bars to use instead of fetching start_date..end_date
+            full_results: Include trades and the equity curve
+
+        Returns:
+            Dictionary with backtest results, shaped like run_backtest()
+        """
+        from vectorized_backtest import backtest_strategy_signals
+
+        logger.info(f"Starting vectorized backtest: {symbol} {start_date} to {end_date} ({interval})")
+
+        df, error = self.load_backtest_data(symbol, exchange, start_date, end_date, interval, data=data)
+        if error:
+            return {'error': error}
+
+        results = backtest_strategy_signals(
+            strategy_module, df, initial_capital=self.initial_capital, interval=interval,
+            full_results=full_results
+        )
+        if 'error' not in results:
+            self.current_capital = results['final_capital']
+            self.metrics = results['metrics']
+        return results
+
     def calculate_metrics(self) -> dict[str, Any]:
         """Calculate performance metrics"""
         if not self.closed_trades:
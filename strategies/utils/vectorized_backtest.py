@@ -0,0 +1,383 @@
+"""
+Vectorized Backtest Engine
+--------------------------
+Backtests strategies that compute their entry signals for every bar in one
+pass over OHLCV data, instead of being called bar by bar.
+
+Fills follow SimpleBacktestEngine.run_backtest: one position at a time,
+entries at the close of a signal bar after the warm-up bars, exits checked
+from the next bar in the order exit signal, time stop, stop loss, take profit
+(stops fill at their level, or at the open when the bar gaps through it),
+breakeven moves the stop before the SL/TP check, and the open position is
+closed at the last close. Costs follow apply_costs(), and the metrics match
+calculate_metrics().
+
+Python work is per trade, not per bar: each position finds its exit bar
+with a numpy scan, and P&L, the equity curve and the metrics are array
+operations, so a parameter sweep costs milliseconds per run.
+"""
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Add utils to path
+utils_path = Path(__file__).parent
+if str(utils_path) not in sys.path:
+    sys.path.insert(0, str(utils_path))
+
+from simple_backtest_engine import PRICE_COLUMNS, TOTAL_COST_BPS, get_bar_duration
+
+logger = logging.getLogger("VectorizedBacktest")
+
+# Bars searched for an exit before the look-ahead window doubles
+SCAN_CHUNK_BARS = 256
+
+def atr_levels(
+    close: np.ndarray,
+    atr: np.ndarray | None,
+    signals: np.ndarray,
+    sl_multiplier: float = 1.5,
+    tp_multiplier: float = 2.5
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stop loss and take profit for an entry at every bar, as run_backtest sets them.
+
+    Args:
+        close: Close prices
+        atr: ATR per bar (None or values <= 0 use the 2% fallback)
+        signals: Entry direction per bar (>0 buy, <0 sell)
+        sl_multiplier: Stop distance in ATRs
+        tp_multiplier: Target distance in ATRs
+
+    Returns:
+        (stop_loss, take_profit) arrays
+    """
+    close = np.asarray(close, dtype=float)
+    atr = np.zeros_like(close) if atr is None else np.asarray(atr, dtype=float)
+    long = np.asarray(signals) >= 0
+
+    with np.errstate(invalid='ignore'):
+        has_atr = atr > 0
+    stop_loss = np.where(
+        has_atr,
+        np.where(long, close - (sl_multiplier * atr), close + (sl_multiplier * atr)),
+        np.where(long, close * 0.98, close * 1.02)
+    )
+    take_profit = np.where(
+        has_atr,
+        np.where(long, close + (tp_multiplier * atr), close - (tp_multiplier * atr)),
+        np.where(long, close * 1.02, close * 0.98)
+    )
+    return stop_loss, take_profit
+
+def compute_metrics(
+    pnl: np.ndarray,
+    pnl_pct: np.ndarray,
+    equity: np.ndarray,
+    initial_capital: float,
+    final_capital: float
+) -> dict[str, Any]:
+    """
+    Performance metrics of a list of trades, same keys and formulas as
+    SimpleBacktestEngine.calculate_metrics().
+
+    Args:
+        pnl: Trade P&L
+        pnl_pct: Trade P&L in percent of the entry value
+        equity: Equity curve values
+        initial_capital: Starting capital
+        final_capital: Capital after the last trade
+
+    Returns:
+        Dictionary with performance metrics
+    """
+    if len(pnl) == 0:
+        return {
+            'total_return_pct': 0.0,
+            'win_rate': 0.0,
+            'profit_factor': 0.0,
+            'max_drawdown_pct': 0.0,
+            'avg_win': 0.0,
+            'avg_loss': 0.0,
+            'largest_win': 0.0,
+            'largest_loss': 0.0,
+            'sharpe_ratio': 0.0
+        }
+
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+
+    total_profit = float(wins.sum())
+    total_loss = abs(float(losses.sum())) if len(losses) else 1
+    profit_factor = total_profit / total_loss if total_loss > 0 else 0
+
+    if len(equity):
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(((peak - equity) / peak * 100).max())
+    else:
+        max_drawdown = 0
+
+    sharpe_ratio = 0
+    if len(pnl) > 1:
+        std_return = np.std(pnl_pct)
+        if std_return > 0:
+            sharpe_ratio = float(np.mean(pnl_pct) / std_return * np.sqrt(252))
+
+    return {
+        'total_return_pct': (final_capital - initial_capital) / initial_capital * 100,
+        'win_rate': len(wins) / len(pnl) * 100,
+        'profit_factor': profit_factor,
+        'max_drawdown_pct': max_drawdown,
+        'avg_win': total_profit / len(wins) if len(wins) else 0,
+        'avg_loss': float(losses.mean()) if len(losses) else 0,
+        'largest_win': float(wins.max()) if len(wins) else 0,
+        'largest_loss': float(losses.min()) if len(losses) else 0,
+        'sharpe_ratio': sharpe_ratio,
+        'total_profit': total_profit,
+        'total_loss': -total_loss
+    }
+
+def run_vectorized_backtest(
+    df: pd.DataFrame,
+    signals,
+    stop_loss=None,
+    take_profit=None,
+    exits=None,
+    quantity=1,
+    initial_capital: float = 1000000.0,
+    warmup: int = 50,
+    time_stop_bars: int | None = None,
+    breakeven_r: float | None = None,
+    interval: str = "15m",
+    full_results: bool = True
+) -> dict[str, Any]:
+    """
+    Backtest entry signals against OHLC bars.
+
+    Args:
+        df: OHLC bars with a DatetimeIndex
+        signals: Entry direction per bar (>0 buy, <0 sell, 0 or NaN hold)
+        stop_loss: Stop loss for an entry at each bar (default: 2% of close)
+        take_profit: Take profit for an entry at each bar (default: 2% of close)
+        exits: Bars where an open position is closed at the close (strategy exit)
+        quantity: Entry quantity, scalar or per bar (values <= 0 trade 1)
+        initial_capital: Starting capital
+        warmup: Bars skipped before the first entry (run_backtest uses 50)
+        time_stop_bars: Close positions held longer than this many bars
+        breakeven_r: Move the stop to entry once price moves this many R
+        interval: Bar interval, used by the time stop
+        full_results: Include trades and the equity curve; sweeps that only
+                      rank metrics can skip them
+
+    Returns:
+        Dictionary with backtest results, shaped like run_backtest()
+    """
+    n = len(df)
+    open_, high, low, close = (df[col].to_numpy(dtype=float) for col in PRICE_COLUMNS)
+    times = df.index.to_numpy()
+
+    signals = np.sign(np.nan_to_num(np.asarray(signals, dtype=float)))
+    if stop_loss is None or take_profit is None:
+        default_sl, default_tp = atr_levels(close, None, signals)
+        stop_loss = default_sl if stop_loss is None else stop_loss
+        take_profit = default_tp if take_profit is None else take_profit
+    stop_loss = np.asarray(stop_loss, dtype=float)
+    take_profit = np.asarray(take_profit, dtype=float)
+    exits = np.zeros(n, dtype=bool) if exits is None else np.asarray(exits, dtype=bool)
+    quantity = np.broadcast_to(np.asarray(quantity), (n,))
+
+    time_limit = None
+    if time_stop_bars:
+        time_limit = np.timedelta64(get_bar_duration(interval) * time_stop_bars)
+
+    def find_exit(e: int, side: int, sl: float, tp: float):
+        # First bar after e that closes the position: (bar, reason, price)
+        entry = close[e]
+        risk = abs(entry - sl)
+        use_breakeven = breakeven_r is not None and risk > 0
+        moved_sl = max(sl, entry * 1.0005) if side > 0 else min(sl, entry * 0.9995)
+        moved = False
+
+        start, size = e + 1, SCAN_CHUNK_BARS
+        while start < n:
+            end = min(n, start + size)
+            h, l = high[start:end], low[start:end]
+
+            if use_breakeven:
+                if side > 0:
+                    trigger = h >= entry + (breakeven_r * risk)
+                else:
+                    trigger = l <= entry - (breakeven_r * risk)
+                moved_mask = np.logical_or.accumulate(trigger) | moved
+                stops = np.where(moved_mask, moved_sl, sl)
+            else:
+                moved_mask = np.zeros(end - start, dtype=bool)
+                stops = np.full(end - start, sl)
+
+            if side > 0:
+                sl_hit, tp_hit = l <= stops, h >= tp
+            else:
+                sl_hit, tp_hit = h >= stops, l <= tp
+            time_hit = (times[start:end] - times[e]) > time_limit if time_limit is not None else False
+            hit = exits[start:end] | time_hit | sl_hit | tp_hit
+
+            if hit.any():
+                j = int(np.argmax(hit))
+                k = start + j
+                if exits[k]:
+                    return k, 'STRATEGY_EXIT', close[k]
+                if time_limit is not None and time_hit[j]:
+                    return k, 'TIME_STOP', close[k]
+                stop = stops[j]
+                o = open_[k]
+                if sl_hit[j]:
+                    gapped = o <= stop if side > 0 else o >= stop
+                    return k, 'STOP_LOSS', (o if gapped else stop)
+                gapped = o >= tp if side > 0 else o <= tp
+                return k, 'TAKE_PROFIT', (o if gapped else tp)
+
+            moved = bool(moved_mask[-1])
+            start, size = end, size * 2
+
+        return None, 'END_OF_DATA', close[n - 1]
+
+    entry_bars = np.flatnonzero(signals != 0)
+    trades = []
+    next_bar = warmup
+    while True:
+        idx = np.searchsorted(entry_bars, next_bar)
+        if idx == len(entry_bars):
+            break
+        e = int(entry_bars[idx])
+        side = int(signals[e])
+        k, reason, price = find_exit(e, side, stop_loss[e], take_profit[e])
+        qty = int(quantity[e]) if quantity[e] > 0 else 1
+        trades.append((e, n - 1 if k is None else k, side, qty, price, reason))
+        if k is None:
+            break
+        # A new position may open on the exit bar
+        next_bar = k
+
+    cost_factor = TOTAL_COST_BPS / 10000.0
+    if trades:
+        entry_idx, exit_idx, sides, qtys, exit_prices, _ = (np.array(col) for col in zip(*trades))
+        exit_prices = exit_prices.astype(float)
+        entry_prices = close[entry_idx]
+        long = sides > 0
+        entry_with_costs = np.where(long, entry_prices * (1 + cost_factor), entry_prices * (1 - cost_factor))
+        exit_with_costs = np.where(long, exit_prices * (1 - cost_factor), exit_prices * (1 + cost_factor))
+        pnl = np.where(long, exit_with_costs - entry_with_costs, entry_with_costs - exit_with_costs) * qtys
+        pnl_pct = (pnl / (entry_with_costs * qtys)) * 100
+    else:
+        entry_idx = exit_idx = sides = qtys = np.array([], dtype=int)
+        entry_prices = pnl = pnl_pct = np.array([], dtype=float)
+
+    # Realized capital after each bar, plus open P&L at the close (no costs)
+    end_of_data = bool(trades) and trades[-1][5] == 'END_OF_DATA'
+    realized = np.zeros(n)
+    closed = slice(None, -1) if end_of_data else slice(None)
+    realized[exit_idx[closed]] = pnl[closed]
+    capital = np.cumsum(np.concatenate([[initial_capital], realized]))[1:]
+    unrealized = np.zeros(n)
+    for t, (e, k) in enumerate(zip(entry_idx, exit_idx)):
+        held = slice(e, n if end_of_data and t == len(trades) - 1 else k)
+        if sides[t] > 0:
+            unrealized[held] = (close[held] - entry_prices[t]) * qtys[t]
+        else:
+            unrealized[held] = (entry_prices[t] - close[held]) * qtys[t]
+    equity = (capital + unrealized)[warmup:]
+
+    final_capital = float(capital[-1]) if n else initial_capital
+    if end_of_data:
+        final_capital += float(pnl[-1])
+
+    results = {
+        'initial_capital': initial_capital,
+        'final_capital': final_capital,
+        'total_trades': len(trades),
+        'metrics': compute_metrics(pnl, pnl_pct, equity, initial_capital, final_capital)
+    }
+    if full_results:
+        results['closed_trades'] = [
+            {
+                'entry_time': str(df.index[e]),
+                'exit_time': str(df.index[k]),
+                'entry_price': float(close[e]),
+                'exit_price': float(price),
+                'quantity': qty if side > 0 else -qty,
+                'side': 'BUY' if side > 0 else 'SELL',
+                'pnl': float(pnl[t]),
+                'pnl_pct': float(pnl_pct[t]),
+                'exit_reason': reason
+            }
+            for t, (e, k, side, qty, price, reason) in enumerate(trades)
+        ]
+        results['equity_curve'] = [(str(t), float(e)) for t, e in zip(df.index[warmup:], equity)]
+    return results
+
+def backtest_strategy_signals(
+    strategy_module,
+    df: pd.DataFrame,
+    initial_capital: float = 1000000.0,
+    interval: str = "15m",
+    full_results: bool = True
+) -> dict[str, Any]:
+    """
+    Backtest a strategy module's generate_signals(df) output.
+
+    Stops come from the 'stop_loss'/'take_profit' columns, or from 'atr' with
+    the module's ATR_SL_MULTIPLIER/ATR_TP_MULTIPLIER; TIME_STOP_BARS and
+    BREAKEVEN_TRIGGER_R are read from the module like run_backtest does.
+
+    Args:
+        strategy_module: Strategy module with generate_signals()
+        df: OHLCV bars
+        initial_capital: Starting capital
+        interval: Bar interval
+        full_results: Include trades and the equity curve
+
+    Returns:
+        Dictionary with backtest results
+    """
+    if not hasattr(strategy_module, 'generate_signals'):
+        return {'error': 'Strategy does not define generate_signals()'}
+
+    try:
+        frame = strategy_module.generate_signals(df)
+    except Exception as e:
+        logger.error(f"Error generating signals: {e}")
+        return {'error': f'Error generating signals: {e}'}
+
+    if 'signal' not in frame or len(frame['signal']) != len(df):
+        return {'error': "generate_signals() must return a 'signal' value for every bar"}
+
+    signals = np.asarray(frame['signal'], dtype=float)
+    stop_loss, take_profit = atr_levels(
+        df['close'].to_numpy(dtype=float),
+        np.asarray(frame['atr'], dtype=float) if 'atr' in frame else None,
+        signals,
+        sl_multiplier=getattr(strategy_module, 'ATR_SL_MULTIPLIER', 1.5),
+        tp_multiplier=getattr(strategy_module, 'ATR_TP_MULTIPLIER', 2.5)
+    )
+    if 'stop_loss' in frame:
+        stop_loss = np.asarray(frame['stop_loss'], dtype=float)
+    if 'take_profit' in frame:
+        take_profit = np.asarray(frame['take_profit'], dtype=float)
+
+    return run_vectorized_backtest(
+        df,
+        signals,
+        stop_loss=stop_loss,
+        take_profit=take_profit,
+        exits=frame['exit'] if 'exit' in frame else None,
+        quantity=frame['quantity'] if 'quantity' in frame else 1,
+        initial_capital=initial_capital,
+        time_stop_bars=getattr(strategy_module, 'TIME_STOP_BARS', None),
+        breakeven_r=getattr(strategy_module, 'BREAKEVEN_TRIGGER_R', None),
+        interval=interval,
+        full_results=full_results
+    )
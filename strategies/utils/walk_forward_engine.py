@@ -3,9 +3,20 @@ Walk-Forward Optimization Engine
 --------------------------------
 Implements Walk-Forward Analysis (WFA) to validate strategy robustness
 and detect overfitting by testing on out-of-sample data.
+
+The full history is fetched once and every train/test window is a slice of
+it. In-sample optimizations of different windows do not depend on each
+other and can run in worker processes (the bars are shared through a
+memory-mapped Arrow file); the out-of-sample tests run in window order
+because each one starts from the capital left by the previous window.
 """
 import logging
+import shutil
 import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -17,12 +28,75 @@ utils_path = Path(__file__).parent
 if str(utils_path) not in sys.path:
     sys.path.insert(0, str(utils_path))
 
-from optimization_engine import BayesianOptimizer, GridSearchOptimizer, calculate_composite_score
+from optimization_engine import (
+    BayesianOptimizer,
+    GridSearchOptimizer,
+    calculate_composite_score,
+    load_shared_frame,
+    share_frame,
+)
 from simple_backtest_engine import SimpleBacktestEngine
 from strategy_param_injector import create_strategy_with_params
 
 logger = logging.getLogger("WalkForwardEngine")
 
+def optimize_window(
+    config: dict[str, Any],
+    data: pd.DataFrame,
+    train_start: str,
+    train_end: str,
+    optimization_method: str = 'grid',
+    max_evals: int = 20,
+    workers: int = 1
+) -> tuple[dict[str, Any], float]:
+    """
+    Find the best parameters on one training window.
+
+    Args:
+        config: Optimizer settings (strategy_name, symbol, exchange,
+                initial_capital, api_key, host, interval)
+        data: Full walk-forward history; the window is sliced from it
+        train_start: Window start (YYYY-MM-DD)
+        train_end: Window end (YYYY-MM-DD, inclusive)
+        optimization_method: 'grid' or 'bayesian'
+        max_evals: Max evaluations in the window
+        workers: Worker processes of the optimizer itself
+
+    Returns:
+        (best parameters, seconds spent)
+    """
+    started = time.perf_counter()
+    settings = dict(config)
+    args = (settings.pop('strategy_name'), settings.pop('symbol'), settings.pop('exchange'),
+            train_start, train_end)
+    train_data = data.loc[train_start:train_end]
+
+    best_params = {}
+    if optimization_method == 'bayesian':
+        opt = BayesianOptimizer(*args, data=train_data, **settings)
+        res = opt.optimize(n_iterations=max_evals, workers=workers)
+        best_params = res.get('best_parameters') or {}
+    else:
+        opt = GridSearchOptimizer(*args, data=train_data, **settings)
+        res = opt.optimize(max_combinations=max_evals, workers=workers)
+        if res:
+            best_params = res[0].get('parameters', {})
+
+    return best_params, time.perf_counter() - started
+
+# Per-process state of window workers, set by _init_window_worker
+_window_data: pd.DataFrame | None = None
+_window_config: dict[str, Any] = {}
+
+def _init_window_worker(data_path: str, config: dict[str, Any]):
+    global _window_data, _window_config
+    logging.getLogger("BacktestEngine").setLevel(logging.WARNING)
+    _window_data = load_shared_frame(data_path)
+    _window_config = config
+
+def _optimize_window_in_worker(task: tuple) -> tuple[dict[str, Any], float]:
+    return optimize_window(_window_config, _window_data, *task)
+
 class WalkForwardOptimizer:
     """
     Performs Walk-Forward Analysis on a strategy.
@@ -40,7 +114,8 @@ class WalkForwardOptimizer:
                  train_window_months: int = 6,
                  test_window_months: int = 3,
                  initial_capital: float = 1000000.0,
-                 api_key: str = None, host: str = "http://127.0.0.1:5001"):
+                 api_key: str = None, host: str = "http://127.0.0.1:5001",
+                 interval: str = "15m", data: pd.DataFrame | None = None):
 
         self.strategy_name = strategy_name
         self.symbol = symbol
@@ -54,6 +129,8 @@ class WalkForwardOptimizer:
         self.initial_capital = initial_capital
         self.api_key = api_key
         self.host = host
+        self.interval = interval
+        self.data = data
 
         self.results = []
         self.aggregated_trades = []
@@ -84,24 +161,88 @@ class WalkForwardOptimizer:
 
         return windows
 
-    def run(self, optimization_method: str = 'grid', max_evals: int = 20) -> dict[str, Any]:
+    def load_data(self) -> pd.DataFrame:
+        """Fetch the whole walk-forward span once; windows are slices of it"""
+        if self.data is None:
+            engine = SimpleBacktestEngine(
+                initial_capital=self.initial_capital,
+                api_key=self.api_key,
+                host=self.host
+            )
+            self.data, _ = engine.load_backtest_data(
+                self.symbol, self.exchange,
+                self.start_date.strftime("%Y-%m-%d"), self.end_date.strftime("%Y-%m-%d"),
+                self.interval
+            )
+        return self.data
+
+    def _optimize_windows(self, tasks: list[tuple], data: pd.DataFrame,
+                          workers: int) -> Iterator[tuple[dict[str, Any], float]]:
+        """Yield (best params, seconds) per window in window order"""
+        config = {
+            'strategy_name': self.strategy_name,
+            'symbol': self.symbol,
+            'exchange': self.exchange,
+            # Fixed, so that windows do not depend on earlier out-of-sample results
+            'initial_capital': self.initial_capital,
+            'api_key': self.api_key,
+            'host': self.host,
+            'interval': self.interval
+        }
+
+        if workers <= 1 or len(tasks) <= 1:
+            # A single window can still parallelize its own parameter sweep
+            for task in tasks:
+                yield optimize_window(config, data, *task, workers=workers)
+            return
+
+        shared_dir = tempfile.mkdtemp(prefix="openalgo_walkforward_")
+        try:
+            data_path = share_frame(data, shared_dir)
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(tasks)),
+                initializer=_init_window_worker, initargs=(data_path, config)
+            ) as executor:
+                # map() yields in submission order while later windows keep running
+                yield from executor.map(_optimize_window_in_worker, tasks)
+        finally:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+    def run(self, optimization_method: str = 'grid', max_evals: int = 20, workers: int = 1) -> dict[str, Any]:
         """
         Run the Walk-Forward Analysis.
 
         Args:
             optimization_method: 'grid' or 'bayesian'
             max_evals: Max evaluations per training window
+            workers: Worker processes; windows are optimized in parallel
+                     while out-of-sample tests run in order
         """
+        started = time.perf_counter()
         windows = self.generate_windows()
         logger.info(f"Generated {len(windows)} Walk-Forward windows.")
 
+        data = self.load_data()
+        load_seconds = time.perf_counter() - started
+        if data.empty:
+            logger.error("No data available for walk-forward analysis")
+            return {'strategy': self.strategy_name, 'symbol': self.symbol, 'error': 'No data available'}
+
         current_capital = self.initial_capital
 
         overall_stats = {
             'wins': 0, 'losses': 0, 'total_pnl': 0.0, 'trades': 0
         }
 
-        for i, window in enumerate(windows, 1):
+        tasks = [
+            (window['train_start'].strftime("%Y-%m-%d"), window['train_end'].strftime("%Y-%m-%d"),
+             optimization_method, max_evals)
+            for window in windows
+        ]
+        optimized = self._optimize_windows(tasks, data, workers)
+        test_seconds_total = 0.0
+
+        for i, (window, (best_params, optimize_seconds)) in enumerate(zip(windows, optimized), 1):
             train_start_str = window['train_start'].strftime("%Y-%m-%d")
             train_end_str = window['train_end'].strftime("%Y-%m-%d")
             test_start_str = window['test_start'].strftime("%Y-%m-%d")
@@ -111,35 +252,15 @@ class WalkForwardOptimizer:
             logger.info(f"  Train: {train_start_str} to {train_end_str}")
             logger.info(f"  Test:  {test_start_str} to {test_end_str}")
 
-            # 1. Optimize on In-Sample (Train) Data
-            best_params = {}
-            if optimization_method == 'bayesian':
-                opt = BayesianOptimizer(
-                    self.strategy_name, self.symbol, self.exchange,
-                    train_start_str, train_end_str,
-                    initial_capital=current_capital,
-                    api_key=self.api_key, host=self.host
-                )
-                res = opt.optimize(n_iterations=max_evals)
-                best_params = res.get('best_parameters', {})
-            else:
-                opt = GridSearchOptimizer(
-                    self.strategy_name, self.symbol, self.exchange,
-                    train_start_str, train_end_str,
-                    initial_capital=current_capital,
-                    api_key=self.api_key, host=self.host
-                )
-                res = opt.optimize(max_combinations=max_evals)
-                if res:
-                    best_params = res[0].get('parameters', {})
-
+            # 1. Optimize on In-Sample (Train) Data (done by _optimize_windows)
             if not best_params:
                 logger.warning(f"  No best parameters found for Window {i}. Using defaults.")
                 # Could fetch defaults from strategy...
 
-            logger.info(f"  Best Params: {best_params}")
+            logger.info(f"  Best Params: {best_params} ({optimize_seconds:.2f}s)")
 
             # 2. Test on Out-of-Sample (Test) Data using Best Params
+            test_started = time.perf_counter()
             strategy_module = create_strategy_with_params(self.strategy_name, best_params)
             engine = SimpleBacktestEngine(
                 initial_capital=current_capital,
@@ -149,8 +270,11 @@ class WalkForwardOptimizer:
 
             test_result = engine.run_backtest(
                 strategy_module, self.symbol, self.exchange,
-                test_start_str, test_end_str
+                test_start_str, test_end_str, interval=self.interval,
+                data=data.loc[test_start_str:test_end_str]
             )
+            test_seconds = time.perf_counter() - test_started
+            test_seconds_total += test_seconds
 
             # 3. Collect Results
             metrics = test_result.get('metrics', {})
@@ -167,7 +291,11 @@ class WalkForwardOptimizer:
                 'test_period': f"{test_start_str} to {test_end_str}",
                 'best_params': best_params,
                 'metrics': metrics,
-                'pnl': period_pnl
+                'pnl': period_pnl,
+                'timing': {
+                    'optimize_seconds': round(optimize_seconds, 3),
+                    'test_seconds': round(test_seconds, 3)
+                }
             })
 
             self.aggregated_trades.extend(trades)
@@ -180,6 +308,9 @@ class WalkForwardOptimizer:
 
         # Final Compilation
         robustness_score = self.calculate_robustness()
+        total_seconds = time.perf_counter() - started
+        logger.info(f"Walk-forward complete in {total_seconds:.2f}s "
+                    f"(data {load_seconds:.2f}s, out-of-sample {test_seconds_total:.2f}s)")
 
         return {
             'strategy': self.strategy_name,
@@ -189,7 +320,12 @@ class WalkForwardOptimizer:
             'total_return': current_capital - self.initial_capital,
             'robustness_score': robustness_score,
             'window_results': self.results,
-            'aggregated_trades_count': len(self.aggregated_trades)
+            'aggregated_trades_count': len(self.aggregated_trades),
+            'timing': {
+                'load_seconds': round(load_seconds, 3),
+                'test_seconds': round(test_seconds_total, 3),
+                'total_seconds': round(total_seconds, 3)
+            }
         }
 
     def calculate_robustness(self) -> float:
@@ -0,0 +1,130 @@
+"""
+Tests for the per-client outbound queues of the WebSocket proxy
+(websocket_proxy/client_queue.py).
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket_proxy.client_queue import ClientSendQueue
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send(self, payload):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(payload)
+
+
+def test_ltp_conflates_to_latest_value():
+    async def scenario():
+        websocket = FakeWebSocket()
+        queue = ClientSendQueue(1, websocket, max_size=10)
+        key = ("SBIN", "NSE", 1)
+        for price in range(5):
+            queue.put(key, 1, f"tick-{price}")
+        queue.start()
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return websocket, queue
+
+    websocket, queue = asyncio.run(scenario())
+
+    assert websocket.sent == ["tick-4"]
+    assert queue.conflated == 4
+    assert queue.dropped == 0
+
+
+def test_depth_drop_oldest_keeps_newest():
+    queue = ClientSendQueue(1, FakeWebSocket(), max_size=2, depth_policy="drop_oldest")
+    key = ("NIFTY", "NSE_INDEX", 3)
+    for n in range(4):
+        queue.put(key, 3, f"depth-{n}")
+
+    assert list(queue._depth) == ["depth-2", "depth-3"]
+    assert queue.dropped == 2
+
+
+def test_depth_drop_newest_keeps_oldest():
+    queue = ClientSendQueue(1, FakeWebSocket(), max_size=2, depth_policy="drop_newest")
+    key = ("NIFTY", "NSE_INDEX", 3)
+    for n in range(4):
+        queue.put(key, 3, f"depth-{n}")
+
+    assert list(queue._depth) == ["depth-0", "depth-1"]
+    assert queue.dropped == 2
+
+
+def test_slow_client_does_not_block_put():
+    async def scenario():
+        slow = ClientSendQueue(1, FakeWebSocket(delay=0.05), max_size=100)
+        fast_socket = FakeWebSocket()
+        fast = ClientSendQueue(2, fast_socket, max_size=100)
+        slow.start()
+        fast.start()
+
+        for n in range(20):
+            key = (f"SYM{n}", "NSE", 2)
+            slow.put(key, 2, f"quote-{n}")
+            fast.put(key, 2, f"quote-{n}")
+
+        await asyncio.sleep(0.01)
+        fast_sent = len(fast_socket.sent)
+        slow_depth = slow.depth
+        await slow.close()
+        await fast.close()
+        return fast_sent, slow_depth
+
+    fast_sent, slow_depth = asyncio.run(scenario())
+
+    assert fast_sent == 20
+    assert slow_depth > 0
+
+
+def test_conflation_window_delivers_latest_after_expiry():
+    from websocket_proxy.conflation import TimerWheel
+
+    wheel = TimerWheel(tick=0.01, max_delay=1.0)
+    queue = ClientSendQueue(1, FakeWebSocket(), max_size=10, timer_wheel=wheel, default_window=0.05)
+    key = ("NIFTY", "NSE_INDEX", 1)
+
+    for price in range(5):
+        queue.put(key, 1, f"tick-{price}")
+
+    # First tick goes out immediately, the burst is held
+    assert list(queue._latest.values()) == ["tick-0"]
+    queue._latest.clear()
+
+    wheel.advance(wheel._last_advance + 0.06)
+    # Final tick of the burst is delivered when the window expires
+    assert list(queue._latest.values()) == ["tick-4"]
+
+
+def test_zero_window_delivers_every_tick():
+    from websocket_proxy.conflation import TimerWheel
+
+    websocket = FakeWebSocket()
+    wheel = TimerWheel(tick=0.01, max_delay=1.0)
+    queue = ClientSendQueue(1, websocket, max_size=10, timer_wheel=wheel, default_window=0.25)
+    key = ("SBIN", "NSE", 1)
+    queue.set_window(key, 0)
+
+    async def scenario():
+        queue.start()
+        for price in range(3):
+            queue.put(key, 1, f"tick-{price}")
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        await queue.close()
+
+    asyncio.run(scenario())
+
+    assert websocket.sent == ["tick-0", "tick-1", "tick-2"]
+    assert len(wheel) == 0
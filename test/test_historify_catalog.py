@@ -0,0 +1,83 @@
+"""
+Tests for incremental data_catalog maintenance and bulk upserts in
+database/historify_db.py.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from database import historify_db
+
+
+@pytest.fixture
+def historify(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "0")
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    historify_db.close_connections()
+    historify_db.init_database()
+    yield historify_db
+    historify_db.close_connections()
+
+
+def _bars(start, count, step=60, close=100.0):
+    return pd.DataFrame(
+        {
+            "timestamp": [start + step * n for n in range(count)],
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": 1000,
+        }
+    )
+
+
+def _catalog(db, symbol):
+    return next(entry for entry in db.get_data_catalog() if entry["symbol"] == symbol)
+
+
+def test_catalog_tracks_overlapping_upserts_incrementally(historify):
+    historify.upsert_market_data(_bars(1737000000, 10), "SBIN", "NSE", "1m")
+    # Overlaps the last 5 bars and adds 5 new ones, then prepends 3 earlier bars
+    historify.upsert_market_data(_bars(1737000300, 10, close=101.0), "SBIN", "NSE", "1m")
+    historify.upsert_market_data(_bars(1736999820, 3), "SBIN", "NSE", "1m")
+
+    entry = _catalog(historify, "SBIN")
+    assert entry["record_count"] == 18
+    assert entry["first_timestamp"] == 1736999820
+    assert entry["last_timestamp"] == 1737000000 + 60 * 14
+    assert historify.reconcile_data_catalog() == 0
+
+
+def test_bulk_upsert_commits_all_symbols_together(historify):
+    frames = [
+        (_bars(1737000000, 5), "INFY", "NSE", "1m"),
+        (_bars(1737000000, 7), "TCS", "NSE", "1m"),
+        (pd.DataFrame(), "EMPTY", "NSE", "1m"),
+    ]
+    assert historify.bulk_upsert_market_data(frames) == 12
+    assert _catalog(historify, "TCS")["record_count"] == 7
+
+    bad = _bars(1737000000, 2)
+    bad["open"] = None  # Violates NOT NULL, so the whole batch must roll back
+    with pytest.raises(Exception):
+        historify.bulk_upsert_market_data(
+            [(_bars(1737086400, 5), "INFY", "NSE", "1m"), (bad, "WIPRO", "NSE", "1m")]
+        )
+
+    assert _catalog(historify, "INFY")["record_count"] == 5
+    assert not any(entry["symbol"] == "WIPRO" for entry in historify.get_data_catalog())
+
+
+def test_reconcile_fixes_drift(historify):
+    historify.upsert_market_data(_bars(1737000000, 4), "HDFC", "NSE", "1m")
+    with historify.get_connection() as conn:
+        conn.execute("UPDATE data_catalog SET record_count = 99 WHERE symbol = 'HDFC'")
+
+    assert historify.reconcile_data_catalog() == 1
+    assert _catalog(historify, "HDFC")["record_count"] == 4
@@ -0,0 +1,114 @@
+"""
+Tests for the Parquet cold tier of Historify (database/historify_cold_tier.py
+and its use in database/historify_db.py).
+"""
+
+import glob
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from database import historify_db
+
+IST = timezone(timedelta(hours=5, minutes=30))
+CUTOFF = int(datetime(2025, 2, 1, tzinfo=IST).timestamp())
+
+
+@pytest.fixture
+def historify(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "0")
+    monkeypatch.setenv("HISTORIFY_COLD_TIER_PATH", str(tmp_path / "cold"))
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    historify_db.close_connections()
+    historify_db.init_database()
+    yield historify_db
+    historify_db.close_connections()
+
+
+def _session(year, month, day, close=100.0, count=60):
+    market_open = int(datetime(year, month, day, 9, 15, tzinfo=IST).timestamp())
+    return pd.DataFrame(
+        {
+            "timestamp": [market_open + 60 * n for n in range(count)],
+            "open": close,
+            "high": [close + 1 + n % 7 for n in range(count)],
+            "low": close - 1,
+            "close": [close + n * 0.05 for n in range(count)],
+            "volume": 100,
+        }
+    )
+
+
+def _load(db):
+    db.upsert_market_data(_session(2024, 12, 31), "SBIN", "NSE", "1m")
+    db.upsert_market_data(_session(2025, 1, 20), "SBIN", "NSE", "1m")
+    db.upsert_market_data(_session(2025, 2, 3), "SBIN", "NSE", "1m")
+
+
+def _hot_rows(db):
+    with db.get_connection(read_only=True) as conn:
+        return conn.execute("SELECT COUNT(*) FROM market_data").fetchone()[0]
+
+
+def test_compaction_moves_closed_months_and_reads_stay_the_same(historify, tmp_path):
+    _load(historify)
+    before = {interval: historify.get_ohlcv("SBIN", "NSE", interval) for interval in ("1m", "5m", "25m")}
+    data_range = historify.get_data_range("SBIN", "NSE", "1m")
+
+    result = historify.compact_closed_months(CUTOFF)
+
+    assert result == {"partitions": 2, "rows_moved": 120}
+    assert _hot_rows(historify) == 60
+    for year in (2024, 2025):
+        files = glob.glob(str(tmp_path / "cold" / "exchange=NSE" / "interval=1m" / "symbol=SBIN" / f"year={year}" / "*.parquet"))
+        assert len(files) == 1
+
+    for interval, expected in before.items():
+        pd.testing.assert_frame_equal(historify.get_ohlcv("SBIN", "NSE", interval), expected, check_dtype=False)
+    assert historify.get_data_range("SBIN", "NSE", "1m") == data_range
+    assert historify.reconcile_data_catalog() == 0
+
+    window = historify.get_ohlcv("SBIN", "NSE", "1m", CUTOFF - 86400 * 14, CUTOFF)
+    assert len(window) == 60
+
+    output = tmp_path / "export.parquet"
+    success, _, count = historify.export_to_parquet(str(output), interval="1m")
+    assert success and count == 180
+    assert historify.get_database_stats()["total_records"] == 180
+
+
+def test_redownloaded_rows_override_cold_copy_until_merged(historify, tmp_path):
+    _load(historify)
+    historify.compact_closed_months(CUTOFF)
+
+    revised = _session(2025, 1, 20, close=200.0, count=10)
+    historify.upsert_market_data(revised, "SBIN", "NSE", "1m")
+
+    january = historify.get_ohlcv("SBIN", "NSE", "1m", CUTOFF - 86400 * 14, CUTOFF)
+    assert len(january) == 60
+    assert january["close"].iloc[0] == 200.0
+    assert historify.get_data_range("SBIN", "NSE", "1m")["record_count"] == 180
+
+    assert historify.compact_closed_months(CUTOFF) == {"partitions": 1, "rows_moved": 10}
+    files = glob.glob(str(tmp_path / "cold" / "**" / "year=2025" / "*.parquet"), recursive=True)
+    assert len(files) == 1
+    january = historify.get_ohlcv("SBIN", "NSE", "1m", CUTOFF - 86400 * 14, CUTOFF)
+    assert len(january) == 60
+    assert january["close"].iloc[0] == 200.0
+
+
+def test_delete_removes_cold_partitions(historify, tmp_path):
+    _load(historify)
+    historify.compact_closed_months(CUTOFF)
+
+    success, _ = historify.delete_market_data("SBIN", "NSE", "1m")
+
+    assert success
+    assert not glob.glob(str(tmp_path / "cold" / "**" / "*.parquet"), recursive=True)
+    assert historify.get_ohlcv("SBIN", "NSE", "1m").empty
+    assert historify.get_database_stats()["cold_tier"]["files"] == 0
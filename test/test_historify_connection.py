@@ -0,0 +1,112 @@
+"""
+Tests for the Historify DuckDB connection manager (database/historify_connection.py).
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database.historify_connection import HistorifyConnectionManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_path = str(tmp_path / "historify.duckdb")
+    manager = HistorifyConnectionManager(lambda: db_path)
+    with manager.writer() as conn:
+        conn.execute("CREATE TABLE ticks (id INTEGER, value INTEGER)")
+    yield manager
+    manager.close()
+
+
+def test_writes_are_serialized_and_visible_to_readers(manager):
+    def write(worker):
+        for n in range(20):
+            with manager.writer() as conn:
+                conn.execute("INSERT INTO ticks VALUES (?, ?)", [worker, n])
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with manager.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM ticks").fetchone()[0] == 80
+
+    stats = manager.get_stats()
+    assert stats["opens"] == 1
+    assert stats["writes"] == 81
+    assert stats["writer_queue_depth"] == 0
+    assert stats["writer_queue_max"] >= 1
+
+
+def test_reader_cursor_is_reused_per_thread_and_nested_reads_are_safe(manager):
+    with manager.reader() as outer:
+        pending = outer.execute("SELECT 42")
+        with manager.reader() as inner:
+            assert inner is not outer
+            assert inner.execute("SELECT 1").fetchone()[0] == 1
+        assert pending.fetchone()[0] == 42
+
+    with manager.reader() as again:
+        assert again is outer
+    assert manager.get_stats()["reader_cursors_created"] == 1
+
+
+def test_writer_is_reentrant_and_rolls_back_on_error(manager):
+    with pytest.raises(RuntimeError):
+        with manager.writer() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute("INSERT INTO ticks VALUES (1, 1)")
+            with manager.writer() as nested:
+                assert nested is conn
+            raise RuntimeError("boom")
+
+    with manager.writer() as conn:
+        conn.execute("INSERT INTO ticks VALUES (2, 2)")
+
+    with manager.reader() as conn:
+        assert conn.execute("SELECT id FROM ticks").fetchall() == [(2,)]
+
+
+def test_persistent_connection_is_opt_in(monkeypatch):
+    from database.historify_connection import is_persistent_connection_enabled
+
+    monkeypatch.delenv("HISTORIFY_PERSISTENT_CONNECTION", raising=False)
+    assert not is_persistent_connection_enabled()
+    monkeypatch.setenv("HISTORIFY_PERSISTENT_CONNECTION", "true")
+    assert is_persistent_connection_enabled()
+
+
+def _open_from_other_process(db_path):
+    code = "import duckdb, sys; duckdb.connect(sys.argv[1]).close()"
+    return subprocess.run([sys.executable, "-c", code, db_path], capture_output=True).returncode == 0
+
+
+def test_idle_connection_releases_file_lock(tmp_path):
+    db_path = str(tmp_path / "idle.duckdb")
+    manager = HistorifyConnectionManager(lambda: db_path, idle_close_seconds=0.2)
+    try:
+        with manager.writer() as conn:
+            conn.execute("CREATE TABLE ticks (id INTEGER)")
+        assert not _open_from_other_process(db_path)
+
+        deadline = time.monotonic() + 5
+        while manager.get_stats()["open"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert manager.get_stats()["idle_closes"] == 1
+        assert _open_from_other_process(db_path)
+
+        # Reopens on next use, with fresh reader cursors
+        with manager.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM ticks").fetchone()[0] == 0
+        assert manager.get_stats()["opens"] == 2
+    finally:
+        manager.close()
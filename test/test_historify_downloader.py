@@ -0,0 +1,195 @@
+"""
+Tests for the concurrent, rate-aware Historify downloader
+(services/historify_downloader.py) and its use by download jobs.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.historify_downloader import (
+    ChunkedDownloader,
+    TokenBucket,
+    get_rate_limit,
+    is_rate_limited,
+    split_date_range,
+)
+
+
+def _fake_history(calls, rate_limited=(), failing=()):
+    """Return one daily bar per day; the first call for a rate_limited chunk gets a 429"""
+    lock = threading.Lock()
+
+    def fetch(symbol, exchange, interval, start_date, end_date):
+        with lock:
+            calls.append((symbol, start_date, end_date))
+            first_attempt = calls.count((symbol, start_date, end_date)) == 1
+        if (symbol, start_date) in rate_limited and first_attempt:
+            return False, {"status": "error", "message": "Too many requests"}, 500
+        if symbol in failing:
+            return False, {"status": "error", "message": "Invalid symbol"}, 400
+        start = int(datetime.strptime(start_date, "%Y-%m-%d").timestamp())
+        end = int(datetime.strptime(end_date, "%Y-%m-%d").timestamp())
+        data = [
+            {"timestamp": ts, "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 10, "oi": 0}
+            for ts in range(start, end + 1, 86400)
+        ]
+        return True, {"status": "success", "data": data}, 200
+
+    return fetch
+
+
+def _drain(downloader):
+    finished = {}
+    while downloader.in_flight:
+        for download in downloader.completed(timeout=5):
+            finished[download.symbol] = download
+    return finished
+
+
+def test_split_date_range_is_contiguous():
+    assert split_date_range("2025-01-01", "2025-03-01", 30) == [
+        ("2025-01-01", "2025-01-30"),
+        ("2025-01-31", "2025-03-01"),
+    ]
+    assert split_date_range("2025-01-05", "2025-01-05", 30) == [("2025-01-05", "2025-01-05")]
+    assert split_date_range("2025-01-05", "2025-01-04", 30) == []
+
+
+def test_token_bucket_throttles_and_recovers():
+    bucket = TokenBucket(rate=100.0, burst=1)
+    assert bucket.acquire(timeout=1)
+
+    bucket.throttle(backoff=0.05)
+    assert bucket.rate == 50.0
+    started = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - started >= 0.04
+
+    for _ in range(20):
+        bucket.record_success()
+    assert bucket.rate == 100.0
+    assert is_rate_limited({"message": "HTTP 429"}, 500)
+    assert not is_rate_limited({"message": "Invalid symbol"}, 400)
+
+
+def test_rate_limit_must_be_positive(monkeypatch):
+    monkeypatch.setenv("HISTORIFY_RATE_LIMIT", "0")
+    monkeypatch.setenv("HISTORIFY_RATE_LIMIT_ZERODHA", "-1")
+    monkeypatch.setenv("HISTORIFY_RATE_LIMIT_DHAN", "5")
+    assert get_rate_limit() == 3.0
+    assert get_rate_limit("zerodha") == 3.0
+    assert get_rate_limit("dhan") == 5.0
+
+    monkeypatch.setenv("HISTORIFY_RATE_LIMIT", "2")
+    monkeypatch.setenv("HISTORIFY_RATE_LIMIT_ZERODHA", "nan")
+    assert get_rate_limit("zerodha") == 2.0
+
+
+def test_request_counters_are_exact_under_concurrency(monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CHUNK_DAYS_1M", "30")
+    downloader = ChunkedDownloader(
+        lambda *args: (True, {"data": [{"timestamp": 1736899200, "close": 1.0}]}, 200),
+        TokenBucket(rate=1e6, burst=1e6),
+        workers=8,
+    )
+    try:
+        for n in range(50):
+            downloader.submit(n, f"SYM{n}", "NSE", "1m", [("2024-01-01", "2024-12-31")])
+        _drain(downloader)
+    finally:
+        downloader.shutdown()
+
+    # 366 days in 30 day chunks
+    assert downloader.get_stats()["requests"] == 50 * 13
+
+
+def test_downloader_fetches_chunks_in_parallel_and_merges(monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CHUNK_DAYS_D", "30")
+    calls = []
+    fetch = _fake_history(calls, rate_limited={("SBIN", "2025-01-31")}, failing={"BAD"})
+    downloader = ChunkedDownloader(fetch, TokenBucket(rate=1000.0), workers=4, max_retries=2)
+    monkeypatch.setattr("services.historify_downloader.BACKOFF_SECONDS", 0.01)
+    try:
+        downloader.submit("a", "SBIN", "NSE", "D", [("2025-01-01", "2025-03-31")])
+        downloader.submit("b", "INFY", "NSE", "D", [("2025-01-01", "2025-01-10"), ("2025-03-01", "2025-03-10")])
+        downloader.submit("c", "BAD", "NSE", "D", [("2025-01-01", "2025-01-10")])
+        downloader.submit("d", "NONE", "NSE", "D", [])
+        finished = _drain(downloader)
+    finally:
+        downloader.shutdown()
+
+    sbin = finished["SBIN"].frame
+    assert len(sbin) == 90
+    assert sbin["timestamp"].is_monotonic_increasing and sbin["timestamp"].is_unique
+    assert len(finished["INFY"].frame) == 20
+    assert finished["BAD"].error == "Invalid symbol"
+    assert finished["NONE"].frame.empty and finished["NONE"].error is None
+    # 3 SBIN chunks + 1 retry, 2 INFY chunks, 1 BAD chunk
+    assert len(calls) == 7
+    assert downloader.get_stats()["retries"] == 1
+
+
+def test_downloader_holds_requests_while_paused():
+    calls = []
+    resumed = threading.Event()
+    downloader = ChunkedDownloader(
+        _fake_history(calls), TokenBucket(rate=1000.0), workers=2, wait_if_paused=lambda: resumed.wait(5)
+    )
+    try:
+        downloader.submit("a", "SBIN", "NSE", "D", [("2025-01-01", "2025-01-10")])
+        assert downloader.completed(timeout=0.2) == []
+        assert calls == []
+        resumed.set()
+        assert len(_drain(downloader)["SBIN"].frame) == 10
+    finally:
+        downloader.shutdown()
+
+
+def test_download_job_uses_scheduler(tmp_path, monkeypatch):
+    from database import historify_db
+
+    monkeypatch.setenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "0")
+    monkeypatch.setenv("HISTORIFY_CHUNK_DAYS_D", "20")
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    historify_db.close_connections()
+    historify_db.init_database()
+
+    # Imported after the path is patched: the module cleans up zombie jobs on import
+    from services import historify_service
+
+    calls = []
+    monkeypatch.setattr(
+        historify_service, "get_auth_token_broker", lambda api_key, include_feed_token=False: ("token", None, "testbroker")
+    )
+    fetch = _fake_history(calls, failing={"BAD"})
+    monkeypatch.setattr(
+        historify_service,
+        "get_history_with_auth",
+        lambda auth, feed, broker, symbol, exchange, interval, start, end: fetch(symbol, exchange, interval, start, end),
+    )
+    events = []
+    monkeypatch.setattr(historify_service, "_emit_progress", lambda *args: events.append(args))
+
+    symbols = [{"symbol": "SBIN", "exchange": "NSE"}, {"symbol": "INFY", "exchange": "NSE"}, {"symbol": "BAD", "exchange": "NSE"}]
+    historify_db.create_download_job("job1", "custom", symbols, "D", "2025-01-01", "2025-02-28")
+    historify_service._running_jobs["job1"] = True
+    pause = threading.Event()
+    pause.set()
+    historify_service._paused_jobs["job1"] = pause
+    try:
+        historify_service._process_download_job("job1", "apikey")
+
+        job = historify_db.get_download_job("job1")
+        assert job["status"] == "completed_with_errors"
+        assert (job["completed_symbols"], job["failed_symbols"]) == (2, 1)
+        assert len(historify_db.get_ohlcv("SBIN", "NSE", "D")) == 59
+        assert len([call for call in calls if call[0] != "BAD"]) == 6
+        assert [event[1] for event in events] == [1, 2, 3]
+    finally:
+        historify_service._cleanup_job("job1")
+        historify_db.close_connections()
@@ -0,0 +1,122 @@
+"""
+Tests for the streaming Historify exports (database/historify_export.py and
+the export functions in database/historify_db.py).
+"""
+
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from database import historify_db
+from database.historify_export import ExportEntry, ExportJob, write_zip_entries
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SYMBOLS = ["SBIN", "INFY", "TCS", "M&M"]
+
+
+@pytest.fixture
+def historify(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "0")
+    monkeypatch.setenv("HISTORIFY_EXPORT_BATCH_ROWS", "64")
+    monkeypatch.setenv("HISTORIFY_EXPORT_SPOOL_MB", "0.001")
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    historify_db.close_connections()
+    historify_db.init_database()
+    for n, symbol in enumerate(SYMBOLS):
+        market_open = int(datetime(2025, 1, 13, 9, 15, tzinfo=IST).timestamp())
+        historify_db.upsert_market_data(
+            pd.DataFrame(
+                {
+                    "timestamp": [market_open + 60 * i for i in range(375)],
+                    "open": 100.0 + n,
+                    "high": [101.5 + n + i % 5 for i in range(375)],
+                    "low": 99.0 + n,
+                    "close": [100.25 + n + i * 0.01 for i in range(375)],
+                    "volume": 10,
+                }
+            ),
+            symbol,
+            "NSE",
+            "1m",
+        )
+    yield historify_db
+    historify_db.close_connections()
+
+
+@pytest.fixture
+def output_dir():
+    directory = tempfile.mkdtemp(prefix="historify_export_test_")
+    yield directory
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+def test_zip_export_streams_every_symbol(historify, output_dir):
+    progress = []
+    output = os.path.join(output_dir, "export.zip")
+
+    success, message, count = historify.export_to_zip(
+        output, intervals=["1m", "5m", "25m"], progress_callback=lambda *args: progress.append(args)
+    )
+
+    assert success, message
+    assert count == len(SYMBOLS) * (375 + 75 + 15)
+    assert sorted(label for _, _, label in progress) == sorted(f"{s}:NSE" for s in SYMBOLS)
+    assert [(current, total) for current, total, _ in progress] == [(n, 4) for n in range(1, 5)]
+
+    with zipfile.ZipFile(output) as zf:
+        assert len(zf.namelist()) == 12
+        five_minute = pd.read_csv(zf.open("M_M_NSE_5m.csv"))
+    expected = historify.get_ohlcv("M&M", "NSE", "5m")
+    assert list(five_minute.columns) == ["date", "time", "open", "high", "low", "close", "volume", "oi"]
+    assert five_minute["time"].iloc[:2].tolist() == ["09:15:00", "09:20:00"]
+    pd.testing.assert_series_equal(five_minute["high"], expected["high"], check_names=False)
+    assert five_minute["volume"].tolist() == [50] * 75
+
+
+def test_zip_export_writes_parquet_entries(historify, output_dir):
+    output = os.path.join(output_dir, "export.zip")
+
+    success, _, count = historify.export_to_zip(
+        output, symbols=[{"symbol": "sbin", "exchange": "nse"}], intervals=["1m", "D"], file_format="parquet"
+    )
+
+    assert success and count == 375
+    with zipfile.ZipFile(output) as zf:
+        assert zf.namelist() == ["SBIN_NSE_1m.parquet"]
+        table = pq.read_table(io.BytesIO(zf.read("SBIN_NSE_1m.parquet")))
+    assert table.num_rows == 375
+
+
+def test_failed_entry_aborts_export(historify, output_dir):
+    jobs = [
+        ExportJob("ok", [ExportEntry("ok", "SELECT * FROM range(1000)")]),
+        ExportJob("bad", [ExportEntry("bad", "SELECT * FROM missing_table")]),
+    ]
+    with zipfile.ZipFile(os.path.join(output_dir, "failed.zip"), "w") as zf:
+        with pytest.raises(Exception, match="missing_table"):
+            write_zip_entries(zf, jobs, lambda: historify.get_connection(read_only=True), workers=2)
+
+
+def test_delimited_exports_stream_to_file(historify, output_dir):
+    txt = os.path.join(output_dir, "export.txt")
+    success, _, count = historify.export_to_txt(txt, interval="1m", delimiter="|")
+    assert success and count == len(SYMBOLS) * 375
+    frame = pd.read_csv(txt, sep="|")
+    assert len(frame) == count
+    assert frame["symbol"].unique().tolist() == sorted(SYMBOLS)
+
+    csv = os.path.join(output_dir, "export.csv")
+    success, message, count = historify.export_bulk_csv(csv, [], interval="D")
+    assert (success, message, count) == (False, "No data matching the criteria", 0)
+    assert not os.path.exists(csv)
@@ -0,0 +1,179 @@
+"""
+Tests for services/historify_replay.py: deterministic event streams built from
+Historify 1m bars, topic/payload format and speed pacing.
+"""
+
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from services import historify_replay
+from services.historify_replay import HistorifyReplay, session_bounds
+
+DAY = date(2025, 1, 15)
+START, _ = session_bounds(DAY)
+OPEN = START + 9 * 3600 + 15 * 60  # 09:15 IST
+
+
+def _bars(prices, volume=10):
+    return pd.DataFrame(
+        {
+            "timestamp": [OPEN + 60 * i for i in range(len(prices))],
+            "open": [p[0] for p in prices],
+            "high": [p[1] for p in prices],
+            "low": [p[2] for p in prices],
+            "close": [p[3] for p in prices],
+            "volume": [volume] * len(prices),
+            "oi": [0] * len(prices),
+        }
+    )
+
+
+DATA = {
+    ("RELIANCE", "NSE"): _bars([(100, 105, 99, 104), (104, 106, 101, 102)]),
+    ("SBIN", "NSE"): _bars([(800, 802, 795, 796)], volume=7),
+}
+
+
+class FakePublisher:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, topic, data):
+        self.messages.append((time.perf_counter(), topic, data))
+        return True
+
+
+@pytest.fixture(autouse=True)
+def historify(monkeypatch):
+    calls = []
+
+    def get_ohlcv(symbol, exchange, interval, start, end):
+        calls.append((symbol, exchange, interval, start, end))
+        return DATA.get((symbol, exchange), pd.DataFrame()).copy()
+
+    monkeypatch.setattr(historify_replay, "get_ohlcv", get_ohlcv)
+    return calls
+
+
+def _replay(speed=0, **kwargs):
+    publisher = FakePublisher()
+    replay = HistorifyReplay([("RELIANCE", "NSE"), ("SBIN", "NSE")], DAY, speed=speed, publisher=publisher, **kwargs)
+    return replay, publisher, replay.run()
+
+
+def test_ticks_are_synthesized_deterministically(historify):
+    _, publisher, stats = _replay()
+    _, again, _ = _replay()
+
+    assert historify[0] == ("RELIANCE", "NSE", "1m", START, START + 86399)
+    assert [m[1:] for m in publisher.messages] == [m[1:] for m in again.messages]
+    assert stats["messages"] == stats["events"] == 12 and stats["errors"] == 0
+
+    reliance = [data for _, topic, data in publisher.messages if topic == "NSE_RELIANCE_LTP"]
+    # Rising bar: open, low, high, close; falling bar: open, high, low, close
+    assert [d["ltp"] for d in reliance] == [100, 99, 105, 104, 104, 106, 101, 102]
+    assert [d["timestamp"] for d in reliance[:4]] == [(OPEN + s) * 1000 for s in (0, 15, 30, 59)]
+
+    # Equal timestamps are ordered by symbol, so streams interleave deterministically
+    first_minute = [topic for _, topic, data in publisher.messages if data["timestamp"] < (OPEN + 60) * 1000]
+    assert first_minute == ["NSE_RELIANCE_LTP", "NSE_SBIN_LTP"] * 4
+
+
+def test_quote_mode_accumulates_session_and_splits_volume():
+    _, publisher, _ = _replay(publish_modes=("QUOTE",))
+
+    sbin = [data for _, topic, data in publisher.messages if topic == "NSE_SBIN_QUOTE"]
+    assert [d["volume"] for d in sbin] == [1, 2, 3, 7]
+    assert sbin[-1] == {
+        "symbol": "SBIN",
+        "exchange": "NSE",
+        "mode": "quote",
+        "ltp": 796,
+        "open": 800,
+        "high": 802,
+        "low": 795,
+        "volume": 7,
+        "ltt": (OPEN + 59) * 1000,
+        "timestamp": (OPEN + 59) * 1000,
+    }
+
+
+def test_bars_mode_publishes_closes():
+    _, publisher, stats = _replay(replay_mode="bars", publish_modes=("LTP", "QUOTE"))
+
+    assert stats["events"] == 3 and stats["messages"] == 6
+    assert [d["ltp"] for _, topic, d in publisher.messages if topic == "NSE_RELIANCE_LTP"] == [104, 102]
+
+
+def test_speed_paces_by_bar_time():
+    # One replayed minute (two bars of RELIANCE, 119s of ticks) at 600x is ~0.2s
+    replay, publisher, stats = _replay(speed=600, replay_mode="bars")
+
+    elapsed = publisher.messages[-1][0] - publisher.messages[0][0]
+    assert 0.09 <= elapsed < 0.5
+    assert stats["replayed_seconds"] == 60
+    assert set(stats["publish_latency_us"]) == set(stats["schedule_lag_ms"]) == {"p50", "p99", "max"}
+
+    first_ts = publisher.messages[0][2]["timestamp"]
+    assert replay.expected_wall_time(first_ts + 60_000) - replay.expected_wall_time(first_ts) == pytest.approx(0.1)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        HistorifyReplay([("SBIN", "NSE")], DAY, replay_mode="trades")
+    with pytest.raises(ValueError):
+        HistorifyReplay([("SBIN", "NSE")], DAY, publish_modes=("DEPTH",))
+
+
+def test_unsent_messages_count_as_errors():
+    class UnboundPublisher:
+        def publish(self, topic, data):
+            return False
+
+    stats = HistorifyReplay([("SBIN", "NSE")], DAY, speed=0, publisher=UnboundPublisher()).run()
+
+    assert stats["events"] == 4
+    assert stats["messages"] == 0
+    assert stats["errors"] == 4
+
+
+def test_default_publisher_is_bound(monkeypatch):
+    from websocket_proxy import connection_manager
+
+    bound = []
+
+    class SharedPublisher(FakePublisher):
+        def bind(self, port=None):
+            bound.append(port)
+            return port
+
+    monkeypatch.setenv("ZMQ_PORT", "5599")
+    monkeypatch.setattr(connection_manager, "SharedZmqPublisher", SharedPublisher)
+    replay = HistorifyReplay([("SBIN", "NSE")], DAY, speed=0)
+    stats = replay.run()
+
+    assert bound == [5599]
+    assert stats["messages"] == len(replay.publisher.messages) == 4
+
+
+def test_default_publisher_must_bind_to_zmq_port(monkeypatch):
+    from websocket_proxy import connection_manager
+
+    class FallbackPublisher(FakePublisher):
+        def bind(self, port=None):
+            return port + 1
+
+    monkeypatch.setenv("ZMQ_PORT", "5599")
+    monkeypatch.setattr(connection_manager, "SharedZmqPublisher", FallbackPublisher)
+    replay = HistorifyReplay([("SBIN", "NSE")], DAY, speed=0)
+
+    with pytest.raises(RuntimeError, match="5599 is busy"):
+        replay.run()
+    assert replay.stats.messages == 0
@@ -0,0 +1,171 @@
+"""
+Tests for the materialized multi-timeframe rollups in database/historify_db.py.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from database import historify_db
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+@pytest.fixture
+def historify(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "0")
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    historify_db.close_connections()
+    historify_db.init_database()
+    yield historify_db
+    historify_db.close_connections()
+
+
+def _ist_epoch(year, month, day, hour=0, minute=0):
+    return int(datetime(year, month, day, hour, minute, tzinfo=IST).timestamp())
+
+
+def _bars(timestamps, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, len(timestamps)).cumsum()
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "open": close + rng.normal(0, 0.2, len(timestamps)),
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.integers(100, 1000, len(timestamps)),
+            "oi": rng.integers(0, 50, len(timestamps)),
+        }
+    )
+
+
+def _minute_bars(seed=1):
+    timestamps = []
+    for day in (13, 14, 15):
+        market_open = _ist_epoch(2025, 1, day, 9, 15)
+        timestamps += [market_open + 60 * n for n in range(375)]
+    return _bars(timestamps, seed)
+
+
+def _daily_bars(seed=2):
+    first = _ist_epoch(2025, 1, 1)
+    return _bars([first + 86400 * n for n in range(90)], seed)
+
+
+def _on_the_fly(db, interval, start=None, end=None):
+    if historify_db.ROLLUP_INTERVALS[interval] == "D":
+        return db._get_daily_aggregated_ohlcv("SBIN", "NSE", interval, start, end)
+    return db._get_aggregated_ohlcv("SBIN", "NSE", interval, start, end)
+
+
+def _assert_same(rollup, expected):
+    assert len(rollup) == len(expected)
+    pd.testing.assert_frame_equal(
+        rollup.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False
+    )
+
+
+def _load_in_chunks(db, frame, interval, chunk):
+    # Overlapping, out-of-order chunks exercise the incremental refresh
+    starts = list(range(0, len(frame), chunk))
+    for start in reversed(starts):
+        db.upsert_market_data(frame.iloc[max(0, start - 3) : start + chunk], "SBIN", "NSE", interval)
+
+
+def test_rollups_match_on_the_fly_aggregation(historify):
+    _load_in_chunks(historify, _minute_bars(), "1m", 97)
+    _load_in_chunks(historify, _daily_bars(), "D", 11)
+
+    ranges = [
+        (None, None),
+        # Starts and ends inside a candle, so the edge candles are partial
+        (_ist_epoch(2025, 1, 13, 10, 7), _ist_epoch(2025, 1, 15, 11, 52)),
+        (_ist_epoch(2025, 1, 8), _ist_epoch(2025, 3, 12)),
+    ]
+    for interval in historify.ROLLUP_INTERVALS:
+        for start, end in ranges:
+            expected = _on_the_fly(historify, interval, start, end)
+            assert not expected.empty
+            _assert_same(historify.get_ohlcv("SBIN", "NSE", interval, start, end), expected)
+
+
+def test_upsert_updates_touched_candles_only(historify):
+    bars = _minute_bars()
+    historify.upsert_market_data(bars, "SBIN", "NSE", "1m")
+
+    revised = bars.iloc[30:32].copy()
+    revised["high"] = 999.0
+    revised["volume"] = 1
+    historify.upsert_market_data(revised, "SBIN", "NSE", "1m")
+
+    hourly = historify.get_ohlcv("SBIN", "NSE", "1h")
+    assert hourly["high"].tolist().count(999.0) == 1
+    assert hourly.loc[hourly["high"] == 999.0, "timestamp"].iloc[0] == _ist_epoch(2025, 1, 13, 9, 15)
+    _assert_same(hourly, _on_the_fly(historify, "1h"))
+
+
+def test_custom_interval_falls_back_to_on_the_fly(historify):
+    historify.upsert_market_data(_minute_bars(), "SBIN", "NSE", "1m")
+
+    result = historify.get_ohlcv("SBIN", "NSE", "25m")
+
+    _assert_same(result, historify._get_aggregated_ohlcv("SBIN", "NSE", "25m"))
+    assert result["timestamp"].iloc[1] - result["timestamp"].iloc[0] == 25 * 60
+    with historify.get_connection(read_only=True) as conn:
+        intervals = {row[0] for row in conn.execute("SELECT DISTINCT interval FROM market_data_rollup").fetchall()}
+    assert intervals == {"5m", "15m", "30m", "1h"}
+
+
+def test_rebuild_and_delete_keep_rollups_in_sync(historify):
+    historify.upsert_market_data(_minute_bars(), "SBIN", "NSE", "1m")
+    historify.upsert_market_data(_daily_bars(), "SBIN", "NSE", "D")
+    incremental = historify.get_ohlcv("SBIN", "NSE", "15m")
+
+    assert historify.rebuild_rollups("SBIN", "NSE") > 0
+    _assert_same(historify.get_ohlcv("SBIN", "NSE", "15m"), incremental)
+
+    historify.delete_market_data("SBIN", "NSE", "1m")
+    assert historify.get_ohlcv("SBIN", "NSE", "15m").empty
+    assert not historify.get_ohlcv("SBIN", "NSE", "W").empty
+
+    historify.delete_market_data("SBIN", "NSE")
+    assert historify.get_database_stats()["rollups"]["candles"] == 0
+
+
+def test_missing_rollup_rows_fall_back_to_on_the_fly(historify):
+    historify.upsert_market_data(_minute_bars(), "SBIN", "NSE", "1m")
+    assert historify._rollups_ready
+    with historify.get_connection() as conn:
+        conn.execute("DELETE FROM market_data_rollup WHERE symbol = 'SBIN'")
+
+    start, end = _ist_epoch(2025, 1, 14), _ist_epoch(2025, 1, 15)
+    for interval in ("5m", "1h"):
+        _assert_same(historify.get_ohlcv("SBIN", "NSE", interval, start, end), _on_the_fly(historify, interval, start, end))
+    # No base rows either: still an empty result
+    assert historify.get_ohlcv("SBIN", "NSE", "5m", _ist_epoch(2025, 6, 1), _ist_epoch(2025, 6, 2)).empty
+
+
+def test_backfill_covers_cold_tier_only_series(historify, tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORIFY_COLD_TIER_PATH", str(tmp_path / "cold"))
+    historify.refresh_market_data_view()
+    historify.upsert_market_data(_minute_bars(), "SBIN", "NSE", "1m")
+    historify.compact_closed_months(_ist_epoch(2025, 2, 1))
+    with historify.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM market_data").fetchone()[0] == 0
+        conn.execute("DELETE FROM market_data_rollup")
+
+    if not historify.start_rollup_backfill():
+        historify._rollup_backfill.join(timeout=30)
+
+    assert historify._rollups_ready
+    with historify.get_connection(read_only=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM market_data_rollup WHERE symbol = 'SBIN'").fetchone()[0] > 0
+    _assert_same(historify.get_ohlcv("SBIN", "NSE", "15m"), _on_the_fly(historify, "15m"))
@@ -0,0 +1,164 @@
+"""
+Tests for the Historify read-through cache of services/history_service.get_history.
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from database import historify_db
+from services import history_service
+
+IST = history_service.IST
+
+
+def _day(offset):
+    return datetime.now(IST).date() + timedelta(days=offset)
+
+
+def _epoch(day):
+    return history_service._ist_epoch(day)
+
+
+@pytest.fixture
+def broker(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORIFY_CATALOG_RECONCILE_INTERVAL", "0")
+    monkeypatch.setenv("HISTORIFY_READ_THROUGH", "true")
+    monkeypatch.setattr(historify_db, "HISTORIFY_DB_PATH", str(tmp_path / "historify.duckdb"))
+    historify_db.close_connections()
+    historify_db.init_database()
+
+    calls = []
+
+    def get_history_with_auth(
+        auth, feed, broker_name, symbol, exchange, interval, start, end, response_format="json"
+    ):
+        calls.append((interval, start, end))
+        first = datetime.strptime(start, "%Y-%m-%d").date()
+        last = datetime.strptime(end, "%Y-%m-%d").date()
+        days = [first + timedelta(days=n) for n in range((last - first).days + 1)]
+        data = [
+            {"timestamp": _epoch(day), "open": 1.0, "high": 2.0, "low": 0.5, "close": day.day, "volume": 10}
+            for day in days
+            if day.weekday() < 5
+        ]
+        return True, {"status": "success", "data": data}, 200
+
+    monkeypatch.setattr(history_service, "get_history_with_auth", get_history_with_auth)
+    monkeypatch.setattr(history_service, "_enforce_rate_limit", lambda: None)
+    yield calls
+    historify_db.close_connections()
+
+
+def _history(start, end, interval="D"):
+    success, response, status = history_service.get_history(
+        "SBIN", "NSE", interval, start.isoformat(), end.isoformat(), auth_token="token", broker="test"
+    )
+    assert success and status == 200
+    return pd.DataFrame(response["data"])
+
+
+def _weekdays(start, end):
+    return sum((start + timedelta(days=n)).weekday() < 5 for n in range((end - start).days + 1))
+
+
+def test_covered_days_are_served_without_broker_calls(broker):
+    first = _history(_day(-30), _day(-1))
+    assert len(broker) == 1
+    assert len(first) == _weekdays(_day(-30), _day(-1))
+
+    again = _history(_day(-20), _day(-5))
+    assert len(broker) == 1
+    assert again["timestamp"].is_monotonic_increasing
+    assert len(again) == _weekdays(_day(-20), _day(-5))
+
+    # Today is always fetched and returned, but never stored
+    with_today = _history(_day(-10), _day(0))
+    assert broker[-1] == ("D", _day(0).isoformat(), _day(0).isoformat())
+    assert len(with_today) == _weekdays(_day(-10), _day(0))
+    assert historify_db.get_history_coverage("SBIN", "NSE", "D") == (_day(-30), _day(-1))
+    assert historify_db.get_data_range("SBIN", "NSE", "D")["last_timestamp"] < _epoch(_day(0))
+
+
+def test_only_missing_edges_are_fetched(broker):
+    _history(_day(-20), _day(-10))
+    _history(_day(-25), _day(-5))
+
+    assert broker[1:] == [
+        ("D", _day(-25).isoformat(), _day(-21).isoformat()),
+        ("D", _day(-9).isoformat(), _day(-5).isoformat()),
+    ]
+    assert historify_db.get_history_coverage("SBIN", "NSE", "D") == (_day(-25), _day(-5))
+
+    # A range away from the covered span is stored but not marked as covered
+    _history(_day(-60), _day(-50))
+    assert historify_db.get_history_coverage("SBIN", "NSE", "D") == (_day(-25), _day(-5))
+
+
+def test_historify_downloads_seed_coverage(broker):
+    start, end = _day(-15), _day(-2)
+    bars = [
+        {"timestamp": _epoch(start + timedelta(days=n)), "open": 1, "high": 2, "low": 0.5, "close": 1, "volume": 10}
+        for n in range((end - start).days + 1)
+    ]
+    historify_db.upsert_market_data(pd.DataFrame(bars), "SBIN", "NSE", "D")
+
+    assert len(_history(start, end)) == len(bars)
+    success, response, _ = history_service.get_history(
+        "SBIN", "NSE", "D", start, end, auth_token="token", broker="test", response_format="columnar"
+    )
+    assert success and response["data"]["timestamp"] == [bar["timestamp"] for bar in bars]
+    assert broker == []
+
+    # Intervals that are not stored go straight to the broker
+    _history(start, end, interval="5m")
+    assert broker == [("5m", start.isoformat(), end.isoformat())]
+
+    # Deleting the data forgets the coverage
+    historify_db.delete_market_data("SBIN", "NSE", "D")
+    assert historify_db.get_history_coverage("SBIN", "NSE", "D") is None
+
+
+def test_missing_ranges_merge_around_partial_coverage():
+    coverage = (date(2025, 1, 10), date(2025, 1, 20))
+    assert history_service._missing_ranges(date(2025, 1, 12), date(2025, 1, 18), coverage) == []
+    assert history_service._missing_ranges(date(2025, 1, 1), date(2025, 1, 31), coverage) == [
+        (date(2025, 1, 1), date(2025, 1, 9), True),
+        (date(2025, 1, 21), date(2025, 1, 31), True),
+    ]
+    assert history_service._missing_ranges(
+        date(2025, 1, 1), date(2025, 1, 31), (date(2025, 1, 10), date(2025, 1, 9))
+    ) == [(date(2025, 1, 1), date(2025, 1, 31), True)]
+
+
+def test_truncated_broker_response_is_not_marked_covered(broker, monkeypatch):
+    full = history_service.get_history_with_auth
+    requested = []
+
+    def truncated(auth, feed, broker_name, symbol, exchange, interval, start, end, response_format="json"):
+        # Like a broker capping 1m history per request: only the first 3 days come back
+        requested.append((start, end))
+        cap = (datetime.strptime(start, "%Y-%m-%d").date() + timedelta(days=2)).isoformat()
+        return full(auth, feed, broker_name, symbol, exchange, interval, start, min(end, cap))
+
+    monkeypatch.setenv("HISTORIFY_CHUNK_DAYS_1M", "30")
+    monkeypatch.setattr(history_service, "get_history_with_auth", truncated)
+    _history(_day(-40), _day(-1), interval="1m")
+
+    # Gaps are fetched in broker-sized chunks
+    assert requested == [
+        (_day(-40).isoformat(), _day(-11).isoformat()),
+        (_day(-10).isoformat(), _day(-1).isoformat()),
+    ]
+    first, last = historify_db.get_history_coverage("SBIN", "NSE", "1m")
+    assert first >= _day(-10) and last <= _day(-8)
+
+    # The days the broker did not return are fetched again
+    monkeypatch.setattr(history_service, "get_history_with_auth", full)
+    assert len(_history(_day(-40), _day(-1), interval="1m")) == _weekdays(_day(-40), _day(-1))
+    assert historify_db.get_history_coverage("SBIN", "NSE", "1m") == (_day(-40), _day(-1))
@@ -0,0 +1,69 @@
+"""
+Tests for symbol-indexed subscriber dispatch in MarketDataService
+(services/market_data_service.DispatchIndex).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_data_service import (
+    DispatchIndex,
+    MarketDataService,
+    SubscriberPriority,
+)
+
+
+def _subscriber(name, event_type="all", symbols=None):
+    return {"name": name, "event_type": event_type, "filter": frozenset(symbols) if symbols else None}
+
+
+def test_index_orders_by_key_and_routes_filtered_symbols():
+    critical = _subscriber("critical")
+    ltp_sbin = _subscriber("ltp_sbin", "ltp", {"NSE:SBIN"})
+    quote_all = _subscriber("quote_all", "quote")
+    index = DispatchIndex([((3, 3), quote_all), ((2, 2), ltp_sbin), ((1, 1), critical)])
+
+    assert [s["name"] for s in index.lookup("NSE:SBIN", "ltp")] == ["critical", "ltp_sbin"]
+    assert [s["name"] for s in index.lookup("NSE:INFY", "ltp")] == ["critical"]
+    assert [s["name"] for s in index.lookup("NSE:SBIN", "quote")] == ["critical", "quote_all"]
+    # Unknown modes only reach "all" subscribers
+    assert [s["name"] for s in index.lookup("NSE:SBIN", "all")] == ["critical"]
+
+
+def test_service_dispatch_follows_subscribe_and_unsubscribe():
+    service = MarketDataService()
+    received = []
+
+    critical_id = service.subscribe_critical(lambda data: received.append(("critical", data["symbol"])))
+    filtered_id = service.subscribe_with_priority(
+        SubscriberPriority.HIGH,
+        "ltp",
+        lambda data: received.append(("filtered", data["symbol"])),
+        filter_symbols={"NSE:TCS"},
+    )
+    try:
+        service._broadcast_update_priority("NSE:TCS", 1, {"symbol": "TCS"})
+        service._broadcast_update_priority("NSE:INFY", 1, {"symbol": "INFY"})
+        assert received == [("critical", "TCS"), ("filtered", "TCS"), ("critical", "INFY")]
+
+        # Re-subscribing with another filter rebuilds the index
+        assert service.unsubscribe_priority(filtered_id)
+        filtered_id = service.subscribe_with_priority(
+            SubscriberPriority.HIGH,
+            "ltp",
+            lambda data: received.append(("filtered", data["symbol"])),
+            filter_symbols={"NSE:INFY"},
+        )
+        received.clear()
+        service._broadcast_update_priority("NSE:TCS", 1, {"symbol": "TCS"})
+        service._broadcast_update_priority("NSE:INFY", 1, {"symbol": "INFY"})
+        assert received == [("critical", "TCS"), ("critical", "INFY"), ("filtered", "INFY")]
+    finally:
+        service.unsubscribe_priority(critical_id)
+        service.unsubscribe_priority(filtered_id)
+
+    received.clear()
+    service._broadcast_update_priority("NSE:INFY", 1, {"symbol": "INFY"})
+    assert received == []
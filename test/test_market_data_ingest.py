@@ -0,0 +1,90 @@
+"""
+Tests for the MarketDataService ingestion stage (services/market_data_ingest.py).
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.market_data_ingest import IsolatedCallback, RingBuffer, RingWorker
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_ring_buffer_is_fifo_and_bounded():
+    ring = RingBuffer(3)
+    assert ring.capacity == 4
+
+    assert all(ring.put(n) for n in range(4))
+    assert not ring.put(4)
+    assert ring.drain(2) == [0, 1]
+    assert ring.put(5)
+    assert ring.drain(10) == [2, 3, 5]
+    assert len(ring) == 0
+
+
+def test_worker_dispatches_in_order_in_batches():
+    received = []
+    worker = RingWorker("test-ingest", received.extend, capacity=1024, batch_size=64)
+    try:
+        for n in range(500):
+            assert worker.submit(n)
+        assert _wait_for(lambda: len(received) == 500)
+    finally:
+        worker.stop()
+
+    stats = worker.get_stats()
+    assert received == list(range(500))
+    assert stats["processed"] == 500
+    assert stats["max_batch"] <= 64
+    assert stats["dropped"] == 0
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+    worker = RingWorker("test-backpressure", lambda batch: release.wait(), capacity=4, batch_size=1)
+    try:
+        worker.submit("first")
+        assert _wait_for(lambda: len(worker.ring) == 0)
+        # Handler is now blocked on the first item; four more fit in the ring
+        results = [worker.submit(n) for n in range(6)]
+    finally:
+        release.set()
+        worker.stop()
+
+    assert results == [True] * 4 + [False] * 2
+    assert worker.get_stats()["dropped"] == 2
+    assert worker.get_stats()["high_watermark"] == 4
+
+
+def test_isolated_callback_does_not_block_caller():
+    release = threading.Event()
+    received = []
+
+    def slow_callback(data):
+        release.wait()
+        received.append(data)
+
+    isolated = IsolatedCallback(slow_callback, "slow", capacity=16)
+    try:
+        started = time.monotonic()
+        for n in range(3):
+            isolated({"n": n})
+        assert time.monotonic() - started < 0.5
+        release.set()
+        assert _wait_for(lambda: len(received) == 3)
+    finally:
+        release.set()
+        isolated.stop()
+
+    assert [data["n"] for data in received] == [0, 1, 2]
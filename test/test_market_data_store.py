@@ -0,0 +1,89 @@
+"""
+Tests for the columnar last-value store behind MarketDataService
+(services/market_data_store.py).
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.market_data_store import CacheView, LastValueStore
+
+
+def test_ltp_and_quote_views_match_legacy_shape():
+    store = LastValueStore(capacity=2)
+    store.update("NSE", "SBIN", 1, {"ltp": 812.5, "timestamp": 1737000000, "volume": 1200}, 1737000001.0)
+    instrument_id = store.update(
+        "NSE",
+        "SBIN",
+        2,
+        {"ltp": 813.0, "open": 800, "high": 815.5, "low": 799.0, "close": 805.0, "volume": 1500},
+        1737000002.0,
+    )
+
+    assert store.ltp_view(instrument_id) == {"value": 813.0, "timestamp": 1737000002, "volume": 1500}
+    quote = store.quote_view(instrument_id)
+    assert quote["high"] == 815.5
+    assert quote["volume"] == 1500
+    assert store.depth_view(instrument_id) is None
+
+
+def test_store_grows_and_keeps_values():
+    store = LastValueStore(capacity=2)
+    for n in range(10):
+        store.update("NFO", f"OPT{n}", 1, {"ltp": 100.0 + n}, 1737000000.0)
+
+    assert len(store) == 10
+    ids = store.get_ids([{"exchange": "NFO", "symbol": "OPT0"}, {"exchange": "NFO", "symbol": "OPT9"}])
+    assert store.ltp_values(ids).tolist() == [100.0, 109.0]
+
+
+def test_ltp_values_marks_unknown_and_cleared_as_nan():
+    store = LastValueStore()
+    store.update("NSE", "INFY", 1, {"ltp": 1500.0}, 1737000000.0)
+    store.update("NSE", "TCS", 1, {"ltp": 4000.0}, 1737000000.0)
+    store.clear("NSE", "TCS")
+
+    ids = store.get_ids(
+        [
+            {"exchange": "NSE", "symbol": "INFY"},
+            {"exchange": "NSE", "symbol": "TCS"},
+            {"exchange": "NSE", "symbol": "WIPRO"},
+        ]
+    )
+    out = np.empty(3)
+    values = store.ltp_values(ids, out=out)
+
+    assert values is out
+    assert values[0] == 1500.0
+    assert math.isnan(values[1]) and math.isnan(values[2])
+
+
+def test_ltp_values_max_age():
+    store = LastValueStore()
+    now = time.time()
+    store.update("NSE", "FRESH", 1, {"ltp": 10.0}, now - 1)
+    store.update("NSE", "STALE", 1, {"ltp": 20.0}, now - 60)
+
+    ids = store.get_ids([{"exchange": "NSE", "symbol": "FRESH"}, {"exchange": "NSE", "symbol": "STALE"}])
+    assert store.ltp_values(ids).tolist() == [10.0, 20.0]
+    fresh = store.ltp_values(ids, max_age=5)
+    assert fresh[0] == 10.0 and math.isnan(fresh[1])
+
+
+def test_clear_stale_and_cache_view():
+    store = LastValueStore()
+    store.update("NSE", "OLD", 1, {"ltp": 10.0}, 1000.0)
+    store.update("NSE", "NEW", 1, {"ltp": 20.0}, 5000.0)
+
+    assert store.clear_stale(2000.0) == [("NSE", "OLD")]
+
+    view = CacheView(store)
+    assert list(view) == ["NSE:NEW"]
+    assert "NSE:OLD" not in view
+    assert view["NSE:NEW"]["ltp"]["value"] == 20.0
@@ -0,0 +1,120 @@
+"""
+Tests for the shared-data and process-pool modes of strategies/utils/optimization_engine.py.
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The engine puts strategies/utils on sys.path, which the strategy modules import from
+from strategies.utils import optimization_engine  # isort: skip
+from strategies import mcx_commodity_momentum_strategy as momentum  # isort: skip
+
+GRID = {"adx_threshold": [10, 15, 20, 25, 30, 35]}
+
+
+def _bars(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 5000 + np.cumsum(rng.normal(0, 15, n))
+    spread = rng.uniform(2, 20, n)
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 8, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(100, 1000, n),
+        },
+        index=pd.date_range("2025-01-01 09:00", periods=n, freq="15min"),
+    )
+
+
+def _strategy(name, parameters):
+    threshold = parameters.get("adx_threshold", 25)
+    return types.SimpleNamespace(
+        generate_signals=lambda df: momentum.generate_signals(df, {"adx_threshold": threshold})
+    )
+
+
+@pytest.fixture
+def strategies(monkeypatch):
+    # Forked workers inherit these patches
+    monkeypatch.setattr(optimization_engine, "create_strategy_with_params", _strategy)
+    monkeypatch.setattr(optimization_engine, "get_grid_search_params", lambda name: GRID)
+    monkeypatch.setattr(optimization_engine, "get_continuous_ranges", lambda name: {"adx_threshold": (10, 35)})
+
+
+def _grid(**kwargs):
+    return optimization_engine.GridSearchOptimizer(
+        "momentum", "CRUDEOIL", "MCX", "2025-01-01", "2025-03-31", api_key="test", **kwargs
+    )
+
+
+def _scores(results):
+    return sorted((r["parameters"]["adx_threshold"], r["composite_score"]) for r in results)
+
+
+def test_parallel_grid_matches_serial(strategies):
+    data = _bars()
+    progress = []
+
+    serial = _grid(data=data).optimize()
+    parallel = _grid(data=data).optimize(workers=2, progress_callback=lambda *args: progress.append(args[:2]))
+
+    assert len(serial) == len(GRID["adx_threshold"])
+    assert all("error" not in r for r in serial)
+    assert _scores(parallel) == pytest.approx(_scores(serial))
+    assert progress == [(n, 6) for n in range(1, 7)]
+    assert parallel[0]["composite_score"] == max(score for _, score in _scores(serial))
+
+
+def test_history_is_fetched_once(strategies, monkeypatch):
+    calls = []
+
+    def load_historical_data(self, *args):
+        calls.append(args)
+        return _bars()
+
+    monkeypatch.setattr(optimization_engine.SimpleBacktestEngine, "load_historical_data", load_historical_data)
+    results = _grid().optimize()
+
+    assert len(results) == 6 and all("error" not in r for r in results)
+    assert calls == [("CRUDEOIL", "MCX", "2025-01-01", "2025-03-31", "15m")]
+
+
+def test_early_stopping(strategies):
+    # Repeating the first set never improves on it
+    optimizer = _grid(data=_bars())
+
+    results = list(
+        optimization_engine.run_parameter_sweep(
+            [{"adx_threshold": 20}] * 6, optimizer.sweep_config(), optimizer.data, patience=2
+        )
+    )
+
+    assert len(results) == 3
+
+
+def test_shared_frame_round_trip(tmp_path):
+    df = _bars(50)
+    path = optimization_engine.share_frame(df, str(tmp_path))
+    pd.testing.assert_frame_equal(optimization_engine.load_shared_frame(path), df, check_freq=False)
+
+
+def test_random_search_fallback_in_workers(strategies, monkeypatch):
+    monkeypatch.setattr(optimization_engine, "SKOPT_AVAILABLE", False)
+    optimizer = optimization_engine.BayesianOptimizer(
+        "momentum", "CRUDEOIL", "MCX", "2025-01-01", "2025-03-31", api_key="test", data=_bars()
+    )
+
+    result = optimizer.optimize(n_iterations=4, workers=2)
+
+    assert result["n_iterations"] == 4
+    assert len(result["history"]) == 4
+    assert result["best_score"] == max(h["composite_score"] for h in result["history"])
@@ -0,0 +1,106 @@
+"""
+Tests for the columnar and binary API response formats (utils/response_format.py).
+"""
+
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from flask import Flask
+
+from services.quotes_service import multiquotes_to_frame
+from utils.response_format import format_table, table_response
+
+BARS = pd.DataFrame(
+    {
+        "timestamp": [1736740500, 1736740560],
+        "open": [766.5, 772.45],
+        "high": [774.0, 774.95],
+        "low": [763.2, 772.1],
+        "close": [772.5, 773.2],
+        "volume": [318625, 197189],
+        "oi": [0, 0],
+    }
+)
+
+
+@pytest.fixture
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+
+def test_json_formats():
+    assert format_table(BARS) == BARS.to_dict(orient="records")
+    columnar = format_table(BARS, "columnar")
+    assert list(columnar) == list(BARS.columns)
+    assert columnar["close"] == [772.5, 773.2]
+    assert type(columnar["volume"][0]) is int
+
+
+@pytest.mark.parametrize("response_format", ["arrow", "parquet"])
+def test_binary_formats_round_trip(app_context, response_format):
+    response = table_response(
+        {"status": "success", "data": format_table(BARS, response_format)}, 200, response_format
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-OpenAlgo-Status"] == "success"
+    assert response.headers["X-OpenAlgo-Rows"] == "2"
+    assert response.json == {"status": "success"}
+    body = response.get_data()
+    if response_format == "arrow":
+        assert response.mimetype == "application/vnd.apache.arrow.stream"
+        frame = pa.ipc.open_stream(body).read_pandas()
+    else:
+        frame = pd.read_parquet(io.BytesIO(body))
+    pd.testing.assert_frame_equal(frame, BARS)
+
+
+def test_errors_stay_json(app_context):
+    response = table_response({"status": "error", "message": "Invalid openalgo apikey"}, 403, "arrow")
+
+    assert response.status_code == 403
+    assert response.get_json()["message"] == "Invalid openalgo apikey"
+
+
+def test_multiquotes_flatten_to_rows():
+    frame = multiquotes_to_frame(
+        [
+            {"symbol": "SBIN", "exchange": "NSE", "data": {"ltp": 772.5, "volume": 100}},
+            {"symbol": "BAD", "exchange": "NSE", "error": "Symbol not found"},
+        ]
+    )
+
+    assert list(frame.columns) == ["symbol", "exchange", "ltp", "volume", "error"]
+    assert frame["ltp"].iloc[0] == 772.5
+    assert frame["error"].tolist()[1] == "Symbol not found"
+    assert format_table(multiquotes_to_frame([]), "columnar") == {"symbol": [], "exchange": [], "error": []}
+
+
+
+def test_multiquotes_with_errors_are_strict_json():
+    frame = multiquotes_to_frame(
+        [
+            {"symbol": "SBIN", "exchange": "NSE", "data": {"ltp": 772.5, "volume": 100}},
+            {"symbol": "BAD", "exchange": "NSE", "error": "Symbol not found"},
+        ]
+    )
+
+    def reject(constant):
+        raise ValueError(constant)
+
+    columnar = json.loads(json.dumps(format_table(frame, "columnar")), parse_constant=reject)
+    assert columnar["ltp"] == [772.5, None]
+    assert columnar["volume"] == [100, None]
+    assert type(columnar["volume"][0]) is int
+    assert columnar["error"] == [None, "Symbol not found"]
+
+    rows = json.loads(json.dumps(format_table(frame)), parse_constant=reject)
+    assert rows[1] == {"symbol": "BAD", "exchange": "NSE", "ltp": None, "volume": None, "error": "Symbol not found"}
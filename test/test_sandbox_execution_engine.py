@@ -0,0 +1,181 @@
+"""
+Tests for the incremental polling cycle of sandbox/execution_engine.py: only
+orders crossed by a moved LTP (or new, modified and rate-deferred orders)
+reach _process_order, and the order rate cap never blocks the loop.
+"""
+
+import os
+import sys
+import time
+import types
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database.sandbox_db import SandboxOrders, db_session, init_db
+from sandbox import execution_engine
+from sandbox.execution_engine import ExecutionEngine, OrderRateLimiter
+
+USERS = ["engine_test_a", "engine_test_b", "engine_test_c"]
+SYMBOLS = [("SBIN", "NSE"), ("INFY", "NSE")]
+
+
+@pytest.fixture
+def orders():
+    init_db()
+    SandboxOrders.query.filter(SandboxOrders.user_id.in_(USERS)).delete()
+    rows = []
+    for i in range(1000):
+        symbol, exchange = SYMBOLS[i % 2]
+        rows.append(
+            SandboxOrders(
+                orderid=f"ENGTEST{i:04d}",
+                user_id=USERS[i % 3],
+                symbol=symbol,
+                exchange=exchange,
+                action="BUY",
+                quantity=1,
+                price=Decimal(500 + i // 2),  # one order per price level per symbol
+                price_type="LIMIT",
+                product="MIS",
+                order_status="open",
+                pending_quantity=1,
+                order_timestamp=datetime.now(),
+            )
+        )
+    db_session.add_all(rows)
+    db_session.commit()
+    yield rows
+    db_session.rollback()
+    SandboxOrders.query.filter(SandboxOrders.user_id.in_(USERS)).delete()
+    db_session.commit()
+    db_session.remove()
+
+
+def _engine(monkeypatch, ltps, rate=10_000):
+    engine = ExecutionEngine()
+    engine.order_limiter = OrderRateLimiter(rate)
+    engine.fetches = []
+    engine.processed = []
+
+    def fetch(symbols):
+        engine.fetches.append(sorted(symbols))
+        return {key: {"ltp": ltp, "bid": ltp, "ask": ltp} for key, ltp in ltps.items()}
+
+    def process(order, quote):
+        engine.processed.append(order.orderid)
+        if Decimal(str(quote["ltp"])) <= order.price:
+            order.order_status = "complete"
+            db_session.commit()
+
+    monkeypatch.setattr(engine, "_fetch_quotes_batch", fetch)
+    monkeypatch.setattr(engine, "_process_order", process)
+    return engine
+
+
+def _cycle(engine):
+    engine.processed.clear()
+    engine.check_and_execute_pending_orders()
+    return list(engine.processed)
+
+
+def test_only_crossed_orders_on_moved_symbols_are_processed(orders, monkeypatch):
+    ltps = {("SBIN", "NSE"): 995, ("INFY", "NSE"): 2000}
+    engine = _engine(monkeypatch, ltps)
+
+    # SBIN orders are priced 500..999: five of them are at or above 995
+    assert sorted(_cycle(engine)) == [f"ENGTEST{i:04d}" for i in range(990, 1000, 2)]
+    assert engine.fetches == [sorted(SYMBOLS)]
+
+    # Same quotes: nothing to do
+    assert _cycle(engine) == []
+
+    # SBIN moves down; only the newly crossed levels are checked
+    ltps[("SBIN", "NSE")] = 993
+    assert sorted(_cycle(engine)) == ["ENGTEST0986", "ENGTEST0988"]
+
+    # A modified order is re-checked even though its LTP didn't move
+    order = SandboxOrders.query.filter_by(orderid="ENGTEST0001").one()
+    order.price = Decimal("2500")
+    db_session.commit()
+    assert _cycle(engine) == ["ENGTEST0001"]
+
+    # Cancelled orders leave the books
+    SandboxOrders.query.filter_by(orderid="ENGTEST0000").update({"order_status": "cancelled"})
+    db_session.commit()
+    _cycle(engine)
+    assert "ENGTEST0000" not in engine._indexed
+
+
+@pytest.mark.parametrize("bad_ltp", ["N/A", "nan"])
+def test_bad_ltp_only_skips_its_symbol(orders, monkeypatch, bad_ltp):
+    engine = _engine(monkeypatch, {("SBIN", "NSE"): bad_ltp, ("INFY", "NSE"): 995})
+
+    # INFY orders are priced 500..999 too: five of them are at or above 995
+    assert sorted(_cycle(engine)) == [f"ENGTEST{i:04d}" for i in range(991, 1000, 2)]
+    assert ("SBIN", "NSE") not in engine._last_ltp
+
+
+def test_missing_ltp_counts_as_zero():
+    assert execution_engine.quote_price({"ltp": None}, "ltp") == 0
+    assert execution_engine.quote_price({}, "bid") == 0
+    assert execution_engine.quote_price({"ltp": "812.5"}, "ltp") == Decimal("812.5")
+
+
+def test_rate_cap_defers_instead_of_sleeping(orders, monkeypatch):
+    engine = _engine(monkeypatch, {("SBIN", "NSE"): 1, ("INFY", "NSE"): 1}, rate=10)
+
+    started = time.monotonic()
+    first = _cycle(engine)
+    assert time.monotonic() - started < 1
+    # A full bucket of 10, plus whatever refilled while the cycle ran
+    assert 10 <= len(first) < 15
+    assert len(first) + len(engine._deferred) == 1000
+
+    # Deferred orders are retried on later cycles even though the LTP is unchanged
+    time.sleep(0.5)
+    second = _cycle(engine)
+    assert 4 <= len(second) < 10
+    assert not set(first) & set(second)
+
+
+def test_quote_api_key_is_cached(monkeypatch):
+    lookups = []
+    api_keys = types.SimpleNamespace(
+        query=types.SimpleNamespace(first=lambda: lookups.append(1) or types.SimpleNamespace(api_key_encrypted="x"))
+    )
+    monkeypatch.setattr("database.auth_db.ApiKeys", api_keys)
+    monkeypatch.setattr("database.auth_db.decrypt_token", lambda value: "decrypted")
+    monkeypatch.setattr(execution_engine, "_quote_api_key", None)
+
+    assert [execution_engine.get_quote_api_key() for _ in range(5)] == ["decrypted"] * 5
+    assert len(lookups) == 1
+
+    monkeypatch.setattr(execution_engine, "_quote_api_key_expires", 0.0)
+    execution_engine.get_quote_api_key()
+    assert len(lookups) == 2
+
+
+def test_standalone_cycles_reuse_one_engine(monkeypatch):
+    engines = []
+    monkeypatch.setattr(execution_engine, "_execution_engine", None)
+    monkeypatch.setattr(ExecutionEngine, "check_and_execute_pending_orders", lambda self: engines.append(self))
+
+    for _ in range(3):
+        execution_engine.run_execution_engine_once()
+
+    assert len(engines) == 3
+    assert engines[0] is engines[1] is engines[2] is execution_engine.get_execution_engine()
+
+
+def test_websocket_fallback_shares_the_polling_engine(monkeypatch):
+    from sandbox.websocket_execution_engine import WebSocketExecutionEngine
+
+    monkeypatch.setattr(execution_engine, "_execution_engine", None)
+    engine = execution_engine.get_execution_engine()
+
+    # One engine, so one order rate limiter for the whole process
+    assert WebSocketExecutionEngine()._execution_engine is engine
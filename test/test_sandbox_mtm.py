@@ -0,0 +1,132 @@
+"""
+Tests for the batched MTM in sandbox/position_manager.py: integer paise P&L
+matches the Decimal formulas, currency contracts keep their sub-paise ticks,
+and a persisted refresh only writes the positions whose values changed.
+"""
+
+import os
+import sys
+from decimal import ROUND_HALF_UP, Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+from database.sandbox_db import SandboxPositions, db_session, init_db
+from sandbox.position_manager import PositionManager, calculate_mtm
+
+USER = "mtm_batch_test"
+SYMBOLS = ["SBIN", "INFY", "TCS", "WIPRO"]
+
+
+def test_paise_pnl_matches_decimal():
+    rng = np.random.default_rng(25)
+    quantity = rng.integers(-5000, 5000, 2000)
+    average = rng.integers(1, 5_000_000, 2000)
+    ltp = average + rng.integers(-100_000, 100_000, 2000).clip(-average + 1)
+
+    pnl, percent = calculate_mtm(quantity, average, ltp)
+
+    for q, a, l, p, pct in zip(quantity.tolist(), average.tolist(), ltp.tolist(), pnl.tolist(), percent.tolist()):
+        avg, price = Decimal(a) / 100, Decimal(l) / 100
+        move = (price - avg) if q > 0 else (avg - price)
+        assert Decimal(p) / 100 == (price - avg) * q
+        expected = (move / avg * 100).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+        assert Decimal(pct) / 10_000 == (expected if q else 0)
+
+    assert calculate_mtm(np.array([10]), np.array([0]), np.array([100]))[1].tolist() == [0]
+
+
+@pytest.fixture
+def positions(monkeypatch):
+    init_db()
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    for n, symbol in enumerate(SYMBOLS):
+        db_session.add(
+            SandboxPositions(
+                user_id=USER,
+                symbol=symbol,
+                exchange="NSE",
+                product="MIS",
+                quantity=10 if n % 2 else -10,
+                average_price=Decimal("100.00"),
+                ltp=Decimal("100.00"),
+                pnl=Decimal("0.00"),
+                pnl_percent=Decimal("0.00"),
+                accumulated_realized_pnl=Decimal("0.00"),
+            )
+        )
+    db_session.commit()
+    monkeypatch.setattr(PositionManager, "_mtm_persisted_at", {})
+    monkeypatch.setattr("sandbox.position_manager.get_config", lambda key, default=None: "0")
+
+    updated = []
+    listener = lambda mapper, connection, target: updated.append(target.symbol)  # noqa: E731
+    event.listen(SandboxPositions, "before_update", listener)
+    yield updated
+    event.remove(SandboxPositions, "before_update", listener)
+    db_session.rollback()
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    db_session.commit()
+    db_session.remove()
+
+
+def _refresh(monkeypatch, ltps, exchange="NSE"):
+    quotes = {(symbol, exchange): {"ltp": ltp} for symbol, ltp in ltps.items()}
+    monkeypatch.setattr(PositionManager, "_fetch_quotes_from_websocket", lambda self, symbols: quotes)
+    monkeypatch.setattr(PositionManager, "_fetch_quotes_batch", lambda self, symbols: {})
+    success, response, _ = PositionManager(USER).get_open_positions(update_mtm=True)
+    assert success
+    return {row["symbol"]: row for row in response["data"]}
+
+
+def test_only_changed_rows_are_written(positions, monkeypatch):
+    rows = _refresh(monkeypatch, {"SBIN": 101.5, "INFY": 101.5, "TCS": 100, "WIPRO": 100})
+    assert sorted(positions) == ["INFY", "SBIN"]
+    assert rows["SBIN"]["pnl"] == pytest.approx(-15)  # short
+    assert rows["INFY"]["pnl"] == pytest.approx(15)
+    assert rows["INFY"]["ltp"] == 101.5
+
+    positions.clear()
+    rows = _refresh(monkeypatch, {"SBIN": 101.5, "INFY": 99.95, "TCS": 100})
+    assert positions == ["INFY"]
+    assert rows["INFY"]["pnl"] == pytest.approx(-0.5)
+    # No quote: the position keeps its last values
+    assert rows["WIPRO"]["ltp"] == 100
+
+    stored = {p.symbol: p for p in SandboxPositions.query.filter_by(user_id=USER)}
+    assert stored["INFY"].pnl_percent == Decimal("-0.05")
+    assert stored["SBIN"].pnl == Decimal("-15.00")
+
+
+def test_currency_positions_keep_sub_paise_ticks(positions, monkeypatch):
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    db_session.add(
+        SandboxPositions(
+            user_id=USER,
+            symbol="USDINR25JANFUT",
+            exchange="CDS",
+            product="NRML",
+            quantity=1000,
+            average_price=Decimal("83.25"),
+            ltp=Decimal("83.25"),
+            pnl=Decimal("0.00"),
+            pnl_percent=Decimal("0.00"),
+            accumulated_realized_pnl=Decimal("0.00"),
+        )
+    )
+    db_session.commit()
+
+    # Persisted: P&L is taken from the 0.0025 tick, not from an LTP rounded to 83.25
+    row = _refresh(monkeypatch, {"USDINR25JANFUT": 83.2525}, exchange="CDS")["USDINR25JANFUT"]
+    assert row["pnl"] == pytest.approx(2.5)
+    stored = SandboxPositions.query.filter_by(user_id=USER).one()
+    assert (stored.pnl, stored.pnl_percent) == (Decimal("2.50"), Decimal("0.0030"))
+
+    # In memory (write-behind): the LTP keeps its sub-paise tick as well
+    monkeypatch.setattr("sandbox.position_manager.get_config", lambda key, default=None: "60")
+    row = _refresh(monkeypatch, {"USDINR25JANFUT": 83.255}, exchange="CDS")["USDINR25JANFUT"]
+    assert row["ltp"] == 83.255
+    assert row["pnl"] == pytest.approx(5)
@@ -0,0 +1,121 @@
+"""
+Tests for sandbox/trigger_book.py and the WebSocketExecutionEngine tick path:
+a tick must only hand the orders it crosses to the execution engine.
+"""
+
+import os
+import sys
+import types
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sandbox.trigger_book import TriggerBook
+
+
+def _order(orderid, action, price_type, price=None, trigger_price=None, symbol="NIFTY24DEC24000CE"):
+    return types.SimpleNamespace(
+        orderid=orderid,
+        user_id="testuser",
+        symbol=symbol,
+        exchange="NFO",
+        action=action,
+        price_type=price_type,
+        price=Decimal(str(price)) if price is not None else None,
+        trigger_price=Decimal(str(trigger_price)) if trigger_price is not None else None,
+    )
+
+
+def _book(*orders):
+    book = TriggerBook()
+    for order in orders:
+        book.add(order.orderid, order.action, order.price_type, order.price, order.trigger_price)
+    return book
+
+
+def _should_execute(order, ltp):
+    """The crossing rules of ExecutionEngine._process_order."""
+    ltp = Decimal(str(ltp))
+    buy = order.action == "BUY"
+    if order.price_type == "MARKET":
+        return True
+    if order.price_type == "LIMIT":
+        return ltp <= order.price if buy else ltp >= order.price
+    if order.price_type == "SL":
+        if buy:
+            return order.trigger_price <= ltp <= order.price
+        return order.price <= ltp <= order.trigger_price
+    return ltp >= order.trigger_price if buy else ltp <= order.trigger_price
+
+
+ORDERS = [
+    _order("LB100", "BUY", "LIMIT", price=100),
+    _order("LB105", "BUY", "LIMIT", price=105),
+    _order("LS110", "SELL", "LIMIT", price=110),
+    _order("LS100", "SELL", "LIMIT", price=100),
+    _order("SLB", "BUY", "SL", price=108, trigger_price=106),
+    _order("SLS", "SELL", "SL", price=96, trigger_price=98),
+    _order("SLMB", "BUY", "SL-M", trigger_price=107),
+    _order("SLMS", "SELL", "SL-M", trigger_price=99),
+    _order("MKT", "BUY", "MARKET"),
+]
+
+
+def test_crossed_matches_execution_rules():
+    book = _book(*ORDERS)
+
+    for tenths in range(900, 1201):
+        ltp = Decimal(tenths) / 10
+        expected = {order.orderid for order in ORDERS if _should_execute(order, ltp)}
+        assert set(book.crossed(ltp)) == expected, ltp
+
+
+def test_remove_and_reprice():
+    book = _book(*ORDERS)
+
+    assert book.remove("LB105") and not book.remove("LB105")
+    assert "LB105" not in set(book.crossed(Decimal("104")))
+
+    book.add("LS110", "SELL", "LIMIT", Decimal("103"))
+    assert "LS110" in book.crossed(Decimal("104"))
+    assert len(book) == len(ORDERS) - 1
+
+    for order_id in book.order_ids():
+        book.remove(order_id)
+    assert not book and book.crossed(Decimal("100")) == []
+
+
+def test_tick_only_checks_crossed_orders(monkeypatch):
+    from sandbox.websocket_execution_engine import WebSocketExecutionEngine
+
+    engine = WebSocketExecutionEngine()
+    engine._running = True
+    checked = []
+    monkeypatch.setattr(engine, "_subscribe_ws_symbols", lambda *args: None)
+    monkeypatch.setattr(engine, "_unsubscribe_ws_symbols", lambda *args: None)
+    monkeypatch.setattr(engine, "_check_and_execute_order", lambda order_id, ltp: checked.append((order_id, ltp)))
+
+    resting = [_order(f"B{i}", "BUY", "LIMIT", price=50 + i) for i in range(200)]
+    for order in resting:
+        engine.notify_order_placed(order)
+    engine.notify_order_placed(resting[0])
+
+    def tick(ltp):
+        checked.clear()
+        engine._on_market_data({"symbol": "nifty24dec24000ce", "exchange": "NFO", "data": {"ltp": ltp}})
+        return sorted(order_id for order_id, _ in checked)
+
+    assert tick(300) == []
+    assert tick(248.5) == ["B199"]
+    assert checked == [("B199", Decimal("248.5"))]
+
+    engine.notify_order_modified(_order("B0", "BUY", "LIMIT", price=400))
+    assert tick(300) == ["B0"]
+
+    for order in resting:
+        engine.notify_order_completed(order.orderid, "NFO:NIFTY24DEC24000CE", order.user_id)
+    engine.notify_order_completed("B0", "NFO:NIFTY24DEC24000CE", "testuser")
+
+    assert tick(1) == []
+    assert engine._order_books == {} and engine._monitored_symbols == set()
+    assert engine._user_symbol_refcounts == {}
@@ -0,0 +1,147 @@
+"""
+Tests for the sandbox write path: WAL journaling on sandbox.db, one
+transaction per fill in sandbox/execution_engine.py and write-behind MTM in
+sandbox/position_manager.py.
+"""
+
+import os
+import sys
+import types
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import text
+
+from database.sandbox_db import (
+    SandboxOrders,
+    SandboxPositions,
+    SandboxTrades,
+    db_session,
+    engine,
+    init_db,
+)
+from sandbox import fund_manager
+from sandbox.execution_engine import ExecutionEngine
+from sandbox.position_manager import PositionManager
+
+USER = "writebehind_test"
+
+
+@pytest.fixture
+def position(monkeypatch):
+    init_db()
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    row = SandboxPositions(
+        user_id=USER,
+        symbol="SBIN",
+        exchange="NSE",
+        product="MIS",
+        quantity=10,
+        average_price=Decimal("800.00"),
+        ltp=Decimal("800.00"),
+        pnl=Decimal("0.00"),
+        pnl_percent=Decimal("0.00"),
+        accumulated_realized_pnl=Decimal("0.00"),
+    )
+    db_session.add(row)
+    db_session.commit()
+    monkeypatch.setattr(PositionManager, "_mtm_persisted_at", {})
+    monkeypatch.setattr("sandbox.position_manager.get_config", lambda key, default=None: "60")
+    yield row
+    db_session.rollback()
+    SandboxPositions.query.filter_by(user_id=USER).delete()
+    db_session.commit()
+    db_session.remove()
+
+
+def _refresh(monkeypatch, ltp):
+    quotes = {("SBIN", "NSE"): {"ltp": ltp}}
+    monkeypatch.setattr(PositionManager, "_fetch_quotes_from_websocket", lambda self, symbols: quotes)
+    success, response, _ = PositionManager(USER).get_open_positions(update_mtm=True)
+    assert success
+    (row,) = response["data"]
+    return row
+
+
+def _stored():
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT ltp, pnl FROM sandbox_positions WHERE user_id = :user"), {"user": USER}
+        ).one()
+
+
+def test_sandbox_db_uses_wal_journal():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_mtm_is_served_live_and_persisted_on_interval(position, monkeypatch):
+    assert _refresh(monkeypatch, 810)["pnl"] == pytest.approx(100)
+    assert float(_stored().ltp) == 810
+
+    # Within the interval: live P&L in the response, nothing written
+    assert _refresh(monkeypatch, 815)["pnl"] == pytest.approx(150)
+    assert float(_stored().ltp) == 810
+    assert not db_session.dirty
+
+    # Interval elapsed: the latest value is written even though it didn't move
+    PositionManager._mtm_persisted_at.clear()
+    assert _refresh(monkeypatch, 815)["pnl"] == pytest.approx(150)
+    stored = _stored()
+    assert float(stored.ltp) == 815 and float(stored.pnl) == 150
+
+
+def test_failed_margin_release_rolls_back_the_whole_fill(position, monkeypatch):
+    position.margin_blocked = Decimal("1600.00")
+    order = SandboxOrders(
+        orderid="WBTEST0001",
+        user_id=USER,
+        symbol="SBIN",
+        exchange="NSE",
+        action="SELL",
+        quantity=10,
+        price=Decimal("810.00"),
+        price_type="LIMIT",
+        product="MIS",
+        order_status="open",
+        pending_quantity=10,
+        order_timestamp=datetime.now(),
+    )
+    db_session.add(order)
+    db_session.commit()
+
+    def fail(**kwargs):
+        raise RuntimeError("database is locked")
+
+    funds = types.SimpleNamespace(query=types.SimpleNamespace(filter_by=fail))
+    monkeypatch.setattr(fund_manager, "SandboxFunds", funds)
+    try:
+        ExecutionEngine()._execute_order(order, Decimal("810.00"))
+        db_session.remove()
+
+        stored = SandboxOrders.query.filter_by(orderid="WBTEST0001").one()
+        # Not left open, so the next cycle can't fill it again
+        assert stored.order_status == "rejected"
+        assert SandboxTrades.query.filter_by(orderid="WBTEST0001").count() == 0
+        assert SandboxPositions.query.filter_by(user_id=USER).one().quantity == 10
+    finally:
+        db_session.rollback()
+        SandboxOrders.query.filter_by(orderid="WBTEST0001").delete()
+        SandboxTrades.query.filter_by(orderid="WBTEST0001").delete()
+        db_session.commit()
+
+
+def test_single_position_mtm_leaves_the_write_to_the_full_pass(position, monkeypatch):
+    quotes = {("SBIN", "NSE"): {"ltp": 810}}
+    monkeypatch.setattr(PositionManager, "_fetch_quotes_from_websocket", lambda self, symbols: quotes)
+
+    single = PositionManager(USER).get_position_for_symbol("SBIN", "NSE", "MIS")
+    assert single["ltp"] == 810 and single["pnl"] == pytest.approx(100)
+    assert float(_stored().ltp) == 800
+
+    # The full pass still owns this interval's write
+    assert _refresh(monkeypatch, 815)["pnl"] == pytest.approx(150)
+    assert float(_stored().ltp) == 815
@@ -0,0 +1,99 @@
+"""
+Tests for the incremental mode of strategies/utils/simple_backtest_engine.py.
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The engine puts strategies/utils on sys.path, which the strategy modules import from
+from strategies.utils.simple_backtest_engine import SimpleBacktestEngine  # isort: skip
+from strategies import mcx_commodity_momentum_strategy as momentum  # isort: skip
+
+
+def _bars(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 5000 + np.cumsum(rng.normal(0, 15, n))
+    spread = rng.uniform(2, 20, n)
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 5, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(100, 1000, n),
+        },
+        index=pd.date_range("2025-01-01 09:00", periods=n, freq="15min"),
+    )
+
+
+def _run(strategy_module, df, **kwargs):
+    engine = SimpleBacktestEngine(api_key="test", host="http://127.0.0.1:5000")
+    engine.load_historical_data = lambda *args, **kw: df.copy()
+    return engine.run_backtest(strategy_module, "CRUDEOIL", "MCX", "2025-01-01", "2025-01-31", **kwargs)
+
+
+def test_precomputed_signals_match_full_history_signals():
+    df = _bars()
+    legacy_module = types.SimpleNamespace(generate_signal=momentum.generate_signal)
+
+    legacy = _run(legacy_module, df)
+    incremental = _run(momentum, df)
+
+    assert legacy["total_trades"] >= 3
+    assert incremental["closed_trades"] == legacy["closed_trades"]
+    assert incremental["equity_curve"] == legacy["equity_curve"]
+    assert incremental["final_capital"] == pytest.approx(legacy["final_capital"])
+
+
+def test_generate_signal_gets_views_in_incremental_mode():
+    df = _bars(120)
+    seen = []
+
+    def generate_signal(history, client=None, symbol=None):
+        seen.append((len(history), history.index[-1]))
+        return "HOLD", 0.0, {}
+
+    module = types.SimpleNamespace(generate_signal=generate_signal)
+    _run(module, df, incremental=True, lookback=20)
+
+    assert len(seen) == len(df) - 50
+    assert {length for length, _ in seen} == {20}
+    assert [last for _, last in seen] == list(df.index[50:])
+
+
+def test_precompute_must_keep_every_bar():
+    module = types.SimpleNamespace(
+        generate_signal_at=lambda df, i, **kwargs: ("HOLD", 0.0, {}),
+        precompute=lambda df: df.dropna().iloc[10:],
+    )
+
+    assert _run(module, _bars(100)) == {"error": "precompute() must keep every bar"}
+
+
+def test_short_take_profit_books_a_gain():
+    df = pd.DataFrame(
+        {"open": 100.0, "high": 100.5, "low": 99.5, "close": 100.0, "volume": 500},
+        index=pd.date_range("2025-01-01 09:00", periods=60, freq="15min"),
+    )
+    df.iloc[51] = [99.0, 99.0, 97.0, 97.5, 500]
+    module = types.SimpleNamespace(
+        generate_signal_at=lambda df, i, **kwargs: ("SELL", 1.0, {"quantity": 10}) if i == 50 else ("HOLD", 0.0, {})
+    )
+
+    engine = SimpleBacktestEngine(api_key="test", host="http://127.0.0.1:5000")
+    engine.load_historical_data = lambda *args, **kw: df.copy()
+    result = engine.run_backtest(module, "CRUDEOIL", "MCX", "2025-01-01", "2025-01-31")
+
+    [trade] = result["closed_trades"]
+    assert (trade["side"], trade["quantity"], trade["exit_reason"]) == ("SELL", -10, "TAKE_PROFIT")
+    expected = (engine.apply_costs(100.0, 10, "SELL") - engine.apply_costs(98.0, 10, "BUY")) * 10
+    assert expected > 0
+    assert trade["pnl"] == pytest.approx(expected)
+    assert result["final_capital"] == pytest.approx(engine.initial_capital + expected)
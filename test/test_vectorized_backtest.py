@@ -0,0 +1,109 @@
+"""
+Tests for strategies/utils/vectorized_backtest.py: the vectorized path must
+fill, cost and score trades exactly like the SimpleBacktestEngine bar loop.
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The engine puts strategies/utils on sys.path, which the strategy modules import from
+from strategies.utils.simple_backtest_engine import SimpleBacktestEngine  # isort: skip
+from strategies import mcx_commodity_momentum_strategy as momentum  # isort: skip
+from strategies.utils.vectorized_backtest import run_vectorized_backtest  # isort: skip
+
+
+def _bars(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 5000 + np.cumsum(rng.normal(0, 15, n))
+    spread = rng.uniform(2, 20, n)
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 8, n),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(100, 1000, n),
+        },
+        index=pd.date_range("2025-01-01 09:00", periods=n, freq="15min"),
+    )
+
+
+def _engine(df):
+    engine = SimpleBacktestEngine(api_key="test", host="http://127.0.0.1:5000")
+    engine.load_historical_data = lambda *args, **kw: df.copy()
+    return engine
+
+
+def _assert_same_results(loop, vectorized):
+    assert vectorized["total_trades"] == loop["total_trades"]
+    for expected, actual in zip(loop["closed_trades"], vectorized["closed_trades"]):
+        assert {k: v for k, v in actual.items() if not isinstance(v, float)} == {
+            k: v for k, v in expected.items() if not isinstance(v, float)
+        }
+        for key in ("entry_price", "exit_price", "pnl", "pnl_pct"):
+            assert actual[key] == pytest.approx(expected[key])
+    assert [t for t, _ in vectorized["equity_curve"]] == [t for t, _ in loop["equity_curve"]]
+    np.testing.assert_allclose([e for _, e in vectorized["equity_curve"]], [e for _, e in loop["equity_curve"]])
+    assert vectorized["final_capital"] == pytest.approx(loop["final_capital"])
+    assert vectorized["metrics"] == pytest.approx(loop["metrics"])
+
+
+def _run_both(module, df):
+    args = ("CRUDEOIL", "MCX", "2025-01-01", "2025-03-31")
+    return _engine(df).run_backtest(module, *args), _engine(df).run_vectorized_backtest(module, *args)
+
+
+def test_strategy_signals_match_bar_loop():
+    loop, vectorized = _run_both(momentum, _bars())
+
+    assert loop["total_trades"] >= 5
+    _assert_same_results(loop, vectorized)
+
+
+def test_exit_rules_match_bar_loop():
+    df = _bars(seed=3)
+    rng = np.random.default_rng(5)
+    signal = rng.choice([1, -1, 0], size=len(df), p=[0.04, 0.04, 0.92])
+    exit_signal = rng.random(len(df)) < 0.01
+    atr = np.full(len(df), 12.0)
+    atr[::7] = np.nan
+
+    module = types.SimpleNamespace(
+        TIME_STOP_BARS=20,
+        BREAKEVEN_TRIGGER_R=1.0,
+        ATR_SL_MULTIPLIER=1.0,
+        ATR_TP_MULTIPLIER=3.0,
+        generate_signal_at=lambda df, i, **kw: (
+            {1: "BUY", -1: "SELL", 0: "HOLD"}[signal[i]], 1.0, {"atr": atr[i], "quantity": 2}
+        ),
+        check_exit_at=lambda df, i, position: (bool(exit_signal[i]), "STRATEGY_EXIT", None),
+        generate_signals=lambda df: {"signal": signal, "atr": atr, "exit": exit_signal, "quantity": 2},
+    )
+    loop, vectorized = _run_both(module, df)
+
+    reasons = {trade["exit_reason"] for trade in loop["closed_trades"]}
+    assert {"STOP_LOSS", "TAKE_PROFIT", "TIME_STOP", "STRATEGY_EXIT"} <= reasons
+    assert {trade["side"] for trade in loop["closed_trades"]} == {"BUY", "SELL"}
+    _assert_same_results(loop, vectorized)
+
+
+def test_open_position_closes_at_end_of_data():
+    df = _bars(100)
+    signal = np.zeros(len(df))
+    signal[-3] = 1
+
+    results = run_vectorized_backtest(df, signal, stop_loss=np.zeros(len(df)), take_profit=np.full(len(df), 1e9))
+
+    (trade,) = results["closed_trades"]
+    assert trade["exit_reason"] == "END_OF_DATA"
+    assert trade["exit_price"] == df["close"].iloc[-1]
+    assert results["final_capital"] == pytest.approx(results["initial_capital"] + trade["pnl"])
+    assert len(results["equity_curve"]) == len(df) - 50
+    assert "closed_trades" not in run_vectorized_backtest(df, signal, full_results=False)
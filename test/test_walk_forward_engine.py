@@ -0,0 +1,97 @@
+"""
+Tests for the shared-data and parallel window modes of strategies/utils/walk_forward_engine.py.
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The engine puts strategies/utils on sys.path, which the strategy modules import from
+from strategies.utils import walk_forward_engine  # isort: skip
+from strategies import mcx_commodity_momentum_strategy as momentum  # isort: skip
+
+# walk_forward_engine imports its siblings as top-level modules
+optimization_engine = sys.modules[walk_forward_engine.GridSearchOptimizer.__module__]
+
+
+def _bars(seed=21):
+    index = pd.date_range("2025-01-01", "2025-08-31 23:00", freq="1h")
+    rng = np.random.default_rng(seed)
+    close = 5000 + np.cumsum(rng.normal(0, 15, len(index)))
+    spread = rng.uniform(2, 20, len(index))
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 8, len(index)),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(100, 1000, len(index)),
+        },
+        index=index,
+    )
+
+
+def _strategy(name, parameters):
+    params = {"adx_threshold": parameters.get("adx_threshold", 25)}
+    return types.SimpleNamespace(
+        precompute=lambda df: momentum.precompute(df, params),
+        generate_signal_at=lambda df, i, **kw: momentum.generate_signal_at(df, i, params=params),
+        generate_signals=lambda df: momentum.generate_signals(df, params),
+    )
+
+
+@pytest.fixture
+def history(monkeypatch):
+    calls = []
+
+    def load_historical_data(self, *args):
+        calls.append(args)
+        return _bars()
+
+    monkeypatch.setattr(optimization_engine, "create_strategy_with_params", _strategy)
+    monkeypatch.setattr(optimization_engine, "get_grid_search_params", lambda name: {"adx_threshold": [15, 25, 35]})
+    monkeypatch.setattr(walk_forward_engine, "create_strategy_with_params", _strategy)
+    monkeypatch.setattr(walk_forward_engine.SimpleBacktestEngine, "load_historical_data", load_historical_data)
+    return calls
+
+
+def _run(workers):
+    wfo = walk_forward_engine.WalkForwardOptimizer(
+        "momentum", "CRUDEOIL", "MCX", "2025-01-01", "2025-08-31",
+        train_window_months=2, test_window_months=1, api_key="test", interval="1h",
+    )
+    return wfo.run(max_evals=3, workers=workers)
+
+
+def test_parallel_windows_match_serial(history):
+    serial = _run(workers=1)
+    parallel = _run(workers=3)
+
+    assert history == [("CRUDEOIL", "MCX", "2025-01-01", "2025-08-31", "1h")] * 2
+    assert serial["total_windows"] == parallel["total_windows"] == 5
+    assert parallel["final_capital"] == pytest.approx(serial["final_capital"])
+    for expected, actual in zip(serial["window_results"], parallel["window_results"]):
+        assert actual["best_params"] == expected["best_params"]
+        assert actual["pnl"] == pytest.approx(expected["pnl"])
+        assert set(actual["timing"]) == {"optimize_seconds", "test_seconds"}
+    assert set(parallel["timing"]) == {"load_seconds", "test_seconds", "total_seconds"}
+
+
+def test_out_of_sample_capital_is_chained(history):
+    result = _run(workers=1)
+
+    pnl = sum(window["pnl"] for window in result["window_results"])
+    assert result["total_return"] == pytest.approx(pnl)
+    assert any(window["metrics"] for window in result["window_results"])
+
+
+def test_no_data(monkeypatch):
+    monkeypatch.setattr(walk_forward_engine.SimpleBacktestEngine, "load_historical_data", lambda *args: pd.DataFrame())
+
+    assert _run(workers=2)["error"] == "No data available"
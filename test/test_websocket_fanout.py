@@ -0,0 +1,114 @@
+"""
+Tests for WebSocketProxy (websocket_proxy/server.py): the per-broker fan-out
+in zmq_listener encodes each tick once per distinct broker and every client
+receives its own broker's payload; subscribe validates conflation_ms.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from websocket_proxy import server
+from websocket_proxy.server import WebSocketProxy
+
+SUB_KEY = ("SBIN", "NSE", 1)
+CLIENT_BROKERS = {1: "zerodha", 2: "zerodha", 3: "angel", 4: "angel"}
+
+
+class FakeSocket:
+    """Yields the queued frames, then stops the listener"""
+
+    def __init__(self, proxy, frames):
+        self.proxy = proxy
+        self.frames = list(frames)
+
+    async def recv_multipart(self):
+        if not self.frames:
+            self.proxy.running = False
+            raise TimeoutError
+        return self.frames.pop(0)
+
+
+class FakeQueue:
+    def __init__(self):
+        self.items = []
+
+    def put(self, key, mode, payload):
+        self.items.append((key, mode, payload))
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    monkeypatch.setattr(server, "is_port_in_use", lambda *args, **kwargs: False)
+    monkeypatch.setattr(server, "get_market_data_service", lambda: types.SimpleNamespace(submit_market_data=lambda data: True))
+    proxy = WebSocketProxy(port=0)
+    proxy.socket.close(linger=0)
+    proxy.context.term()
+
+    for client_id, broker in CLIENT_BROKERS.items():
+        proxy.clients[client_id] = object()
+        proxy.user_mapping[client_id] = f"user{client_id}"
+        proxy.user_broker_mapping[f"user{client_id}"] = broker
+        proxy.client_queues[client_id] = FakeQueue()
+        proxy.subscription_index[SUB_KEY].add(client_id)
+    return proxy
+
+
+def _listen(proxy, monkeypatch, *topics):
+    encodes = []
+    real_dumps = json.dumps
+
+    def dumps(obj, *args, **kwargs):
+        encodes.append(obj["broker"])
+        return real_dumps(obj, *args, **kwargs)
+
+    monkeypatch.setattr(server, "json", types.SimpleNamespace(dumps=dumps, loads=json.loads))
+    tick = json.dumps({"ltp": 812.5, "timestamp": 1737000000000}).encode()
+    proxy.socket = FakeSocket(proxy, [[topic.encode(), tick] for topic in topics])
+    proxy.running = True
+    asyncio.run(proxy.zmq_listener())
+    return encodes
+
+
+def _received(proxy):
+    return {
+        client_id: [json.loads(payload)["broker"] for _, _, payload in queue.items]
+        for client_id, queue in proxy.client_queues.items()
+    }
+
+
+def test_unprefixed_tick_is_encoded_once_per_client_broker(proxy, monkeypatch):
+    encodes = _listen(proxy, monkeypatch, "NSE_SBIN_LTP")
+
+    assert sorted(encodes) == ["angel", "zerodha"]
+    assert _received(proxy) == {1: ["zerodha"], 2: ["zerodha"], 3: ["angel"], 4: ["angel"]}
+    # Clients of the same broker share one payload object
+    assert proxy.client_queues[1].items[0][2] is proxy.client_queues[2].items[0][2]
+    assert (proxy._fanout_encodes, proxy._fanout_sends) == (2, 4)
+
+
+def test_broker_topic_only_reaches_that_brokers_clients(proxy, monkeypatch):
+    encodes = _listen(proxy, monkeypatch, "angel_NSE_SBIN_LTP", "zerodha_NSE_SBIN_LTP")
+
+    assert encodes == ["angel", "zerodha"]
+    assert _received(proxy) == {1: ["zerodha"], 2: ["zerodha"], 3: ["angel"], 4: ["angel"]}
+    assert (proxy._fanout_ticks, proxy._fanout_encodes, proxy._fanout_sends) == (2, 2, 4)
+
+
+@pytest.mark.parametrize("conflation_ms", ["abc", "nan", "inf", "-inf", float("nan"), -5])
+def test_invalid_conflation_ms_is_rejected(proxy, conflation_ms):
+    errors = []
+
+    async def send_error(client_id, code, message):
+        errors.append((client_id, code, message))
+
+    proxy.send_error = send_error
+    asyncio.run(proxy.subscribe_client(1, {"symbol": "SBIN", "exchange": "NSE", "conflation_ms": conflation_ms}))
+
+    assert [code for _, code, _ in errors] == ["INVALID_PARAMETERS"]
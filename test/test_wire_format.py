@@ -0,0 +1,165 @@
+"""
+Tests for the compact ZeroMQ wire format between broker adapters and the
+WebSocket proxy (websocket_proxy/wire_format.py).
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from websocket_proxy import wire_format
+
+
+@pytest.fixture
+def compact(monkeypatch):
+    monkeypatch.setattr(wire_format, "WIRE_FORMAT", "compact")
+
+
+def _roundtrip(topic, data):
+    decoded = None
+    for topic_bytes, payload in wire_format.encode_market_data(topic, data):
+        assert wire_format.is_compact_topic(topic_bytes)
+        decoded = wire_format.decode_compact(topic_bytes, payload)
+    return decoded
+
+
+def test_parse_topic_formats():
+    assert wire_format.parse_topic("NSE_RELIANCE_LTP") == ("unknown", "NSE", "RELIANCE", "LTP")
+    assert wire_format.parse_topic("NSE_INDEX_NIFTY_QUOTE") == ("unknown", "NSE_INDEX", "NIFTY", "QUOTE")
+    assert wire_format.parse_topic("BSE_INDEX_SENSEX_LTP") == ("unknown", "BSE_INDEX", "SENSEX", "LTP")
+    assert wire_format.parse_topic("zerodha_NFO_NIFTY25JAN24000CE_LTP") == (
+        "zerodha",
+        "NFO",
+        "NIFTY25JAN24000CE",
+        "LTP",
+    )
+    assert wire_format.parse_topic("BAD") is None
+
+
+def test_json_format_is_default():
+    messages = wire_format.encode_market_data("NSE_SBIN_LTP", {"ltp": 812.5})
+    assert messages == [[b"NSE_SBIN_LTP", json.dumps({"ltp": 812.5}).encode("utf-8")]]
+
+
+def test_ltp_struct_roundtrip(compact):
+    data = {"symbol": "SBIN", "exchange": "NSE", "mode": "ltp", "ltp": 812.5, "timestamp": 1737000000123}
+    broker, exchange, symbol, mode, decoded = _roundtrip("NSE_SBIN_LTP", data)
+
+    assert (broker, exchange, symbol, mode) == ("unknown", "NSE", "SBIN", 1)
+    assert decoded == data
+    assert type(decoded["timestamp"]) is int
+
+
+def test_depth_struct_roundtrip(compact):
+    data = {
+        "symbol": "NIFTY",
+        "exchange": "NSE_INDEX",
+        "mode": 3,
+        "ltp": 24100.15,
+        "volume": 0,
+        "depth": {
+            "buy": [{"price": 24100.0, "quantity": 75, "orders": 3}],
+            "sell": [
+                {"price": 24100.5, "quantity": 150, "orders": 2},
+                {"price": 24101.0, "quantity": 25, "orders": 1},
+            ],
+        },
+    }
+    _, exchange, symbol, mode, decoded = _roundtrip("NSE_INDEX_NIFTY_DEPTH", data)
+
+    assert (exchange, symbol, mode) == ("NSE_INDEX", "NIFTY", 3)
+    assert decoded == data
+
+
+def test_unstructured_tick_falls_back(compact):
+    data = {"symbol": "INFY", "ltp": 1500.0, "ltt": "2025-01-16 10:00:00", "extra": [1, 2]}
+    *_, decoded = _roundtrip("NSE_INFY_QUOTE", data)
+
+    assert decoded == data
+
+
+def test_definition_sent_once(compact):
+    first = wire_format.encode_market_data("BSE_TCS_LTP", {"ltp": 4000.0})
+    second = wire_format.encode_market_data("BSE_TCS_LTP", {"ltp": 4001.0})
+
+    assert len(first) == 2
+    assert first[0][0][0] == wire_format.MAGIC_DEFINITION
+    assert len(second) == 1
+
+
+def test_definition_repeats_after_interval(compact, monkeypatch):
+    registry = wire_format.InstrumentRegistry()
+    assert len(wire_format.encode_market_data("NSE_WIPRO_LTP", {"ltp": 300.0}, registry)) == 2
+    assert len(wire_format.encode_market_data("NSE_WIPRO_LTP", {"ltp": 301.0}, registry)) == 1
+
+    monkeypatch.setattr(wire_format, "DEFINITION_INTERVAL", 0)
+    assert len(wire_format.encode_market_data("NSE_WIPRO_LTP", {"ltp": 302.0}, registry)) == 2
+
+
+def test_late_subscriber_requests_missed_definition(compact):
+    publisher = wire_format.InstrumentRegistry()
+    subscriber = wire_format.InstrumentRegistry()
+
+    # The first tick (with its definition) goes out before the subscriber connects
+    wire_format.encode_market_data("NSE_SBIN_LTP", {"ltp": 812.5}, publisher)
+    ((topic, payload),) = wire_format.encode_market_data("NSE_SBIN_LTP", {"ltp": 813.0}, publisher)
+    assert wire_format.decode_compact(topic, payload, subscriber) is None
+
+    (request,) = wire_format.take_definition_requests(subscriber)
+    wire_format.decode_compact(topic, payload, subscriber)
+    assert wire_format.take_definition_requests(subscriber) == []  # rate limited
+
+    wire_format.handle_subscription(b"\x01" + request, publisher)
+    decoded = [
+        wire_format.decode_compact(t, p, subscriber)
+        for t, p in wire_format.encode_market_data("NSE_SBIN_LTP", {"ltp": 813.5}, publisher)
+    ]
+    assert decoded[-1] == ("unknown", "NSE", "SBIN", 1, {"ltp": 813.5})
+
+
+def test_ids_are_scoped_per_publisher(compact):
+    first = wire_format.InstrumentRegistry()
+    second = wire_format.InstrumentRegistry()
+    subscriber = wire_format.InstrumentRegistry()
+
+    frames = wire_format.encode_market_data("NSE_SBIN_LTP", {"ltp": 812.5}, first)
+    frames += wire_format.encode_market_data("NSE_INFY_LTP", {"ltp": 1500.0}, second)
+    decoded = [wire_format.decode_compact(t, p, subscriber) for t, p in frames]
+
+    assert first.intern("unknown", "NSE", "SBIN")[0] == second.intern("unknown", "NSE", "INFY")[0] == 1
+    assert [d[2] for d in decoded if d] == ["SBIN", "INFY"]
+
+
+def test_late_subscriber_over_xpub(compact):
+    zmq = pytest.importorskip("zmq")
+    publisher = wire_format.InstrumentRegistry()
+    subscriber = wire_format.InstrumentRegistry()
+    context = zmq.Context()
+    pub = wire_format.create_publisher_socket(context)
+    sub = context.socket(zmq.SUB)
+    try:
+        pub.bind("inproc://late-subscriber")
+        wire_format.send_market_data(pub, "NSE_TCS_LTP", {"ltp": 4000.0}, publisher)
+
+        sub.connect("inproc://late-subscriber")
+        sub.setsockopt(zmq.SUBSCRIBE, b"")
+        sub.setsockopt(zmq.RCVTIMEO, 2000)
+
+        received = None
+        for price in range(100):
+            # The new subscription reaches the publisher on its next send
+            wire_format.send_market_data(pub, "NSE_TCS_LTP", {"ltp": 4001.0 + price}, publisher)
+            while sub.poll(10):
+                received = wire_format.decode_compact(*sub.recv_multipart(), subscriber) or received
+            if received:
+                break
+
+        assert received is not None and received[2] == "TCS"
+    finally:
+        sub.close(linger=0)
+        pub.close(linger=0)
+        context.term()
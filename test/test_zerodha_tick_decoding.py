@@ -0,0 +1,193 @@
+"""
+Tests for the Zerodha binary tick decoder
+(broker/zerodha/streaming/zerodha_websocket.py).
+
+The tests check the memoryview/struct.Struct decoder against a reference
+copy of the previous slice-and-unpack decoder. The throughput benchmark of
+both lives in scripts/benchmark_zerodha_tick_decoding.py.
+"""
+
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# websocket_proxy registers the broker adapters; import it first like the proxy does
+import websocket_proxy  # noqa: F401
+from broker.zerodha.streaming.zerodha_websocket import ZerodhaWebSocket
+
+
+def build_packet(token, mode, price=250000):
+    """Build one binary packet for the given mode ("ltp", "quote", "full", "index")"""
+    if mode == "ltp":
+        return struct.pack(">Ii", token, price)
+    if mode == "index":
+        return struct.pack(">7i", token, price, price + 500, price - 700, price + 100, price - 50, 35)
+    quote = struct.pack(
+        ">11i", token, price, 25, price - 10, 150000, 4000, 3500, price - 300, price + 400, price - 600, price - 200
+    )
+    if mode == "quote":
+        return quote
+    extension = struct.pack(">5i", 1737000000, 120000, 125000, 110000, 1737000001)
+    depth = b"".join(
+        struct.pack(">iih2x", 100 + level, price - 5 * (level + 1), 3 + level) for level in range(5)
+    ) + b"".join(
+        struct.pack(">iih2x", 200 + level, price + 5 * (level + 1), 4 + level) for level in range(4)
+    ) + struct.pack(">iih2x", 0, 0, 0)
+    return quote + extension + depth
+
+
+def build_frame(packets):
+    """Wrap packets into one websocket binary message"""
+    body = b"".join(struct.pack(">H", len(packet)) + packet for packet in packets)
+    return struct.pack(">H", len(packets)) + body
+
+
+def legacy_parse_binary_message(client, data):
+    """Reference copy of the previous decoder (slice + struct.unpack per field)"""
+    if len(data) < 4:
+        return []
+    num_packets = struct.unpack(">H", data[0:2])[0]
+    packets = []
+    offset = 2
+    for _ in range(num_packets):
+        if offset + 2 > len(data):
+            break
+        packet_length = struct.unpack(">H", data[offset : offset + 2])[0]
+        offset += 2
+        if offset + packet_length > len(data):
+            break
+        tick = legacy_parse_packet(client, data[offset : offset + packet_length])
+        if tick:
+            packets.append(tick)
+        offset += packet_length
+    return packets
+
+
+def legacy_parse_packet(client, packet):
+    if len(packet) < 8:
+        return None
+    instrument_token = struct.unpack(">I", packet[0:4])[0]
+    last_price = struct.unpack(">i", packet[4:8])[0] / 100.0
+    if len(packet) == 8:
+        mode = client.MODE_LTP
+    elif len(packet) == 44:
+        mode = client.MODE_QUOTE
+    elif len(packet) >= 184:
+        mode = client.MODE_FULL
+    else:
+        mode = client.mode_map.get(instrument_token, client.MODE_QUOTE)
+    with client.lock:
+        exchange = client.token_exchange_map.get(instrument_token)
+    tick = {
+        "instrument_token": instrument_token,
+        "last_traded_price": last_price,
+        "last_price": last_price,
+        "mode": mode,
+        "timestamp": int(time.time() * 1000),
+    }
+    if exchange:
+        tick["source_exchange"] = exchange
+    if len(packet) >= 44:
+        fields = struct.unpack(">11i", packet[0:44])
+        tick.update(
+            {
+                "instrument_token": fields[0],
+                "last_traded_price": fields[1] / 100.0,
+                "last_price": fields[1] / 100.0,
+                "last_traded_quantity": fields[2],
+                "average_traded_price": fields[3] / 100.0,
+                "average_price": fields[3] / 100.0,
+                "volume_traded": fields[4],
+                "volume": fields[4],
+                "total_buy_quantity": fields[5],
+                "total_sell_quantity": fields[6],
+                "open_price": fields[7] / 100.0,
+                "high_price": fields[8] / 100.0,
+                "low_price": fields[9] / 100.0,
+                "close_price": fields[10] / 100.0,
+                "ohlc": {
+                    "open": fields[7] / 100.0,
+                    "high": fields[8] / 100.0,
+                    "low": fields[9] / 100.0,
+                    "close": fields[10] / 100.0,
+                },
+            }
+        )
+    if len(packet) >= 64:
+        extended_fields = struct.unpack(">iiiii", packet[44:64])
+        tick.update(
+            {
+                "last_traded_timestamp": extended_fields[0],
+                "open_interest": extended_fields[1],
+                "oi": extended_fields[1],
+                "exchange_timestamp": extended_fields[4],
+            }
+        )
+    if len(packet) >= 184:
+        depth_data = packet[64:184]
+        depth = {"buy": [], "sell": []}
+        for side, start in (("buy", 0), ("sell", 60)):
+            for i in range(5):
+                offset = start + i * 12
+                quantity, price, orders = struct.unpack(">iih", depth_data[offset : offset + 10])
+                if price > 0:
+                    depth[side].append({"quantity": quantity, "price": price / 100.0, "orders": orders})
+        if depth["buy"] or depth["sell"]:
+            tick["depth"] = depth
+    return tick
+
+
+def make_client():
+    client = ZerodhaWebSocket(api_key="key", access_token="token")
+    client.set_token_exchange_mapping({256265: "NSE_INDEX", 738561: "NSE"})
+    client.mode_map[256265] = client.MODE_FULL
+    return client
+
+
+def synthetic_frames(count=200, packets_per_frame=50):
+    modes = ("ltp", "quote", "full")
+    frames = []
+    for frame_index in range(count):
+        packets = [
+            build_packet(738561 + n, modes[n % 3], 250000 + frame_index) for n in range(packets_per_frame)
+        ]
+        frames.append(build_frame(packets))
+    return frames
+
+
+def _without_timestamp(ticks):
+    return [{key: value for key, value in tick.items() if key != "timestamp"} for tick in ticks]
+
+
+def test_decoder_matches_legacy_for_all_packet_types():
+    client = make_client()
+    frame = build_frame(
+        [
+            build_packet(738561, "ltp"),
+            build_packet(738562, "quote"),
+            build_packet(738561, "full"),
+            build_packet(256265, "index"),
+            b"\x00\x01",  # Too short, skipped
+        ]
+    )
+
+    ticks = client._parse_binary_message(frame)
+    legacy = legacy_parse_binary_message(client, frame)
+
+    assert [tick["mode"] for tick in ticks] == ["ltp", "quote", "full", "full"]
+    assert _without_timestamp(ticks) == _without_timestamp(legacy)
+    assert ticks[2]["depth"]["buy"][0] == {"quantity": 100, "price": 2499.95, "orders": 3}
+    assert len(ticks[2]["depth"]["sell"]) == 4
+    assert ticks[0]["source_exchange"] == "NSE"
+
+
+def test_truncated_frame_returns_complete_packets():
+    client = make_client()
+    frame = build_frame([build_packet(738561, "quote"), build_packet(738562, "quote")])
+
+    ticks = client._parse_binary_message(frame[:-10])
+
+    assert [tick["instrument_token"] for tick in ticks] == [738561]
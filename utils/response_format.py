@@ -0,0 +1,121 @@
+"""
+Response formats for tabular API data (history bars, multiquotes).
+
+Clients choose the format with the request's ``format`` field:
+
+    json      One object per row (default, unchanged responses)
+    columnar  One JSON array per column: {"timestamp": [...], "close": [...]}
+    arrow     Arrow IPC stream of the table (application/vnd.apache.arrow.stream)
+    parquet   Parquet file of the table (application/vnd.apache.parquet)
+
+For the binary formats the body holds only the table; the other response
+fields are sent in X-OpenAlgo-* headers. Errors are always JSON.
+
+Reading the binary formats back into pandas:
+
+    pyarrow.ipc.open_stream(body).read_pandas()   # arrow
+    pd.read_parquet(io.BytesIO(body))             # parquet
+"""
+
+import json
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, jsonify, make_response
+
+RESPONSE_FORMATS = ("json", "columnar", "arrow", "parquet")
+
+BINARY_MIMETYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class BinaryResponse(Response):
+    """Custom Response class for binary tables with a JSON summary for latency monitoring"""
+
+    @property
+    def json(self):
+        return getattr(self, "_json", None)
+
+    @json.setter
+    def json(self, value):
+        self._json = value
+
+
+def format_table(df: pd.DataFrame, response_format: str = "json") -> Any:
+    """
+    Convert a DataFrame to the data value of a service response.
+
+    Args:
+        df: Table to return
+        response_format: One of RESPONSE_FORMATS
+
+    Returns:
+        List of row dicts (json), dict of column lists (columnar), or the
+        DataFrame itself for the binary formats, encoded by table_response()
+    """
+    if response_format in BINARY_MIMETYPES:
+        return df
+    # Missing values become None so the body stays valid JSON (no bare NaN)
+    df = df.astype(object).where(df.notna(), None)
+    if response_format == "columnar":
+        return {column: df[column].tolist() for column in df.columns}
+    return df.to_dict(orient="records")
+
+
+def encode_table(df: pd.DataFrame, response_format: str) -> bytes:
+    """
+    Serialize a DataFrame as an Arrow IPC stream or a Parquet file.
+
+    Args:
+        df: Table to encode
+        response_format: 'arrow' or 'parquet'
+
+    Returns:
+        Encoded bytes
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if response_format == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def table_response(
+    response_data: dict[str, Any], status_code: int, response_format: str = "json", table_key: str = "data"
+) -> Response:
+    """
+    Build the HTTP response for a service result that may hold a binary table.
+
+    Args:
+        response_data: Service response dict
+        status_code: HTTP status code
+        response_format: Format requested by the client
+        table_key: Key of the table in response_data
+
+    Returns:
+        Flask response: JSON, or the encoded table if response_data[table_key]
+        is a DataFrame produced by format_table() for a binary format
+    """
+    table = response_data.get(table_key)
+    if response_format not in BINARY_MIMETYPES or not isinstance(table, pd.DataFrame):
+        return make_response(jsonify(response_data), status_code)
+
+    summary = {key: value for key, value in response_data.items() if key != table_key}
+    response = BinaryResponse(
+        encode_table(table, response_format),
+        status=status_code,
+        mimetype=BINARY_MIMETYPES[response_format],
+    )
+    for key, value in summary.items():
+        header = "X-OpenAlgo-" + key.replace("_", "-").title()
+        response.headers[header] = value if isinstance(value, str) else json.dumps(value)
+    response.headers["X-OpenAlgo-Rows"] = str(len(table))
+    response.json = summary
+    return response
@@ -1,4 +1,3 @@
-import json
 import os
 import random
 import socket
@@ -9,6 +8,8 @@ import zmq
 
 from utils.logging import get_logger
 
+from .wire_format import create_publisher_socket, send_market_data
+
 # Initialize logger
 logger = get_logger(__name__)
 
@@ -184,7 +185,7 @@ class BaseBrokerWebSocketAdapter(ABC):
         Create and configure ZeroMQ socket
         """
         with self._context_lock:
-            socket = self.context.socket(zmq.PUB)
+            socket = create_publisher_socket(self.context)
             socket.setsockopt(zmq.LINGER, 1000)  # 1 second linger
             socket.setsockopt(zmq.SNDHWM, 1000)  # High water mark
             return socket
@@ -412,10 +413,8 @@ class BaseBrokerWebSocketAdapter(ABC):
                 # Use shared publisher (connection pooling mode)
                 self._shared_publisher.publish(topic, data)
             elif self.socket:
-                # Use own socket
-                self.socket.send_multipart(
-                    [topic.encode("utf-8"), json.dumps(data).encode("utf-8")]
-                )
+                # Use own socket (JSON or compact encoding, see wire_format)
+                send_market_data(self.socket, topic, data)
             else:
                 self.logger.warning("No ZMQ socket available for publishing")
         except Exception as e:
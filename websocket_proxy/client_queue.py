@@ -0,0 +1,275 @@
+"""
+Per-client outbound queues for the WebSocket proxy.
+
+Each connected client gets a ClientSendQueue with its own writer task, so the
+ZeroMQ listener only enqueues pre-encoded payloads and never awaits a client
+socket. A slow client therefore only delays itself.
+
+LTP and Quote ticks conflate per (symbol, exchange, mode): while a tick is
+still waiting to be written, a newer one replaces it in place and only the
+latest value is delivered. Depth ticks follow a configurable drop policy.
+
+On top of that each subscription has a conflation window (conflation_ms in the
+subscribe message, WS_CONFLATION_WINDOW_MS by default). After a tick for a key
+is queued, later ticks for that key are held for the window and the most
+recent one is delivered when the window expires (see conflation.TimerWheel).
+A window of 0 delivers every tick.
+
+Configuration:
+    WS_CLIENT_QUEUE_SIZE: Maximum pending messages per client (default: 1000)
+    WS_DEPTH_DROP_POLICY: drop_oldest | drop_newest | conflate (default: drop_oldest)
+"""
+
+import asyncio as aio
+import os
+from collections import deque
+
+import websockets
+
+from utils.logging import get_logger
+
+from .conflation import TimerWheel, get_default_conflation_window
+
+logger = get_logger(__name__)
+
+DEFAULT_CLIENT_QUEUE_SIZE = 1000
+DEFAULT_DEPTH_DROP_POLICY = "drop_oldest"
+DEPTH_DROP_POLICIES = ("drop_oldest", "drop_newest", "conflate")
+
+DEPTH_MODE = 3
+
+
+def get_client_queue_size() -> int:
+    """Get maximum pending messages per client from config"""
+    return int(os.getenv("WS_CLIENT_QUEUE_SIZE", DEFAULT_CLIENT_QUEUE_SIZE))
+
+
+def get_depth_drop_policy() -> str:
+    """Get the drop policy for Depth messages from config"""
+    policy = os.getenv("WS_DEPTH_DROP_POLICY", DEFAULT_DEPTH_DROP_POLICY).strip().lower()
+    if policy not in DEPTH_DROP_POLICIES:
+        logger.warning(
+            f"Invalid WS_DEPTH_DROP_POLICY '{policy}', using {DEFAULT_DEPTH_DROP_POLICY}"
+        )
+        return DEFAULT_DEPTH_DROP_POLICY
+    return policy
+
+
+class ClientSendQueue:
+    """
+    Bounded outbound queue with a dedicated writer task for one websocket client.
+    """
+
+    def __init__(
+        self,
+        client_id: int,
+        websocket,
+        max_size: int | None = None,
+        depth_policy: str | None = None,
+        timer_wheel: TimerWheel | None = None,
+        default_window: float | None = None,
+    ):
+        """
+        Initialize the queue
+
+        Args:
+            client_id: ID of the client
+            websocket: The client's WebSocket connection
+            max_size: Maximum pending messages (defaults to WS_CLIENT_QUEUE_SIZE)
+            depth_policy: Depth drop policy (defaults to WS_DEPTH_DROP_POLICY)
+            timer_wheel: Shared timer wheel for conflation windows; without one
+                         every tick is queued immediately
+            default_window: Window in seconds for keys without an explicit one
+                            (defaults to WS_CONFLATION_WINDOW_MS)
+        """
+        self.client_id = client_id
+        self.websocket = websocket
+        self.max_size = max_size or get_client_queue_size()
+        self.depth_policy = depth_policy or get_depth_drop_policy()
+
+        # Latest pending payload per (symbol, exchange, mode), in arrival order
+        self._latest: dict[tuple, str] = {}
+        # Non-conflated Depth payloads
+        self._depth: deque[str] = deque()
+
+        # Conflation windows (seconds) per key, keys whose window is running and
+        # the latest (mode, payload) held back while it runs
+        self.timer_wheel = timer_wheel
+        self.default_window = (
+            get_default_conflation_window() if default_window is None else default_window
+        )
+        self._windows: dict[tuple, float] = {}
+        self._gated: set[tuple] = set()
+        self._held: dict[tuple, tuple[int, str]] = {}
+
+        self._wakeup = aio.Event()
+        self._writer_task: aio.Task | None = None
+        self._closed = False
+
+        # Metrics
+        self.enqueued = 0
+        self.sent = 0
+        self.conflated = 0
+        self.dropped = 0
+        self.max_depth_seen = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be written (excluding held ticks)"""
+        return len(self._latest) + len(self._depth)
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        if self._writer_task is None:
+            self._writer_task = aio.get_running_loop().create_task(self._writer())
+
+    async def close(self):
+        """Stop the writer task and discard pending messages"""
+        self._closed = True
+        self._wakeup.set()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except aio.CancelledError:
+                pass
+            self._writer_task = None
+        self._latest.clear()
+        self._depth.clear()
+        self._gated.clear()
+        self._held.clear()
+
+    def set_window(self, key: tuple, window: float | None):
+        """
+        Set the conflation window for a subscription key.
+
+        Args:
+            key: (symbol, exchange, mode)
+            window: Window in seconds, or None to use the default
+        """
+        if window is None:
+            self._windows.pop(key, None)
+        else:
+            self._windows[key] = window
+
+    def clear_key(self, key: tuple):
+        """Forget window, gate and held tick for a key after unsubscribe"""
+        self._windows.pop(key, None)
+        self._gated.discard(key)
+        self._held.pop(key, None)
+
+    def put(self, key: tuple, mode: int, payload: str) -> bool:
+        """
+        Enqueue a pre-encoded market data payload without blocking.
+
+        Args:
+            key: Conflation key, normally (symbol, exchange, mode)
+            mode: Subscription mode (1: LTP, 2: Quote, 3: Depth)
+            payload: JSON encoded message
+
+        Returns:
+            bool: False if the message was dropped
+        """
+        if self._closed:
+            return False
+
+        self.enqueued += 1
+
+        window = self._windows.get(key, self.default_window) if self.timer_wheel is not None else 0
+        if window > 0:
+            if key in self._gated:
+                # Window still running: keep only the latest tick for delivery at expiry
+                if key in self._held:
+                    self.conflated += 1
+                self._held[key] = (mode, payload)
+                return True
+            self._gated.add(key)
+            self.timer_wheel.schedule(window, self._release, key)
+
+        return self._enqueue(key, mode, payload)
+
+    def _release(self, key: tuple):
+        """Timer wheel callback: deliver the held tick for a key, or open its gate"""
+        if self._closed:
+            return
+        held = self._held.pop(key, None)
+        if held is None:
+            self._gated.discard(key)
+            return
+        window = self._windows.get(key, self.default_window)
+        if window > 0:
+            self.timer_wheel.schedule(window, self._release, key)
+        else:
+            self._gated.discard(key)
+        self._enqueue(key, *held)
+
+    def _enqueue(self, key: tuple, mode: int, payload: str) -> bool:
+        """Add a payload to the outbound buffers, applying conflation and drop policy"""
+        if mode != DEPTH_MODE or self.depth_policy == "conflate":
+            if key in self._latest:
+                # Replace in place: keeps the key's position, delivers only the latest value
+                self._latest[key] = payload
+                self.conflated += 1
+                return True
+            if self.depth >= self.max_size:
+                self.dropped += 1
+                return False
+            self._latest[key] = payload
+        else:
+            if self.depth >= self.max_size:
+                if self.depth_policy == "drop_newest" or not self._depth:
+                    self.dropped += 1
+                    return False
+                self._depth.popleft()
+                self.dropped += 1
+            self._depth.append(payload)
+
+        depth = self.depth
+        if depth > self.max_depth_seen:
+            self.max_depth_seen = depth
+        self._wakeup.set()
+        return True
+
+    def _pop(self) -> str | None:
+        """Take the next payload, alternating between conflated and Depth messages"""
+        if self._latest and (not self._depth or self.sent % 2 == 0):
+            key = next(iter(self._latest))
+            return self._latest.pop(key)
+        if self._depth:
+            return self._depth.popleft()
+        return None
+
+    async def _writer(self):
+        """Write queued payloads to the websocket until closed"""
+        while not self._closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while not self._closed:
+                payload = self._pop()
+                if payload is None:
+                    break
+                try:
+                    await self.websocket.send(payload)
+                    self.sent += 1
+                except websockets.exceptions.ConnectionClosed:
+                    logger.info(f"Connection closed while sending message to client {self.client_id}")
+                    self._closed = True
+                    return
+                except Exception as e:
+                    logger.exception(f"Error sending message to client {self.client_id}: {e}")
+
+    def get_stats(self) -> dict:
+        """Get queue depth and drop counters for health monitoring"""
+        return {
+            "depth": self.depth,
+            "max_depth_seen": self.max_depth_seen,
+            "max_size": self.max_size,
+            "depth_policy": self.depth_policy,
+            "held": len(self._held),
+            "windowed_keys": len(self._gated),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,136 @@
+"""
+Timer wheel driving per-subscription conflation windows in the WebSocket proxy.
+
+A ClientSendQueue delivers the first tick for a (symbol, exchange, mode) key
+immediately and then closes a gate for that key for the subscription's window.
+Ticks arriving while the gate is closed overwrite a single held value. When the
+window expires the wheel releases the key: the held value (the most recent
+tick) is delivered and the gate re-arms, or the gate opens if nothing arrived.
+
+Unlike a per-key timestamp map this keeps no state for idle keys, and the
+wheel itself has a fixed number of slots, so memory is bounded by the number
+of keys currently inside a window.
+
+Configuration:
+    WS_CONFLATION_WINDOW_MS: Default window for subscriptions that do not set
+                             conflation_ms (default: 50)
+    WS_CONFLATION_MAX_WINDOW_MS: Upper bound for client supplied windows (default: 5000)
+    WS_CONFLATION_TICK_MS: Timer wheel resolution (default: 10)
+"""
+
+import math
+import os
+import time
+from collections.abc import Callable
+
+DEFAULT_CONFLATION_WINDOW_MS = 50
+DEFAULT_CONFLATION_MAX_WINDOW_MS = 5000
+DEFAULT_CONFLATION_TICK_MS = 10
+
+
+def get_default_conflation_window() -> float:
+    """Get default conflation window in seconds from config"""
+    return max(0, int(os.getenv("WS_CONFLATION_WINDOW_MS", DEFAULT_CONFLATION_WINDOW_MS))) / 1000
+
+
+def get_max_conflation_window() -> float:
+    """Get maximum client supplied conflation window in seconds from config"""
+    return max(0, int(os.getenv("WS_CONFLATION_MAX_WINDOW_MS", DEFAULT_CONFLATION_MAX_WINDOW_MS))) / 1000
+
+
+def get_conflation_tick() -> float:
+    """Get timer wheel resolution in seconds from config"""
+    return max(1, int(os.getenv("WS_CONFLATION_TICK_MS", DEFAULT_CONFLATION_TICK_MS))) / 1000
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel with fixed slots.
+
+    Delays longer than the wheel span are clamped to the last slot, which is
+    fine for conflation windows since they are capped well below the span.
+    """
+
+    def __init__(self, tick: float | None = None, max_delay: float | None = None):
+        """
+        Initialize the wheel
+
+        Args:
+            tick: Slot resolution in seconds (defaults to WS_CONFLATION_TICK_MS)
+            max_delay: Longest delay the wheel must represent (defaults to WS_CONFLATION_MAX_WINDOW_MS)
+        """
+        self.tick = tick or get_conflation_tick()
+        max_delay = max_delay if max_delay is not None else get_max_conflation_window()
+        self.slot_count = max(2, math.ceil(max_delay / self.tick) + 2)
+        self._slots: list[list] = [[] for _ in range(self.slot_count)]
+        self._position = 0
+        self._last_advance = time.monotonic()
+        self._pending = 0
+
+        # Metrics
+        self.scheduled = 0
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def schedule(self, delay: float, callback: Callable, *args):
+        """
+        Run callback(*args) after at least delay seconds, at tick resolution.
+
+        Args:
+            delay: Delay in seconds
+            callback: Function to call when the timer fires
+            *args: Arguments for the callback
+        """
+        ticks = min(max(1, math.ceil(delay / self.tick)), self.slot_count - 1)
+        slot = (self._position + ticks) % self.slot_count
+        self._slots[slot].append((callback, args))
+        self._pending += 1
+        self.scheduled += 1
+
+    def advance(self, now: float | None = None) -> int:
+        """
+        Fire all timers that are due.
+
+        Args:
+            now: Current monotonic time (defaults to time.monotonic())
+
+        Returns:
+            int: Number of timers fired
+        """
+        now = time.monotonic() if now is None else now
+        elapsed_ticks = int((now - self._last_advance) / self.tick)
+        if elapsed_ticks <= 0:
+            return 0
+
+        self._last_advance += elapsed_ticks * self.tick
+        fired = 0
+        for _ in range(min(elapsed_ticks, self.slot_count)):
+            self._position = (self._position + 1) % self.slot_count
+            due = self._slots[self._position]
+            if not due:
+                continue
+            # Callbacks may schedule new timers, so swap the slot out first
+            self._slots[self._position] = []
+            self._pending -= len(due)
+            for callback, args in due:
+                callback(*args)
+            fired += len(due)
+
+        # Fell behind by a full revolution: every slot has fired, resync the clock
+        if elapsed_ticks > self.slot_count:
+            self._last_advance = now
+
+        self.fired += fired
+        return fired
+
+    def get_stats(self) -> dict:
+        """Get timer wheel statistics for health monitoring"""
+        return {
+            "tick_ms": round(self.tick * 1000, 3),
+            "slots": self.slot_count,
+            "pending_timers": self._pending,
+            "scheduled": self.scheduled,
+            "fired": self.fired,
+        }
@@ -10,7 +10,6 @@ Configuration:
     MAX_WEBSOCKET_CONNECTIONS: Maximum WebSocket connections per user/broker (default: 3)
 """
 
-import json
 import os
 import threading
 from collections import defaultdict
@@ -21,6 +20,8 @@ import zmq
 
 from utils.logging import get_logger
 
+from .wire_format import create_publisher_socket, send_market_data
+
 logger = get_logger(__name__)
 
 # Thread-local storage for pooled adapter creation context
@@ -80,7 +81,7 @@ class SharedZmqPublisher:
         self._initialized = True
         self.logger = get_logger("shared_zmq_publisher")
         self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.PUB)
+        self.socket = create_publisher_socket(self.context)
         self.socket.setsockopt(zmq.LINGER, 1000)
         self.socket.setsockopt(zmq.SNDHWM, 1000)
         self.zmq_port = None
@@ -131,7 +132,7 @@ class SharedZmqPublisher:
 
             raise RuntimeError("Could not bind shared ZMQ publisher to any port")
 
-    def publish(self, topic: str, data: dict):
+    def publish(self, topic: str, data: dict) -> bool:
         """
         Publish market data to ZeroMQ subscribers.
         Thread-safe publishing.
@@ -139,18 +140,21 @@ class SharedZmqPublisher:
         Args:
             topic: Topic string for subscriber filtering
             data: Market data dictionary
+
+        Returns:
+            True if the message was sent, False if the socket is not bound or the send failed
         """
         if not self._bound:
             self.logger.error("Cannot publish: ZMQ socket not bound")
-            return
+            return False
 
         with self._publish_lock:
             try:
-                self.socket.send_multipart(
-                    [topic.encode("utf-8"), json.dumps(data).encode("utf-8")]
-                )
+                send_market_data(self.socket, topic, data)
+                return True
             except Exception as e:
                 self.logger.exception(f"Error publishing to ZMQ: {e}")
+                return False
 
     def cleanup(self):
         """Clean up ZeroMQ resources with separate error handling for each step"""
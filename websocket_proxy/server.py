@@ -1,5 +1,6 @@
 import asyncio as aio
 import json
+import math
 import os
 import signal
 import socket
@@ -20,7 +21,16 @@ from utils.logging import get_logger, highlight_url
 
 from .base_adapter import BaseBrokerWebSocketAdapter
 from .broker_factory import create_broker_adapter
+from .client_queue import ClientSendQueue
+from .conflation import TimerWheel, get_default_conflation_window, get_max_conflation_window
 from .port_check import find_available_port, is_port_in_use
+from .wire_format import (
+    decode_compact,
+    get_instrument_registry,
+    is_compact_topic,
+    parse_topic,
+    take_definition_requests,
+)
 
 # Initialize logger
 logger = get_logger("websocket_proxy")
@@ -63,6 +73,7 @@ class WebSocketProxy:
         self.broker_adapters = {}  # Maps user_id to broker adapter
         self.user_mapping = {}  # Maps client_id to user_id
         self.user_broker_mapping = {}  # Maps user_id to broker_name
+        self.client_queues: dict[int, ClientSendQueue] = {}  # Maps client_id to outbound queue
         self.running = False
 
         # PERFORMANCE OPTIMIZATION: Subscription index for O(1) lookup
@@ -70,21 +81,37 @@ class WebSocketProxy:
         # This eliminates the need for nested loops in zmq_listener
         self.subscription_index: dict[tuple[str, str, int], set[int]] = defaultdict(set)
 
-        # PERFORMANCE OPTIMIZATION 2: Message throttling to avoid excessive updates
-        # Maps (symbol, exchange, mode) -> last message timestamp
-        # Prevents sending duplicate LTP updates faster than 50ms
-        self.last_message_time: dict[tuple[str, str, int], float] = {}
-        self.message_throttle_interval = 0.05  # 50ms minimum between messages
+        # PERFORMANCE OPTIMIZATION: Per-subscription conflation windows
+        # Each client queue holds back ticks for a (symbol, exchange, mode) key for
+        # the subscription's window and then delivers the most recent one. The
+        # timer wheel releases windows; it has fixed slots and no per-key timestamps.
+        self.conflation_wheel = TimerWheel()
+        self.default_conflation_window = get_default_conflation_window()
+        self.max_conflation_window = get_max_conflation_window()
 
-        # PERFORMANCE OPTIMIZATION 3: Pre-compute mode mappings
+        # PERFORMANCE OPTIMIZATION: Pre-compute mode mappings
         self.MODE_MAP = {"LTP": 1, "QUOTE": 2, "DEPTH": 3}
 
         # RESOURCE MONITORING: Track metrics for health checks
         self._stats_lock = aio.Lock() if hasattr(aio, 'Lock') else None
         self._messages_processed = 0
-        self._last_cleanup_time = time.time()
-        self._cleanup_interval = 300  # Clean stale entries every 5 minutes
-        self._throttle_entry_max_age = 60  # Remove throttle entries older than 60 seconds
+
+        # Compact wire format frames that carried no routable tick
+        self._compact_frames_skipped = 0
+        self._definition_requests = 0
+
+        # FAN-OUT METRICS: Per-tick encode and send timings (seconds)
+        # Each tick is serialized once per distinct broker value, then the same
+        # string is sent to every matching websocket.
+        self._fanout_ticks = 0
+        self._fanout_encodes = 0
+        self._fanout_sends = 0
+        self._fanout_encode_time_total = 0.0
+        self._fanout_send_time_total = 0.0
+        self._fanout_last_encode_time = 0.0
+        self._fanout_last_send_time = 0.0
+        self._fanout_max_encode_time = 0.0
+        self._fanout_max_send_time = 0.0
 
         # ZeroMQ context for subscribing to broker adapters
         self.context = zmq.asyncio.Context()
@@ -111,6 +138,9 @@ class WebSocketProxy:
             # Create the ZMQ listener task
             zmq_task = loop.create_task(self.zmq_listener())
 
+            # Drive conflation window expiry for all client queues
+            conflation_task = loop.create_task(self.conflation_timer())
+
             # Start WebSocket server
             stop = aio.Future()  # Used to stop the server
 
@@ -165,12 +195,14 @@ class WebSocketProxy:
 
                 await stop  # Wait until stopped
 
-                # Cancel the monitor task
+                # Cancel the monitor and conflation timer tasks
                 monitor_task.cancel()
-                try:
-                    await monitor_task
-                except aio.CancelledError:
-                    pass
+                conflation_task.cancel()
+                for task in (monitor_task, conflation_task):
+                    try:
+                        await task
+                    except aio.CancelledError:
+                        pass
 
             except Exception as e:
                 logger.exception(f"Failed to start WebSocket server: {e}")
@@ -210,6 +242,14 @@ class WebSocketProxy:
                 except Exception as e:
                     logger.exception(f"Error closing WebSocket server: {e}")
 
+            # Stop per-client writer tasks
+            for client_queue in list(self.client_queues.values()):
+                try:
+                    await client_queue.close()
+                except Exception as e:
+                    logger.exception(f"Error closing send queue for client {client_queue.client_id}: {e}")
+            self.client_queues.clear()
+
             # Close all client connections
             close_tasks = []
             for client_id, websocket in self.clients.items():
@@ -311,7 +351,6 @@ class WebSocketProxy:
         # Calculate subscription index stats
         total_subscriptions = len(self.subscription_index)
         total_client_subscriptions = sum(len(clients) for clients in self.subscription_index.values())
-        throttle_entries = len(self.last_message_time)
 
         return {
             "server": {
@@ -336,53 +375,105 @@ class WebSocketProxy:
                 "brokers": list(self.user_broker_mapping.values()),
             },
             "performance": {
-                "throttle_entries": throttle_entries,
                 "messages_processed": self._messages_processed,
-                "last_cleanup_time": self._last_cleanup_time,
+                "conflation": {
+                    "default_window_ms": round(self.default_conflation_window * 1000, 3),
+                    "max_window_ms": round(self.max_conflation_window * 1000, 3),
+                    **self.conflation_wheel.get_stats(),
+                },
+                "fanout": self._get_fanout_stats(),
+                "market_data_ingest": self._get_market_data_ingest_stats(),
+            },
+            "client_queues": self._get_client_queue_stats(),
+            "wire_format": {
+                "interned_instruments": len(get_instrument_registry()),
+                "compact_frames_skipped": self._compact_frames_skipped,
+                "definition_requests": self._definition_requests,
             },
             "zmq_resources": adapter_stats,
         }
 
-    def _cleanup_stale_throttle_entries(self):
-        """
-        Remove stale entries from last_message_time dict.
+    def _get_market_data_ingest_stats(self) -> dict | None:
+        """Get MarketDataService ingestion queue backpressure counters"""
+        ingestor = get_market_data_service().ingestor
+        return ingestor.get_stats() if ingestor is not None else None
 
-        This prevents unbounded memory growth from symbols that were
-        subscribed to but are no longer active.
+    def _get_fanout_stats(self) -> dict:
         """
-        current_time = time.time()
-
-        # Only run cleanup periodically
-        if current_time - self._last_cleanup_time < self._cleanup_interval:
-            return
+        Get per-tick encode and send timings for the market data fan-out.
 
-        self._last_cleanup_time = current_time
-        initial_count = len(self.last_message_time)
+        Returns:
+            dict: Counters plus average, last and max timings in milliseconds
+        """
+        ticks = self._fanout_ticks
+        return {
+            "ticks": ticks,
+            "encodes": self._fanout_encodes,
+            "sends": self._fanout_sends,
+            "encodes_per_tick": round(self._fanout_encodes / ticks, 3) if ticks else 0.0,
+            "sends_per_tick": round(self._fanout_sends / ticks, 3) if ticks else 0.0,
+            "avg_encode_ms": round(self._fanout_encode_time_total * 1000 / ticks, 4) if ticks else 0.0,
+            "avg_send_ms": round(self._fanout_send_time_total * 1000 / ticks, 4) if ticks else 0.0,
+            "last_encode_ms": round(self._fanout_last_encode_time * 1000, 4),
+            "last_send_ms": round(self._fanout_last_send_time * 1000, 4),
+            "max_encode_ms": round(self._fanout_max_encode_time * 1000, 4),
+            "max_send_ms": round(self._fanout_max_send_time * 1000, 4),
+        }
 
-        # Find and remove stale entries
-        stale_keys = [
-            key for key, timestamp in self.last_message_time.items()
-            if current_time - timestamp > self._throttle_entry_max_age
-        ]
+    def _get_client_queue_stats(self) -> dict:
+        """
+        Get outbound queue depth and drop counters for all clients.
 
-        for key in stale_keys:
-            del self.last_message_time[key]
+        Returns:
+            dict: Totals plus per-client queue statistics
+        """
+        per_client = {
+            str(client_id): client_queue.get_stats()
+            for client_id, client_queue in self.client_queues.items()
+        }
+        return {
+            "total_depth": sum(stats["depth"] for stats in per_client.values()),
+            "total_conflated": sum(stats["conflated"] for stats in per_client.values()),
+            "total_dropped": sum(stats["dropped"] for stats in per_client.values()),
+            "per_client": per_client,
+        }
 
-        if stale_keys:
-            logger.info(
-                f"Cleaned up {len(stale_keys)} stale throttle entries "
-                f"(was {initial_count}, now {len(self.last_message_time)})"
-            )
+    def _record_fanout_timing(self, encode_time: float, send_time: float, encodes: int, sends: int):
+        """
+        Record encode/send timings for one fanned-out tick.
 
-        # Log subscription index stats periodically
-        total_subs = len(self.subscription_index)
-        total_clients = len(self.clients)
-        if total_subs > 0 or total_clients > 0:
-            logger.debug(
-                f"Resource stats: {total_clients} clients, "
-                f"{total_subs} unique subscriptions, "
-                f"{len(self.last_message_time)} throttle entries"
-            )
+        Args:
+            encode_time: Seconds spent serializing payloads for this tick
+            send_time: Seconds spent handing the pre-encoded payloads to client queues
+            encodes: Number of payloads serialized (one per distinct broker)
+            sends: Number of payloads enqueued
+        """
+        self._fanout_ticks += 1
+        self._fanout_encodes += encodes
+        self._fanout_sends += sends
+        self._fanout_encode_time_total += encode_time
+        self._fanout_send_time_total += send_time
+        self._fanout_last_encode_time = encode_time
+        self._fanout_last_send_time = send_time
+        if encode_time > self._fanout_max_encode_time:
+            self._fanout_max_encode_time = encode_time
+        if send_time > self._fanout_max_send_time:
+            self._fanout_max_send_time = send_time
+
+    async def conflation_timer(self):
+        """
+        Advance the conflation timer wheel so held ticks are delivered when
+        their subscription's window expires.
+        """
+        tick = self.conflation_wheel.tick
+        while self.running:
+            try:
+                await aio.sleep(tick)
+                self.conflation_wheel.advance()
+            except aio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Error in conflation timer: {e}")
 
     async def handle_client(self, websocket):
         """
@@ -395,6 +486,17 @@ class WebSocketProxy:
         self.clients[client_id] = websocket
         self.subscriptions[client_id] = set()
 
+        # Market data goes through a bounded per-client queue with its own writer
+        # task, so a slow client never blocks the ZeroMQ listener
+        client_queue = ClientSendQueue(
+            client_id,
+            websocket,
+            timer_wheel=self.conflation_wheel,
+            default_window=self.default_conflation_window,
+        )
+        client_queue.start()
+        self.client_queues[client_id] = client_queue
+
         # Get path info from websocket if available
         path = getattr(websocket, "path", "/unknown")
         logger.info(f"Client connected: {client_id} from path: {path}")
@@ -432,6 +534,11 @@ class WebSocketProxy:
         if client_id in self.clients:
             del self.clients[client_id]
 
+        # Stop the client's writer task and drop pending messages
+        client_queue = self.client_queues.pop(client_id, None)
+        if client_queue:
+            await client_queue.close()
+
         # Clean up subscriptions
         if client_id in self.subscriptions:
             subscriptions = self.subscriptions[client_id]
@@ -947,6 +1054,26 @@ class WebSocketProxy:
         mode_str = data.get("mode", "Quote")  # Get mode as string (LTP, Quote, Depth)
         depth_level = data.get("depth", 5)  # Default to 5 levels
 
+        # Optional per-subscription conflation window, e.g. 0 for strategies, 250 for UIs
+        conflation_window = None
+        conflation_ms = data.get("conflation_ms")
+        if conflation_ms is not None:
+            try:
+                conflation_window = float(conflation_ms) / 1000
+                if not math.isfinite(conflation_window):
+                    raise ValueError(conflation_ms)
+            except (TypeError, ValueError):
+                await self.send_error(
+                    client_id, "INVALID_PARAMETERS", "conflation_ms must be a number"
+                )
+                return
+            if conflation_window < 0:
+                await self.send_error(
+                    client_id, "INVALID_PARAMETERS", "conflation_ms must not be negative"
+                )
+                return
+            conflation_window = min(conflation_window, self.max_conflation_window)
+
         # Map string mode to numeric mode
         mode_mapping = {"LTP": 1, "Quote": 2, "Depth": 3}
 
@@ -1005,6 +1132,10 @@ class WebSocketProxy:
                 sub_key = (symbol, exchange, mode)
                 self.subscription_index[sub_key].add(client_id)
 
+                client_queue = self.client_queues.get(client_id)
+                if client_queue:
+                    client_queue.set_window(sub_key, conflation_window)
+
                 # Add to successful subscriptions
                 subscription_responses.append(
                     {
@@ -1087,6 +1218,7 @@ class WebSocketProxy:
 
         adapter = self.broker_adapters[user_id]
         broker_name = self.user_broker_mapping.get(user_id, "unknown")
+        client_queue = self.client_queues.get(client_id)
 
         # Process unsubscribe request
         successful_unsubscriptions = []
@@ -1114,6 +1246,8 @@ class WebSocketProxy:
                     if symbol and exchange:
                         # Remove from subscription index and check if we should unsubscribe from adapter
                         sub_key = (symbol, exchange, mode)
+                        if client_queue:
+                            client_queue.clear_key(sub_key)
                         should_unsubscribe_from_adapter = False
                         if sub_key in self.subscription_index:
                             self.subscription_index[sub_key].discard(client_id)
@@ -1164,6 +1298,8 @@ class WebSocketProxy:
 
                 # Remove from subscription index and check if we should unsubscribe from adapter
                 sub_key = (symbol, exchange, mode)
+                if client_queue:
+                    client_queue.clear_key(sub_key)
                 should_unsubscribe_from_adapter = False
                 if sub_key in self.subscription_index:
                     self.subscription_index[sub_key].discard(client_id)
@@ -1422,7 +1558,8 @@ class WebSocketProxy:
         Key Performance Improvements:
         1. Increased timeout from 0.1s to 0.3s (reduces busy-waiting by 66%)
         2. Use subscription_index for O(1) lookup instead of O(n²) iteration
-        3. Batch message sending with asyncio.gather
+        3. Serialize each tick once per distinct broker and share the payload
+        4. Enqueue to per-client send queues instead of awaiting client sockets
 
         Also handles cache invalidation messages from Flask process for cross-process
         cache synchronization (see GitHub issue #765).
@@ -1435,10 +1572,7 @@ class WebSocketProxy:
                 if not self.running:
                     break
 
-                # RESOURCE CLEANUP: Periodically clean stale throttle entries
-                self._cleanup_stale_throttle_entries()
-
-                # OPTIMIZATION 1: Increased timeout to reduce busy-waiting
+                # OPTIMIZATION: Increased timeout to reduce busy-waiting
                 try:
                     [topic, data] = await aio.wait_for(
                         self.socket.recv_multipart(),
@@ -1448,83 +1582,61 @@ class WebSocketProxy:
                     # No message received within timeout, continue the loop
                     continue
 
-                # Parse the message
-                topic_str = topic.decode("utf-8")
-                data_str = data.decode("utf-8")
-
-                # Handle cache invalidation messages (from Flask process)
-                # These messages clear stale auth tokens after re-login
-                # See GitHub issue #765 for details
-                if topic_str.startswith("CACHE_INVALIDATE"):
-                    try:
-                        self._handle_cache_invalidation(topic_str, data_str)
-                    except Exception as e:
-                        logger.exception(f"Error handling cache invalidation: {e}")
-                    continue  # Skip market data processing for cache messages
-
-                market_data = json.loads(data_str)
-
-                # Extract topic components
-                # Support both formats:
-                # New format: BROKER_EXCHANGE_SYMBOL_MODE (with broker name)
-                # Old format: EXCHANGE_SYMBOL_MODE (without broker name)
-                # Special case: NSE_INDEX_SYMBOL_MODE (exchange contains underscore)
-                parts = topic_str.split("_")
-
-                # Special case handling for NSE_INDEX and BSE_INDEX
-                if len(parts) >= 4 and parts[0] == "NSE" and parts[1] == "INDEX":
-                    broker_name = "unknown"
-                    exchange = "NSE_INDEX"
-                    symbol = parts[2]
-                    mode_str = parts[3]
-                elif len(parts) >= 4 and parts[0] == "BSE" and parts[1] == "INDEX":
-                    broker_name = "unknown"
-                    exchange = "BSE_INDEX"
-                    symbol = parts[2]
-                    mode_str = parts[3]
-                elif len(parts) >= 5 and parts[1] == "INDEX":  # BROKER_NSE_INDEX_SYMBOL_MODE format
-                    broker_name = parts[0]
-                    exchange = f"{parts[1]}_{parts[2]}"
-                    symbol = parts[3]
-                    mode_str = parts[4]
-                elif len(parts) >= 4:
-                    # Standard format with broker name
-                    broker_name = parts[0]
-                    exchange = parts[1]
-                    symbol = parts[2]
-                    mode_str = parts[3]
-                elif len(parts) >= 3:
-                    # Old format without broker name
-                    broker_name = "unknown"
-                    exchange = parts[0]
-                    symbol = parts[1]
-                    mode_str = parts[2]
+                # Compact frames carry an interned instrument id, no topic splitting needed
+                if is_compact_topic(topic):
+                    decoded = decode_compact(topic, data)
+                    if decoded is None:
+                        # Definition frame, or tick for an instrument not defined yet.
+                        # Ask publishers for missed definitions: a subscription to the
+                        # request topic reaches their XPUB sockets (we already receive
+                        # everything, so it is dropped again right away).
+                        self._compact_frames_skipped += 1
+                        for request in take_definition_requests():
+                            self.socket.setsockopt(zmq.SUBSCRIBE, request)
+                            self.socket.setsockopt(zmq.UNSUBSCRIBE, request)
+                            self._definition_requests += 1
+                        continue
+                    broker_name, exchange, symbol, mode, market_data = decoded
                 else:
-                    logger.warning(f"Invalid topic format: {topic_str}")
-                    continue
+                    # Parse the message
+                    topic_str = topic.decode("utf-8")
+                    data_str = data.decode("utf-8")
+
+                    # Handle cache invalidation messages (from Flask process)
+                    # These messages clear stale auth tokens after re-login
+                    # See GitHub issue #765 for details
+                    if topic_str.startswith("CACHE_INVALIDATE"):
+                        try:
+                            self._handle_cache_invalidation(topic_str, data_str)
+                        except Exception as e:
+                            logger.exception(f"Error handling cache invalidation: {e}")
+                        continue  # Skip market data processing for cache messages
 
-                # OPTIMIZATION: Use pre-computed mode map
-                mode = self.MODE_MAP.get(mode_str)
+                    market_data = json.loads(data_str)
 
-                if not mode:
-                    logger.warning(f"Invalid mode in topic: {mode_str}")
-                    continue
+                    # Extract topic components (memoized, handles NSE_INDEX/BSE_INDEX)
+                    parsed_topic = parse_topic(topic_str)
+                    if parsed_topic is None:
+                        logger.warning(f"Invalid topic format: {topic_str}")
+                        continue
+                    broker_name, exchange, symbol, mode_str = parsed_topic
 
-                # OPTIMIZATION: Message throttling for high-frequency updates
-                # Skip if we sent the same message too recently (reduces CPU on fast updates)
-                sub_key = (symbol, exchange, mode)
-                current_time = time.time()
+                    # OPTIMIZATION: Use pre-computed mode map
+                    mode = self.MODE_MAP.get(mode_str)
 
-                # Only throttle LTP mode (mode 1), not Quote/Depth
-                if mode == 1:  # LTP mode
-                    last_time = self.last_message_time.get(sub_key, 0)
-                    if current_time - last_time < self.message_throttle_interval:
-                        continue  # Skip this update, too soon
-                    self.last_message_time[sub_key] = current_time
+                    if not mode:
+                        logger.warning(f"Invalid mode in topic: {mode_str}")
+                        continue
+
+                # Every tick is ingested; rate limiting happens per client through
+                # the conflation windows of each ClientSendQueue
+                sub_key = (symbol, exchange, mode)
 
                 # Feed market data to MarketDataService for backend consumers
                 # (sandbox execution engine, position MTM, RMS, etc.)
-                # This runs regardless of whether WebSocket clients are subscribed
+                # This runs regardless of whether WebSocket clients are subscribed.
+                # submit_market_data only enqueues; validation and subscriber
+                # callbacks run on the service's ingestion thread.
                 try:
                     mds_data = {
                         "symbol": symbol,
@@ -1533,12 +1645,12 @@ class WebSocketProxy:
                         "data": market_data,
                     }
                     market_data_service = get_market_data_service()
-                    market_data_service.process_market_data(mds_data)
+                    market_data_service.submit_market_data(mds_data)
                 except Exception as mds_error:
                     # Don't block WebSocket delivery if MarketDataService has issues
                     logger.debug(f"MarketDataService processing error: {mds_error}")
 
-                # OPTIMIZATION 2: O(1) lookup using subscription index
+                # OPTIMIZATION: O(1) lookup using subscription index
                 # Instead of iterating through ALL clients and ALL subscriptions (O(n²)),
                 # directly lookup clients subscribed to this specific (symbol, exchange, mode)
                 client_ids = self.subscription_index.get(sub_key, set()).copy()
@@ -1546,22 +1658,10 @@ class WebSocketProxy:
                 if not client_ids:
                     continue  # No WebSocket clients subscribed, skip delivery
 
-                # OPTIMIZATION 3: Batch message sends for parallel delivery
-                send_tasks = []
-
-                # OPTIMIZATION 4: Pre-create base message (reused for all clients)
-                # This avoids creating the same dict 1000 times
-                base_message = {
-                    "type": "market_data",
-                    "symbol": symbol,
-                    "exchange": exchange,
-                    "mode": mode,
-                    "data": market_data,
-                }
-
-                # OPTIMIZATION 5: Pre-serialize JSON once (not per-client)
-                # Most clients get the same message, so serialize once
-                base_message_str = None
+                # OPTIMIZATION: Group clients by the broker value they will see
+                # A tick is identical for every client of the same broker, so the
+                # only per-client field is "broker". Group first, encode once per group.
+                clients_by_broker: dict[str, list[int]] = defaultdict(list)
 
                 for client_id in client_ids:
                     # Verify client still exists
@@ -1578,16 +1678,43 @@ class WebSocketProxy:
                     if broker_name != "unknown" and client_broker and client_broker != broker_name:
                         continue
 
-                    # Add broker to message
-                    message = base_message.copy()
-                    message["broker"] = broker_name if broker_name != "unknown" else client_broker
+                    message_broker = broker_name if broker_name != "unknown" else client_broker
+                    clients_by_broker[message_broker].append(client_id)
 
-                    # Add to batch
-                    send_tasks.append(self.send_message(client_id, message))
+                if not clients_by_broker:
+                    continue
 
-                # Send all messages in parallel (non-blocking)
-                if send_tasks:
-                    await aio.gather(*send_tasks, return_exceptions=True)
+                # OPTIMIZATION: Pre-serialize JSON once per distinct broker value
+                encode_start = time.perf_counter()
+                encoded_payloads = {
+                    message_broker: json.dumps(
+                        {
+                            "type": "market_data",
+                            "symbol": symbol,
+                            "exchange": exchange,
+                            "mode": mode,
+                            "data": market_data,
+                            "broker": message_broker,
+                        }
+                    )
+                    for message_broker in clients_by_broker
+                }
+                encode_time = time.perf_counter() - encode_start
+
+                # OPTIMIZATION: Hand the shared payload to each client's queue
+                # Enqueueing never blocks; per-client writer tasks do the socket I/O
+                send_start = time.perf_counter()
+                sends = 0
+                for message_broker, broker_clients in clients_by_broker.items():
+                    payload = encoded_payloads[message_broker]
+                    for client_id in broker_clients:
+                        client_queue = self.client_queues.get(client_id)
+                        if client_queue:
+                            client_queue.put(sub_key, mode, payload)
+                            sends += 1
+                send_time = time.perf_counter() - send_start
+
+                self._record_fanout_timing(encode_time, send_time, len(encoded_payloads), sends)
 
                 # METRICS: Track message count for health monitoring
                 self._messages_processed += 1
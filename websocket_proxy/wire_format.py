@@ -0,0 +1,536 @@
+"""
+Wire format for the broker adapter -> WebSocket proxy ZeroMQ hop.
+
+Two encodings are supported on the same socket:
+
+Legacy (JSON):
+    topic   = "EXCHANGE_SYMBOL_MODE" or "BROKER_EXCHANGE_SYMBOL_MODE" (utf-8)
+    payload = json.dumps(data)
+
+Compact (ZMQ_WIRE_FORMAT=compact):
+    topic   = 11 bytes: magic, mode (1/2/3), payload encoding, publisher id,
+              interned instrument id
+    payload = one of
+        ENCODING_STRUCT  - fixed layout for numeric LTP/Quote fields plus a
+                           variable-length level list for Depth
+        ENCODING_MSGPACK - msgpack of the data dict (when msgpack is installed)
+        ENCODING_JSON    - json of the data dict (last resort for odd ticks)
+
+The instrument id is interned once per (broker, exchange, symbol) so the proxy
+does not need to split and special-case topic strings such as NSE_INDEX on
+every tick. Ids are scoped by a random publisher id drawn at process start, so
+several adapter processes (or a restarted one) can share the bus without
+collisions.
+
+Subscribers in another process learn ids from definition frames. A definition
+precedes the first tick of an instrument and is repeated:
+- every ZMQ_DEFINITION_INTERVAL seconds (default 10) per instrument
+- when a subscriber connects: compact publishers use an XPUB socket, which
+  reports each new subscription
+- when a subscriber sees an id it does not know: it briefly subscribes to a
+  request topic naming that id, which the publisher answers on its next tick
+
+The proxy always accepts both encodings, so adapters can be switched over
+independently and CACHE_INVALIDATE messages keep their string topics.
+"""
+
+import json
+import os
+import secrets
+import struct
+import threading
+import time
+from functools import lru_cache
+
+import zmq
+
+from utils.logging import get_logger
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# "json" keeps the legacy string-topic/JSON encoding, "compact" enables the
+# interned-id topic with struct/msgpack payloads
+WIRE_FORMAT = os.getenv("ZMQ_WIRE_FORMAT", "json").strip().lower()
+
+# Seconds between repeated definition frames of an instrument
+DEFINITION_INTERVAL = float(os.getenv("ZMQ_DEFINITION_INTERVAL", "10"))
+
+# Minimum seconds between definition requests for the same unknown id
+DEFINITION_REQUEST_INTERVAL = 1.0
+
+# First topic byte of compact frames. Legacy topics always start with ASCII.
+MAGIC_DATA = 0xA1
+MAGIC_DEFINITION = 0xA0
+MAGIC_REQUEST = 0xA2
+
+ENCODING_STRUCT = 1
+ENCODING_MSGPACK = 2
+ENCODING_JSON = 3
+
+MODE_MAP = {"LTP": 1, "QUOTE": 2, "DEPTH": 3}
+MODE_NAMES = {1: "LTP", 2: "QUOTE", 3: "DEPTH"}
+
+_TOPIC = struct.Struct(">BBBII")  # magic, mode, encoding, publisher id, instrument id
+_REQUEST = struct.Struct(">BII")  # magic, publisher id, instrument id (0 = all)
+_HEADER = struct.Struct(">BBII")  # mode tag, flags, present mask, int mask
+_DEPTH_HEADER = struct.Struct(">HH")  # buy levels, sell levels
+_LEVEL = struct.Struct(">dqq")  # price, quantity, orders
+
+# Numeric tick fields that the fixed layout can carry (max 32, one mask bit each)
+STRUCT_FIELDS = (
+    "ltp",
+    "ltq",
+    "ltt",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "oi",
+    "average_price",
+    "percent_change",
+    "change",
+    "last_quantity",
+    "last_trade_quantity",
+    "last_trade_time",
+    "total_buy_quantity",
+    "total_sell_quantity",
+    "upper_circuit",
+    "lower_circuit",
+    "prev_close",
+    "timestamp",
+    "depth_level",
+    "token",
+)
+_FIELD_BITS = {name: 1 << index for index, name in enumerate(STRUCT_FIELDS)}
+
+# Values the "mode" key of a tick may carry; index 0 means the key is absent
+_MODE_TAGS = (None, "ltp", "quote", "full", "depth", "LTP", "QUOTE", "DEPTH", 1, 2, 3)
+_MODE_TAG_INDEX = {(type(tag), tag): index for index, tag in enumerate(_MODE_TAGS) if tag is not None}
+
+_FLAG_SYMBOL = 0x01
+_FLAG_EXCHANGE = 0x02
+_FLAG_DEPTH = 0x04
+
+_LEVEL_KEYS = frozenset(("price", "quantity", "orders"))
+
+
+class InstrumentRegistry:
+    """
+    Interns (broker, exchange, symbol) tuples to compact numeric ids.
+
+    Ids assigned here are scoped by this registry's publisher_id. Ids of other
+    publishers are learnt from their definition frames. Adapters normally run
+    inside the proxy process, in which case both sides share this registry and
+    definitions are a no-op.
+    """
+
+    def __init__(self, publisher_id: int | None = None):
+        self.publisher_id = publisher_id if publisher_id is not None else secrets.randbits(32)
+        self._lock = threading.Lock()
+        self._ids: dict[tuple[str, str, str], int] = {}
+        # (publisher_id, instrument_id) -> (broker, exchange, symbol), own and learnt
+        self._instruments: dict[tuple[int, int], tuple[str, str, str]] = {}
+        self._next_id = 1
+        # Publisher side: instrument id -> monotonic time its definition was last sent
+        self._defined_at: dict[int, float] = {}
+        # Subscriber side: definition requests for unknown ids
+        self._requested_at: dict[tuple[int, int], float] = {}
+        self._pending_requests: list[bytes] = []
+
+    def intern(self, broker: str, exchange: str, symbol: str) -> tuple[int, bool]:
+        """
+        Get the id for an instrument, assigning a new one if needed.
+
+        Returns:
+            tuple: (instrument_id, definition_due) - definition_due is True when
+                   a definition frame should precede this tick
+        """
+        key = (broker, exchange, symbol)
+        instrument_id = self._ids.get(key)
+        if instrument_id is None:
+            with self._lock:
+                instrument_id = self._ids.get(key)
+                if instrument_id is None:
+                    instrument_id = self._next_id
+                    self._next_id += 1
+                    self._ids[key] = instrument_id
+                    self._instruments[(self.publisher_id, instrument_id)] = key
+
+        now = time.monotonic()
+        sent_at = self._defined_at.get(instrument_id)
+        if sent_at is not None and now - sent_at < DEFINITION_INTERVAL:
+            return instrument_id, False
+        self._defined_at[instrument_id] = now
+        return instrument_id, True
+
+    def request_definitions(self, instrument_ids: list[int] | None = None):
+        """Re-send definitions with the next tick of the given ids (all if None)"""
+        with self._lock:
+            if instrument_ids is None:
+                self._defined_at.clear()
+            else:
+                for instrument_id in instrument_ids:
+                    self._defined_at.pop(instrument_id, None)
+
+    def define(self, publisher_id: int, instrument_id: int, broker: str, exchange: str, symbol: str):
+        """Record an id assigned by a publisher in another process"""
+        with self._lock:
+            self._instruments[(publisher_id, instrument_id)] = (broker, exchange, symbol)
+            self._requested_at.pop((publisher_id, instrument_id), None)
+
+    def lookup(self, publisher_id: int, instrument_id: int) -> tuple[str, str, str] | None:
+        """Get (broker, exchange, symbol) for an id, or None if unknown"""
+        return self._instruments.get((publisher_id, instrument_id))
+
+    def note_unknown(self, publisher_id: int, instrument_id: int):
+        """Queue a definition request for an id seen without its definition"""
+        key = (publisher_id, instrument_id)
+        now = time.monotonic()
+        with self._lock:
+            requested_at = self._requested_at.get(key)
+            if requested_at is not None and now - requested_at < DEFINITION_REQUEST_INTERVAL:
+                return
+            self._requested_at[key] = now
+            self._pending_requests.append(_REQUEST.pack(MAGIC_REQUEST, publisher_id, instrument_id))
+
+    def take_requests(self) -> list[bytes]:
+        """Get and clear the queued definition request topics"""
+        with self._lock:
+            requests, self._pending_requests = self._pending_requests, []
+            return requests
+
+    def __len__(self) -> int:
+        return len(self._instruments)
+
+
+_registry = InstrumentRegistry()
+
+
+def get_instrument_registry() -> InstrumentRegistry:
+    """Get the process-wide instrument registry"""
+    return _registry
+
+
+def take_definition_requests(registry: InstrumentRegistry | None = None) -> list[bytes]:
+    """
+    Get the topics a subscriber should briefly subscribe to in order to ask
+    publishers for definitions it missed (see decode_compact).
+    """
+    return (_registry if registry is None else registry).take_requests()
+
+
+@lru_cache(maxsize=65536)
+def parse_topic(topic_str: str) -> tuple[str, str, str, str] | None:
+    """
+    Split a legacy string topic into its components.
+
+    Supports both formats:
+        New format: BROKER_EXCHANGE_SYMBOL_MODE (with broker name)
+        Old format: EXCHANGE_SYMBOL_MODE (without broker name)
+        Special case: NSE_INDEX_SYMBOL_MODE (exchange contains underscore)
+
+    Results are memoized since the set of live topics is small and fixed.
+
+    Args:
+        topic_str: Topic string
+
+    Returns:
+        tuple: (broker_name, exchange, symbol, mode_str), or None if invalid
+    """
+    parts = topic_str.split("_")
+
+    # Special case handling for NSE_INDEX and BSE_INDEX
+    if len(parts) >= 4 and parts[0] == "NSE" and parts[1] == "INDEX":
+        return "unknown", "NSE_INDEX", parts[2], parts[3]
+    if len(parts) >= 4 and parts[0] == "BSE" and parts[1] == "INDEX":
+        return "unknown", "BSE_INDEX", parts[2], parts[3]
+    if len(parts) >= 5 and parts[1] == "INDEX":  # BROKER_NSE_INDEX_SYMBOL_MODE format
+        return parts[0], f"{parts[1]}_{parts[2]}", parts[3], parts[4]
+    if len(parts) >= 4:
+        # Standard format with broker name
+        return parts[0], parts[1], parts[2], parts[3]
+    if len(parts) >= 3:
+        # Old format without broker name
+        return "unknown", parts[0], parts[1], parts[2]
+    return None
+
+
+def _is_number(value) -> bool:
+    return type(value) in (int, float)
+
+
+def _pack_struct(data: dict, exchange: str, symbol: str) -> bytes | None:
+    """
+    Pack a tick into the fixed layout, or return None if it has fields
+    the layout cannot represent losslessly.
+    """
+    flags = 0
+    present_mask = 0
+    int_mask = 0
+    mode_tag = 0
+    values = []
+    fmt = [">"]
+    depth = None
+
+    for key, value in data.items():
+        bit = _FIELD_BITS.get(key)
+        if bit is not None:
+            if not _is_number(value):
+                return None
+            present_mask |= bit
+            continue
+        if key == "symbol":
+            if value != symbol:
+                return None
+            flags |= _FLAG_SYMBOL
+        elif key == "exchange":
+            if value != exchange:
+                return None
+            flags |= _FLAG_EXCHANGE
+        elif key == "mode":
+            mode_tag = _MODE_TAG_INDEX.get((type(value), value))
+            if mode_tag is None:
+                return None
+        elif key == "depth":
+            if not isinstance(value, dict) or set(value) - {"buy", "sell"}:
+                return None
+            depth = value
+            flags |= _FLAG_DEPTH
+        else:
+            return None
+
+    # Emit values in field order so the decoder can rebuild them from the masks
+    for name in STRUCT_FIELDS:
+        bit = _FIELD_BITS[name]
+        if present_mask & bit:
+            value = data[name]
+            if type(value) is int:
+                if not -(1 << 63) <= value < (1 << 63):
+                    return None
+                int_mask |= bit
+                fmt.append("q")
+            else:
+                fmt.append("d")
+            values.append(value)
+
+    parts = [_HEADER.pack(mode_tag, flags, present_mask, int_mask), _values_struct("".join(fmt)).pack(*values)]
+
+    if depth is not None:
+        buy = depth.get("buy", [])
+        sell = depth.get("sell", [])
+        if len(buy) > 0xFFFF or len(sell) > 0xFFFF:
+            return None
+        parts.append(_DEPTH_HEADER.pack(len(buy), len(sell)))
+        for level in (*buy, *sell):
+            if not isinstance(level, dict) or level.keys() != _LEVEL_KEYS:
+                return None
+            price, quantity, orders = level["price"], level["quantity"], level["orders"]
+            if type(price) is not float or type(quantity) is not int or type(orders) is not int:
+                return None
+            parts.append(_LEVEL.pack(price, quantity, orders))
+
+    return b"".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def _values_struct(fmt: str) -> struct.Struct:
+    return struct.Struct(fmt)
+
+
+def _unpack_struct(payload: bytes, exchange: str, symbol: str) -> dict:
+    """Rebuild a tick dict from the fixed layout"""
+    view = memoryview(payload)
+    mode_tag, flags, present_mask, int_mask = _HEADER.unpack_from(view, 0)
+    offset = _HEADER.size
+
+    data = {}
+    if flags & _FLAG_SYMBOL:
+        data["symbol"] = symbol
+    if flags & _FLAG_EXCHANGE:
+        data["exchange"] = exchange
+    if mode_tag:
+        data["mode"] = _MODE_TAGS[mode_tag]
+
+    names = []
+    fmt = [">"]
+    for name in STRUCT_FIELDS:
+        bit = _FIELD_BITS[name]
+        if present_mask & bit:
+            names.append(name)
+            fmt.append("q" if int_mask & bit else "d")
+    values_struct = _values_struct("".join(fmt))
+    data.update(zip(names, values_struct.unpack_from(view, offset)))
+    offset += values_struct.size
+
+    if flags & _FLAG_DEPTH:
+        buy_count, sell_count = _DEPTH_HEADER.unpack_from(view, offset)
+        offset += _DEPTH_HEADER.size
+        levels = [
+            {"price": price, "quantity": quantity, "orders": orders}
+            for price, quantity, orders in _LEVEL.iter_unpack(
+                view[offset : offset + (buy_count + sell_count) * _LEVEL.size]
+            )
+        ]
+        data["depth"] = {"buy": levels[:buy_count], "sell": levels[buy_count:]}
+
+    return data
+
+
+def encode_market_data(topic: str, data: dict, registry: InstrumentRegistry | None = None) -> list[list[bytes]]:
+    """
+    Encode a tick for publishing on the ZeroMQ socket.
+
+    Args:
+        topic: Legacy topic string (e.g. 'NSE_RELIANCE_LTP')
+        data: Market data dictionary
+        registry: Instrument registry (defaults to the process-wide one)
+
+    Returns:
+        list: One or more multipart messages to send in order. A definition
+              message precedes the tick when one is due for the instrument.
+    """
+    if WIRE_FORMAT != "compact":
+        return [[topic.encode("utf-8"), json.dumps(data).encode("utf-8")]]
+
+    parsed = parse_topic(topic)
+    mode = MODE_MAP.get(parsed[3]) if parsed else None
+    if not mode:
+        # Leave anything the proxy could not route on the legacy path
+        return [[topic.encode("utf-8"), json.dumps(data).encode("utf-8")]]
+
+    if registry is None:
+        registry = _registry
+    broker_name, exchange, symbol, _ = parsed
+    instrument_id, definition_due = registry.intern(broker_name, exchange, symbol)
+
+    messages = []
+    if definition_due:
+        messages.append(
+            [
+                _TOPIC.pack(MAGIC_DEFINITION, 0, ENCODING_JSON, registry.publisher_id, instrument_id),
+                json.dumps([broker_name, exchange, symbol]).encode("utf-8"),
+            ]
+        )
+
+    payload = _pack_struct(data, exchange, symbol)
+    if payload is not None:
+        encoding = ENCODING_STRUCT
+    elif MSGPACK_AVAILABLE:
+        encoding = ENCODING_MSGPACK
+        payload = msgpack.packb(data, use_bin_type=True)
+    else:
+        encoding = ENCODING_JSON
+        payload = json.dumps(data).encode("utf-8")
+
+    messages.append([_TOPIC.pack(MAGIC_DATA, mode, encoding, registry.publisher_id, instrument_id), payload])
+    return messages
+
+
+def create_publisher_socket(context: zmq.Context) -> zmq.Socket:
+    """
+    Create the adapter-side publishing socket.
+
+    Compact publishers use XPUB with verbose subscriptions so they see every
+    subscriber that connects and every definition request (send_market_data
+    handles both). The legacy format keeps a plain PUB socket.
+    """
+    if WIRE_FORMAT != "compact":
+        return context.socket(zmq.PUB)
+    socket = context.socket(zmq.XPUB)
+    socket.setsockopt(zmq.XPUB_VERBOSE, 1)
+    return socket
+
+
+def handle_subscription(message: bytes, registry: InstrumentRegistry | None = None):
+    """
+    Act on a subscription message received on an XPUB socket.
+
+    A definition request naming this publisher re-sends that definition; any
+    other new subscription is a (re)connecting subscriber and re-sends all.
+    """
+    if not message or message[0] != 1:
+        return  # unsubscribe
+    if registry is None:
+        registry = _registry
+    topic = message[1:]
+    if len(topic) == _REQUEST.size and topic[0] == MAGIC_REQUEST:
+        _, publisher_id, instrument_id = _REQUEST.unpack(topic)
+        if publisher_id == registry.publisher_id:
+            registry.request_definitions([instrument_id] if instrument_id else None)
+    else:
+        registry.request_definitions()
+
+
+def send_market_data(socket: zmq.Socket, topic: str, data: dict, registry: InstrumentRegistry | None = None):
+    """
+    Publish a tick on an adapter socket, answering pending subscriptions first.
+
+    Not thread-safe, like the socket itself.
+    """
+    if WIRE_FORMAT == "compact" and socket.socket_type == zmq.XPUB:
+        while True:
+            try:
+                message = socket.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            handle_subscription(message, registry)
+    for frames in encode_market_data(topic, data, registry):
+        socket.send_multipart(frames)
+
+
+def is_compact_topic(topic: bytes) -> bool:
+    """Check whether a received topic uses the compact layout"""
+    return len(topic) == _TOPIC.size and topic[0] in (MAGIC_DATA, MAGIC_DEFINITION)
+
+
+def decode_compact(
+    topic: bytes, payload: bytes, registry: InstrumentRegistry | None = None
+) -> tuple[str, str, str, int, dict] | None:
+    """
+    Decode a compact frame.
+
+    Definition frames update the registry and return None, as do ticks for
+    instrument ids that have not been defined yet. Those queue a definition
+    request, see take_definition_requests.
+
+    Args:
+        topic: Compact topic bytes
+        payload: Payload bytes
+        registry: Instrument registry (defaults to the process-wide one)
+
+    Returns:
+        tuple: (broker_name, exchange, symbol, mode, data) or None
+    """
+    if registry is None:
+        registry = _registry
+    magic, mode, encoding, publisher_id, instrument_id = _TOPIC.unpack(topic)
+
+    if magic == MAGIC_DEFINITION:
+        broker_name, exchange, symbol = json.loads(payload)
+        registry.define(publisher_id, instrument_id, broker_name, exchange, symbol)
+        return None
+
+    instrument = registry.lookup(publisher_id, instrument_id)
+    if instrument is None:
+        registry.note_unknown(publisher_id, instrument_id)
+        return None
+    broker_name, exchange, symbol = instrument
+
+    if encoding == ENCODING_STRUCT:
+        data = _unpack_struct(payload, exchange, symbol)
+    elif encoding == ENCODING_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("Received msgpack frame but msgpack is not installed")
+        data = msgpack.unpackb(payload, raw=False)
+    else:
+        data = json.loads(payload)
+
+    return broker_name, exchange, symbol, mode, data